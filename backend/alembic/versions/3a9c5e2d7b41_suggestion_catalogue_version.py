@@ -0,0 +1,26 @@
+"""suggestion scores and catalogue version
+
+Revision ID: 3a9c5e2d7b41
+Revises: f17dfb03ef75
+Create Date: 2026-10-17 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9c5e2d7b41'
+down_revision = 'f17dfb03ef75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('suggestions', sa.Column('scores', sa.String(length=100), nullable=True))
+    op.add_column('suggestions', sa.Column('catalogue_version', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    op.drop_column('suggestions', 'catalogue_version')
+    op.drop_column('suggestions', 'scores')
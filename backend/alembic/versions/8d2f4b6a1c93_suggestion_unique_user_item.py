@@ -0,0 +1,30 @@
+"""unique suggestion per user and item
+
+Revision ID: 8d2f4b6a1c93
+Revises: 3a9c5e2d7b41
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4b6a1c93'
+down_revision = '3a9c5e2d7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Mantém só a sugestão mais recente de cada usuário/item antes de criar a restrição
+    op.execute(
+        "DELETE FROM suggestions WHERE id NOT IN "
+        "(SELECT MAX(id) FROM suggestions GROUP BY user_id, item_id)"
+    )
+    with op.batch_alter_table('suggestions') as batch_op:
+        batch_op.create_unique_constraint('uq_suggestions_user_item', ['user_id', 'item_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('suggestions') as batch_op:
+        batch_op.drop_constraint('uq_suggestions_user_item', type_='unique')
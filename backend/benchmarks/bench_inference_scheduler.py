@@ -0,0 +1,129 @@
+"""
+Benchmark: forward por requisição vs micro-batching (InferenceScheduler)
+
+Simula C clientes concorrentes, cada um avaliando requisições de N outfits
+(o tamanho típico de uma sugestão), e compara:
+1. direct: cada requisição faz o próprio predict_arrays (threads concorrentes)
+2. scheduler: requisições agrupadas em forwards únicos pelo InferenceScheduler
+
+Reporta throughput (requisições/s e outfits/s), latência p50/p99 e os
+tamanhos médios de batch do scheduler.
+
+Usage:
+    python benchmarks/bench_inference_scheduler.py
+    python benchmarks/bench_inference_scheduler.py --clients 1 8 32 --outfits 10 --max-wait-ms 2
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from modules.inference_scheduler import InferenceScheduler
+from modules.pytorch_model import ModelPredictor, create_model
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark per-request inference vs micro-batching scheduler')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrent clients (default: 1 8 32)')
+    parser.add_argument('--outfits', type=int, default=10, help='Outfits per request (default: 10)')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per case (default: 3)')
+    parser.add_argument('--max-batch-size', type=int, default=256, help='Scheduler max outfits per forward')
+    parser.add_argument('--max-wait-ms', type=float, default=3.0, help='Scheduler max wait (default: 3ms)')
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads (default: torch default)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    return parser.parse_args()
+
+
+def random_request(rng: np.random.Generator, num_outfits: int):
+    embeddings = rng.standard_normal((num_outfits, 5, 96)).astype(np.float32)
+    masks = np.arange(5)[None, :] < rng.integers(2, 6, size=(num_outfits, 1))
+    return embeddings, masks
+
+
+def run_case(score_fn, clients: int, num_outfits: int, duration: float):
+    """Executa clients loops concorrentes por duration segundos"""
+    stop = threading.Event()
+
+    def client(seed: int):
+        rng = np.random.default_rng(seed)
+        request = random_request(rng, num_outfits)
+        latencies = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            score_fn(*request)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        futures = [pool.submit(client, seed) for seed in range(clients)]
+        time.sleep(duration)
+        stop.set()
+        latencies = np.concatenate([future.result() for future in futures]) * 1000
+
+    return {
+        "requests_per_s": len(latencies) / duration,
+        "outfits_per_s": len(latencies) * num_outfits / duration,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    args = parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = Path(tmp_dir) / "random_model.pth"
+        torch.save({'model_state_dict': create_model({}).state_dict(), 'epoch': 0, 'best_val_auc': 0.5}, checkpoint_path)
+        predictor = ModelPredictor(str(checkpoint_path), device='cpu')
+
+    rows = []
+    for clients in args.clients:
+        direct = run_case(predictor.predict_arrays, clients, args.outfits, args.duration)
+
+        scheduler = InferenceScheduler(predictor, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        batched = run_case(
+            lambda embeddings, masks: scheduler.submit(embeddings, masks).result(),
+            clients, args.outfits, args.duration
+        )
+        scheduler.close()
+        stats = scheduler.stats
+
+        rows.append({
+            "clients": clients,
+            "direct": direct,
+            "scheduler": batched,
+            "avg_jobs_per_batch": stats["avg_jobs_per_batch"],
+            "max_queue_depth": stats["max_queue_depth"],
+        })
+        print(
+            f"clients={clients:>3} | direct {direct['requests_per_s']:>8.0f} req/s "
+            f"(p99 {direct['p99_ms']:.1f}ms) | scheduler {batched['requests_per_s']:>8.0f} req/s "
+            f"(p99 {batched['p99_ms']:.1f}ms, {stats['avg_jobs_per_batch']:.1f} jobs/forward) | "
+            f"speedup {batched['requests_per_s'] / direct['requests_per_s']:.2f}x"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=2)
+        print(f"\n✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark do forward do OutfitCompatibilityModel (CPU)
+
+Compara a formulação vetorizada das relações par a par (gather dos pares
+triangulares + einsum) com o loop Python original (for i / for j), para
+treino (forward + backward) e serving (eval + no_grad).
+
+Também verifica que as duas formulações produzem os mesmos scores.
+
+Usage:
+    python benchmarks/bench_model_forward.py
+    python benchmarks/bench_model_forward.py --batch-sizes 1 32 1024 --iters 50
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from modules.pytorch_model import create_model
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark vectorised vs loop pairwise relations')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 1024],
+                        help='Batch sizes to benchmark (default: 1 32 1024)')
+    parser.add_argument('--iters', type=int, default=30, help='Timed iterations per case (default: 30)')
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads (default: torch default)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    return parser.parse_args()
+
+
+def loop_forward(model, embeddings: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """Forward com o loop par a par original (referência)"""
+    batch_size = embeddings.shape[0]
+    flat_embeddings = embeddings.reshape(-1, model.embed_input_size)
+    projected = model.feature_proj(flat_embeddings)
+    features = projected.reshape(batch_size, model.max_items, model.embed_proj_size)
+
+    relations = []
+    mask_weights = F.relu(model.masks.weight)
+    pair_idx = 0
+    for i in range(model.max_items):
+        for j in range(i, model.max_items):
+            pair_valid = mask[:, i] & mask[:, j]
+            left = F.normalize(mask_weights[pair_idx] * features[:, i], dim=-1)
+            right = F.normalize(mask_weights[pair_idx] * features[:, j], dim=-1)
+            relation = (left * right).sum(dim=-1)
+            relations.append(relation * pair_valid.float())
+            pair_idx += 1
+
+    relations = model.bn_relations(torch.stack(relations, dim=1))
+    return model.predictor(relations).squeeze(-1)
+
+
+def random_batch(batch_size: int, max_items: int = 5):
+    embeddings = torch.randn(batch_size, max_items, 96)
+    num_items = torch.randint(2, max_items + 1, (batch_size,))
+    mask = torch.arange(max_items).unsqueeze(0) < num_items.unsqueeze(1)
+    return embeddings, mask
+
+
+def time_case(fn, iters: int) -> float:
+    """Retorna a mediana (ms) de iters execuções após warm-up"""
+    for _ in range(3):
+        fn()
+    samples = []
+    for _ in range(iters):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1000)
+
+
+def main():
+    args = parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    model = create_model({})
+    rows = []
+
+    for batch_size in args.batch_sizes:
+        embeddings, mask = random_batch(batch_size)
+
+        # Serving: eval + no_grad
+        model.eval()
+        with torch.no_grad():
+            max_diff = (model(embeddings, mask) - loop_forward(model, embeddings, mask)).abs().max().item()
+
+            def serve_vectorised():
+                with torch.no_grad():
+                    model(embeddings, mask)
+
+            def serve_loop():
+                with torch.no_grad():
+                    loop_forward(model, embeddings, mask)
+
+        # Treino: forward + backward (BatchNorm em modo treino requer batch > 1)
+        def train_step(forward):
+            def step():
+                model.zero_grad(set_to_none=True)
+                forward(model, embeddings, mask).mean().backward()
+            return step
+
+        row = {
+            'batch_size': batch_size,
+            'max_abs_diff': max_diff,
+            'serve_loop_ms': time_case(serve_loop, args.iters),
+            'serve_vectorised_ms': time_case(serve_vectorised, args.iters),
+        }
+        if batch_size > 1:
+            model.train()
+            row['train_loop_ms'] = time_case(train_step(loop_forward), args.iters)
+            row['train_vectorised_ms'] = time_case(train_step(lambda m, e, k: m(e, k)), args.iters)
+            model.eval()
+        rows.append(row)
+
+        line = (
+            f"B={batch_size:>5} | serve loop={row['serve_loop_ms']:.2f}ms "
+            f"vec={row['serve_vectorised_ms']:.2f}ms"
+        )
+        if 'train_loop_ms' in row:
+            line += f" | train loop={row['train_loop_ms']:.2f}ms vec={row['train_vectorised_ms']:.2f}ms"
+        line += f" | max|diff|={max_diff:.2e}"
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Benchmark end-to-end do pipeline de sugestões (SuggestionAppService.generate_suggestion)
+
+Para cada tamanho de catálogo:
+1. Gera outfits sintéticos (JSONs no formato de filtered_outfits e imagens JPEG)
+   e os indexa em um ChromaDB temporário com EmbeddingGenerator.bulk_ingest
+2. Cria um checkpoint com pesos aleatórios, um banco SQLite temporário, um
+   usuário e itens com embeddings na coleção do usuário
+3. Mede cada etapa isoladamente (get_item, embedding, search, outfit_fetch,
+   build_inputs, predict, persist, image_encode)
+4. Mede o pipeline completo (sem sugestão persistida nem cache de resultados)
+   com C clientes concorrentes, cada um com a própria sessão do banco
+
+Reporta p50/p95/p99 e throughput em JSON. Com --compare, compara com um
+resultado anterior (ex: de outro commit) e termina com código 1 se alguma
+latência p50/p95 piorar ou algum throughput cair mais que --threshold.
+
+Usage:
+    GEMINI_KEY=x python benchmarks/bench_suggestion_pipeline.py --output baseline.json
+    GEMINI_KEY=x python benchmarks/bench_suggestion_pipeline.py --sizes 2000 20000 --concurrency 1 4 16
+    GEMINI_KEY=x python benchmarks/bench_suggestion_pipeline.py --compare baseline.json --output candidate.json
+    python benchmarks/bench_suggestion_pipeline.py --compare baseline.json candidate.json --threshold 0.15
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Banco temporário: precisa estar definido antes de importar src
+_TMP_DIR = tempfile.mkdtemp(prefix="blindstyle_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/bench.db"
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import torch
+
+from benchmarks.fixtures import build_catalogue, build_checkpoint, random_piece
+from modules.config import VALID_CATEGORIES
+from modules.embeddings import EmbeddingGenerator
+from modules.inference_scheduler import InferenceScheduler
+from modules.model_input import ModelInputBuilder
+from modules.outfit_features import OutfitFeaturesIndex
+from modules.pytorch_model import ModelPredictor
+from modules.thumbnail_cache import ThumbnailCache
+from modules.vector_db import VectorDB
+from src.app_services.suggestion_app_service import SuggestionAppService
+from src.core.db import SessionLocal, create_tables
+from src.core.executors import StageExecutors
+from src.models.user import User as UserModel
+from src.repositories.item_repository import ItemRepository
+from src.schemas.item import ItemCreate
+
+# Itens do usuário usados como alvo (round-robin entre as requisições)
+NUM_ITEMS = 16
+STAGES = ("get_item", "embedding", "search", "outfit_fetch", "build_inputs", "predict", "persist", "image_encode")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the suggestion pipeline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 20000],
+                        help='Catalogue sizes in pieces (default: 2000 20000)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help='Concurrent clients for the full pipeline (default: 1 4 16)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per concurrency level (default: 5)')
+    parser.add_argument('--stage-iterations', type=int, default=50, help='Iterations per isolated stage (default: 50)')
+    parser.add_argument('--no-scheduler', action='store_true', help='Disable the InferenceScheduler')
+    parser.add_argument('--ingest-workers', type=int, default=None, help='bulk_ingest processes (default: cpu count)')
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads (default: torch default)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    parser.add_argument('--compare', type=str, nargs='+', default=None, metavar='JSON',
+                        help='BASELINE [CANDIDATE]: compare results (runs the benchmark if CANDIDATE is omitted)')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative regression tolerated by --compare (default: 0.10)')
+    return parser.parse_args()
+
+
+# ----------------------------------------------------------------------
+# Fixture
+# ----------------------------------------------------------------------
+
+def build_user_items(vector_db: VectorDB, size: int, rng: random.Random):
+    """
+    Cria usuário e itens no SQLite e os embeddings dos itens na coleção do usuário
+
+    Returns:
+        Tuple (user_id, [item_id, ...])
+    """
+    categories = list(VALID_CATEGORIES)
+    db = SessionLocal()
+    try:
+        user_row = UserModel(email=f"bench{size}@test.com", name="Benchmark", hashed_password="x", is_active=True)
+        db.add(user_row)
+        db.commit()
+        db.refresh(user_row)
+        user_id = user_row.id
+
+        item_repo = ItemRepository(db)
+        pieces, item_ids = [], []
+        for index in range(NUM_ITEMS):
+            piece = random_piece(rng, categories[index % len(categories)])
+            item = item_repo.create(user_id, ItemCreate(name=f"Item {index}", image_url="http://localhost/item.jpg", **piece))
+            pieces.append(piece)
+            item_ids.append(item.id)
+    finally:
+        db.close()
+
+    collection_name = f"user_{user_id}_pieces"
+    vector_db.create_collection(collection_name)
+    embeddings = EmbeddingGenerator().generate_embeddings(pieces)
+    vector_db.add_items(collection_name, list(embeddings), [str(item_id) for item_id in item_ids])
+    return user_id, item_ids
+
+
+# ----------------------------------------------------------------------
+# Medição
+# ----------------------------------------------------------------------
+
+def summarize(samples, elapsed=None) -> dict:
+    samples = np.asarray(samples) * 1000
+    summary = {
+        "count": int(len(samples)),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+    }
+    if elapsed is not None:
+        summary["throughput_rps"] = len(samples) / elapsed
+    return summary
+
+
+def timed(samples: dict, stage: str, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    samples[stage].append(time.perf_counter() - start)
+    return result
+
+
+def bench_stages(service: SuggestionAppService, user_id: int, item_ids, iterations: int) -> dict:
+    """Executa cada etapa do pipeline isoladamente (sequencial, sem executores)"""
+    vector_db = service.vector_db
+    samples = {stage: [] for stage in STAGES}
+
+    for iteration in range(iterations):
+        item_id = item_ids[iteration % len(item_ids)]
+        target_item = timed(samples, "get_item", service._get_target_item, item_id, user_id)
+        embedding = timed(samples, "embedding", vector_db.get_by_id, f"user_{user_id}_pieces", str(item_id))["embedding"]
+        similar_ids = timed(
+            samples, "search", vector_db.search_similar, "pieces", embedding,
+            n_results=10, filter_dict={"category": target_item.category}
+        )['ids'][0]
+        outfit_ids = list({sid.split('/')[0] for sid in similar_ids})
+        outfits_dict = timed(samples, "outfit_fetch", vector_db.get_pieces_by_outfits_batch, "pieces", outfit_ids)
+        similar = set(similar_ids)
+        outfits_dict = {
+            outfit_id: [piece for piece in pieces if piece['piece_id'] not in similar]
+            for outfit_id, pieces in outfits_dict.items()
+        }
+
+        inputs, masks, batch_outfit_ids, projected = timed(
+            samples, "build_inputs", service._build_scoring_inputs, embedding, outfits_dict
+        )
+        scores = timed(samples, "predict", service._predict_scoring_inputs, inputs, masks, projected)
+        top_outfits = service.model_predictor.get_top_k_outfits(
+            scores=dict(zip(batch_outfit_ids, scores.tolist())), k=3, min_threshold=0.96
+        )
+        timed(samples, "persist", service._persist_suggestion, user_id, item_id, top_outfits, outfits_dict)
+        for outfit_id, score in top_outfits.items():
+            timed(samples, "image_encode", service._build_outfit_display, outfit_id, score, outfits_dict, None)
+
+    return {stage: summarize(stage_samples) for stage, stage_samples in samples.items() if stage_samples}
+
+
+async def bench_pipeline(make_service, user_id: int, item_ids, clients: int, duration: float) -> dict:
+    """C clientes chamando generate_suggestion em loop por duration segundos"""
+    stop = asyncio.Event()
+    latencies = []
+
+    async def client(index: int):
+        db = SessionLocal()
+        try:
+            service = make_service(db)
+            request = index
+            while not stop.is_set():
+                item_id = item_ids[request % len(item_ids)]
+                start = time.perf_counter()
+                await service.generate_suggestion(item_id, user_id, use_stored=False)
+                latencies.append(time.perf_counter() - start)
+                request += clients
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(client(index)) for index in range(clients)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return summarize(latencies, elapsed=time.perf_counter() - start)
+
+
+def run_size(size: int, args) -> dict:
+    root = Path(_TMP_DIR) / f"catalogue_{size}"
+    root.mkdir()
+
+    print(f"🔄 Criando catálogo sintético ({size:,} peças)...")
+    ingest = build_catalogue(root, size, seed=args.seed, ingest_workers=args.ingest_workers)
+    vector_db = VectorDB(path=root / "chroma")
+    # Sem LRU em memória: cada sugestão lê os thumbnails do cache em disco
+    thumbnail_cache = ThumbnailCache(cache_dir=root / "thumbnails", images_dir=root / "images", max_memory_items=0)
+    outfit_features = OutfitFeaturesIndex(path=root / "missing.sqlite", filtered_dir=root / "filtered")
+    model_predictor = ModelPredictor(str(build_checkpoint(root)), device='cpu')
+    user_id, item_ids = build_user_items(vector_db, size, random.Random(args.seed))
+
+    executors = StageExecutors(stage_limits={"db": 8, "vector": 4, "model": 2, "image": 2})
+    scheduler = None if args.no_scheduler else InferenceScheduler(model_predictor)
+
+    def make_service(db):
+        return SuggestionAppService(
+            db=db,
+            vector_db=vector_db,
+            model_predictor=model_predictor,
+            model_input_builder=ModelInputBuilder(),
+            thumbnail_cache=thumbnail_cache,
+            outfit_features=outfit_features,
+            executors=executors,
+            inference_scheduler=scheduler,
+            catalogue_version="bench"
+        )
+
+    db = SessionLocal()
+    try:
+        service = make_service(db)
+        # Warm-up (torch, ChromaDB, thumbnails em disco)
+        asyncio.run(service.generate_suggestion(item_ids[0], user_id, use_stored=False))
+        stages = bench_stages(service, user_id, item_ids, args.stage_iterations)
+    finally:
+        db.close()
+
+    pipeline = {}
+    for clients in args.concurrency:
+        pipeline[str(clients)] = asyncio.run(bench_pipeline(make_service, user_id, item_ids, clients, args.duration))
+
+    if scheduler is not None:
+        scheduler.close()
+    executors.shutdown()
+
+    return {
+        "size": size,
+        "ingest_s": round(ingest["elapsed"], 2),
+        "ingested_pieces": ingest["pieces"],
+        "stages": stages,
+        "pipeline": pipeline,
+    }
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(args) -> dict:
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    create_tables()
+
+    results = []
+    for size in args.sizes:
+        row = run_size(size, args)
+        results.append(row)
+        for stage, stats in row["stages"].items():
+            print(f"  {stage:<14} p50={stats['p50_ms']:>8.2f}ms p95={stats['p95_ms']:>8.2f}ms p99={stats['p99_ms']:>8.2f}ms")
+        for clients, stats in row["pipeline"].items():
+            print(
+                f"  pipeline c={clients:<4} p50={stats['p50_ms']:>7.1f}ms p95={stats['p95_ms']:>7.1f}ms "
+                f"p99={stats['p99_ms']:>7.1f}ms | {stats['throughput_rps']:.1f} req/s"
+            )
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "torch_threads": torch.get_num_threads(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("compare", "output")},
+        },
+        "results": results,
+    }
+
+
+# ----------------------------------------------------------------------
+# Comparação
+# ----------------------------------------------------------------------
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """
+    Compara dois resultados (mesmos tamanhos/etapas/concorrências)
+
+    Returns:
+        Lista de regressões (descrições); latências p50/p95 que sobem ou
+        throughputs que caem mais que threshold (relativo)
+    """
+    print(f"\n📊 {baseline['meta']['revision']} -> {candidate['meta']['revision']} (tolerância {threshold:.0%})")
+    regressions = []
+    candidate_sizes = {row["size"]: row for row in candidate["results"]}
+
+    def check(label: str, before: float, after: float, higher_is_better: bool = False):
+        change = (after - before) / before if before else 0.0
+        regressed = -change > threshold if higher_is_better else change > threshold
+        marker = "❌" if regressed else "  "
+        print(f"{marker} {label:<40}{before:>10.2f}{after:>10.2f}{change:>+9.1%}")
+        if regressed:
+            regressions.append(f"{label}: {before:.2f} -> {after:.2f} ({change:+.1%})")
+
+    print(f"   {'métrica':<40}{'antes':>10}{'depois':>10}{'Δ':>9}")
+    for base_row in baseline["results"]:
+        row = candidate_sizes.get(base_row["size"])
+        if row is None:
+            continue
+        size = base_row["size"]
+        for stage, stats in base_row["stages"].items():
+            if stage in row["stages"]:
+                for metric in ("p50_ms", "p95_ms"):
+                    check(f"{size} {stage} {metric}", stats[metric], row["stages"][stage][metric])
+        for clients, stats in base_row["pipeline"].items():
+            if clients in row["pipeline"]:
+                after = row["pipeline"][clients]
+                for metric in ("p50_ms", "p95_ms"):
+                    check(f"{size} pipeline c={clients} {metric}", stats[metric], after[metric])
+                check(f"{size} pipeline c={clients} throughput_rps", stats["throughput_rps"],
+                      after["throughput_rps"], higher_is_better=True)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if args.compare and len(args.compare) > 2:
+        sys.exit("--compare aceita BASELINE [CANDIDATE]")
+
+    try:
+        if args.compare and len(args.compare) == 2:
+            with open(args.compare[1]) as f:
+                report = json.load(f)
+        else:
+            report = run_benchmark(args)
+            if args.output:
+                with open(args.output, "w") as f:
+                    json.dump(report, f, indent=2)
+                print(f"\n✅ Resultados salvos em {args.output}")
+    finally:
+        shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressões acima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: espelho NumPy em memória vs busca HNSW do ChromaDB
+
+Para cada tamanho de catálogo:
+1. Popula uma coleção temporária com embeddings no formato dos hash embeddings
+   (6 blocos de 16 dims normalizados) e metadado de categoria
+2. Mede latência de search_similar (com filtro de categoria) no ChromaDB (HNSW)
+3. Ativa o espelho em memória e mede a mesma busca
+4. Reporta p50/p95, speedup e recall@k do HNSW em relação à busca exata
+
+Usage:
+    python benchmarks/bench_vector_search.py
+    python benchmarks/bench_vector_search.py --sizes 10000 100000 1000000 --queries 200
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from modules.config import ATTRIBUTES, ATTR_DIM, VALID_CATEGORIES
+from modules.vector_db import VectorDB
+
+INSERT_BATCH_SIZE = 5000
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark in-memory mirror vs ChromaDB HNSW search')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Catalogue sizes to benchmark (default: 10k 100k 1M)')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per size (default: 200)')
+    parser.add_argument('--n-results', type=int, default=10, help='Top-N per query (default: 10)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    return parser.parse_args()
+
+
+def synthetic_embeddings(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Gera embeddings (n, 96) com a mesma estrutura dos hash embeddings"""
+    blocks = rng.standard_normal((n, len(ATTRIBUTES), ATTR_DIM)).astype(np.float32)
+    blocks /= np.linalg.norm(blocks, axis=2, keepdims=True)
+    return blocks.reshape(n, -1)
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def time_queries(vector_db, queries, categories, n_results):
+    """Executa as queries e retorna (latências, ids retornados)"""
+    latencies, results = [], []
+    for query, category in zip(queries, categories):
+        start = time.perf_counter()
+        result = vector_db.search_similar("pieces", query, n_results=n_results, filter_dict={"category": category})
+        latencies.append(time.perf_counter() - start)
+        results.append(result['ids'][0])
+    return latencies, results
+
+
+def run_size(size: int, num_queries: int, n_results: int, rng: np.random.Generator) -> dict:
+    categories = VALID_CATEGORIES[:3]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_db = VectorDB(path=tmp_dir)
+        vector_db.get_or_create_collection("pieces")
+
+        start = time.perf_counter()
+        for offset in range(0, size, INSERT_BATCH_SIZE):
+            count = min(INSERT_BATCH_SIZE, size - offset)
+            ids = [f"{(offset + i) // 4}/{(offset + i) % 4}.jpg" for i in range(count)]
+            metadatas = [{"category": categories[(offset + i) % len(categories)]} for i in range(count)]
+            vector_db.add_items("pieces", list(synthetic_embeddings(rng, count)), ids, metadatas)
+        elapsed_ingest = time.perf_counter() - start
+
+        queries = synthetic_embeddings(rng, num_queries)
+        query_categories = [categories[i % len(categories)] for i in range(num_queries)]
+
+        hnsw_latencies, hnsw_results = time_queries(vector_db, queries, query_categories, n_results)
+
+        start = time.perf_counter()
+        vector_db.enable_memory_mirror("pieces")
+        elapsed_mirror_load = time.perf_counter() - start
+
+        mirror_latencies, mirror_results = time_queries(vector_db, queries, query_categories, n_results)
+
+        recall = np.mean([
+            len(set(hnsw) & set(exact)) / max(len(exact), 1)
+            for hnsw, exact in zip(hnsw_results, mirror_results)
+        ])
+
+    return {
+        'size': size,
+        'ingest_s': round(elapsed_ingest, 2),
+        'mirror_load_s': round(elapsed_mirror_load, 3),
+        'hnsw_p50_ms': percentile_ms(hnsw_latencies, 50),
+        'hnsw_p95_ms': percentile_ms(hnsw_latencies, 95),
+        'mirror_p50_ms': percentile_ms(mirror_latencies, 50),
+        'mirror_p95_ms': percentile_ms(mirror_latencies, 95),
+        'speedup_p50': percentile_ms(hnsw_latencies, 50) / max(percentile_ms(mirror_latencies, 50), 1e-9),
+        'hnsw_recall_at_k': float(recall),
+    }
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+
+    rows = []
+    for size in args.sizes:
+        print(f"🔄 Benchmarking {size:,} pieces...")
+        row = run_size(size, args.queries, args.n_results, rng)
+        rows.append(row)
+        print(
+            f"  HNSW p50={row['hnsw_p50_ms']:.2f}ms p95={row['hnsw_p95_ms']:.2f}ms | "
+            f"Mirror p50={row['mirror_p50_ms']:.2f}ms p95={row['mirror_p95_ms']:.2f}ms | "
+            f"speedup={row['speedup_p50']:.1f}x | HNSW recall@{args.n_results}={row['hnsw_recall_at_k']:.3f}"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Dados sintéticos compartilhados pelos benchmarks: catálogo, checkpoint e imagens de upload
+
+Usado por bench_suggestion_pipeline.py, load_test_suggestions.py e pelo
+load test HTTP (benchmarks/loadtest). Tudo é gravado em um diretório
+temporário (root) usado no lugar de chroma_db/, checkpoints/ e images/:
+    root/filtered     JSONs de features dos outfits
+    root/images       imagens das peças (hard links para um pool pequeno)
+    root/chroma       coleção "pieces" indexada com bulk_ingest
+    root/model.pth    checkpoint com pesos aleatórios
+
+Usage (scripts em backend/benchmarks, com backend/ no sys.path):
+    from benchmarks.fixtures import build_catalogue, build_checkpoint, random_piece
+"""
+
+import io
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+from PIL import Image
+
+from modules.config import VALID_CATEGORIES
+from modules.embeddings import EmbeddingGenerator
+from modules.pytorch_model import create_model
+from modules.vector_db import VectorDB
+
+PIECES_PER_OUTFIT = 4
+# Imagens distintas do catálogo; as demais peças são hard links para elas
+DISTINCT_IMAGES = 32
+
+# Valores dos enums de src/schemas/description.py
+ATTRIBUTE_VALUES = {
+    "item_type": ["t-shirt", "jeans", "sneakers", "shirt", "dress", "jacket", "skirt", "boots"],
+    "primary_color": ["white", "black", "navy", "red", "beige", "green", "grey"],
+    "usage": ["casual", "formal", "business", "sportswear", "party"],
+    "texture": ["cotton", "denim", "leather", "wool", "linen", "knit"],
+    "print_category": ["plain", "striped", "floral", "plaid", "logo"],
+}
+
+
+def random_piece(rng: random.Random, category: str = None) -> Dict[str, str]:
+    """Atributos aleatórios de uma peça (mesmo formato dos JSONs filtrados)"""
+    piece = {"category": category or rng.choice(list(VALID_CATEGORIES))}
+    for attr, values in ATTRIBUTE_VALUES.items():
+        piece[attr] = rng.choice(values)
+    return piece
+
+
+def _encode_jpeg(image: Image.Image, quality: int = 90) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def build_catalogue(root: Path, num_pieces: int, seed: int = 0, ingest_workers: Optional[int] = 1) -> Dict:
+    """
+    Gera JSONs e imagens do catálogo e indexa a coleção "pieces"
+
+    Args:
+        root: Diretório do fixture
+        num_pieces: Peças no catálogo
+        seed: Semente dos atributos e imagens
+        ingest_workers: Processos do bulk_ingest (None: número de CPUs)
+
+    Returns:
+        Estatísticas do bulk_ingest (outfits, pieces, elapsed, ...)
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    categories = list(VALID_CATEGORIES)
+    filtered_dir, images_dir, pool_dir = root / "filtered", root / "images", root / "image_pool"
+    filtered_dir.mkdir(parents=True)
+    pool_dir.mkdir()
+
+    pool = []
+    for index in range(DISTINCT_IMAGES):
+        path = pool_dir / f"{index}.jpg"
+        pixels = np_rng.integers(0, 255, (256, 256, 3), dtype=np.uint8)
+        path.write_bytes(_encode_jpeg(Image.fromarray(pixels)))
+        pool.append(path)
+
+    for outfit in range(num_pieces // PIECES_PER_OUTFIT):
+        outfit_id = str(100000000 + outfit)
+        outfit_dir = images_dir / outfit_id
+        outfit_dir.mkdir(parents=True)
+        features = {}
+        for piece in range(PIECES_PER_OUTFIT):
+            piece_name = f"{piece}.jpg"
+            features[piece_name] = random_piece(rng, categories[piece % len(categories)])
+            source = rng.choice(pool)
+            try:
+                os.link(source, outfit_dir / piece_name)
+            except OSError:
+                shutil.copyfile(source, outfit_dir / piece_name)
+        (filtered_dir / f"{outfit_id}.json").write_text(json.dumps(features), encoding="utf-8")
+
+    return EmbeddingGenerator(VectorDB(path=root / "chroma")).bulk_ingest(
+        "pieces", workers=ingest_workers, filtered_dir=filtered_dir, checkpoint_path=root / "ingest.progress"
+    )
+
+
+def build_checkpoint(root: Path, filename: str = "model.pth") -> Path:
+    """
+    Checkpoint com pesos aleatórios
+
+    Args:
+        root: Diretório do fixture
+        filename: Nome do arquivo do checkpoint
+
+    Returns:
+        Caminho do checkpoint
+    """
+    model = create_model({})
+    # Viés alto na saída: todos os outfits passam do threshold e a etapa de imagens sempre roda
+    model.predictor[-2].bias.data.fill_(10.0)
+    checkpoint_path = root / filename
+    torch.save({'model_state_dict': model.state_dict(), 'epoch': 0, 'best_val_auc': 0.5}, checkpoint_path)
+    return checkpoint_path
+
+
+def build_upload_images(count: int, seed: int = 0, size=(640, 800)) -> List[bytes]:
+    """
+    Fotos sintéticas para os uploads de extração de features
+
+    Ruído de baixa resolução ampliado: o JPEG fica com tamanho de foto real
+    (dezenas de KB), ao contrário de ruído puro. Cada imagem é distinta, então
+    o cache de features só acerta quando a mesma imagem é reenviada.
+
+    Args:
+        count: Quantidade de imagens distintas
+        seed: Semente
+        size: (largura, altura)
+
+    Returns:
+        Lista de JPEGs
+    """
+    np_rng = np.random.default_rng(seed + 1)
+    images = []
+    for _ in range(count):
+        pixels = np_rng.integers(0, 255, (size[1] // 32, size[0] // 32, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels).resize(size, Image.BILINEAR)
+        images.append(_encode_jpeg(image, quality=85))
+    return images
@@ -0,0 +1,209 @@
+"""
+Load test: latência de /items enquanto sugestões são geradas
+
+Sobe a aplicação em processo (httpx + ASGITransport) com um catálogo
+sintético (ChromaDB temporário, JSONs de features, imagens JPEG e checkpoint
+com pesos aleatórios) e mede a latência de GET /api/v1/itemslist-all:
+
+1. Sozinho (baseline)
+2. Com N clientes gerando sugestões em paralelo, executores desligados
+   (etapas bloqueantes rodam no event loop)
+3. Idem, com executores ligados (StageExecutors)
+
+Com os executores ligados, o p99 de /items deve ficar próximo do baseline.
+
+Usage:
+    GEMINI_KEY=x python benchmarks/load_test_suggestions.py
+    GEMINI_KEY=x python benchmarks/load_test_suggestions.py --catalogue 20000 --concurrency 8 --duration 10
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Banco temporário: precisa estar definido antes de importar src
+_TMP_DIR = tempfile.mkdtemp(prefix="blindstyle_load_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/load_test.db"
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+from dependency_injector import providers
+
+from benchmarks.fixtures import build_catalogue, build_checkpoint, random_piece
+from modules.config import VALID_CATEGORIES
+from modules.embeddings import EmbeddingGenerator
+from modules.outfit_features import OutfitFeaturesIndex
+from modules.pytorch_model import ModelPredictor
+from modules.thumbnail_cache import ThumbnailCache
+from modules.vector_db import VectorDB
+from src.core.db import SessionLocal, create_tables
+from src.core.dependencies import container, get_current_user
+from src.core.executors import StageExecutors
+from src.main import app
+from src.models.user import User as UserModel
+from src.repositories.item_repository import ItemRepository
+from src.schemas.item import ItemCreate
+from src.schemas.user import User
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Load test /items latency while suggestions run')
+    parser.add_argument('--catalogue', type=int, default=5000, help='Catalogue pieces (default: 5000)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent suggestion clients (default: 4)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per phase (default: 5)')
+    parser.add_argument('--probe-interval', type=float, default=0.01,
+                        help='Pause between /items probes in seconds (default: 0.01)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    return parser.parse_args()
+
+
+def build_fixture(root: Path, num_pieces: int):
+    """
+    Cria catálogo, imagens, features, checkpoint, usuário e item sintéticos
+
+    Returns:
+        Tuple (vector_db, model_predictor, thumbnail_cache, outfit_features, user, item_id)
+    """
+    rng = random.Random(0)
+    build_catalogue(root, num_pieces, seed=0)
+    vector_db = VectorDB(path=root / "chroma")
+    model_predictor = ModelPredictor(str(build_checkpoint(root)), device='cpu')
+
+    # Sem LRU em memória: cada sugestão codifica/lê os thumbnails, como em cache frio
+    thumbnail_cache = ThumbnailCache(cache_dir=root / "thumbnails", images_dir=root / "images", max_memory_items=0)
+    outfit_features = OutfitFeaturesIndex(path=root / "missing.sqlite", filtered_dir=root / "filtered")
+
+    create_tables()
+    piece = random_piece(rng, list(VALID_CATEGORIES)[0])
+    db = SessionLocal()
+    try:
+        user_row = UserModel(email="load@test.com", name="Load Test", hashed_password="x", is_active=True)
+        db.add(user_row)
+        db.commit()
+        db.refresh(user_row)
+        user = User.model_validate(user_row)
+        item_repo = ItemRepository(db)
+        item = None
+        for index in range(20):
+            item = item_repo.create(user.id, ItemCreate(
+                name=f"Item {index}", image_url="http://localhost/item.jpg", **piece
+            ))
+        item_id = item.id
+    finally:
+        db.close()
+
+    collection_name = f"user_{user.id}_pieces"
+    vector_db.create_collection(collection_name)
+    vector_db.add_item(collection_name, EmbeddingGenerator().generate_embeddings([piece])[0], str(item_id))
+
+    return vector_db, model_predictor, thumbnail_cache, outfit_features, user, item_id
+
+
+def summarize(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "count": int(len(samples)),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "max_ms": float(samples.max()),
+    }
+
+
+async def run_phase(client, item_id: int, concurrency: int, duration: float, probe_interval: float):
+    """Mede /items por duration segundos com concurrency clientes de sugestão"""
+    stop = asyncio.Event()
+    items_latencies, suggestion_latencies = [], []
+
+    async def probe_items():
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.get("/api/v1/itemslist-all", params={"size": 10})
+            items_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+            await asyncio.sleep(probe_interval)
+
+    async def suggest():
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.post("/api/v1/suggestions/generate", params={"item_id": item_id, "refresh": True})
+            suggestion_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    tasks = [asyncio.create_task(probe_items())]
+    tasks += [asyncio.create_task(suggest()) for _ in range(concurrency)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    result = {"items": summarize(items_latencies)}
+    if suggestion_latencies:
+        result["suggestions"] = summarize(suggestion_latencies)
+    return result
+
+
+async def run(args, item_id: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        rows = {}
+        rows["baseline"] = await run_phase(client, item_id, 0, args.duration, args.probe_interval)
+        for enabled in (False, True):
+            executors = StageExecutors(
+                io_workers=8,
+                compute_workers=2,
+                stage_limits={"db": 8, "vector": 4, "model": 2, "image": 2},
+                enabled=enabled
+            )
+            container.executors.override(providers.Object(executors))
+            # Warm-up (thumbnails em disco, torch, ChromaDB)
+            await client.post("/api/v1/suggestions/generate", params={"item_id": item_id, "refresh": True})
+            name = "executors_on" if enabled else "executors_off"
+            rows[name] = await run_phase(client, item_id, args.concurrency, args.duration, args.probe_interval)
+            container.executors.reset_override()
+            executors.shutdown()
+        return rows
+
+
+def main():
+    args = parse_args()
+    root = Path(_TMP_DIR)
+
+    print(f"🔄 Criando catálogo sintético ({args.catalogue} peças) em {root}...")
+    vector_db, model_predictor, thumbnail_cache, outfit_features, user, item_id = build_fixture(root, args.catalogue)
+
+    container.vector_db.override(providers.Object(vector_db))
+    container.model_predictor.override(providers.Object(model_predictor))
+    container.thumbnail_cache.override(providers.Object(thumbnail_cache))
+    container.outfit_features.override(providers.Object(outfit_features))
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    rows = asyncio.run(run(args, item_id))
+
+    print(f"\n{'fase':<15}{'/items p50':>12}{'p95':>10}{'p99':>10}{'max':>10}{'sugestões':>11}{'sug. p50':>10}")
+    for name, row in rows.items():
+        items = row["items"]
+        suggestions = row.get("suggestions", {"count": 0, "p50_ms": 0.0})
+        print(
+            f"{name:<15}{items['p50_ms']:>10.1f}ms{items['p95_ms']:>8.1f}ms{items['p99_ms']:>8.1f}ms"
+            f"{items['max_ms']:>8.1f}ms{suggestions['count']:>11}{suggestions['p50_ms']:>8.1f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=2)
+        print(f"\n✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Load test HTTP da API com dependências locais
+
+Sobe create_app() em um processo uvicorn separado contra:
+- SQLite temporário (usuários e itens criados pela própria API)
+- ChromaDB temporário com catálogo sintético (bulk_ingest)
+- checkpoint com pesos aleatórios
+- servidor Gemini falso local (GEMINI_API_ENDPOINT + GeminiRestClient)
+
+e dispara misturas de requisições (login, criação/listagem de itens,
+extração de features e geração de sugestões) com N usuários virtuais em
+asyncio (httpx). Reporta throughput, percentis de latência e taxa de erro
+por endpoint, e CPU/RSS do processo do servidor amostrados durante a carga.
+
+Catálogo, checkpoint e imagens de upload sintéticos vêm de benchmarks/fixtures.py,
+compartilhado com os demais benchmarks.
+
+Módulos:
+- fake_gemini.py: generateContent falso com latência configurável
+- server.py: processo do servidor (overrides do container + uvicorn)
+- scenarios.py: operações, misturas e usuários virtuais
+- stats.py: latências e erros por endpoint
+- sampler.py: CPU/RSS de um processo (psutil ou /proc)
+
+Usage (a partir de backend/):
+    python -m benchmarks.loadtest --scenario mixed --users 20 --duration 60
+    python -m benchmarks.loadtest --scenario upload --gemini-latency 2.0 --server-env FEATURE_BATCH_ENABLED=true
+    python -m benchmarks.loadtest --list-scenarios
+"""
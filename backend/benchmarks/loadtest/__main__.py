@@ -0,0 +1,235 @@
+"""
+Orquestrador do load test (python -m benchmarks.loadtest)
+
+1. Cria o fixture (catálogo, checkpoint, imagens de upload) em um diretório temporário
+2. Sobe o Gemini falso e o servidor (create_app() em um processo uvicorn)
+3. Registra os usuários e cadastra itens iniciais (fora das métricas)
+4. Executa o cenário com N usuários virtuais por --duration segundos,
+   amostrando CPU/RSS do servidor
+5. Reporta métricas por endpoint e, com --output, salva o JSON
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# O servidor usa o Gemini falso; a chave só precisa existir para importar modules.config
+os.environ.setdefault("GEMINI_KEY", "fake-key")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import socket
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.loadtest.fake_gemini import FakeGemini
+from benchmarks.fixtures import build_catalogue, build_checkpoint, build_upload_images
+from benchmarks.loadtest.sampler import ProcessSampler
+from benchmarks.loadtest.scenarios import SCENARIOS, VirtualUser
+from benchmarks.loadtest.server import launch_server, stop_server, wait_until_ready
+from benchmarks.loadtest.stats import EndpointStats
+
+PASSWORD = "loadtest-password"
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='HTTP load test of the API with local stand-ins')
+    parser.add_argument('--scenario', type=str, default='mixed', choices=sorted(SCENARIOS),
+                        help='Traffic mix (default: mixed)')
+    parser.add_argument('--list-scenarios', action='store_true', help='Print the scenario weights and exit')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users (default: 10)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Measured seconds (default: 30)')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds to start all users (default: 5)')
+    parser.add_argument('--think-time', type=float, default=1.0,
+                        help='Mean pause between requests of a user in seconds (default: 1.0)')
+    parser.add_argument('--seed-items', type=int, default=5, help='Items created per user before the test (default: 5)')
+    parser.add_argument('--catalogue', type=int, default=5000, help='Catalogue pieces (default: 5000)')
+    parser.add_argument('--upload-images', type=int, default=50,
+                        help='Distinct upload photos; fewer means more feature cache hits (default: 50)')
+    parser.add_argument('--gemini-latency', type=float, default=1.0,
+                        help='Fake Gemini mean latency in seconds (default: 1.0)')
+    parser.add_argument('--gemini-jitter', type=float, default=0.3, help='Fake Gemini relative jitter (default: 0.3)')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0,
+                        help='Fraction of fake Gemini calls answered with 429 (default: 0)')
+    parser.add_argument('--server-env', type=str, nargs='*', default=[], metavar='KEY=VALUE',
+                        help='Extra settings for the server process (e.g. FEATURE_BATCH_ENABLED=true)')
+    parser.add_argument('--sample-interval', type=float, default=0.5,
+                        help='Server CPU/RSS sampling interval in seconds (default: 0.5)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='HTTP timeout in seconds (default: 60)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', type=str, default=None, help='Optional JSON output path')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory (server.log, databases)')
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def setup_users(client: httpx.AsyncClient, args, uploads) -> list:
+    """Registra os usuários, faz login e cadastra os itens iniciais (sem métricas)"""
+    users = [
+        VirtualUser(client, f"loadtest{index}@example.com", PASSWORD, uploads, random.Random(args.seed + index))
+        for index in range(args.users)
+    ]
+
+    async def prepare(user: VirtualUser):
+        await user.register()
+        await user.login()
+        if user.token is None:
+            raise RuntimeError(f"Falha no login de {user.email}")
+        for _ in range(args.seed_items):
+            await user.item_create()
+
+    await asyncio.gather(*(prepare(user) for user in users))
+    return users
+
+
+async def run_load(base_url: str, args, uploads, sampler: ProcessSampler):
+    """
+    Returns:
+        Tuple (EndpointStats da fase medida, duração medida em segundos)
+    """
+    limits = httpx.Limits(max_connections=args.users + 4, max_keepalive_connections=args.users + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        print(f"👥 Registrando {args.users} usuários ({args.seed_items} itens cada)...")
+        users = await setup_users(client, args, uploads)
+
+        # Warm-up (torch, ChromaDB, thumbnails, Gemini falso)
+        await users[0].suggestion(refresh=True)
+        await users[0].extract_features()
+
+        stats = EndpointStats()
+        stop = asyncio.Event()
+        weights = SCENARIOS[args.scenario]
+
+        async def start_user(index: int, user: VirtualUser):
+            await asyncio.sleep(index * args.ramp_up / max(len(users), 1))
+            await user.run(weights, stats, stop, args.think_time)
+
+        print(f"🚀 Cenário '{args.scenario}': {args.users} usuários, {args.duration:.0f}s (ramp-up {args.ramp_up:.0f}s)...")
+        sampler.start()
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(start_user(index, user)) for index, user in enumerate(users)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        # Requisições em andamento terminam e entram nas métricas
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        return stats, elapsed
+
+
+def print_report(endpoints: dict, server: dict, gemini: dict) -> None:
+    print(f"\n{'endpoint':<58}{'reqs':>7}{'req/s':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for endpoint, row in endpoints.items():
+        if endpoint == "TOTAL":
+            print("-" * 116)
+        print(
+            f"{endpoint:<58}{row['count']:>7}{row['throughput_rps']:>8.1f}{100 * row['error_rate']:>6.1f}%"
+            f"{row['p50_ms']:>7.0f}ms{row['p95_ms']:>7.0f}ms{row['p99_ms']:>7.0f}ms{row['max_ms']:>7.0f}ms"
+        )
+    errors = {endpoint: row["errors"] for endpoint, row in endpoints.items() if row["errors"] and endpoint != "TOTAL"}
+    for endpoint, counts in errors.items():
+        print(f"❌ {endpoint}: {counts}")
+
+    if server:
+        print(
+            f"\n🖥️  Servidor: CPU média {server['cpu_mean_percent']:.0f}% (p95 {server['cpu_p95_percent']:.0f}%, "
+            f"máx {server['cpu_max_percent']:.0f}%) | RSS {server['rss_start_mb']:.0f} -> {server['rss_end_mb']:.0f} MB "
+            f"(máx {server['rss_max_mb']:.0f} MB) | threads máx {server['threads_max']}"
+        )
+    print(f"🤖 Gemini falso: {gemini['calls']} chamadas, {gemini['images']} imagens, "
+          f"{gemini['errors']} erros, máx {gemini['max_in_flight']} simultâneas")
+
+
+def main():
+    args = parse_args()
+    if args.list_scenarios:
+        for name, weights in SCENARIOS.items():
+            total = sum(weights.values())
+            print(f"{name}: " + ", ".join(f"{op} {weight / total:.0%}" for op, weight in weights.items()))
+        return
+
+    root = Path(tempfile.mkdtemp(prefix="blindstyle_loadtest_"))
+    gemini = FakeGemini(args.gemini_latency, args.gemini_jitter, args.gemini_error_rate, seed=args.seed)
+    server = None
+    try:
+        print(f"🔄 Criando fixture em {root} ({args.catalogue:,} peças)...")
+        ingest = build_catalogue(root, args.catalogue, seed=args.seed)
+        build_checkpoint(root)
+        uploads = build_upload_images(args.upload_images, seed=args.seed)
+
+        env = {
+            "DATABASE_URL": f"sqlite:///{root}/loadtest.db",
+            "GEMINI_KEY": "fake-key",
+            "GEMINI_API_ENDPOINT": gemini.start(),
+        }
+        for item in args.server_env:
+            key, _, value = item.partition("=")
+            env[key] = value
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = launch_server(root, port, env, root / "server.log")
+        wait_until_ready(server, base_url)
+        sampler = ProcessSampler(server.pid, interval=args.sample_interval)
+        idle_rss_mb = sampler.read()[1] / (1024 * 1024) if sampler.available else None
+        print(f"✅ Servidor pronto em {base_url} (pid {server.pid})")
+
+        stats, elapsed = asyncio.run(run_load(base_url, args, uploads, sampler))
+
+        endpoints = stats.summary(elapsed)
+        server_stats = sampler.summary()
+        if idle_rss_mb is not None:
+            server_stats["rss_idle_mb"] = idle_rss_mb
+        print_report(endpoints, server_stats, gemini.stats)
+
+        if args.output:
+            report = {
+                "meta": {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "cpu_count": os.cpu_count(),
+                    "elapsed_s": elapsed,
+                    "catalogue_pieces": ingest["pieces"],
+                    "server_env": {key: value for key, value in env.items() if key != "GEMINI_KEY"},
+                    "args": {key: value for key, value in vars(args).items() if key not in ("output", "list_scenarios")},
+                },
+                "endpoints": endpoints,
+                "server": {"summary": server_stats, "samples": sampler.samples},
+                "fake_gemini": gemini.stats,
+            }
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✅ Resultados salvos em {args.output}")
+    except RuntimeError as e:
+        log_path = root / "server.log"
+        if log_path.exists():
+            print("".join(log_path.read_text(errors="replace").splitlines(keepends=True)[-30:]))
+        sys.exit(f"❌ {e}")
+    finally:
+        if server is not None:
+            stop_server(server)
+        gemini.stop()
+        if args.keep:
+            print(f"📁 Arquivos mantidos em {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
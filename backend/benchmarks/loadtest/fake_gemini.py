@@ -0,0 +1,124 @@
+"""
+Servidor Gemini falso (models/<model>:generateContent) para o load test
+
+Responde no formato da API REST usada pelo GeminiRestClient: um JSON com as
+features de cada imagem, identificada pela linha "Filename of the image
+below: <nome> image:" que o FeatureExtractor envia antes de cada imagem.
+A latência simula o tempo de resposta do modelo; error_rate injeta 429.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from benchmarks.fixtures import random_piece
+
+FILENAME_PREFIX = "Filename of the image below: "
+
+
+class FakeGemini:
+    """generateContent falso em uma thread, com latência e taxa de erro configuráveis"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency: Tempo médio de resposta em segundos
+            jitter: Variação relativa da latência (0.2 = ±20%)
+            error_rate: Fração das chamadas respondidas com 429
+            seed: Semente das features e da latência
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "images": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {key: value for key, value in self._stats.items() if key != "in_flight"}
+
+    def _respond(self, body: Dict):
+        """
+        Returns:
+            Tuple (status, payload, atraso em segundos)
+        """
+        parts = body["contents"][0]["parts"]
+        filenames = [
+            part["text"][len(FILENAME_PREFIX):].split(" ")[0]
+            for part in parts if part.get("text", "").startswith(FILENAME_PREFIX)
+        ]
+        with self._lock:
+            delay = self.latency * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            if self._rng.random() < self.error_rate:
+                self._stats["errors"] += 1
+                return 429, {"error": {"code": 429, "message": "Resource has been exhausted"}}, delay / 10
+            answer = {name: random_piece(self._rng) for name in filenames}
+
+        # Indentado: o FeatureExtractor trata "{{" como chaves duplicadas
+        text = f"```json\n{json.dumps(answer, indent=2)}\n```"
+        payload = {
+            "candidates": [{"content": {"parts": [{"text": text}]}}],
+            "usageMetadata": {"promptTokenCount": 300 + 260 * len(filenames), "candidatesTokenCount": 60 * len(filenames)},
+        }
+        with self._lock:
+            self._stats["images"] += len(filenames)
+        return 200, payload, delay
+
+    def _make_handler(self):
+        fake = self
+
+        class FakeGeminiHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    fake._stats["calls"] += 1
+                    fake._stats["in_flight"] += 1
+                    fake._stats["max_in_flight"] = max(fake._stats["max_in_flight"], fake._stats["in_flight"])
+                try:
+                    status, payload, delay = fake._respond(body)
+                    time.sleep(delay)
+                finally:
+                    with fake._lock:
+                        fake._stats["in_flight"] -= 1
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(data)
+
+        return FakeGeminiHandler
+
+    def start(self) -> str:
+        """
+        Sobe o servidor em uma porta livre
+
+        Returns:
+            URL base (valor de GEMINI_API_ENDPOINT)
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,122 @@
+"""
+Amostragem de CPU e memória de um processo (o servidor do load test)
+
+Usa psutil quando instalado; sem ele, lê /proc/<pid>/stat e /proc/<pid>/status
+(Linux). Em outras plataformas sem psutil a amostragem fica desligada.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Processo terminou ou /proc ilegível durante a amostragem
+SAMPLE_ERRORS = (OSError, IndexError, ValueError) + ((psutil.Error,) if psutil is not None else ())
+
+
+def _read_proc(pid: int) -> Tuple[float, int, int]:
+    """
+    Returns:
+        Tuple (CPU acumulada em segundos, RSS em bytes, threads)
+    """
+    with open(f"/proc/{pid}/stat") as f:
+        # O nome do processo (campo 2) pode conter espaços: os campos seguintes começam após ")"
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    rss, threads = 0, 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) * 1024
+            elif line.startswith("Threads:"):
+                threads = int(line.split()[1])
+    return cpu, rss, threads
+
+
+class ProcessSampler:
+    """Amostra CPU (%), RSS e threads de um processo em uma thread de fundo"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        """
+        Args:
+            pid: Processo amostrado
+            interval: Intervalo entre amostras em segundos
+        """
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process = psutil.Process(pid) if psutil is not None else None
+        self.available = self._process is not None or os.path.exists(f"/proc/{pid}/stat")
+
+    def read(self) -> Tuple[float, int, int]:
+        """
+        Returns:
+            Tuple (CPU acumulada em segundos, RSS em bytes, threads)
+        """
+        if self._process is not None:
+            with self._process.oneshot():
+                cpu_times = self._process.cpu_times()
+                return (
+                    cpu_times.user + cpu_times.system,
+                    self._process.memory_info().rss,
+                    self._process.num_threads()
+                )
+        return _read_proc(self.pid)
+
+    def _run(self) -> None:
+        start = time.monotonic()
+        last_time, (last_cpu, _, _) = start, self.read()
+        while not self._stop.wait(self.interval):
+            try:
+                cpu, rss, threads = self.read()
+            except SAMPLE_ERRORS:
+                break
+            now = time.monotonic()
+            self.samples.append({
+                "t": round(now - start, 3),
+                "cpu_percent": 100.0 * (cpu - last_cpu) / max(now - last_time, 1e-9),
+                "rss_mb": rss / (1024 * 1024),
+                "threads": threads,
+            })
+            last_time, last_cpu = now, cpu
+
+    def start(self) -> None:
+        if not self.available:
+            print("⚠️  Amostragem de CPU/RSS indisponível (instale psutil)")
+            return
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            CPU média/p95/máxima (% de um núcleo) e RSS/threads inicial e máximo
+        """
+        if not self.samples:
+            return {}
+        cpu = np.array([sample["cpu_percent"] for sample in self.samples])
+        rss = np.array([sample["rss_mb"] for sample in self.samples])
+        return {
+            "samples": len(self.samples),
+            "cpu_mean_percent": float(cpu.mean()),
+            "cpu_p95_percent": float(np.percentile(cpu, 95)),
+            "cpu_max_percent": float(cpu.max()),
+            "rss_start_mb": float(rss[0]),
+            "rss_max_mb": float(rss.max()),
+            "rss_end_mb": float(rss[-1]),
+            "threads_max": int(max(sample["threads"] for sample in self.samples)),
+        }
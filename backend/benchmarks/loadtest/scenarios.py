@@ -0,0 +1,176 @@
+"""
+Operações, misturas de tráfego e usuários virtuais do load test
+
+Cada usuário virtual faz login, escolhe a próxima operação pelos pesos do
+cenário e espera um think time exponencial entre requisições (modelo
+fechado: N usuários, no máximo N requisições em andamento).
+"""
+
+import asyncio
+import base64
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.fixtures import random_piece
+from benchmarks.loadtest.stats import EndpointStats
+
+API_V1_PREFIX = "/api/v1"
+
+# Operação -> (método, path sob /api/v1) ; os routers de itens não têm "/" entre prefixo e rota
+OPERATIONS = {
+    "login": ("POST", "/users/login"),
+    "item_create": ("POST", "/itemscreate"),
+    "item_list": ("GET", "/itemslist-all"),
+    "extract_features": ("POST", "/api/descriptions/extract-features/stream"),
+    "extract_features_base64": ("POST", "/api/descriptions/extract-features/upload"),
+    "suggestion": ("POST", "/suggestions/generate"),
+    "suggestion_refresh": ("POST", "/suggestions/generate"),
+}
+REGISTER_PATH = "/users/register"
+
+# Pesos relativos de cada operação por cenário
+SCENARIOS = {
+    # Uso típico do app: navegação no guarda-roupa, cadastro ocasional com foto
+    "mixed": {
+        "login": 1, "item_list": 10, "item_create": 2, "extract_features": 2,
+        "suggestion": 4, "suggestion_refresh": 1,
+    },
+    "browse": {"login": 1, "item_list": 20, "suggestion": 6},
+    # Cadastro de roupas: foto -> features -> item
+    "upload": {"extract_features": 4, "extract_features_base64": 1, "item_create": 4, "item_list": 1},
+    # Sugestões sempre recalculadas (pior caso do pipeline)
+    "suggestions": {"suggestion_refresh": 1},
+    "login": {"login": 1},
+}
+
+
+def endpoint_label(operation: str) -> str:
+    """Rótulo das métricas (sugestões com refresh=true ficam separadas das servidas do cache)"""
+    method, path = OPERATIONS[operation]
+    return f"{method} {path}" + (" (refresh)" if operation == "suggestion_refresh" else "")
+
+
+class VirtualUser:
+    """Usuário do app com token, itens próprios e gerador aleatório próprio"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        email: str,
+        password: str,
+        uploads: List[bytes],
+        rng: random.Random
+    ):
+        """
+        Args:
+            client: Cliente HTTP compartilhado (pool de conexões)
+            email: Email do usuário já registrado
+            password: Senha
+            uploads: Imagens JPEG usadas na extração de features
+            rng: Gerador aleatório do usuário
+        """
+        self.client = client
+        self.email = email
+        self.password = password
+        self.uploads = uploads
+        self.rng = rng
+        self.token: Optional[str] = None
+        self.item_ids: List[int] = []
+
+    @property
+    def _auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def _request(self, stats: Optional[EndpointStats], operation: str, **kwargs):
+        """
+        Executa e registra uma requisição
+
+        Returns:
+            Resposta, ou None se a requisição falhou sem resposta
+        """
+        method, path = OPERATIONS[operation]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"{API_V1_PREFIX}{path}", headers=self._auth, **kwargs)
+        except httpx.HTTPError as e:
+            if stats is not None:
+                stats.record(endpoint_label(operation), time.perf_counter() - start, error=type(e).__name__)
+            return None
+        if stats is not None:
+            stats.record(endpoint_label(operation), time.perf_counter() - start, status=response.status_code)
+        return response
+
+    # ---------------- Operações ----------------
+
+    async def register(self) -> None:
+        response = await self.client.post(
+            f"{API_V1_PREFIX}{REGISTER_PATH}",
+            json={"email": self.email, "name": self.email.split("@")[0], "password": self.password}
+        )
+        if response.status_code not in (201, 400):  # 400: já registrado
+            raise RuntimeError(f"Falha ao registrar {self.email}: {response.status_code} {response.text}")
+
+    async def login(self, stats: Optional[EndpointStats] = None) -> None:
+        response = await self._request(stats, "login", json={"email": self.email, "password": self.password})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def item_create(self, stats: Optional[EndpointStats] = None) -> None:
+        payload = {"name": f"Item {len(self.item_ids)}", "image_url": "http://localhost/item.jpg", **random_piece(self.rng)}
+        response = await self._request(stats, "item_create", json=payload)
+        if response is not None and response.status_code == 200:
+            self.item_ids.append(response.json()["id"])
+
+    async def item_list(self, stats: Optional[EndpointStats] = None) -> None:
+        pages = max(1, (len(self.item_ids) + 9) // 10)
+        await self._request(stats, "item_list", params={"page": self.rng.randint(1, pages), "size": 10})
+
+    async def extract_features(self, stats: Optional[EndpointStats] = None) -> None:
+        image = self.rng.choice(self.uploads)
+        await self._request(stats, "extract_features", files={"file": ("photo.jpg", image, "image/jpeg")})
+
+    async def extract_features_base64(self, stats: Optional[EndpointStats] = None) -> None:
+        image = self.rng.choice(self.uploads)
+        await self._request(
+            stats, "extract_features_base64", json={"image_base64": base64.b64encode(image).decode("ascii")}
+        )
+
+    async def suggestion(self, stats: Optional[EndpointStats] = None, refresh: bool = False) -> None:
+        if not self.item_ids:
+            await self.item_create(stats)
+            return
+        await self._request(
+            stats, "suggestion_refresh" if refresh else "suggestion",
+            params={"item_id": self.rng.choice(self.item_ids), "image_mode": "url", "refresh": refresh}
+        )
+
+    async def suggestion_refresh(self, stats: Optional[EndpointStats] = None) -> None:
+        await self.suggestion(stats, refresh=True)
+
+    # ---------------- Loop ----------------
+
+    async def run(self, weights: Dict[str, float], stats: EndpointStats, stop: asyncio.Event, think_time: float) -> None:
+        """
+        Executa operações sorteadas pelos pesos até stop
+
+        Args:
+            weights: Pesos por operação (SCENARIOS[nome])
+            stats: Métricas da fase medida
+            stop: Evento de fim da fase
+            think_time: Pausa média entre requisições em segundos (exponencial; 0 = sem pausa)
+        """
+        operations, operation_weights = list(weights), list(weights.values())
+        await self.login(stats)
+        while not stop.is_set():
+            operation = self.rng.choices(operations, operation_weights)[0]
+            await getattr(self, operation)(stats)
+            if think_time > 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.rng.expovariate(1.0 / think_time))
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(0)
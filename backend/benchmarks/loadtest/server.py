@@ -0,0 +1,122 @@
+"""
+Processo do servidor do load test: create_app() com as dependências do fixture
+
+O orquestrador (__main__.py) executa este módulo em um processo separado,
+para que CPU e RSS medidos sejam só do servidor. Banco e Gemini são
+configurados por variáveis de ambiente (DATABASE_URL, GEMINI_KEY,
+GEMINI_API_ENDPOINT) antes de importar src; catálogo, checkpoint, thumbnails
+e features dos outfits são sobrescritos no container, como nos benchmarks.
+
+Usage (normalmente via launch_server):
+    DATABASE_URL=sqlite:///<root>/loadtest.db GEMINI_KEY=fake-key GEMINI_API_ENDPOINT=http://127.0.0.1:<porta> \\
+        python -m benchmarks.loadtest.server --root <root> --port 8765
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+
+def launch_server(root: Path, port: int, env: Dict[str, str], log_path: Path) -> subprocess.Popen:
+    """
+    Inicia o processo do servidor
+
+    Args:
+        root: Diretório do fixture
+        port: Porta HTTP
+        env: Variáveis de ambiente adicionais (DATABASE_URL, GEMINI_*, settings)
+        log_path: Arquivo que recebe stdout/stderr do servidor
+
+    Returns:
+        Processo do servidor
+    """
+    # O processo filho herda o descritor: o arquivo pode ser fechado aqui
+    with open(log_path, "wb") as log_file:
+        return subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.loadtest.server", "--root", str(root), "--port", str(port)],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", **env},
+            stdout=log_file,
+            stderr=subprocess.STDOUT
+        )
+
+
+def wait_until_ready(process: subprocess.Popen, base_url: str, timeout: float = 120.0) -> None:
+    """
+    Aguarda o servidor responder (o lifespan carrega o índice de features e a coleção)
+
+    Raises:
+        RuntimeError: Processo terminou ou não respondeu dentro do timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Servidor terminou durante a inicialização (código {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/docs", timeout=2.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Servidor não respondeu em {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen, timeout: float = 15.0) -> Optional[int]:
+    """SIGTERM (shutdown do lifespan) e SIGKILL se não terminar dentro do timeout"""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return process.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test server process')
+    parser.add_argument('--root', type=str, required=True, help='Fixture directory')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind host (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Bind port (default: 8765)')
+    args = parser.parse_args()
+    root = Path(args.root)
+
+    # Add project root to path
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import uvicorn
+    from dependency_injector import providers
+
+    from modules.outfit_features import OutfitFeaturesIndex
+    from modules.pytorch_model import ModelPredictor
+    from modules.thumbnail_cache import ThumbnailCache
+    from modules.vector_db import VectorDB
+    from src.core.db import create_tables
+    from src.core.dependencies import container
+    from src.main import create_app
+
+    # Banco novo: o lifespan só verifica a conexão (o schema vem das migrations)
+    create_tables()
+
+    container.vector_db.override(providers.Object(VectorDB(path=root / "chroma")))
+    container.model_predictor.override(providers.Object(ModelPredictor(str(root / "model.pth"), device='cpu')))
+    container.thumbnail_cache.override(providers.Object(
+        ThumbnailCache(cache_dir=root / "thumbnails", images_dir=root / "images")
+    ))
+    container.outfit_features.override(providers.Object(
+        OutfitFeaturesIndex(path=root / "missing.sqlite", filtered_dir=root / "filtered")
+    ))
+
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Latências, status e erros por endpoint durante o load test
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class EndpointStats:
+    """Acumula latência e resultado de cada requisição, agrupados por endpoint"""
+
+    def __init__(self):
+        self._latencies = defaultdict(list)
+        self._outcomes = defaultdict(Counter)
+
+    def record(self, endpoint: str, elapsed: float, status: Optional[int] = None, error: Optional[str] = None) -> None:
+        """
+        Args:
+            endpoint: Rótulo do endpoint (ex: "POST /suggestions/generate")
+            elapsed: Latência em segundos (inclui respostas com erro)
+            status: Status HTTP, se houve resposta
+            error: Nome da exceção, se a requisição falhou sem resposta (timeout, conexão)
+        """
+        self._latencies[endpoint].append(elapsed)
+        self._outcomes[endpoint][str(status) if error is None else error] += 1
+
+    @staticmethod
+    def _is_error(outcome: str) -> bool:
+        return not outcome.isdigit() or int(outcome) >= 400
+
+    def _summarize(self, latencies, outcomes: Counter, duration: float) -> Dict:
+        samples = np.asarray(latencies) * 1000
+        errors = {outcome: count for outcome, count in outcomes.items() if self._is_error(outcome)}
+        return {
+            "count": int(len(samples)),
+            "throughput_rps": len(samples) / duration,
+            "error_rate": sum(errors.values()) / len(samples),
+            "errors": errors,
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p95_ms": float(np.percentile(samples, 95)),
+            "p99_ms": float(np.percentile(samples, 99)),
+            "max_ms": float(samples.max()),
+        }
+
+    def summary(self, duration: float) -> Dict[str, Dict]:
+        """
+        Args:
+            duration: Duração da fase medida em segundos (base do throughput)
+
+        Returns:
+            Dict endpoint -> métricas, mais "TOTAL" com todas as requisições
+        """
+        result = {
+            endpoint: self._summarize(latencies, self._outcomes[endpoint], duration)
+            for endpoint, latencies in sorted(self._latencies.items())
+        }
+        if result:
+            result["TOTAL"] = self._summarize(
+                [value for latencies in self._latencies.values() for value in latencies],
+                sum(self._outcomes.values(), Counter()),
+                duration
+            )
+        return result
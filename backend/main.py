@@ -56,7 +56,7 @@ def main():
     # file_name_test = "193875024.json"
     # path_test =  config.FILTERED_DIR / file_name_test
     # outfit_json = json.load(open(path_test, "r"))
-    # emebdding_test, id_test = embedding_generator._process_outfit(outfit_json, file_name_test)
+    # emebdding_test, id_test, _ = embedding_generator._process_outfit(outfit_json, file_name_test)
     # for i, emb in enumerate(emebdding_test):
     #     print(f"\nEmbedding {i + 1}:")
     #     print(f"ID: {id_test[i]}")
@@ -50,6 +50,14 @@ class OutfitCompatibilityModel(nn.Module):
         # For 5 items: 5*6/2 = 15 pairs (including self-comparisons)
         self.num_pairs = (max_items * (max_items + 1)) // 2
 
+        # Upper triangular (i, j) index pairs, including diagonal, in row-major order
+        # (pair_idx order matches the learnable masks). Non-persistent buffers so
+        # existing checkpoints load unchanged.
+        pair_i, pair_j = torch.triu_indices(max_items, max_items)
+        self.register_buffer('pair_i', pair_i, persistent=False)
+        self.register_buffer('pair_j', pair_j, persistent=False)
+        self.register_buffer('pair_ids', torch.arange(self.num_pairs), persistent=False)
+
         # 1. Feature Projection Layer
         # Projects embeddings from 96-D to 1000-D
         self.feature_proj = nn.Sequential(
@@ -118,38 +126,34 @@ class OutfitCompatibilityModel(nn.Module):
         projected = self.feature_proj(flat_embeddings)  # (B*max_items, 1000)
         features = projected.reshape(batch_size, self.max_items, self.embed_proj_size)
 
-        # 2. Compute pairwise comparisons with learnable masks
-        relations = []
+        # 2. Compute pairwise comparisons with learnable masks (all pairs at once)
+        # relation_p = <normalize(m_p * f_i), normalize(m_p * f_j)>
+        #            = sum(m_p^2 * f_i * f_j) / (||m_p * f_i|| * ||m_p * f_j||)
         mask_weights = F.relu(self.masks.weight)  # (num_pairs, 1000) - ensure positive
-
-        pair_idx = 0
-        for i in range(self.max_items):
-            for j in range(i, self.max_items):  # Upper triangular including diagonal
-                # Check if both items are valid (not padding)
-                pair_valid = mask[:, i] & mask[:, j]  # (batch_size,)
-
-                # Apply learnable mask and normalize
-                left = F.normalize(
-                    mask_weights[pair_idx] * features[:, i],
-                    dim=-1
-                )  # (batch_size, 1000)
-
-                right = F.normalize(
-                    mask_weights[pair_idx] * features[:, j],
-                    dim=-1
-                )  # (batch_size, 1000)
-
-                # Compute similarity (dot product)
-                relation = (left * right).sum(dim=-1)  # (batch_size,)
-
-                # Zero out invalid pairs
-                relation = relation * pair_valid.float()
-
-                relations.append(relation)
-                pair_idx += 1
-
-        # Stack all pairwise relations
-        relations = torch.stack(relations, dim=1)  # (batch_size, num_pairs)
+        mask_sq = mask_weights * mask_weights  # (num_pairs, 1000)
+
+        # Check if both items of each pair are valid (not padding)
+        pair_valid = mask[:, self.pair_i] & mask[:, self.pair_j]  # (batch_size, num_pairs)
+
+        # Masked norms of every item under every pair mask, clamped like F.normalize
+        # (clamp before sqrt: an all-zero row would otherwise get a 0 * inf = NaN gradient)
+        norms = torch.matmul(features * features, mask_sq.t()).clamp_min(1e-24).sqrt()  # (batch_size, max_items, num_pairs)
+        left_norms = norms[:, self.pair_i, self.pair_ids]  # (batch_size, num_pairs)
+        right_norms = norms[:, self.pair_j, self.pair_ids]  # (batch_size, num_pairs)
+
+        # Compute similarities (masked dot product) for every pair in one einsum
+        # Item-major layout makes the pair gathers contiguous block copies
+        item_features = features.transpose(0, 1).contiguous()  # (max_items, batch_size, 1000)
+        relations = torch.einsum(
+            'pbd,pbd,pd->pb',
+            item_features[self.pair_i],
+            item_features[self.pair_j],
+            mask_sq
+        ).t()  # (batch_size, num_pairs)
+        relations = relations / (left_norms * right_norms)
+
+        # Zero out invalid pairs
+        relations = relations * pair_valid.float()
 
         # 3. Normalize relations
         relations = self.bn_relations(relations)
@@ -10,6 +10,8 @@ IMAGES_DIR = BASE_DIR / "archive" / "images"
 RESPONSES_DIR = BASE_DIR / "responses"
 FILTERED_DIR = BASE_DIR / "filtered_outfits"
 VECTOR_DB_DIR = BASE_DIR / "chroma_db"
+THUMBNAILS_DIR = BASE_DIR / "thumbnails"
+OUTFIT_FEATURES_INDEX_PATH = BASE_DIR / "filtered_outfits.sqlite"
 
 # Configurações de Embedding
 ATTRIBUTES = ["category", "item_type", "primary_color", "usage", "texture", "print_category"]
@@ -88,4 +90,26 @@ if not GEMINI_API_KEY:
 
 LLM_MODEL = "gemini-2.5-pro"
 
+# Endpoint alternativo da API REST do Gemini (ex: servidor falso local); vazio = SDK oficial
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+
+# Extração em massa (FeatureExtractor.process_all_folders): concorrência e cotas do Gemini
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', 4))
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 60))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv('GEMINI_TOKENS_PER_MINUTE', 1000000))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 6))
+# Imagens de várias pastas por chamada (modules/extraction_batcher.py); 1 = uma pasta por chamada
+GEMINI_BATCH_IMAGES = int(os.getenv('GEMINI_BATCH_IMAGES', 16))
+GEMINI_BATCH_TOKENS = int(os.getenv('GEMINI_BATCH_TOKENS', 50000))
+# Pré-processamento das imagens enviadas ao Gemini (modules/image_preprocess.py)
+GEMINI_IMAGE_PREPROCESS = os.getenv('GEMINI_IMAGE_PREPROCESS', 'true').lower() in ('1', 'true', 'yes')
+GEMINI_IMAGE_MAX_SIDE = int(os.getenv('GEMINI_IMAGE_MAX_SIDE', 768))
+GEMINI_IMAGE_QUALITY = int(os.getenv('GEMINI_IMAGE_QUALITY', 85))
+GEMINI_IMAGE_CROP_BACKGROUND = os.getenv('GEMINI_IMAGE_CROP_BACKGROUND', 'false').lower() in ('1', 'true', 'yes')
+# Manifesto de progresso da extração (JSONL, um registro por pasta processada)
+EXTRACTION_MANIFEST_PATH = BASE_DIR / "extraction_manifest.jsonl"
+
+# Spans e histogramas por etapa (modules/tracing.py)
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
 IMAGES_DIR = BASE_DIR / "archive" / "images"
\ No newline at end of file
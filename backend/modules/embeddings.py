@@ -1,15 +1,51 @@
 import json
+import os
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import hashlib
 from modules.config import (
     FILTERED_DIR,
     ATTRIBUTES,
     ATTR_DIM,
+    PIECE_DIM,
 )
 from .vector_db import VectorDB
 
+# Vetores por escrita no ChromaDB na ingestão em massa (limitado por client.get_max_batch_size())
+INGEST_CHUNK_SIZE = 5000
+# Arquivo de progresso da ingestão em massa (um nome de arquivo concluído por linha)
+INGEST_CHECKPOINT_NAME = "ingest_{collection}.progress"
+
+# Máximo de pares "atributo:valor" memorizados (o vocabulário real tem poucos milhares)
+VOCABULARY_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=VOCABULARY_CACHE_SIZE)
+def _cached_hash_vector(text: str, dim: int) -> np.ndarray:
+    """
+    Vetor determinístico de "atributo:valor" (MD5 -> seed -> normais), memorizado
+    
+    Construir o np.random.default_rng domina o custo; cada valor do
+    vocabulário é calculado uma única vez por processo. O array retornado é
+    somente leitura, pois é compartilhado entre chamadas.
+    """
+    # Create a deterministic seed from md5 hash
+    md5 = hashlib.md5(text.encode("utf-8")).hexdigest()
+    seed = int(md5[:8], 16)  # use first 8 hex digits as integer
+
+    rng = np.random.default_rng(seed)
+    vec = rng.standard_normal(dim)
+    normalized = vec / np.linalg.norm(vec)
+    # Garantir float32 para consistência
+    normalized = normalized.astype(np.float32)
+    normalized.setflags(write=False)
+    return normalized
+
+
 class EmbeddingGenerator:
     def __init__(self, vector_db: Optional[VectorDB] = None):
         """Inicializa o gerador de embeddings"""
@@ -26,16 +62,7 @@ class EmbeddingGenerator:
         Returns:
             np.ndarray: Embedding normalizado em float32
         """
-        # Create a deterministic seed from md5 hash
-        md5 = hashlib.md5(text.encode("utf-8")).hexdigest()
-        seed = int(md5[:8], 16)  # use first 8 hex digits as integer
-
-        rng = np.random.default_rng(seed)
-        vec = rng.standard_normal(dim)
-        normalized = vec / np.linalg.norm(vec)
-        # Garantir float32 para consistência
-        return normalized.astype(np.float32)
-    
+        return _cached_hash_vector(text, dim).copy()
     
 
     def _generate_piece_embedding(self, piece_data: Dict) -> np.ndarray:
@@ -58,38 +85,110 @@ class EmbeddingGenerator:
         # Processa cada atributo definido
         for attr in ATTRIBUTES:
             value = piece_data.get(attr, "UNK")
-            encoding = self._hash_embedding(f"{attr}:{value}", ATTR_DIM)
+            encoding = _cached_hash_vector(f"{attr}:{value}", ATTR_DIM)
             embeddings.append(encoding)
         
         # Concatena todos os embeddings de atributos e garante float32
         return np.concatenate(embeddings).astype(np.float32)
 
-    def _process_outfit(self, outfit_data: Dict, file_name: str) -> Tuple[List[np.ndarray], List[str]]:
+    def generate_embeddings(self, pieces: Sequence[Dict]) -> np.ndarray:
+        """
+        Gera os embeddings de N peças de uma vez
+        
+        Idêntico (bit a bit) a empilhar _generate_piece_embedding de cada
+        peça: cada valor distinto de cada atributo é resolvido uma vez e
+        copiado para as linhas correspondentes da matriz.
+        
+        Args:
+            pieces: Lista de dicionários com atributos das peças
+        
+        Returns:
+            np.ndarray: Matriz (N, 96) em float32
+        """
+        matrix = np.empty((len(pieces), PIECE_DIM), dtype=np.float32)
+        
+        for attr_index, attr in enumerate(ATTRIBUTES):
+            # Índice de cada peça no vocabulário distinto deste atributo
+            vocabulary: Dict[str, int] = {}
+            rows = np.fromiter(
+                (vocabulary.setdefault(f"{attr}:{piece.get(attr, 'UNK')}", len(vocabulary)) for piece in pieces),
+                dtype=np.intp,
+                count=len(pieces)
+            )
+            table = np.empty((len(vocabulary), ATTR_DIM), dtype=np.float32)
+            for text, row in vocabulary.items():
+                table[row] = _cached_hash_vector(text, ATTR_DIM)
+            
+            start = attr_index * ATTR_DIM
+            matrix[:, start:start + ATTR_DIM] = table[rows]
+        
+        return matrix
+
+    @staticmethod
+    def _build_piece_metadata(outfit_name: str, piece_id: str, piece_data: Dict) -> Dict[str, str]:
+        """
+        Monta os metadados de uma peça para a coleção do ChromaDB
+
+        Permite filtros nativos (ex: where={"category": "tops"}) sem
+        precisar reabrir os JSONs de filtered_outfits.
+
+        Args:
+            outfit_name: ID do outfit (nome do arquivo sem .json)
+            piece_id: Nome do arquivo da peça (ex: "1.jpg")
+            piece_data: Dicionário com atributos da peça
+
+        Returns:
+            Dict com outfit_id, piece_name e os 6 atributos (sempre str)
+        """
+        metadata = {
+            "outfit_id": outfit_name,
+            "piece_name": piece_id,
+        }
+        for attr in ATTRIBUTES:
+            metadata[attr] = str(piece_data.get(attr, "UNK"))
+        return metadata
+
+    def _process_outfit(self, outfit_data: Dict, file_name: str) -> Tuple[List[np.ndarray], List[str], List[Dict]]:
         """Processa um outfit gerando embeddings e metadados para cada peça"""
         embeddings = []
         ids = []
+        metadatas = []
         outfit_name = file_name.replace(".json", "")
         
+        pieces = []
         for piece_id, piece_data in outfit_data.items():
             try:
-                # Gera embedding da peça
-                piece_embedding = self._generate_piece_embedding(piece_data)
-                embeddings.append(piece_embedding)
+                metadatas.append(self._build_piece_metadata(outfit_name, piece_id, piece_data))
                 ids.append(f"{outfit_name}/{piece_id}")
+                pieces.append(piece_data)
                 
             except Exception as e:
                 print(f"❌ Erro ao processar peça {piece_id} do outfit {file_name}: {e}")
                 continue
+        
+        # Gera embeddings de todas as peças do outfit em uma matriz
+        if pieces:
+            embeddings = list(self.generate_embeddings(pieces))
                 
-        return embeddings, ids
+        return embeddings, ids, metadatas
 
-    def process_and_store(self, collection_name: str, limit: Optional[int] = None) -> List[str]:
+    def process_and_store(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        reindex: bool = False
+    ) -> List[str]:
         """
         Processa outfits filtrados e armazena no banco vetorial
         
+        Cada peça é gravada com metadados (outfit_id, piece_name e atributos),
+        o que permite filtrar por categoria diretamente na busca vetorial.
+        
         Args:
             collection_name: Nome da coleção onde salvar
             limit: Número máximo de arquivos a processar
+            reindex: Se True, usa upsert para regravar peças já existentes
+                (necessário para popular metadados em coleções antigas)
         """
         processed_files = []
         db = self.vector_db or VectorDB()
@@ -104,14 +203,16 @@ class EmbeddingGenerator:
                     outfit_data = json.load(f)
                 
                 # Processa outfit
-                embeddings, ids = self._process_outfit(outfit_data, file_path.name)
+                embeddings, ids, metadatas = self._process_outfit(outfit_data, file_path.name)
                 
                 if embeddings and ids: 
                     # Adiciona ao banco vetorial
                     db.add_items(
                         collection_name=collection_name,
                         embeddings=[e.tolist() for e in embeddings],
-                        ids=ids
+                        ids=ids,
+                        metadatas=metadatas,
+                        upsert=reindex
                     )
                     
                     processed_files.append(file_path.name)
@@ -121,4 +222,133 @@ class EmbeddingGenerator:
                 print(f"❌ Erro ao processar {file_path.name}: {e}")
                 continue
         
-        return processed_files
\ No newline at end of file
+        return processed_files
+
+    def bulk_ingest(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        reindex: bool = False,
+        workers: Optional[int] = None,
+        chunk_size: int = INGEST_CHUNK_SIZE,
+        checkpoint_path: Optional[Path] = None,
+        resume: bool = True,
+        filtered_dir: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingestão em massa de FILTERED_DIR (alternativa a process_and_store)
+        
+        - Leitura e parse dos JSONs em um pool de processos
+        - Embeddings gerados em batch (generate_embeddings) por chunk
+        - Escrita no ChromaDB em chunks de milhares de vetores
+        - Progresso salvo após cada chunk: uma execução interrompida retoma
+          do primeiro arquivo ainda não gravado
+        
+        Args:
+            collection_name: Nome da coleção onde salvar
+            limit: Número máximo de arquivos a processar (nesta execução)
+            reindex: Se True, usa upsert para regravar peças já existentes
+            workers: Processos de leitura (default: os.cpu_count())
+            chunk_size: Vetores por escrita no ChromaDB
+            checkpoint_path: Arquivo de progresso (default: <chroma>/ingest_<coleção>.progress)
+            resume: Se False, descarta o progresso salvo e processa todos os arquivos
+            filtered_dir: Diretório dos JSONs (default: FILTERED_DIR)
+            
+        Returns:
+            Dict com files, skipped (já ingeridos), outfits, pieces, errors,
+            elapsed (s) e outfits_per_second
+        """
+        db = self.vector_db or VectorDB()
+        db.get_or_create_collection(collection_name)
+        chunk_size = min(chunk_size, db.client.get_max_batch_size())
+        
+        checkpoint_path = Path(checkpoint_path) if checkpoint_path is not None else (
+            db.path / INGEST_CHECKPOINT_NAME.format(collection=collection_name)
+        )
+        if not resume:
+            checkpoint_path.unlink(missing_ok=True)
+        done = set()
+        if checkpoint_path.exists():
+            done = set(checkpoint_path.read_text(encoding="utf-8").split())
+        
+        filtered_dir = Path(filtered_dir) if filtered_dir is not None else Path(FILTERED_DIR)
+        files = [path for path in sorted(filtered_dir.glob("*.json")) if path.name not in done]
+        if limit is not None:
+            files = files[:limit]
+        
+        stats = {"files": len(files), "skipped": len(done), "outfits": 0, "pieces": 0, "errors": 0}
+        start = time.time()
+        
+        pending_files: List[str] = []
+        ids: List[str] = []
+        metadatas: List[Dict] = []
+        pieces: List[Dict] = []
+        
+        def flush():
+            if ids:
+                db.add_items(
+                    collection_name=collection_name,
+                    embeddings=list(self.generate_embeddings(pieces)),
+                    ids=ids,
+                    metadatas=metadatas,
+                    upsert=reindex
+                )
+            # Registra os arquivos só depois da escrita: em caso de interrupção, o chunk é refeito
+            with open(checkpoint_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{name}\n" for name in pending_files)
+            stats["pieces"] += len(ids)
+            elapsed = time.time() - start
+            print(
+                f"✅ {stats['outfits']}/{stats['files']} outfits, {stats['pieces']} peças "
+                f"({stats['outfits'] / max(elapsed, 1e-9):.0f} outfits/s)"
+            )
+            pending_files.clear()
+            ids.clear()
+            metadatas.clear()
+            pieces.clear()
+        
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            parsed = pool.map(_parse_outfit_file, [str(path) for path in files], chunksize=64)
+            for file_name, outfit_ids, outfit_metadatas, outfit_pieces, error in parsed:
+                if error is not None:
+                    print(f"❌ Erro ao processar {file_name}: {error}")
+                    stats["errors"] += 1
+                    continue
+                
+                pending_files.append(file_name)
+                ids.extend(outfit_ids)
+                metadatas.extend(outfit_metadatas)
+                pieces.extend(outfit_pieces)
+                stats["outfits"] += 1
+                if len(ids) >= chunk_size:
+                    flush()
+        
+        if pending_files:
+            flush()
+        
+        stats["elapsed"] = time.time() - start
+        stats["outfits_per_second"] = stats["outfits"] / max(stats["elapsed"], 1e-9)
+        return stats
+
+
+def _parse_outfit_file(path: str) -> Tuple[str, List[str], List[Dict], List[Dict], Optional[str]]:
+    """
+    Lê um JSON de filtered_outfits (executado nos processos de bulk_ingest)
+    
+    Returns:
+        Tuple (nome do arquivo, ids, metadados, atributos das peças, erro ou None)
+    """
+    file_name = os.path.basename(path)
+    outfit_name = file_name.replace(".json", "")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            outfit_data = json.load(f)
+        
+        ids, metadatas, pieces = [], [], []
+        for piece_id, piece_data in outfit_data.items():
+            metadatas.append(EmbeddingGenerator._build_piece_metadata(outfit_name, piece_id, piece_data))
+            ids.append(f"{outfit_name}/{piece_id}")
+            pieces.append({attr: piece_data.get(attr, "UNK") for attr in ATTRIBUTES})
+        return file_name, ids, metadatas, pieces, None
+    except Exception as e:
+        return file_name, [], [], [], str(e)
@@ -0,0 +1,343 @@
+"""
+Batching de extrações no Gemini com demultiplexação por imagem
+
+O FEATURE_EXTRACTION_PROMPT já aceita várias imagens identificadas por nome
+de arquivo em uma única chamada, mas cada upload (e cada pasta do dataset)
+fazia a própria chamada generate_content: overhead de requisição e cota de
+requisições por minuto pagos por imagem.
+
+O ExtractionBatcher segue o mesmo desenho do InferenceScheduler: os jobs
+(imagens de um upload ou de uma pasta) entram em uma fila; uma thread junta
+os jobs pendentes até o orçamento de imagens/tokens e dispara uma única
+chamada. Os nomes das imagens recebem o prefixo "<índice do job>_" (pastas
+diferentes têm arquivos com o mesmo nome), e o JSON da resposta é separado de
+volta para cada job por essas chaves.
+
+Se a chamada agrupada falhar (exceto por cota), a resposta não for um JSON
+válido, ou faltar a chave de alguma imagem, os jobs afetados são refeitos em
+batches menores (metade, até o job isolado, que é enviado com os nomes
+originais, como na chamada individual): uma imagem problemática não derruba
+os demais jobs do batch.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .extraction_runner import estimate_tokens, is_quota_error
+
+logger = logging.getLogger(__name__)
+
+NamedImage = Tuple[str, Any]
+# Limites superiores dos buckets do histograma de jobs por chamada
+JOBS_PER_CALL_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+
+class _ExtractionJob:
+    """Imagens de um upload/pasta aguardando a chamada"""
+
+    __slots__ = ("images", "tokens", "future", "enqueued_at")
+
+    def __init__(self, images: List[NamedImage]):
+        self.images = images
+        self.tokens = estimate_tokens([image for _, image in images])
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class ExtractionBatcher:
+    """
+    Agrupa imagens de requisições/pastas concorrentes em chamadas únicas ao Gemini
+    """
+
+    def __init__(
+        self,
+        extractor,
+        max_images: int = 16,
+        max_tokens: int = 50000,
+        max_wait_ms: float = 200.0,
+        workers: int = 4,
+        call: Optional[Callable[[List[Any]], Any]] = None,
+        timeout: Optional[float] = 600.0
+    ):
+        """
+        Inicializa o batcher (a thread de agrupamento inicia no primeiro job)
+
+        Args:
+            extractor: FeatureExtractor (prompt, parse da resposta e cliente)
+            max_images: Máximo de imagens por chamada
+            max_tokens: Máximo de tokens estimados (prompt + resposta) por chamada
+            max_wait_ms: Tempo máximo que o primeiro job espera por outros jobs
+            workers: Chamadas simultâneas em andamento
+            call: Função parts -> resposta (default: extractor.model.generate_content);
+                o ExtractionRunner passa a chamada com limites de cota e retry
+            timeout: Espera máxima de extract() em segundos (fila + chamada; None = sem limite)
+        """
+        self.extractor = extractor
+        self.max_images = max(1, max_images)
+        self.max_tokens = max_tokens
+        self.max_wait = max_wait_ms / 1000.0
+        self.workers = max(1, workers)
+        self.call = call or extractor.model.generate_content
+        self.timeout = timeout
+        self._prompt_tokens = estimate_tokens([extractor.prompt])
+
+        self._queue: "queue.Queue[_ExtractionJob]" = queue.Queue()
+        self._carry: Optional[_ExtractionJob] = None
+        self._slots = threading.Semaphore(self.workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="blindstyle-extraction-call")
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._concurrent = False
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "jobs": 0,
+            "images": 0,
+            "calls": 0,
+            "split_retries": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "prompt_tokens": 0,
+            "response_tokens": 0,
+            "jobs_per_call_histogram": {bucket: 0 for bucket in JOBS_PER_CALL_BUCKETS + (float("inf"),)},
+        }
+
+    # ------------------------------------------------------------------
+    # Submissão
+    # ------------------------------------------------------------------
+
+    def submit(self, images: List[NamedImage]) -> Future:
+        """
+        Enfileira as imagens de um upload/pasta
+
+        Args:
+            images: Lista de (nome do arquivo, imagem PIL ou blob)
+
+        Returns:
+            Future resolvido com (features, usage): features é o dict
+            nome do arquivo -> atributos (ou o registro de erro de JSON inválido,
+            como em extract_features) e usage o dict com prompt_tokens,
+            response_tokens (parcela proporcional às imagens do job) e jobs_in_call
+        """
+        job = _ExtractionJob(images)
+        if not images:
+            job.future.set_result(({}, {"prompt_tokens": 0, "response_tokens": 0, "jobs_in_call": 0}))
+            return job.future
+
+        self._ensure_started()
+        self._queue.put(job)
+        return job.future
+
+    def extract(self, images: List[NamedImage], timeout: Optional[float] = None) -> Dict:
+        """
+        Versão bloqueante de submit(): devolve apenas as features
+
+        Args:
+            images: Lista de (nome do arquivo, imagem PIL ou blob)
+            timeout: Espera máxima em segundos (default: self.timeout)
+
+        Raises:
+            TimeoutError: Job não resolvido dentro do timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return self.submit(images).result(timeout=timeout)[0]
+        except FutureTimeoutError:
+            raise TimeoutError(f"Extração agrupada sem resposta em {timeout:.0f}s")
+
+    async def extract_async(self, images: List[NamedImage]) -> Dict:
+        """Versão async de extract(): aguarda sem bloquear o event loop"""
+        features, _ = await asyncio.wrap_future(self.submit(images))
+        return features
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="blindstyle-extraction-batcher", daemon=True
+                )
+                self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Agrupamento
+    # ------------------------------------------------------------------
+
+    def _fits(self, jobs: List[_ExtractionJob], job: _ExtractionJob) -> bool:
+        images = sum(len(queued.images) for queued in jobs) + len(job.images)
+        tokens = self._prompt_tokens + sum(queued.tokens for queued in jobs) + job.tokens
+        return images <= self.max_images and tokens <= self.max_tokens
+
+    def _collect_batch(self) -> List[_ExtractionJob]:
+        """
+        Junta jobs até o orçamento de imagens/tokens
+
+        Como no InferenceScheduler, a espera de até max_wait só é aplicada
+        quando a chamada anterior agrupou mais de um job; um job que não cabe
+        no batch atual fica para o próximo (um job maior que o orçamento vai
+        sozinho).
+        """
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = self._queue.get()
+        jobs = [first]
+        deadline = time.perf_counter() + (self.max_wait if self._concurrent else 0.0)
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not self._fits(jobs, job):
+                self._carry = job
+                break
+            jobs.append(job)
+
+        self._concurrent = len(jobs) > 1
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            # Só forma o próximo batch quando há uma chamada livre: jobs continuam se acumulando
+            self._slots.acquire()
+            jobs = self._collect_batch()
+            self._pool.submit(self._execute_and_release, jobs)
+
+    def _execute_and_release(self, jobs: List[_ExtractionJob]) -> None:
+        try:
+            # Reivindica os futures: jobs cancelados (asyncio.wrap_future propaga o
+            # cancelamento) saem da chamada, e os demais não podem mais ser cancelados
+            running = [job for job in jobs if job.future.set_running_or_notify_cancel()]
+            if len(running) < len(jobs):
+                with self._stats_lock:
+                    self._stats["cancelled"] += len(jobs) - len(running)
+            jobs = running
+            if jobs:
+                self._execute(jobs)
+        except Exception as e:
+            # Nenhum job pode ficar sem resultado: quem aguarda o future ficaria bloqueado
+            logger.exception(f"Erro inesperado na extração agrupada ({len(jobs)} jobs)")
+            self._fail(jobs, e)
+        finally:
+            self._slots.release()
+
+    def _fail(self, jobs: List[_ExtractionJob], error: Exception) -> None:
+        """Resolve com a exceção os futures ainda pendentes"""
+        pending = [job for job in jobs if not job.future.done()]
+        with self._stats_lock:
+            self._stats["errors"] += len(pending)
+        for job in pending:
+            job.future.set_exception(error)
+
+    # ------------------------------------------------------------------
+    # Chamada e demultiplexação
+    # ------------------------------------------------------------------
+
+    def _build_parts(self, jobs: List[_ExtractionJob]) -> List[Any]:
+        if len(jobs) == 1:
+            return self.extractor._build_parts(jobs[0].images)
+        return self.extractor._build_parts([
+            (f"{index}_{name}", image)
+            for index, job in enumerate(jobs)
+            for name, image in job.images
+        ])
+
+    def _execute(self, jobs: List[_ExtractionJob]) -> None:
+        """Executa uma chamada para os jobs e resolve os futures (refaz em batches menores se preciso)"""
+        # Montagem, chamada e parse: response.text também pode lançar (ex: candidato
+        # bloqueado por segurança no SDK), e cada job precisa receber resultado ou exceção
+        try:
+            response = self.call(self._build_parts(jobs))
+            usage = getattr(response, "usage_metadata", None)
+            prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            response_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            self._record_call(jobs, prompt_tokens, response_tokens)
+            parsed = self.extractor._parse_response(response, f"batch de {len(jobs)} jobs")
+            if not isinstance(parsed, dict):
+                raise ValueError(f"Resposta do modelo não é um objeto JSON: {type(parsed).__name__}")
+        except Exception as e:
+            logger.error(f"Erro na extração agrupada ({len(jobs)} jobs): {e}")
+            # Erro de cota já passou pelo retry da chamada: refazer em partes só gastaria mais cota
+            if len(jobs) > 1 and not is_quota_error(e):
+                self._split_retry(jobs)
+            else:
+                self._fail(jobs, e)
+            return
+
+        total_images = sum(len(job.images) for job in jobs)
+
+        def usage_share(job: _ExtractionJob) -> Dict[str, Any]:
+            share = len(job.images) / total_images
+            return {
+                "prompt_tokens": round(prompt_tokens * share),
+                "response_tokens": round(response_tokens * share),
+                "jobs_in_call": len(jobs),
+            }
+
+        if len(jobs) == 1:
+            jobs[0].future.set_result((parsed, usage_share(jobs[0])))
+            return
+
+        failed = []
+        for index, job in enumerate(jobs):
+            features = {name: parsed.get(f"{index}_{name}") for name, _ in job.images}
+            if "error" in parsed or any(value is None for value in features.values()):
+                failed.append(job)
+                continue
+            job.future.set_result((features, usage_share(job)))
+
+        if failed:
+            logger.warning(f"Resposta agrupada incompleta: refazendo {len(failed)} jobs em batches menores")
+            self._split_retry(failed)
+
+    def _split_retry(self, jobs: List[_ExtractionJob]) -> None:
+        """Refaz os jobs em duas metades (até o job isolado)"""
+        with self._stats_lock:
+            self._stats["split_retries"] += 1
+        middle = (len(jobs) + 1) // 2
+        self._execute(jobs[:middle])
+        if jobs[middle:]:
+            self._execute(jobs[middle:])
+
+    def _record_call(self, jobs: List[_ExtractionJob], prompt_tokens: int, response_tokens: int) -> None:
+        with self._stats_lock:
+            self._stats["jobs"] += len(jobs)
+            self._stats["images"] += sum(len(job.images) for job in jobs)
+            self._stats["calls"] += 1
+            self._stats["prompt_tokens"] += prompt_tokens
+            self._stats["response_tokens"] += response_tokens
+            for bucket in self._stats["jobs_per_call_histogram"]:
+                if len(jobs) <= bucket:
+                    self._stats["jobs_per_call_histogram"][bucket] += 1
+                    break
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    @property
+    def stats(self) -> Dict:
+        """
+        Métricas do batcher
+
+        Returns:
+            Dict com jobs, images e calls (jobs refeitos contam de novo), split_retries,
+            errors, cancelled (jobs cancelados antes da chamada), tokens, médias de jobs/imagens por chamada e
+            jobs_per_call_histogram {limite superior de jobs: chamadas}
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["jobs_per_call_histogram"] = dict(self._stats["jobs_per_call_histogram"])
+        calls = stats["calls"] or 1
+        stats["avg_jobs_per_call"] = stats["jobs"] / calls
+        stats["avg_images_per_call"] = stats["images"] / calls
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
@@ -0,0 +1,397 @@
+"""
+Extração concorrente de features com o Gemini
+=============================================
+
+Driver de FeatureExtractor.process_all_folders para datasets com dezenas de
+milhares de pastas: cada chamada generate_content leva segundos, então as
+pastas são processadas por um pool de threads (concurrency chamadas
+simultâneas), respeitando as cotas do Gemini:
+
+- TokenBucket de requisições por minuto e de tokens por minuto; o custo em
+  tokens é estimado antes da chamada (texto + imagens) e corrigido com o uso
+  real devolvido em usage_metadata
+- Erros de cota (429/503, ResourceExhausted) são repetidos com backoff
+  exponencial com jitter (respeitando Retry-After, quando presente)
+- Com batch_images > 1, imagens de várias pastas vão na mesma chamada
+  (ExtractionBatcher), com a resposta separada de volta por pasta
+- Cada pasta concluída gera uma linha no manifesto (JSONL): status,
+  tentativas, tempo e tokens. Pastas com resposta salva, ou registradas como
+  sem imagens, são puladas na próxima execução
+
+O cliente é o do FeatureExtractor (extractor.model): SDK oficial,
+GeminiRestClient apontando para um servidor falso, ou qualquer objeto com
+generate_content(parts).
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .config import GEMINI_MAX_RETRIES
+from .image_preprocess import part_image_size
+
+# Tokens por tile de imagem no Gemini (imagens com lados <= 384px ocupam um tile; maiores, tiles de 768px)
+IMAGE_TOKENS_PER_TILE = 258
+IMAGE_TILE_SIZE = 768
+IMAGE_SMALL_SIZE = 384
+# Estimativa de tokens de resposta por imagem (JSON com 6 atributos)
+RESPONSE_TOKENS_PER_IMAGE = 100
+# Status do manifesto que não precisam ser refeitos (além das pastas com resposta salva)
+FINAL_STATUSES = {"empty"}
+
+
+class TokenBucket:
+    """
+    Limitador token bucket thread-safe
+
+    Recarrega rate_per_minute unidades por minuto, acumulando até capacity
+    (rajada). acquire bloqueia até haver saldo; rate_per_minute <= 0 desativa.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Unidades (requisições ou tokens) por minuto
+            capacity: Saldo máximo acumulado (default: 10 segundos de cota)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Consome amount unidades, esperando a recarga se necessário
+
+        Args:
+            amount: Unidades a consumir (limitado a capacity)
+
+        Returns:
+            Segundos esperados
+        """
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def adjust(self, delta: float) -> None:
+        """
+        Devolve (delta > 0) ou cobra (delta < 0) unidades após conhecer o custo real;
+        o saldo pode ficar negativo, atrasando as próximas chamadas
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+
+def is_quota_error(error: Exception) -> bool:
+    """
+    Identifica erros de cota/sobrecarga que devem ser repetidos
+
+    Cobre google.api_core (ResourceExhausted, TooManyRequests, ServiceUnavailable),
+    GeminiAPIError e mensagens com "429"/"quota".
+    """
+    code = getattr(error, "code", None)
+    if code in (429, 503):
+        return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+def estimate_tokens(parts: List[Any]) -> int:
+    """
+    Estima os tokens de uma chamada (prompt + resposta) antes de enviá-la
+
+    Args:
+        parts: Partes do conteúdo (strings, imagens PIL ou blobs de imagem)
+
+    Returns:
+        Tokens estimados
+    """
+    tokens = 0
+    images = 0
+    for part in parts:
+        size = part_image_size(part)
+        if size is not None:
+            width, height = size
+            if width <= IMAGE_SMALL_SIZE and height <= IMAGE_SMALL_SIZE:
+                tiles = 1
+            else:
+                tiles = math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE)
+            tokens += tiles * IMAGE_TOKENS_PER_TILE
+            images += 1
+        else:
+            tokens += len(str(part)) // 4 + 1
+    return tokens + images * RESPONSE_TOKENS_PER_IMAGE
+
+
+class ExtractionRunner:
+    """Processa pastas de imagens em paralelo com limites de cota e manifesto"""
+
+    def __init__(
+        self,
+        extractor,
+        concurrency: int = 4,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 1000000,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        backoff_base: float = 2.0,
+        backoff_max: float = 120.0,
+        manifest_path: Optional[Union[str, Path]] = None,
+        progress_every: int = 25,
+        batch_images: int = 1,
+        batch_tokens: int = 50000
+    ):
+        """
+        Args:
+            extractor: FeatureExtractor (cliente em extractor.model)
+            concurrency: Chamadas simultâneas ao Gemini
+            requests_per_minute: Cota de requisições por minuto (0 = sem limite)
+            tokens_per_minute: Cota de tokens por minuto (0 = sem limite)
+            max_retries: Tentativas extras em erros de cota
+            backoff_base: Espera da primeira repetição em segundos (dobra a cada tentativa)
+            backoff_max: Espera máxima entre tentativas em segundos
+            manifest_path: Manifesto JSONL de progresso (None = sem manifesto)
+            progress_every: Imprime o progresso a cada N pastas
+            batch_images: Máximo de imagens por chamada; > 1 junta várias pastas
+                em uma chamada (ExtractionBatcher)
+            batch_tokens: Máximo de tokens estimados por chamada agrupada
+        """
+        self.extractor = extractor
+        self.concurrency = max(1, concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.manifest_path = Path(manifest_path) if manifest_path is not None else None
+        self.progress_every = progress_every
+
+        self._manifest_lock = threading.Lock()
+        self._manifest_file = None
+        self._retries_lock = threading.Lock()
+        self._retries = 0
+
+        self.batcher = None
+        if batch_images > 1:
+            from .extraction_batcher import ExtractionBatcher
+            # Cada chamada agrupada passa pelos mesmos limites de cota e retry
+            self.batcher = ExtractionBatcher(
+                extractor,
+                max_images=batch_images,
+                max_tokens=batch_tokens,
+                workers=self.concurrency,
+                call=lambda parts: self._call(parts, {"attempts": 0, "retries": 0, "waited": 0.0})
+            )
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """
+        Lê o manifesto
+
+        Returns:
+            Dict pasta -> último registro
+        """
+        records = {}
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return records
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Linha truncada por uma interrupção
+                records[record["folder"]] = record
+        return records
+
+    def _record(self, record: Dict) -> None:
+        if self._manifest_file is None:
+            return
+        with self._manifest_lock:
+            self._manifest_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._manifest_file.flush()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        delay *= random.uniform(0.5, 1.0)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _call(self, parts: List[Any], record: Dict) -> Any:
+        """
+        Chama o Gemini respeitando as cotas, com retry em erros de cota
+
+        Args:
+            parts: Conteúdo da chamada
+            record: Registro atualizado com attempts, retries e waited
+
+        Returns:
+            Resposta do cliente
+
+        Raises:
+            Exception: Erro que não é de cota, ou erro de cota após max_retries
+        """
+        estimate = estimate_tokens(parts)
+        while True:
+            record["attempts"] += 1
+            record["waited"] += self.request_bucket.acquire(1)
+            record["waited"] += self.token_bucket.acquire(estimate)
+            try:
+                response = self.extractor.model.generate_content(parts)
+                break
+            except Exception as e:
+                if not is_quota_error(e) or record["attempts"] > self.max_retries:
+                    raise
+                delay = self._backoff(record["attempts"], e)
+                record["retries"] += 1
+                record["waited"] += delay
+                with self._retries_lock:
+                    self._retries += 1
+                time.sleep(delay)
+
+        usage = getattr(response, "usage_metadata", None)
+        actual = (getattr(usage, "prompt_token_count", 0) or 0) + (getattr(usage, "candidates_token_count", 0) or 0)
+        if actual:
+            self.token_bucket.adjust(estimate - actual)
+        return response
+
+    def _process(self, folder: Path) -> Dict:
+        """Extrai uma pasta (executado nas threads do pool)"""
+        start = time.time()
+        record = {"folder": folder.name, "attempts": 0, "retries": 0, "waited": 0.0,
+                  "prompt_tokens": 0, "response_tokens": 0}
+
+        images = self.extractor._load_named_images(folder)
+        if not images:
+            print(f"⚠️ Sem imagens válidas em {folder.name}")
+            record.update(status="empty", seconds=time.time() - start)
+            self._record(record)
+            return record
+
+        try:
+            if self.batcher is not None:
+                response_json, usage = self.batcher.submit(images).result()
+                record["jobs_in_call"] = usage["jobs_in_call"]
+            else:
+                response = self._call(self.extractor._build_parts(images), record)
+                usage_metadata = getattr(response, "usage_metadata", None)
+                usage = {
+                    "prompt_tokens": getattr(usage_metadata, "prompt_token_count", 0) or 0,
+                    "response_tokens": getattr(usage_metadata, "candidates_token_count", 0) or 0,
+                }
+                response_json = self.extractor._parse_response(response, folder.name)
+        except Exception as e:
+            if is_quota_error(e):
+                # Sem arquivo de resposta: a pasta é refeita na próxima execução
+                status = "quota_exhausted"
+            else:
+                # Mesmo comportamento de extract_features: salva o erro (limpo depois pelo JsonCleaner)
+                status = "error"
+                self.extractor._save_response(folder.name, {"error": str(e)})
+            print(f"❌ Erro ao processar {folder.name}: {e}")
+            record.update(status=status, error=str(e), seconds=time.time() - start)
+            self._record(record)
+            return record
+
+        record["prompt_tokens"] = usage["prompt_tokens"]
+        record["response_tokens"] = usage["response_tokens"]
+        self.extractor._save_response(folder.name, response_json)
+        status = "invalid_json" if "error" in response_json else "ok"
+        record.update(status=status, seconds=time.time() - start)
+        self._record(record)
+        return record
+
+    def run(self, folders: List[Union[str, Path]]) -> Dict[str, Any]:
+        """
+        Processa as pastas ainda sem resposta
+
+        Args:
+            folders: Pastas de imagens (uma por outfit)
+
+        Returns:
+            Dict com total, skipped, contagem por status (ok, empty, error,
+            invalid_json, quota_exhausted), retries, tokens, elapsed e folders_per_minute
+            (+ calls e split_retries com batching)
+        """
+        manifest = self.load_manifest()
+        pending = []
+        skipped = 0
+        for folder in map(Path, folders):
+            output_file = self.extractor.responses_dir / f"{folder.name}.json"
+            if output_file.exists() or manifest.get(folder.name, {}).get("status") in FINAL_STATUSES:
+                skipped += 1
+                continue
+            pending.append(folder)
+
+        stats = {"total": len(pending), "skipped": skipped, "ok": 0, "empty": 0, "error": 0,
+                 "invalid_json": 0, "quota_exhausted": 0, "retries": 0,
+                 "prompt_tokens": 0, "response_tokens": 0}
+        print(f"🚀 {len(pending)} pastas para extrair ({skipped} já processadas), concorrência {self.concurrency}")
+
+        start = time.time()
+        self._retries = 0
+        batcher_before = self.batcher.stats if self.batcher is not None else None
+        if self.manifest_path is not None:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            self._manifest_file = open(self.manifest_path, "a", encoding="utf-8")
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="gemini-extract") as pool:
+                futures = [pool.submit(self._process, folder) for folder in pending]
+                for completed, future in enumerate(as_completed(futures), 1):
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        print(f"❌ Erro inesperado na extração: {e}")
+                        stats["error"] += 1
+                        continue
+                    stats[record["status"]] += 1
+                    stats["retries"] = self._retries
+                    stats["prompt_tokens"] += record["prompt_tokens"]
+                    stats["response_tokens"] += record["response_tokens"]
+                    if completed % self.progress_every == 0 or completed == len(pending):
+                        minutes = max(time.time() - start, 1e-9) / 60
+                        print(
+                            f"📈 {completed}/{len(pending)} pastas ({completed / minutes:.1f}/min, "
+                            f"{stats['retries']} retries, {stats['prompt_tokens'] + stats['response_tokens']} tokens)"
+                        )
+        finally:
+            if self._manifest_file is not None:
+                self._manifest_file.close()
+                self._manifest_file = None
+
+        stats["retries"] = self._retries
+        if self.batcher is not None:
+            batcher_stats = self.batcher.stats
+            stats["calls"] = batcher_stats["calls"] - batcher_before["calls"]
+            stats["split_retries"] = batcher_stats["split_retries"] - batcher_before["split_retries"]
+        stats["elapsed"] = time.time() - start
+        stats["folders_per_minute"] = len(pending) / max(stats["elapsed"], 1e-9) * 60
+        return stats
@@ -1,7 +1,7 @@
+import io
 import os
 import json
 import re
-import time
 import logging
 import hashlib
 from pathlib import Path
@@ -17,7 +17,7 @@ PIL_logger.setLevel(logging.WARNING)
 
 from PIL import Image
 import google.generativeai as genai
-from typing import List, Dict, Union, Optional
+from typing import Any, List, Dict, Tuple, Union, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +26,57 @@ from .config import (
     RESPONSES_DIR, 
     FEATURE_EXTRACTION_PROMPT,
     GEMINI_API_KEY,
+    GEMINI_API_ENDPOINT,
+    GEMINI_CONCURRENCY,
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE,
+    GEMINI_BATCH_IMAGES,
+    GEMINI_BATCH_TOKENS,
+    GEMINI_IMAGE_PREPROCESS,
+    GEMINI_IMAGE_MAX_SIDE,
+    GEMINI_IMAGE_QUALITY,
+    GEMINI_IMAGE_CROP_BACKGROUND,
+    EXTRACTION_MANIFEST_PATH,
     LLM_MODEL
 )
+from .gemini_client import GeminiRestClient
+from .image_preprocess import load_image_part, preprocess_image, to_rgb
+from .tracing import tracer
 
 class FeatureExtractor:
-    def __init__(self):
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(LLM_MODEL)
+    def __init__(
+        self,
+        client=None,
+        responses_dir: Optional[Union[str, Path]] = None,
+        preprocess: bool = GEMINI_IMAGE_PREPROCESS,
+        max_side: Optional[int] = GEMINI_IMAGE_MAX_SIDE,
+        jpeg_quality: int = GEMINI_IMAGE_QUALITY,
+        crop_background: bool = GEMINI_IMAGE_CROP_BACKGROUND
+    ):
+        """
+        Args:
+            client: Cliente com generate_content(parts) (default: SDK do Gemini, ou
+                GeminiRestClient se GEMINI_API_ENDPOINT estiver definido)
+            responses_dir: Diretório dos JSONs de resposta (default: RESPONSES_DIR)
+            preprocess: Reduz e recomprime as imagens antes do envio (image_preprocess.py)
+            max_side: Maior lado em pixels das imagens enviadas
+            jpeg_quality: Qualidade JPEG das imagens enviadas
+            crop_background: Recorta o fundo uniforme ao redor da peça
+        """
+        if client is None:
+            if GEMINI_API_ENDPOINT:
+                client = GeminiRestClient(GEMINI_API_KEY, LLM_MODEL, endpoint=GEMINI_API_ENDPOINT)
+            else:
+                genai.configure(api_key=GEMINI_API_KEY)
+                client = genai.GenerativeModel(LLM_MODEL)
+        self.model = client
+        self.model_name = LLM_MODEL
         self.prompt = FEATURE_EXTRACTION_PROMPT
+        self.responses_dir = Path(responses_dir) if responses_dir is not None else RESPONSES_DIR
+        self.preprocess = preprocess
+        self.max_side = max_side
+        self.jpeg_quality = jpeg_quality
+        self.crop_background = crop_background
 
     def _numeric_sort_key(self, filename: str) -> Union[int, str]:
         base = os.path.splitext(filename)[0]
@@ -43,18 +86,39 @@ class FeatureExtractor:
             return base
 
     def _load_images_with_names(self, folder: Path) -> List:
-        parts = [self.prompt]
+        return self._build_parts(self._load_named_images(folder))
+
+    def _load_named_images(self, folder: Path) -> List[Tuple[str, Any]]:
+        """
+        Carrega as imagens de uma pasta (pré-processadas se self.preprocess)
+
+        Returns:
+            Lista de (nome do arquivo, imagem PIL ou blob) em ordem numérica
+        """
+        images = []
         files = [f for f in os.listdir(folder) if f.lower().endswith(".jpg") or f.lower().endswith(".png")]
         for file in sorted(files, key=self._numeric_sort_key):
             image_path = os.path.join(folder, file)
             try:
-                img = Image.open(image_path)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                parts.append(f"Filename of the image below: {file} image:")
-                parts.append(img)
+                if self.preprocess:
+                    img = load_image_part(image_path, self.max_side, self.jpeg_quality, self.crop_background)
+                else:
+                    img = Image.open(image_path)
+                    if img.mode != 'RGB':
+                        img = img.convert('RGB')
+                images.append((file, img))
             except Exception as e:
                 print(f"Erro ao carregar imagem {file}: {e}")
+        return images
+
+    def _build_parts(self, named_images: List[Tuple[str, Any]]) -> List:
+        """
+        Monta o conteúdo da chamada: prompt + (nome, imagem) de cada imagem
+        """
+        parts = [self.prompt]
+        for name, img in named_images:
+            parts.append(f"Filename of the image below: {name} image:")
+            parts.append(img)
         return parts
 
     def _extract_clean_json(self, text: str) -> str:
@@ -88,7 +152,6 @@ class FeatureExtractor:
         """
         folder_path = Path(folder_path)
         folder_name = folder_path.name
-        output_file_path = RESPONSES_DIR / f"{folder_name}.json"
 
         try:
             content_parts = self._load_images_with_names(folder_path)
@@ -97,32 +160,44 @@ class FeatureExtractor:
                 return None
 
             response = self.model.generate_content(content_parts)
-
-            try:
-                cleaned_text = self._extract_clean_json(response.text)
-                response_json = json.loads(cleaned_text)
-            except json.JSONDecodeError:
-                print(f"❌ JSON inválido retornado por {folder_name}")
-                response_json = {
-                    "error": "Invalid JSON from model",
-                    "raw_response": response.text
-                }
+            response_json = self._parse_response(response, folder_name)
 
             # Salva o resultado
-            os.makedirs(RESPONSES_DIR, exist_ok=True)
-            with open(output_file_path, "w", encoding="utf-8") as f:
-                json.dump(response_json, f, indent=2, ensure_ascii=False)
-
+            output_file_path = self._save_response(folder_name, response_json)
             print(f"✅ JSON salvo em {output_file_path}")
             return response_json
 
         except Exception as e:
-            error_info = {"error": str(e)}
-            with open(output_file_path, "w", encoding="utf-8") as f:
-                json.dump(error_info, f, indent=2, ensure_ascii=False)
+            self._save_response(folder_name, {"error": str(e)})
             print(f"❌ Erro ao processar {folder_name}: {e}")
             return None
 
+    def _parse_response(self, response, folder_name: str) -> Dict:
+        """
+        Converte a resposta do Gemini em dict (ou registro de erro se o JSON for inválido)
+        """
+        try:
+            return json.loads(self._extract_clean_json(response.text))
+        except json.JSONDecodeError:
+            print(f"❌ JSON inválido retornado por {folder_name}")
+            return {
+                "error": "Invalid JSON from model",
+                "raw_response": response.text
+            }
+
+    def _save_response(self, folder_name: str, response_json: Dict) -> Path:
+        """
+        Salva a resposta em <responses_dir>/<pasta>.json
+
+        Returns:
+            Path do arquivo salvo
+        """
+        output_file_path = self.responses_dir / f"{folder_name}.json"
+        os.makedirs(self.responses_dir, exist_ok=True)
+        with open(output_file_path, "w", encoding="utf-8") as f:
+            json.dump(response_json, f, indent=2, ensure_ascii=False)
+        return output_file_path
+
     def extract_features_in_memory(self, folder_path: Union[str, Path]) -> Optional[Dict]:
         """
         Extrai features de todas as imagens em uma pasta usando o Gemini, mantendo em memória sem salvar.
@@ -133,89 +208,136 @@ class FeatureExtractor:
         Returns:
             Dict: Dicionário com as features extraídas ou None em caso de erro
         """
-        start_total = time.time()
         folder_path = Path(folder_path)
-        folder_name = folder_path.name
-        logger.info(f"[TIMER]     Starting feature extraction for {folder_name}")
-
-        try:
-            start_load = time.time()
+        with tracer.span("gemini.load_images"):
             content_parts = self._load_images_with_names(folder_path)
-            elapsed_load = time.time() - start_load
-            logger.info(f"[TIMER]       Load images: {elapsed_load:.3f}s")
+        return self._extract_parts_in_memory(content_parts, folder_path.name)
+
+    def prepare_part(self, image: Union[bytes, Image.Image]) -> Any:
+        """
+        Converte uma imagem em memória na parte enviada ao Gemini
+        
+        Mesmo tratamento das imagens lidas do disco: pré-processada (blob JPEG
+        reduzido) se self.preprocess; senão os bytes originais ou a imagem PIL em RGB.
+        
+        Args:
+            image: Bytes da imagem (JPEG/PNG) ou imagem PIL já aberta
             
-            if len(content_parts) <= 1:
-                print(f"⚠️ Sem imagens válidas em {folder_name}")
-                return None
+        Returns:
+            Blob {"mime_type", "data"} ou imagem PIL
+        """
+        if isinstance(image, (bytes, bytearray)):
+            if not self.preprocess:
+                with Image.open(io.BytesIO(image)) as opened:
+                    mime_type = opened.get_format_mimetype()
+                return {"mime_type": mime_type, "data": bytes(image)}
+            image = Image.open(io.BytesIO(image))
+        if self.preprocess:
+            return preprocess_image(image, self.max_side, self.jpeg_quality, self.crop_background)
+        return to_rgb(image)
 
-            start_api = time.time()
-            logger.info(f"[TIMER]       Iniciando chamada Gemini API com {len(content_parts)-1} imagens...")
+    def extract_features_from_image(
+        self,
+        image: Union[bytes, Image.Image],
+        filename: str = "image.jpg"
+    ) -> Optional[Dict]:
+        """
+        Extrai features de uma única imagem em memória, sem passar pelo disco
+        
+        Args:
+            image: Bytes da imagem (JPEG/PNG) ou imagem PIL já aberta
+            filename: Nome da imagem no prompt (chave do dict retornado)
             
-            # Medir tempo de preparação do request
-            start_prepare = time.time()
+        Returns:
+            Dict: Dicionário com as features extraídas ou None em caso de erro
+        """
+        try:
+            with tracer.span("gemini.load_images"):
+                content_parts = self._build_parts([(filename, self.prepare_part(image))])
+        except Exception as e:
+            print(f"❌ Erro ao carregar imagem {filename}: {e}")
+            return None
+        return self._extract_parts_in_memory(content_parts, filename)
+
+    def _extract_parts_in_memory(self, content_parts: List, folder_name: str) -> Optional[Dict]:
+        """
+        Chamada ao Gemini com as partes já montadas (prompt + imagens), sem salvar a resposta
+        """
+        if len(content_parts) <= 1:
+            print(f"⚠️ Sem imagens válidas em {folder_name}")
+            return None
+
+        try:
             # content_parts já contém: [prompt, "filename:", img, "filename:", img, ...]
-            num_images = (len(content_parts) - 1) // 2
-            elapsed_prepare = time.time() - start_prepare
-            logger.info(f"[TIMER]         Preparação do request: {elapsed_prepare:.3f}s ({num_images} imagens)")
-            
-            # Chamada real ao Gemini (rede + processamento no servidor)
-            start_call = time.time()
-            response = self.model.generate_content(content_parts)
-            elapsed_call = time.time() - start_call
-            
-            # Processar resposta
-            start_response_processing = time.time()
-            response_text = response.text
-            prompt_tokens = response.usage_metadata.prompt_token_count if hasattr(response, 'usage_metadata') else 0
-            response_tokens = response.usage_metadata.candidates_token_count if hasattr(response, 'usage_metadata') else 0
-            elapsed_response_processing = time.time() - start_response_processing
-            
-            elapsed_api = time.time() - start_api
-            
-            logger.info(f"[TIMER]         Chamada Gemini (rede + servidor): {elapsed_call:.3f}s")
-            logger.info(f"[TIMER]         Processar resposta: {elapsed_response_processing:.3f}s")
-            logger.info(f"[TIMER]         Tokens: {prompt_tokens} prompt + {response_tokens} response = {prompt_tokens + response_tokens} total")
-            logger.info(f"[TIMER]       TOTAL Gemini API call: {elapsed_api:.3f}s")
-            print(response)
+            upload_bytes = sum(len(part["data"]) for part in content_parts if isinstance(part, dict))
+            with tracer.span("gemini.call", images=(len(content_parts) - 1) // 2, upload_kb=upload_bytes // 1024) as span:
+                # Chamada real ao Gemini (rede + processamento no servidor)
+                response = self.model.generate_content(content_parts)
+                usage = getattr(response, "usage_metadata", None)
+                span.set(
+                    prompt_tokens=getattr(usage, "prompt_token_count", 0),
+                    response_tokens=getattr(usage, "candidates_token_count", 0)
+                )
+
+            with tracer.span("gemini.parse"):
+                try:
+                    response_json = json.loads(self._extract_clean_json(response.text))
+                except json.JSONDecodeError:
+                    print(f"❌ JSON inválido retornado por {folder_name}")
+                    response_json = {
+                        "error": "Invalid JSON from model",
+                        "raw_response": response.text
+                    }
 
-            start_parse = time.time()
-            try:
-                start_extract_text = time.time()
-                cleaned_text = self._extract_clean_json(response_text)
-                elapsed_extract_text = time.time() - start_extract_text
-                
-                start_json_parse = time.time()
-                response_json = json.loads(cleaned_text)
-                elapsed_json_parse = time.time() - start_json_parse
-                
-                elapsed_parse = time.time() - start_parse
-                logger.info(f"[TIMER]       Parse - Extract clean JSON: {elapsed_extract_text:.3f}s, JSON loads: {elapsed_json_parse:.3f}s, Total: {elapsed_parse:.3f}s")
-            except json.JSONDecodeError:
-                print(f"❌ JSON inválido retornado por {folder_name}")
-                response_json = {
-                    "error": "Invalid JSON from model",
-                    "raw_response": response.text
-                }
-
-            elapsed_total = time.time() - start_total
-            logger.info(f"[TIMER]     TOTAL feature extraction: {elapsed_total:.3f}s")
             print(f"✅ Features extraídas para {folder_name} (em memória)")
             return response_json
 
         except Exception as e:
             print(f"❌ Erro ao processar {folder_name}: {e}")
-            logger.error(f"[TIMER] ERROR in feature extraction: {str(e)}")
+            logger.error(f"Erro na extração de features: {str(e)}")
             return None
 
 
-    def process_all_folders(self) -> None:
+    def process_all_folders(
+        self,
+        images_dir: Optional[Union[str, Path]] = None,
+        concurrency: int = GEMINI_CONCURRENCY,
+        requests_per_minute: float = GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = GEMINI_TOKENS_PER_MINUTE,
+        manifest_path: Optional[Union[str, Path]] = None,
+        batch_images: int = GEMINI_BATCH_IMAGES,
+        batch_tokens: int = GEMINI_BATCH_TOKENS
+    ) -> Dict:
         """
         Processa todas as pastas de imagens no diretório base.
+        
+        As chamadas ao Gemini rodam em paralelo (ExtractionRunner), limitadas
+        por concorrência e por cotas de requisições/tokens por minuto, com
+        retry em erros de cota. Pastas pequenas são agrupadas na mesma chamada
+        (até batch_images imagens). Pastas com resposta salva são puladas.
+        
+        Args:
+            images_dir: Diretório com uma pasta por outfit (default: IMAGES_DIR)
+            concurrency: Chamadas simultâneas ao Gemini
+            requests_per_minute: Cota de requisições por minuto
+            tokens_per_minute: Cota de tokens (prompt + resposta) por minuto
+            manifest_path: Manifesto de progresso (default: EXTRACTION_MANIFEST_PATH)
+            batch_images: Máximo de imagens por chamada (1 = uma pasta por chamada)
+            batch_tokens: Máximo de tokens estimados por chamada agrupada
+            
+        Returns:
+            Dict com as estatísticas da execução
         """
-        for folder in Path(IMAGES_DIR).iterdir():
-            if folder.is_dir():
-                output_file = RESPONSES_DIR / f"{folder.name}.json"
-                if output_file.exists():
-                    print(f"⏩ Pulando {folder.name}, já existe {output_file}")
-                    continue
-                self.extract_features(folder)
\ No newline at end of file
+        from .extraction_runner import ExtractionRunner
+
+        runner = ExtractionRunner(
+            self,
+            concurrency=concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            manifest_path=manifest_path if manifest_path is not None else EXTRACTION_MANIFEST_PATH,
+            batch_images=batch_images,
+            batch_tokens=batch_tokens
+        )
+        folders = [folder for folder in Path(images_dir or IMAGES_DIR).iterdir() if folder.is_dir()]
+        return runner.run(folders)
\ No newline at end of file
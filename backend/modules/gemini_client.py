@@ -0,0 +1,125 @@
+"""
+Cliente REST mínimo do Gemini (generateContent)
+
+Alternativa plugável ao google.generativeai.GenerativeModel com a mesma
+interface usada pelo FeatureExtractor: generate_content(parts) devolvendo um
+objeto com .text e .usage_metadata. Permite apontar a extração para outro
+endpoint (ex: um servidor Gemini falso local em testes e benchmarks).
+
+As partes podem ser strings (texto), imagens PIL (enviadas como JPEG inline) ou
+blobs {"mime_type", "data"} já comprimidos.
+Erros HTTP viram GeminiAPIError com o status em .code (429 = cota).
+"""
+
+import base64
+import io
+from typing import Any, List, Optional
+
+import httpx
+from PIL import Image
+
+DEFAULT_ENDPOINT = "https://generativelanguage.googleapis.com"
+
+
+class GeminiAPIError(Exception):
+    """Erro HTTP da API do Gemini"""
+
+    def __init__(self, code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.retry_after = retry_after
+
+
+class GeminiUsage:
+    """Contagem de tokens (mesmos nomes de atributos do SDK)"""
+
+    def __init__(self, prompt_token_count: int = 0, candidates_token_count: int = 0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class GeminiResponse:
+    """Resposta de generateContent com .text e .usage_metadata"""
+
+    def __init__(self, text: str, usage_metadata: GeminiUsage):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class GeminiRestClient:
+    """Chamadas síncronas a models/<model>:generateContent via HTTP"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        endpoint: Optional[str] = None,
+        timeout: float = 300.0,
+        jpeg_quality: int = 90
+    ):
+        """
+        Args:
+            api_key: Chave da API
+            model: Nome do modelo (ex: gemini-2.5-pro)
+            endpoint: URL base (default: API pública do Gemini)
+            timeout: Timeout por requisição em segundos
+            jpeg_quality: Qualidade JPEG das imagens enviadas
+        """
+        self.model = model
+        self.jpeg_quality = jpeg_quality
+        self._url = f"{(endpoint or DEFAULT_ENDPOINT).rstrip('/')}/v1beta/models/{model}:generateContent"
+        # httpx.Client é thread-safe: uma instância compartilhada por todas as threads da extração
+        self._client = httpx.Client(timeout=timeout, headers={"x-goog-api-key": api_key})
+
+    def _encode_part(self, part: Any) -> dict:
+        if isinstance(part, dict) and "data" in part:
+            # Blob já comprimido (modules/image_preprocess.py)
+            data = base64.b64encode(part["data"]).decode("ascii")
+            return {"inline_data": {"mime_type": part["mime_type"], "data": data}}
+        if isinstance(part, Image.Image):
+            buffer = io.BytesIO()
+            part.save(buffer, format="JPEG", quality=self.jpeg_quality)
+            data = base64.b64encode(buffer.getvalue()).decode("ascii")
+            return {"inline_data": {"mime_type": "image/jpeg", "data": data}}
+        return {"text": str(part)}
+
+    def generate_content(self, parts: List[Any]) -> GeminiResponse:
+        """
+        Envia as partes em uma única requisição
+
+        Args:
+            parts: Lista de strings, imagens PIL e blobs
+
+        Returns:
+            GeminiResponse com o texto concatenado dos candidatos e o uso de tokens
+
+        Raises:
+            GeminiAPIError: Status HTTP diferente de 2xx
+        """
+        body = {"contents": [{"role": "user", "parts": [self._encode_part(part) for part in parts]}]}
+        response = self._client.post(self._url, json=body)
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error", {}).get("message", response.text)
+            except ValueError:
+                message = response.text
+            retry_after = response.headers.get("retry-after")
+            raise GeminiAPIError(
+                response.status_code,
+                message,
+                retry_after=float(retry_after) if retry_after else None
+            )
+
+        data = response.json()
+        candidates = data.get("candidates") or [{}]
+        text = "".join(part.get("text", "") for part in candidates[0].get("content", {}).get("parts", []))
+        usage = data.get("usageMetadata", {})
+        return GeminiResponse(
+            text,
+            GeminiUsage(usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0))
+        )
+
+    def close(self) -> None:
+        self._client.close()
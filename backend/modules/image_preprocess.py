@@ -0,0 +1,180 @@
+"""
+Pré-processamento das imagens enviadas ao Gemini
+
+O custo de uma chamada (tokens de prompt, bytes enviados e latência no
+servidor) cresce com a resolução: o Gemini cobra 258 tokens por tile de
+768x768, então uma foto 3000x4000 vira ~20 tiles, enquanto a mesma foto com
+maior lado 768 ocupa um só. Para extrair categoria, cor e textura a
+resolução reduzida é suficiente.
+
+Etapas:
+1. Decodificação em draft mode (JPEG já decodificado em escala 1/2, 1/4 ou 1/8)
+2. Recorte opcional do fundo uniforme ao redor da peça
+3. Redução para max_side no maior lado
+4. Recompressão JPEG (quality)
+
+O resultado é um blob {"mime_type", "data"}, aceito como parte tanto pelo SDK
+do Gemini quanto pelo GeminiRestClient (imagens PIL sem arquivo seriam
+enviadas pelo SDK como WebP lossless, muito maiores).
+"""
+
+import io
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from PIL import Image, ImageChops
+
+# Diferença mínima (0-255) em relação à cor do canto para um pixel contar como peça
+BACKGROUND_THRESHOLD = 24
+# Margem mantida ao redor da peça recortada (fração do maior lado)
+CROP_MARGIN = 0.04
+
+
+def to_rgb(image: Image.Image) -> Image.Image:
+    """Converte para RGB (fundo branco para imagens com transparência)"""
+    if image.mode in ('RGBA', 'P', 'LA'):
+        rgb_img = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        rgb_img.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        return rgb_img
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def crop_background(image: Image.Image, threshold: int = BACKGROUND_THRESHOLD) -> Image.Image:
+    """
+    Recorta o fundo uniforme (cor do canto superior esquerdo) ao redor da peça
+
+    Args:
+        image: Imagem RGB
+        threshold: Diferença mínima por canal para um pixel não ser fundo
+
+    Returns:
+        Imagem recortada (ou a original, se o fundo não for uniforme)
+    """
+    background = Image.new('RGB', image.size, image.getpixel((0, 0)))
+    mask = ImageChops.difference(image, background).convert('L').point(lambda v: 255 if v > threshold else 0)
+    bbox = mask.getbbox()
+    if bbox is None:
+        return image
+
+    margin = int(max(image.size) * CROP_MARGIN)
+    left, top, right, bottom = bbox
+    bbox = (max(0, left - margin), max(0, top - margin),
+            min(image.width, right + margin), min(image.height, bottom + margin))
+    if bbox == (0, 0, image.width, image.height):
+        return image
+    return image.crop(bbox)
+
+
+def prepare_image(
+    image: Image.Image,
+    max_side: Optional[int] = 768,
+    crop: bool = False
+) -> Image.Image:
+    """
+    Decodifica (draft mode), converte para RGB, recorta e reduz uma imagem
+
+    O draft só tem efeito em JPEGs ainda não decodificados: a imagem é
+    decodificada uma única vez, já na menor escala >= max_side (2x com
+    recorte, para a peça recortada manter resolução).
+
+    Args:
+        image: Imagem PIL (aberta ou já decodificada)
+        max_side: Maior lado em pixels (None mantém a resolução)
+        crop: Recorta o fundo uniforme antes de reduzir
+
+    Returns:
+        Imagem RGB decodificada
+    """
+    if max_side:
+        draft_side = max_side * 2 if crop else max_side
+        image.draft('RGB', (draft_side, draft_side))
+
+    image = to_rgb(image)
+    if crop:
+        image = crop_background(image)
+    if max_side and max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        image = image.resize(
+            (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+            Image.LANCZOS
+        )
+    return image
+
+
+def encode_jpeg(image: Image.Image, quality: int = 85) -> Dict[str, Any]:
+    """
+    Comprime uma imagem RGB em um blob JPEG
+
+    Returns:
+        Blob {"mime_type": "image/jpeg", "data": bytes}
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
+
+def preprocess_image(
+    image: Image.Image,
+    max_side: Optional[int] = 768,
+    quality: int = 85,
+    crop: bool = False
+) -> Dict[str, Any]:
+    """
+    Reduz e recomprime uma imagem para envio ao Gemini (prepare_image + encode_jpeg)
+
+    Args:
+        image: Imagem PIL (aberta ou já decodificada)
+        max_side: Maior lado em pixels (None mantém a resolução)
+        quality: Qualidade JPEG (1-100)
+        crop: Recorta o fundo uniforme antes de reduzir
+
+    Returns:
+        Blob {"mime_type": "image/jpeg", "data": bytes}
+    """
+    return encode_jpeg(prepare_image(image, max_side=max_side, crop=crop), quality=quality)
+
+
+def load_image_part(
+    path: Union[str, Path],
+    max_side: Optional[int] = 768,
+    quality: int = 85,
+    crop: bool = False
+) -> Dict[str, Any]:
+    """
+    Lê uma imagem do disco já pronta para envio ao Gemini
+
+    JPEGs que já cabem em max_side (ex: thumbnails ou imagens pré-processadas)
+    são enviados com os bytes originais, sem decodificar nem recomprimir.
+
+    Args:
+        path: Caminho da imagem
+        max_side: Maior lado em pixels (None mantém a resolução)
+        quality: Qualidade JPEG (1-100)
+        crop: Recorta o fundo uniforme antes de reduzir
+
+    Returns:
+        Blob {"mime_type": "image/jpeg", "data": bytes}
+    """
+    with Image.open(path) as image:
+        if image.format == 'JPEG' and not crop and (not max_side or max(image.size) <= max_side):
+            return {"mime_type": "image/jpeg", "data": Path(path).read_bytes()}
+        return preprocess_image(image, max_side=max_side, quality=quality, crop=crop)
+
+
+def part_image_size(part: Any) -> Optional[Tuple[int, int]]:
+    """
+    Dimensões de uma parte de imagem (PIL ou blob), lendo apenas o cabeçalho
+
+    Returns:
+        (largura, altura) ou None se a parte não for imagem
+    """
+    if isinstance(part, Image.Image):
+        return part.size
+    if isinstance(part, dict) and "data" in part:
+        with Image.open(io.BytesIO(part["data"])) as image:
+            return image.size
+    return None
@@ -0,0 +1,273 @@
+"""
+Scheduler de inferência com micro-batching entre requisições
+
+Cada requisição de sugestão avalia poucos outfits (~10). Em vez de cada uma
+fazer o próprio forward no ModelPredictor singleton, os jobs de requisições
+concorrentes entram em uma fila; uma thread dedicada junta os jobs que
+chegarem em até max_wait_ms (ou até max_batch_size outfits), executa um
+único forward e resolve o future de cada requisição com seus scores. O
+predictor ainda divide o batch agrupado em chunks de predictor.max_batch_size
+outfits, que limitam a memória de cada forward; o container constrói os dois
+com INFERENCE_MAX_BATCH_SIZE, então cada grupo roda em um único forward.
+
+Em modo de avaliação o score de um outfit independe dos demais itens do
+batch, então o resultado é o mesmo da predição individual.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .pytorch_model import ModelPredictor
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores dos buckets do histograma de outfits por forward
+BATCH_SIZE_BUCKETS = (1, 8, 16, 32, 64, 128, 256, 512)
+
+
+class _ScoringJob:
+    """Outfits de uma requisição aguardando o forward"""
+
+    __slots__ = ("inputs", "masks", "projected", "future", "enqueued_at")
+
+    def __init__(self, inputs: np.ndarray, masks: np.ndarray, projected: bool):
+        self.inputs = inputs
+        self.masks = masks
+        self.projected = projected
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+    @property
+    def num_outfits(self) -> int:
+        return self.inputs.shape[0]
+
+
+class InferenceScheduler:
+    """
+    Agrupa jobs de scoring de requisições concorrentes em forwards únicos
+    """
+
+    def __init__(
+        self,
+        predictor: ModelPredictor,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 3.0
+    ):
+        """
+        Inicializa o scheduler (a thread de inferência inicia no primeiro job)
+
+        Args:
+            predictor: ModelPredictor compartilhado
+            max_batch_size: Máximo de outfits coletados por batch agrupado
+            max_wait_ms: Tempo máximo que o primeiro job espera por outros jobs
+        """
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[Optional[_ScoringJob]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._concurrent = False
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "jobs": 0,
+            "outfits": 0,
+            "batches": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "queue_wait_seconds": 0.0,
+            "batch_size_histogram": {bucket: 0 for bucket in BATCH_SIZE_BUCKETS + (float("inf"),)},
+        }
+
+    # ------------------------------------------------------------------
+    # Submissão
+    # ------------------------------------------------------------------
+
+    def submit(self, inputs: np.ndarray, masks: np.ndarray, projected: bool = False) -> Future:
+        """
+        Enfileira os outfits de uma requisição
+
+        Args:
+            inputs: Array (B, max_items, 96) com embeddings ou, se projected,
+                (B, max_items, embed_proj_size) com features do cache de projeções
+            masks: Array (B, max_items) boolean
+            projected: Se True, inputs já passaram por feature_proj
+
+        Returns:
+            Future resolvido com o array (B,) de scores
+        """
+        if self._closed:
+            raise RuntimeError("InferenceScheduler encerrado")
+
+        job = _ScoringJob(inputs=inputs, masks=masks, projected=projected)
+        if job.num_outfits == 0:
+            job.future.set_result(np.empty(0, dtype=np.float32))
+            return job.future
+
+        self._ensure_started()
+        self._queue.put(job)
+        with self._stats_lock:
+            depth = self._queue.qsize()
+            self._stats["queue_depth"] = depth
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        return job.future
+
+    async def score(self, inputs: np.ndarray, masks: np.ndarray, projected: bool = False) -> np.ndarray:
+        """Versão async de submit(): aguarda os scores sem bloquear o event loop"""
+        return await asyncio.wrap_future(self.submit(inputs, masks, projected))
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="blindstyle-inference", daemon=True
+                )
+                self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Thread de inferência
+    # ------------------------------------------------------------------
+
+    def _collect_batch(self, first: _ScoringJob) -> List[_ScoringJob]:
+        """
+        Junta jobs até max_batch_size outfits
+
+        Jobs já enfileirados entram sem espera. A espera de até max_wait só é
+        aplicada quando o forward anterior agrupou mais de um job (há
+        requisições concorrentes); uma requisição isolada não paga a espera.
+        """
+        jobs = [first]
+        num_outfits = first.num_outfits
+        deadline = time.perf_counter() + (self.max_wait if self._concurrent else 0.0)
+
+        while num_outfits < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # Sinal de encerramento: processa o batch atual e reenfileira o sinal
+                self._queue.put(None)
+                break
+            jobs.append(job)
+            num_outfits += job.num_outfits
+
+        self._concurrent = len(jobs) > 1
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            jobs = self._collect_batch(first)
+            started_at = time.perf_counter()
+
+            # Reivindica os futures: requisições canceladas (asyncio.wrap_future propaga o
+            # cancelamento) saem do forward, e os demais não podem mais ser cancelados
+            running = [job for job in jobs if job.future.set_running_or_notify_cancel()]
+            if len(running) < len(jobs):
+                with self._stats_lock:
+                    self._stats["cancelled"] += len(jobs) - len(running)
+
+            # Jobs com embeddings crus e com features projetadas vão em forwards separados
+            for projected in (False, True):
+                group = [job for job in running if job.projected == projected]
+                if group:
+                    try:
+                        self._run_group(group, projected)
+                    except Exception as e:
+                        # A thread não pode morrer: requisições seguintes ficariam sem resposta
+                        logger.exception(f"Erro resolvendo jobs de inferência: {e}")
+                        self._fail(group, e)
+
+            if running:
+                self._record_batch(running, started_at)
+
+    def _run_group(self, jobs: List[_ScoringJob], projected: bool) -> None:
+        """Executa um forward com todos os jobs do grupo e resolve os futures"""
+        try:
+            inputs = np.concatenate([job.inputs for job in jobs])
+            masks = np.concatenate([job.masks for job in jobs])
+            predict = self.predictor.predict_projected_arrays if projected else self.predictor.predict_arrays
+            # Chunks do predictor: o batch agrupado não ultrapassa o limite de memória por forward
+            scores = predict(inputs, masks)
+        except Exception as e:
+            logger.error(f"Erro no forward agrupado ({len(jobs)} jobs): {e}")
+            self._fail(jobs, e)
+            return
+
+        start = 0
+        for job in jobs:
+            end = start + job.num_outfits
+            if not job.future.done():
+                job.future.set_result(scores[start:end])
+            start = end
+
+    def _fail(self, jobs: List[_ScoringJob], error: Exception) -> None:
+        """Resolve com a exceção os futures ainda pendentes"""
+        with self._stats_lock:
+            self._stats["errors"] += len(jobs)
+        for job in jobs:
+            if not job.future.done():
+                job.future.set_exception(error)
+
+    def _record_batch(self, jobs: List[_ScoringJob], started_at: float) -> None:
+        num_outfits = sum(job.num_outfits for job in jobs)
+        with self._stats_lock:
+            self._stats["jobs"] += len(jobs)
+            self._stats["outfits"] += num_outfits
+            self._stats["batches"] += 1
+            self._stats["queue_depth"] = self._queue.qsize()
+            self._stats["queue_wait_seconds"] += sum(started_at - job.enqueued_at for job in jobs)
+            for bucket in self._stats["batch_size_histogram"]:
+                if num_outfits <= bucket:
+                    self._stats["batch_size_histogram"][bucket] += 1
+                    break
+        logger.debug(f"Forward agrupado: {len(jobs)} jobs, {num_outfits} outfits")
+
+    # ------------------------------------------------------------------
+    # Métricas e encerramento
+    # ------------------------------------------------------------------
+
+    @property
+    def stats(self) -> Dict:
+        """
+        Métricas do scheduler
+
+        Returns:
+            Dict com jobs, outfits, batches, errors, cancelled, queue_depth atual e máximo,
+            médias de jobs/outfits por forward, espera média na fila (ms) e
+            batch_size_histogram {limite superior de outfits: forwards}
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["batch_size_histogram"] = dict(self._stats["batch_size_histogram"])
+        batches = stats["batches"] or 1
+        stats["avg_jobs_per_batch"] = stats["jobs"] / batches
+        stats["avg_outfits_per_batch"] = stats["outfits"] / batches
+        stats["avg_queue_wait_ms"] = stats.pop("queue_wait_seconds") * 1000 / (stats["jobs"] or 1)
+        return stats
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Processa os jobs pendentes e encerra a thread de inferência"""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
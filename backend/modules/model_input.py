@@ -77,6 +77,58 @@ class ModelInputBuilder:
         
         return embeddings, mask, num_items
     
+    def build_stacked_inputs(
+        self,
+        new_piece_embedding: np.ndarray,
+        outfits_dict: Dict[str, List[Dict]]
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Constrói inputs em batch já empilhados para o modelo
+        
+        Aloca um único array (B, max_items, embedding_dim) e o preenche em uma
+        passada, sem arrays intermediários por peça ou por outfit. Cada outfit
+        segue o layout de build_input: peças do outfit, nova peça e padding.
+        
+        Args:
+            new_piece_embedding: Embedding (96,) da nova peça
+            outfits_dict: Dicionário {outfit_id: [pieces]}
+            
+        Returns:
+            Tuple contendo:
+                - embeddings: Array (B, max_items, 96) float32 com padding
+                - masks: Array (B, max_items) boolean indicando peças válidas
+                - outfit_ids: Lista de outfit_ids na ordem das linhas
+                
+        Raises:
+            ValueError: Se algum outfit exceder max_items
+        """
+        # Pula outfits vazios (todas as peças foram similares e removidas)
+        outfit_ids = [outfit_id for outfit_id, pieces in outfits_dict.items() if pieces]
+        num_items = np.empty(len(outfit_ids), dtype=np.int64)
+        
+        # Validação estrita de máximo de itens antes de alocar - não trunca, lança erro
+        for b, outfit_id in enumerate(outfit_ids):
+            num_items[b] = len(outfits_dict[outfit_id]) + 1
+            if num_items[b] > self.max_items:
+                raise ValueError(
+                    f"Erro ao processar outfit '{outfit_id}': "
+                    f"Número de peças ({num_items[b]}) excede o máximo permitido ({self.max_items}). "
+                    f"Outfit original tem {num_items[b] - 1} peças + 1 nova peça."
+                )
+        
+        # Padding com zeros e máscara (consistente com models/dataset.py linhas 109-114)
+        embeddings = np.zeros((len(outfit_ids), self.max_items, self.embedding_dim), dtype=np.float32)
+        masks = np.arange(self.max_items) < num_items[:, None]
+        
+        for b, outfit_id in enumerate(outfit_ids):
+            for k, piece in enumerate(outfits_dict[outfit_id]):
+                embeddings[b, k] = piece['embedding']
+        
+        # Nova peça na última posição válida de cada outfit
+        embeddings[np.arange(len(outfit_ids)), num_items - 1] = np.asarray(new_piece_embedding, dtype=np.float32)
+        
+        return embeddings, masks, outfit_ids
+    
     def build_batch_inputs(
         self,
         new_piece_embedding: np.ndarray,
@@ -90,31 +142,17 @@ class ModelInputBuilder:
             outfits_dict: Dicionário {outfit_id: [pieces]}
             
         Returns:
-            Dict {outfit_id: (embeddings, mask, num_items)}
+            Dict {outfit_id: (embeddings, mask, num_items)} (views de build_stacked_inputs)
             
         Raises:
             ValueError: Se algum outfit exceder max_items
         """
-        batch_inputs = {}
-        
-        for outfit_id, pieces in outfits_dict.items():
-            # Pula outfits vazios (todas as peças foram similares e removidas)
-            if not pieces:
-                continue
-            
-            try:
-                embeddings, mask, num_items = self.build_input(
-                    new_piece_embedding,
-                    pieces
-                )
-                
-                batch_inputs[outfit_id] = (embeddings, mask, num_items)
-                
-            except ValueError as e:
-                # Re-lança erro com contexto do outfit
-                raise ValueError(f"Erro ao processar outfit '{outfit_id}': {str(e)}")
+        embeddings, masks, outfit_ids = self.build_stacked_inputs(new_piece_embedding, outfits_dict)
         
-        return batch_inputs
+        return {
+            outfit_id: (embeddings[b], masks[b], int(masks[b].sum()))
+            for b, outfit_id in enumerate(outfit_ids)
+        }
 
 
 def generate_description_from_features(outfit_features: Dict[str, Dict]) -> str:
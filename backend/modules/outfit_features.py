@@ -0,0 +1,190 @@
+"""
+Índice das features dos outfits filtrados (filtered_outfits)
+
+Cada outfit filtrado é um JSON {piece_name: {category, item_type, ...}}.
+Em vez de abrir FILTERED_DIR/<outfit_id>.json a cada requisição, todas as
+peças são gravadas offline em um único arquivo SQLite (chave
+outfit_id/piece_name), carregado uma vez em memória na inicialização.
+
+Outfits ausentes do índice (ex: filtrados após o build) são lidos do JSON
+original e mantidos em memória, então o índice é opcional.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .config import FILTERED_DIR, OUTFIT_FEATURES_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE pieces (
+    outfit_id TEXT NOT NULL,
+    piece_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    features TEXT NOT NULL,
+    PRIMARY KEY (outfit_id, piece_name)
+) WITHOUT ROWID
+"""
+
+
+class OutfitFeaturesIndex:
+    """
+    Lookup outfit_id -> {piece_name: features} sem I/O por requisição
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        filtered_dir: Optional[Union[str, Path]] = None
+    ):
+        """
+        Carrega o índice (se existir)
+
+        Args:
+            path: Arquivo SQLite do índice (default: OUTFIT_FEATURES_INDEX_PATH)
+            filtered_dir: Diretório dos JSONs usados como fallback (default: FILTERED_DIR)
+        """
+        self.path = Path(path) if path is not None else Path(OUTFIT_FEATURES_INDEX_PATH)
+        self.filtered_dir = Path(filtered_dir) if filtered_dir is not None else Path(FILTERED_DIR)
+
+        # Features mantidas como JSON compacto por peça (parse sob demanda, ~KB por outfit)
+        self._outfits: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._outfits)
+
+    def __contains__(self, outfit_id: str) -> bool:
+        return outfit_id in self._outfits
+
+    def _load(self) -> None:
+        """Lê o arquivo SQLite inteiro para memória"""
+        if not self.path.exists():
+            logger.warning(f"Índice de features não encontrado ({self.path}): usando JSONs de {self.filtered_dir}")
+            return
+
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(
+                "SELECT outfit_id, piece_name, features FROM pieces ORDER BY outfit_id, position"
+            )
+            for outfit_id, piece_name, features in rows:
+                self._outfits.setdefault(outfit_id, {})[piece_name] = features
+        finally:
+            connection.close()
+        logger.info(f"Índice de features carregado: {len(self._outfits)} outfits")
+
+    def _load_from_json(self, outfit_id: str) -> Optional[Dict[str, str]]:
+        """Fallback: lê FILTERED_DIR/<outfit_id>.json e guarda no índice em memória"""
+        outfit_file = self.filtered_dir / f"{outfit_id}.json"
+        if not outfit_file.exists():
+            return None
+        with open(outfit_file, "r", encoding="utf-8") as f:
+            outfit_data = json.load(f)
+        pieces = {
+            piece_name: json.dumps(features, ensure_ascii=False, separators=(",", ":"))
+            for piece_name, features in outfit_data.items()
+        }
+        with self._lock:
+            self._outfits[outfit_id] = pieces
+        return pieces
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get_outfit(self, outfit_id: str) -> Optional[Dict[str, Dict]]:
+        """
+        Features de todas as peças de um outfit
+
+        Args:
+            outfit_id: ID do outfit (ex: '100002074')
+
+        Returns:
+            Dict {piece_name: features} (cópia, na ordem do JSON original)
+            ou None se o outfit não existir
+        """
+        pieces = self._outfits.get(outfit_id)
+        if pieces is None:
+            pieces = self._load_from_json(outfit_id)
+            if pieces is None:
+                return None
+        return {piece_name: json.loads(features) for piece_name, features in pieces.items()}
+
+    def get_piece(self, outfit_id: str, piece_name: str) -> Optional[Dict]:
+        """Features de uma peça ("outfit_id/piece_name") ou None"""
+        pieces = self._outfits.get(outfit_id)
+        if pieces is None:
+            pieces = self._load_from_json(outfit_id)
+        if pieces is None or piece_name not in pieces:
+            return None
+        return json.loads(pieces[piece_name])
+
+    def get_outfits(self, outfit_ids: Iterable[str]) -> Dict[str, Dict[str, Dict]]:
+        """Features de vários outfits (outfits inexistentes são omitidos)"""
+        result = {}
+        for outfit_id in outfit_ids:
+            outfit = self.get_outfit(outfit_id)
+            if outfit is not None:
+                result[outfit_id] = outfit
+        return result
+
+    # ------------------------------------------------------------------
+    # Build offline
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build(
+        filtered_dir: Optional[Union[str, Path]] = None,
+        path: Optional[Union[str, Path]] = None
+    ) -> int:
+        """
+        Gera o arquivo SQLite a partir de todos os JSONs de filtered_outfits
+
+        O arquivo é escrito em um temporário e substituído atomicamente, então
+        instâncias em execução nunca leem um índice parcial.
+
+        Args:
+            filtered_dir: Diretório dos JSONs (default: FILTERED_DIR)
+            path: Arquivo SQLite de saída (default: OUTFIT_FEATURES_INDEX_PATH)
+
+        Returns:
+            Número de outfits indexados
+        """
+        filtered_dir = Path(filtered_dir) if filtered_dir is not None else Path(FILTERED_DIR)
+        path = Path(path) if path is not None else Path(OUTFIT_FEATURES_INDEX_PATH)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        num_outfits = 0
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute(SCHEMA)
+            for file_path in sorted(filtered_dir.glob("*.json")):
+                try:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        outfit_data = json.load(f)
+                except Exception as e:
+                    logger.error(f"Erro ao ler {file_path.name}: {e}")
+                    continue
+
+                rows: List[tuple] = [
+                    (file_path.stem, piece_name, position,
+                     json.dumps(features, ensure_ascii=False, separators=(",", ":")))
+                    for position, (piece_name, features) in enumerate(outfit_data.items())
+                ]
+                connection.executemany("INSERT INTO pieces VALUES (?, ?, ?, ?)", rows)
+                num_outfits += 1
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(tmp_path, path)
+        return num_outfits
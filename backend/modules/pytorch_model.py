@@ -5,12 +5,24 @@ Contém a arquitetura MCN (Multi-Correlation Network) e funções de predição
 para inferência em produção.
 """
 
+import hashlib
+import json
+import logging
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Número de peças projetadas por forward ao construir o cache de projeções
+PROJECTION_BATCH_SIZE = 4096
+
+# Outfits por forward em predict_arrays/predict_batch (mesmo default do batch agrupado
+# do InferenceScheduler, para que o forward agrupado não seja dividido de novo)
+PREDICT_BATCH_SIZE = 256
 
 
 class OutfitCompatibilityModel(nn.Module):
@@ -47,6 +59,14 @@ class OutfitCompatibilityModel(nn.Module):
         # For 5 items: 5*6/2 = 15 pairs (including self-comparisons)
         self.num_pairs = (max_items * (max_items + 1)) // 2
 
+        # Upper triangular (i, j) index pairs, including diagonal, in row-major order
+        # (pair_idx order matches the learnable masks). Non-persistent buffers so
+        # existing checkpoints load unchanged.
+        pair_i, pair_j = torch.triu_indices(max_items, max_items)
+        self.register_buffer('pair_i', pair_i, persistent=False)
+        self.register_buffer('pair_j', pair_j, persistent=False)
+        self.register_buffer('pair_ids', torch.arange(self.num_pairs), persistent=False)
+
         # 1. Feature Projection Layer
         # Projects embeddings from 96-D to 1000-D
         self.feature_proj = nn.Sequential(
@@ -92,6 +112,24 @@ class OutfitCompatibilityModel(nn.Module):
                 if module.bias is not None:
                     nn.init.constant_(module.bias, 0)
 
+    def project(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """
+        Projects item embeddings to the relation space (feature_proj)
+        
+        In eval mode the projection of each item depends only on that item,
+        so it can be precomputed per piece (see ModelPredictor projection cache).
+        
+        Args:
+            embeddings: (..., embed_input_size) - item embeddings
+            
+        Returns:
+            features: (..., embed_proj_size) - projected features
+        """
+        # Reshape to apply batch norm correctly
+        flat_embeddings = embeddings.reshape(-1, self.embed_input_size)  # (N, 96)
+        projected = self.feature_proj(flat_embeddings)  # (N, 1000)
+        return projected.reshape(*embeddings.shape[:-1], self.embed_proj_size)
+
     def forward(
         self,
         embeddings: torch.Tensor,
@@ -107,46 +145,54 @@ class OutfitCompatibilityModel(nn.Module):
         Returns:
             compatibility_scores: (batch_size,) - compatibility scores in [0, 1]
         """
-        batch_size = embeddings.shape[0]
-
         # 1. Project features to higher dimension
-        # Reshape to apply batch norm correctly
-        flat_embeddings = embeddings.reshape(-1, self.embed_input_size)  # (B*max_items, 96)
-        projected = self.feature_proj(flat_embeddings)  # (B*max_items, 1000)
-        features = projected.reshape(batch_size, self.max_items, self.embed_proj_size)
-
-        # 2. Compute pairwise comparisons with learnable masks
-        relations = []
-        mask_weights = F.relu(self.masks.weight)  # (num_pairs, 1000) - ensure positive
-
-        pair_idx = 0
-        for i in range(self.max_items):
-            for j in range(i, self.max_items):  # Upper triangular including diagonal
-                # Check if both items are valid (not padding)
-                pair_valid = mask[:, i] & mask[:, j]  # (batch_size,)
-
-                # Apply learnable mask and normalize
-                left = F.normalize(
-                    mask_weights[pair_idx] * features[:, i],
-                    dim=-1
-                )  # (batch_size, 1000)
+        features = self.project(embeddings)  # (batch_size, max_items, 1000)
 
-                right = F.normalize(
-                    mask_weights[pair_idx] * features[:, j],
-                    dim=-1
-                )  # (batch_size, 1000)
+        return self.forward_projected(features, mask)
 
-                # Compute similarity (dot product)
-                relation = (left * right).sum(dim=-1)  # (batch_size,)
-
-                # Zero out invalid pairs
-                relation = relation * pair_valid.float()
-
-                relations.append(relation)
-                pair_idx += 1
-
-        # Stack all pairwise relations
-        relations = torch.stack(relations, dim=1)  # (batch_size, num_pairs)
+    def forward_projected(
+        self,
+        features: torch.Tensor,
+        mask: torch.Tensor
+    ) -> torch.Tensor:
+        """
+        Forward pass starting from already projected features
+        
+        Args:
+            features: (batch_size, max_items, embed_proj_size) - output of project()
+            mask: (batch_size, max_items) - boolean mask for valid items
+            
+        Returns:
+            compatibility_scores: (batch_size,) - compatibility scores in [0, 1]
+        """
+        # 2. Compute pairwise comparisons with learnable masks (all pairs at once)
+        # relation_p = <normalize(m_p * f_i), normalize(m_p * f_j)>
+        #            = sum(m_p^2 * f_i * f_j) / (||m_p * f_i|| * ||m_p * f_j||)
+        mask_weights = F.relu(self.masks.weight)  # (num_pairs, 1000) - ensure positive
+        mask_sq = mask_weights * mask_weights  # (num_pairs, 1000)
+
+        # Check if both items of each pair are valid (not padding)
+        pair_valid = mask[:, self.pair_i] & mask[:, self.pair_j]  # (batch_size, num_pairs)
+
+        # Masked norms of every item under every pair mask, clamped like F.normalize
+        # (clamp before sqrt: an all-zero row would otherwise get a 0 * inf = NaN gradient)
+        norms = torch.matmul(features * features, mask_sq.t()).clamp_min(1e-24).sqrt()  # (batch_size, max_items, num_pairs)
+        left_norms = norms[:, self.pair_i, self.pair_ids]  # (batch_size, num_pairs)
+        right_norms = norms[:, self.pair_j, self.pair_ids]  # (batch_size, num_pairs)
+
+        # Compute similarities (masked dot product) for every pair in one einsum
+        # Item-major layout makes the pair gathers contiguous block copies
+        item_features = features.transpose(0, 1).contiguous()  # (max_items, batch_size, 1000)
+        relations = torch.einsum(
+            'pbd,pbd,pd->pb',
+            item_features[self.pair_i],
+            item_features[self.pair_j],
+            mask_sq
+        ).t()  # (batch_size, num_pairs)
+        relations = relations / (left_norms * right_norms)
+
+        # Zero out invalid pairs
+        relations = relations * pair_valid.float()
 
         # 3. Normalize relations
         relations = self.bn_relations(relations)
@@ -194,7 +240,8 @@ class ModelPredictor:
         self,
         checkpoint_path: str,
         device: Optional[str] = None,
-        config: Optional[Dict] = None
+        config: Optional[Dict] = None,
+        max_batch_size: int = PREDICT_BATCH_SIZE
     ):
         """
         Inicializa o preditor do modelo
@@ -203,6 +250,7 @@ class ModelPredictor:
             checkpoint_path: Caminho relativo ao checkpoint do modelo (.pth)
             device: Device para predição ('cpu' ou 'cuda'). Se None, detecta automaticamente
             config: Configuração do modelo (se None, usa defaults)
+            max_batch_size: Máximo de outfits por forward pass em predict_batch
         """
         # Path relativo a partir do módulo backend
         module_dir = Path(__file__).parent
@@ -225,8 +273,17 @@ class ModelPredictor:
             'dropout': 0.3
         }
         
+        self.max_batch_size = max_batch_size
+        
         # Carrega o modelo
         self.model = self._load_model()
+        self.checkpoint_hash = self._compute_checkpoint_hash()
+        
+        # Cache de projeções feature_proj por peça do catálogo (ver build_projection_cache)
+        self._projection_ids: Optional[np.ndarray] = None
+        self._projections: Optional[np.ndarray] = None
+        self._projection_row_by_id: Dict[str, int] = {}
+        self._padding_projection: Optional[np.ndarray] = None
         
     def _load_model(self) -> nn.Module:
         """
@@ -258,6 +315,212 @@ class ModelPredictor:
         
         return model
     
+    def _compute_checkpoint_hash(self) -> str:
+        """SHA-256 do arquivo de checkpoint (identifica os pesos carregados)"""
+        digest = hashlib.sha256()
+        with open(self.checkpoint_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    # ------------------------------------------------------------------
+    # Cache de projeções (serving sem feature_proj para peças do catálogo)
+    # ------------------------------------------------------------------
+    
+    @property
+    def has_projection_cache(self) -> bool:
+        """Indica se o cache de projeções do catálogo está carregado"""
+        return self._projections is not None
+    
+    def project_embeddings(
+        self,
+        embeddings: np.ndarray,
+        batch_size: int = PROJECTION_BATCH_SIZE
+    ) -> np.ndarray:
+        """
+        Aplica feature_proj (modo de avaliação) a um conjunto de peças
+        
+        Args:
+            embeddings: Array (N, 96) com embeddings das peças
+            batch_size: Número de peças por forward
+            
+        Returns:
+            Array (N, embed_proj_size) float32 com as features projetadas
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.model.embed_input_size)
+        projections = np.empty((embeddings.shape[0], self.model.embed_proj_size), dtype=np.float32)
+        
+        with torch.no_grad():
+            for start in range(0, embeddings.shape[0], batch_size):
+                end = min(start + batch_size, embeddings.shape[0])
+                chunk = torch.from_numpy(np.ascontiguousarray(embeddings[start:end])).to(self.device)
+                projections[start:end] = self.model.project(chunk).cpu().numpy()
+        
+        return projections
+    
+    def _set_projection_cache(self, ids: np.ndarray, projections: np.ndarray) -> None:
+        """Ativa o cache de projeções (ids na mesma ordem das linhas)"""
+        if len(ids) != projections.shape[0]:
+            raise ValueError(
+                f"Número de IDs ({len(ids)}) difere do número de projeções ({projections.shape[0]})"
+            )
+        self._projection_ids = ids
+        self._projections = projections
+        self._projection_row_by_id = {piece_id: row for row, piece_id in enumerate(ids.tolist())}
+        # Slots de padding recebem a projeção do vetor nulo, como no forward completo
+        self._padding_projection = self.project_embeddings(
+            np.zeros((1, self.model.embed_input_size), dtype=np.float32)
+        )[0]
+    
+    def build_projection_cache(
+        self,
+        ids: Union[List[str], np.ndarray],
+        embeddings: np.ndarray,
+        batch_size: int = PROJECTION_BATCH_SIZE
+    ) -> int:
+        """
+        Pré-computa a projeção 1000-d de todas as peças do catálogo
+        
+        Em modo de avaliação a saída de feature_proj depende apenas da peça,
+        então as peças do catálogo são projetadas uma única vez e, por
+        requisição, apenas a nova peça passa por feature_proj.
+        
+        Args:
+            ids: IDs das peças ("outfit_id/piece_name"), na ordem de embeddings
+            embeddings: Array (N, 96) com embeddings das peças
+            batch_size: Número de peças por forward
+            
+        Returns:
+            Número de peças no cache
+        """
+        projections = self.project_embeddings(embeddings, batch_size)
+        self._set_projection_cache(np.asarray(ids, dtype=str), projections)
+        logger.info(f"Cache de projeções construído: {len(ids)} peças")
+        return len(ids)
+    
+    @staticmethod
+    def _projection_cache_paths(cache_dir: Path) -> Tuple[Path, Path, Path]:
+        """Caminhos do cache: matriz .npy (memory-mappable), ids .npy e metadados .json"""
+        return cache_dir / "projections.npy", cache_dir / "projection_ids.npy", cache_dir / "projection_meta.json"
+    
+    def save_projection_cache(
+        self,
+        cache_dir: Union[str, Path],
+        catalogue_fingerprint: Optional[str] = None
+    ) -> None:
+        """
+        Salva o cache de projeções em disco
+        
+        Args:
+            cache_dir: Diretório do cache
+            catalogue_fingerprint: Fingerprint do catálogo projetado (VectorDB.fingerprint)
+        """
+        if not self.has_projection_cache:
+            raise RuntimeError("Cache de projeções não foi construído")
+        
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        projections_path, ids_path, meta_path = self._projection_cache_paths(cache_dir)
+        np.save(projections_path, self._projections)
+        np.save(ids_path, self._projection_ids)
+        with open(meta_path, "w") as f:
+            json.dump({
+                'checkpoint_hash': self.checkpoint_hash,
+                'catalogue_fingerprint': catalogue_fingerprint,
+                'num_pieces': int(self._projections.shape[0]),
+                'embed_proj_size': int(self._projections.shape[1])
+            }, f)
+    
+    def load_projection_cache(
+        self,
+        cache_dir: Union[str, Path],
+        mmap: bool = True,
+        expected_count: Optional[int] = None,
+        catalogue_fingerprint: Optional[str] = None
+    ) -> bool:
+        """
+        Carrega um cache salvo por save_projection_cache()
+        
+        O cache é rejeitado se foi gerado com outro checkpoint, com outro
+        fingerprint do catálogo (qualquer escrita na coleção) ou se o número
+        de peças difere de expected_count.
+        
+        Args:
+            cache_dir: Diretório do cache
+            mmap: Se True, a matriz de projeções é memory-mapped (somente leitura)
+            expected_count: Número de peças esperado no catálogo (opcional)
+            catalogue_fingerprint: Fingerprint atual do catálogo (opcional)
+            
+        Returns:
+            True se o cache foi carregado, False se ausente ou desatualizado
+        """
+        projections_path, ids_path, meta_path = self._projection_cache_paths(Path(cache_dir))
+        if not (projections_path.exists() and ids_path.exists() and meta_path.exists()):
+            return False
+        
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get('checkpoint_hash') != self.checkpoint_hash:
+            logger.warning("Cache de projeções gerado com outro checkpoint: ignorado")
+            return False
+        if catalogue_fingerprint is not None and meta.get('catalogue_fingerprint') != catalogue_fingerprint:
+            logger.warning("Cache de projeções gerado com outra versão do catálogo: ignorado")
+            return False
+        if expected_count is not None and meta.get('num_pieces') != expected_count:
+            logger.warning(
+                f"Cache de projeções com {meta.get('num_pieces')} peças, catálogo tem {expected_count}: ignorado"
+            )
+            return False
+        
+        projections = np.load(projections_path, mmap_mode='r' if mmap else None)
+        self._set_projection_cache(np.load(ids_path), projections)
+        logger.info(f"Cache de projeções carregado: {projections.shape[0]} peças")
+        return True
+    
+    def enable_projection_cache(
+        self,
+        cache_dir: Union[str, Path],
+        load_catalogue: Callable[[], Tuple[np.ndarray, np.ndarray]],
+        expected_count: Optional[int] = None,
+        mmap: bool = True,
+        catalogue_fingerprint: Optional[str] = None
+    ) -> int:
+        """
+        Carrega o cache de projeções do disco ou o reconstrói a partir do catálogo
+        
+        Args:
+            cache_dir: Diretório do cache
+            load_catalogue: Função que retorna (ids, embeddings (N, 96)) do catálogo
+            expected_count: Número de peças esperado no catálogo (opcional)
+            mmap: Se True, a matriz de projeções é memory-mapped
+            catalogue_fingerprint: Fingerprint do catálogo, lido antes de load_catalogue (opcional)
+            
+        Returns:
+            Número de peças no cache
+        """
+        if not self.load_projection_cache(
+            cache_dir, mmap=mmap, expected_count=expected_count, catalogue_fingerprint=catalogue_fingerprint
+        ):
+            ids, embeddings = load_catalogue()
+            self.build_projection_cache(ids, embeddings)
+            self.save_projection_cache(cache_dir, catalogue_fingerprint=catalogue_fingerprint)
+            if mmap:
+                self.load_projection_cache(cache_dir, mmap=True)
+        return self._projections.shape[0]
+    
+    @classmethod
+    def delete_projection_cache(cls, cache_dir: Union[str, Path]) -> None:
+        """Remove os arquivos do cache de projeções (ex: após escrita no catálogo)"""
+        for path in cls._projection_cache_paths(Path(cache_dir)):
+            path.unlink(missing_ok=True)
+    
+    def clear_projection_cache(self) -> None:
+        """Descarta o cache de projeções (ex: após reindexar o catálogo)"""
+        self._projection_ids = None
+        self._projections = None
+        self._projection_row_by_id = {}
+        self._padding_projection = None
+    
     def predict_single(
         self,
         embeddings: np.ndarray,
@@ -286,27 +549,210 @@ class ModelPredictor:
         
         return score
     
+    def predict_arrays(
+        self,
+        embeddings: np.ndarray,
+        masks: np.ndarray,
+        max_batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Executa predição para um batch já empilhado de outfits
+        
+        Em modo de avaliação (BatchNorm com estatísticas fixas, sem dropout) o
+        score de cada outfit independe dos demais itens do batch.
+        
+        Args:
+            embeddings: Array (B, max_items, 96) float32
+            masks: Array (B, max_items) boolean
+            max_batch_size: Máximo de outfits por forward (default: self.max_batch_size)
+            
+        Returns:
+            Array (B,) com scores de compatibilidade entre 0 e 1
+        """
+        chunk_size = max_batch_size or self.max_batch_size
+        num_outfits = embeddings.shape[0]
+        scores = np.empty(num_outfits, dtype=np.float32)
+        
+        embeddings_tensor = torch.from_numpy(np.ascontiguousarray(embeddings, dtype=np.float32))
+        masks_tensor = torch.from_numpy(np.ascontiguousarray(masks, dtype=bool))
+        
+        with torch.no_grad():
+            for start in range(0, num_outfits, chunk_size):
+                end = min(start + chunk_size, num_outfits)
+                output = self.model(
+                    embeddings_tensor[start:end].to(self.device),
+                    masks_tensor[start:end].to(self.device)
+                )
+                scores[start:end] = output.reshape(-1).cpu().numpy()
+        
+        return scores
+    
     def predict_batch(
         self,
-        batch_inputs: Dict[str, Tuple[np.ndarray, np.ndarray, int]]
+        batch_inputs: Dict[str, Tuple[np.ndarray, np.ndarray, int]],
+        max_batch_size: Optional[int] = None
     ) -> Dict[str, float]:
         """
         Executa predição em batch para múltiplos outfits
         
+        Todos os pares (embeddings, mask) são empilhados em um único tensor
+        (B, max_items, 96) e avaliados em um forward pass (ou em chunks de
+        max_batch_size outfits).
+        
         Args:
             batch_inputs: Dict {outfit_id: (embeddings, mask, num_items)}
+            max_batch_size: Máximo de outfits por forward (default: self.max_batch_size)
             
         Returns:
             Dict {outfit_id: compatibility_score}
         """
-        scores = {}
+        if not batch_inputs:
+            return {}
+        
+        outfit_ids = list(batch_inputs.keys())
+        embeddings = np.stack([batch_inputs[outfit_id][0] for outfit_id in outfit_ids])
+        masks = np.stack([batch_inputs[outfit_id][1] for outfit_id in outfit_ids])
         
-        for outfit_id, (embeddings, mask, num_items) in batch_inputs.items():
-            score = self.predict_single(embeddings, mask)
-            scores[outfit_id] = score
+        scores = self.predict_arrays(embeddings, masks, max_batch_size)
+        
+        return dict(zip(outfit_ids, scores.tolist()))
+    
+    def predict_projected_arrays(
+        self,
+        features: np.ndarray,
+        masks: np.ndarray,
+        max_batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Executa predição para um batch de features já projetadas (feature_proj)
+        
+        Args:
+            features: Array (B, max_items, embed_proj_size) float32
+            masks: Array (B, max_items) boolean
+            max_batch_size: Máximo de outfits por forward (default: self.max_batch_size)
+            
+        Returns:
+            Array (B,) com scores de compatibilidade entre 0 e 1
+        """
+        chunk_size = max_batch_size or self.max_batch_size
+        num_outfits = features.shape[0]
+        scores = np.empty(num_outfits, dtype=np.float32)
+        
+        features_tensor = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+        masks_tensor = torch.from_numpy(np.ascontiguousarray(masks, dtype=bool))
+        
+        with torch.no_grad():
+            for start in range(0, num_outfits, chunk_size):
+                end = min(start + chunk_size, num_outfits)
+                output = self.model.forward_projected(
+                    features_tensor[start:end].to(self.device),
+                    masks_tensor[start:end].to(self.device)
+                )
+                scores[start:end] = output.reshape(-1).cpu().numpy()
         
         return scores
     
+    def build_projected_inputs(
+        self,
+        new_piece_embedding: np.ndarray,
+        outfit_piece_ids: Dict[str, List[str]]
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Monta as features projetadas dos outfits a partir do cache de projeções
+        
+        Mesmo layout de ModelInputBuilder.build_stacked_inputs (peças do outfit
+        seguidas da nova peça, padding até max_items), já em espaço projetado.
+        
+        Args:
+            new_piece_embedding: Embedding (96,) da nova peça
+            outfit_piece_ids: Dict {outfit_id: [piece_ids]} com peças do catálogo
+            
+        Returns:
+            Tuple (features (B, max_items, embed_proj_size), masks (B, max_items), outfit_ids)
+            
+        Raises:
+            RuntimeError: Se o cache de projeções não estiver carregado
+            KeyError: Se alguma peça não estiver no cache
+            ValueError: Se algum outfit exceder max_items
+        """
+        # Referências locais: clear_projection_cache() pode rodar durante a montagem
+        projections, row_by_id, padding_projection = (
+            self._projections, self._projection_row_by_id, self._padding_projection
+        )
+        if projections is None or padding_projection is None:
+            raise RuntimeError("Cache de projeções não foi construído")
+        
+        max_items = self.model.max_items
+        
+        # Pula outfits vazios (todas as peças foram similares e removidas)
+        outfit_ids = [outfit_id for outfit_id, piece_ids in outfit_piece_ids.items() if piece_ids]
+        num_outfits = len(outfit_ids)
+        
+        # Posições (achatadas em B*max_items) das peças do catálogo e da nova peça
+        masks = np.zeros((num_outfits, max_items), dtype=bool)
+        cached_rows: List[int] = []
+        cached_slots: List[int] = []
+        new_piece_slots: List[int] = []
+        
+        for b, outfit_id in enumerate(outfit_ids):
+            piece_ids = outfit_piece_ids[outfit_id]
+            num_items = len(piece_ids) + 1
+            if num_items > max_items:
+                raise ValueError(
+                    f"Erro ao processar outfit '{outfit_id}': Número de peças ({num_items}) excede "
+                    f"o máximo permitido ({max_items}). Outfit original tem {len(piece_ids)} peças + 1 nova peça."
+                )
+            for k, piece_id in enumerate(piece_ids):
+                row = row_by_id.get(piece_id)
+                if row is None:
+                    raise KeyError(f"Peça '{piece_id}' ausente do cache de projeções")
+                cached_rows.append(row)
+                cached_slots.append(b * max_items + k)
+            new_piece_slots.append(b * max_items + len(piece_ids))
+            masks[b, :num_items] = True
+        
+        features = np.empty((num_outfits * max_items, self.model.embed_proj_size), dtype=np.float32)
+        if num_outfits:
+            features[:] = padding_projection
+            features[cached_slots] = projections[cached_rows]
+            features[new_piece_slots] = self.project_embeddings(new_piece_embedding)[0]
+        
+        return features.reshape(num_outfits, max_items, -1), masks, outfit_ids
+    
+    def predict_with_projection_cache(
+        self,
+        new_piece_embedding: np.ndarray,
+        outfit_piece_ids: Dict[str, List[str]],
+        max_batch_size: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Executa predição em batch usando as projeções pré-computadas do catálogo
+        
+        Equivale a ModelInputBuilder.build_batch_inputs + predict_batch (peças
+        do outfit seguidas da nova peça, padding até max_items), mas apenas a
+        nova peça passa por feature_proj.
+        
+        Args:
+            new_piece_embedding: Embedding (96,) da nova peça
+            outfit_piece_ids: Dict {outfit_id: [piece_ids]} com peças do catálogo
+            max_batch_size: Máximo de outfits por forward (default: self.max_batch_size)
+            
+        Returns:
+            Dict {outfit_id: compatibility_score}
+            
+        Raises:
+            RuntimeError: Se o cache de projeções não estiver carregado
+            KeyError: Se alguma peça não estiver no cache
+            ValueError: Se algum outfit exceder max_items
+        """
+        features, masks, outfit_ids = self.build_projected_inputs(new_piece_embedding, outfit_piece_ids)
+        if not outfit_ids:
+            return {}
+        
+        scores = self.predict_projected_arrays(features, masks, max_batch_size)
+        
+        return dict(zip(outfit_ids, scores.tolist()))
+    
     def get_top_k_outfits(
         self,
         scores: Dict[str, float],
@@ -0,0 +1,161 @@
+"""
+Cache de resultados com LRU em memória e segundo nível opcional em SQLite
+
+Usado para resultados de funções puras caras (ex: sugestões de outfit, que
+dependem apenas do embedding da peça, do catálogo e do checkpoint). Os
+valores precisam ser serializáveis em JSON.
+
+Níveis:
+1. LRU em memória (max_items entradas)
+2. SQLite em disco (opcional), compartilhado entre processos e reinícios;
+   hits no disco são promovidos para a memória
+
+Entradas expiram após ttl_seconds (0 = sem expiração).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class ResultCache:
+    """
+    Cache chave -> valor JSON com LRU, TTL e contadores de hit/miss
+    """
+
+    def __init__(
+        self,
+        max_items: int = 10000,
+        ttl_seconds: float = 0,
+        sqlite_path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Inicializa o cache
+
+        Args:
+            max_items: Máximo de entradas na LRU em memória (0 desativa a memória)
+            ttl_seconds: Validade das entradas em segundos (0 = sem expiração)
+            sqlite_path: Arquivo SQLite do segundo nível (None = apenas memória)
+        """
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "sets": 0, "evictions": 0}
+
+        self.sqlite_path = Path(sqlite_path) if sqlite_path is not None else None
+        self._connection: Optional[sqlite3.Connection] = None
+        if self.sqlite_path is not None:
+            self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(SCHEMA)
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        """Insere na LRU em memória (chamado com o lock)"""
+        if self.max_items <= 0:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Busca um valor (memória -> disco)
+
+        Args:
+            key: Chave do resultado
+
+        Returns:
+            Valor armazenado ou None (ausente ou expirado)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._memory[key]
+                self.stats["expired"] += 1
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self.stats["hits"] += 1
+                        self.stats["disk_hits"] += 1
+                        return value
+                    self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._connection.commit()
+                    self.stats["expired"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Armazena um valor (memória e disco)
+
+        Args:
+            key: Chave do resultado
+            value: Valor serializável em JSON
+        """
+        expires_at = self._expires_at()
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, separators=(",", ":")), expires_at)
+                )
+                self._connection.commit()
+            self.stats["sets"] += 1
+
+    def clear(self) -> None:
+        """Remove todas as entradas (memória e disco)"""
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM results")
+                self._connection.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de hit/miss, tamanho da LRU e hit rate"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
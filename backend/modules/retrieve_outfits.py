@@ -14,24 +14,27 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import json
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 from modules.config import BASE_DIR
+from modules.outfit_features import OutfitFeaturesIndex
 
 
 class OutfitRetriever:
     """Classe para recuperar outfits de treino e teste"""
 
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, features_index: Optional[OutfitFeaturesIndex] = None):
         """
         Inicializa o recuperador de outfits
 
         Args:
             data_path: Caminho para data/processed/ (padrão: BASE_DIR/data/processed)
+            features_index: Índice de features dos outfits filtrados (padrão: carrega o índice default)
         """
         if data_path is None:
             data_path = BASE_DIR / "data" / "processed"
         self.data_path = Path(data_path)
+        self.features_index = features_index or OutfitFeaturesIndex()
 
         # Carrega metadata
         metadata_path = self.data_path / 'metadata.json'
@@ -98,7 +101,7 @@ class OutfitRetriever:
 
     def load_outfit_details(self, outfit_id: str) -> Dict:
         """
-        Carrega detalhes de um outfit do filtered_outfits
+        Carrega detalhes de um outfit do filtered_outfits (via índice de features)
 
         Args:
             outfit_id: ID do outfit (ex: '100002074')
@@ -106,14 +109,10 @@ class OutfitRetriever:
         Returns:
             Dict com detalhes do outfit
         """
-        from modules.config import FILTERED_DIR
-
-        outfit_file = FILTERED_DIR / f"{outfit_id}.json"
-        if not outfit_file.exists():
-            raise FileNotFoundError(f"Arquivo de outfit não encontrado: {outfit_file}")
-
-        with open(outfit_file, 'r') as f:
-            return json.load(f)
+        details = self.features_index.get_outfit(outfit_id)
+        if details is None:
+            raise FileNotFoundError(f"Outfit não encontrado no índice de features: {outfit_id}")
+        return details
 
     def retrieve_sample_outfits(self, num_train: int = 5, num_test: int = 5) -> Dict[str, List[Dict]]:
         """
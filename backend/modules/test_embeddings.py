@@ -0,0 +1,73 @@
+"""
+Script de teste para validar os hash embeddings memorizados e em batch (embeddings.py)
+
+Execute: python backend/modules/test_embeddings.py
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.config import ATTRIBUTES, ATTR_DIM
+from modules.embeddings import EmbeddingGenerator
+
+
+def _reference_piece_embedding(piece_data: dict) -> np.ndarray:
+    """Implementação original (MD5 -> seed -> normais por atributo), sem cache"""
+    encodings = []
+    for attr in ATTRIBUTES:
+        text = f"{attr}:{piece_data.get(attr, 'UNK')}"
+        seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+        vec = np.random.default_rng(seed).standard_normal(ATTR_DIM)
+        encodings.append((vec / np.linalg.norm(vec)).astype(np.float32))
+    return np.concatenate(encodings).astype(np.float32)
+
+
+def test_embeddings_bit_identical():
+    """
+    Testa se embeddings memorizados e a matriz em batch são idênticos bit a bit ao original
+    """
+    print("🧪 Testando hash embeddings (cache + batch)...\n")
+
+    rng = np.random.default_rng(0)
+    values = {
+        "category": ["tops", "bottoms", "shoes", "others"],
+        "item_type": ["t-shirt", "jeans", "sneakers", "camisa social"],
+        "primary_color": ["white", "black", "azul-marinho"],
+        "usage": ["casual", "formal"],
+        "texture": ["cotton", "denim", "couro"],
+        "print_category": ["plain", "striped"],
+    }
+    pieces = []
+    for _ in range(200):
+        piece = {attr: options[rng.integers(len(options))] for attr, options in values.items()}
+        if rng.random() < 0.1:
+            del piece["texture"]  # Atributo ausente vira "UNK"
+        pieces.append(piece)
+
+    generator = EmbeddingGenerator()
+    expected = np.stack([_reference_piece_embedding(piece) for piece in pieces])
+
+    single = np.stack([generator._generate_piece_embedding(piece) for piece in pieces])
+    batch = generator.generate_embeddings(pieces)
+
+    assert batch.shape == (200, 96) and batch.dtype == np.float32
+    assert np.array_equal(single.view(np.uint32), expected.view(np.uint32))
+    assert np.array_equal(batch.view(np.uint32), expected.view(np.uint32))
+
+    # _hash_embedding devolve cópia: alterar o retorno não corrompe o cache
+    vector = generator._hash_embedding("category:tops")
+    vector[:] = 0
+    assert np.array_equal(generator._generate_piece_embedding(pieces[0]), expected[0])
+
+    print("✅ Embeddings idênticos bit a bit à implementação original!")
+
+
+if __name__ == "__main__":
+    test_embeddings_bit_identical()
@@ -0,0 +1,241 @@
+"""
+Script de teste para validar o batching de extrações no Gemini (extraction_batcher.py)
+
+Execute: python backend/modules/test_extraction_batcher.py
+"""
+
+import io
+import json
+import sys
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.extraction_batcher import ExtractionBatcher
+from modules.feature_extractor import FeatureExtractor
+from modules.gemini_client import GeminiResponse, GeminiUsage
+
+_buffer = io.BytesIO()
+Image.new("RGB", (64, 64), (30, 60, 150)).save(_buffer, format="JPEG")
+JPEG = _buffer.getvalue()
+
+
+class FakeBatchClient:
+    """Responde cada imagem pelo nome recebido; acima de max_ok_images devolve JSON inválido"""
+
+    def __init__(self, max_ok_images: int = 100):
+        self.max_ok_images = max_ok_images
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, parts):
+        names = [part.split(": ")[1].split(" ")[0] for part in parts[1::2]]
+        blobs = parts[2::2]
+        with self.lock:
+            self.calls.append(len(names))
+        if len(names) > self.max_ok_images:
+            return GeminiResponse("Desculpe, não consegui", GeminiUsage(100, 10))
+        answer = {name: {"category": "tops", "item_type": blob["tag"]} for name, blob in zip(names, blobs)}
+        return GeminiResponse(f"```json\n{json.dumps(answer, indent=2)}\n```", GeminiUsage(300 * len(names), 50))
+
+
+class BlockedResponse:
+    """Resposta cujo .text lança, como o SDK com candidato bloqueado por segurança"""
+
+    usage_metadata = GeminiUsage(100, 0)
+
+    @property
+    def text(self):
+        raise ValueError("Invalid operation: the response.text quick accessor requires a valid Part")
+
+
+class BlockedClient:
+    def __init__(self, release: threading.Event = None):
+        self.release = release
+
+    def generate_content(self, parts):
+        if self.release is not None:
+            self.release.wait()
+        return BlockedResponse()
+
+
+class GatedClient(FakeBatchClient):
+    """Segura a primeira chamada até release (jobs seguintes se acumulam na fila);
+    falha chamadas com imagens marcadas como poison, como um 400 de imagem ilegível"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate_content(self, parts):
+        self.release.wait(5)
+        if any("poison" in blob["tag"] for blob in parts[2::2]):
+            raise ValueError("400 Unable to process input image")
+        return super().generate_content(parts)
+
+
+def _jobs(count: int):
+    return [
+        [(name, {"mime_type": "image/jpeg", "data": JPEG, "tag": f"job{index}/{name}"}) for name in ("1.jpg", "2.jpg")]
+        for index in range(count)
+    ]
+
+
+def _run_concurrently(batcher: ExtractionBatcher, jobs):
+    results = [None] * len(jobs)
+
+    def worker(index):
+        results[index] = batcher.submit(jobs[index]).result()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(jobs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_batching_and_demultiplexing():
+    """
+    Testa se jobs concorrentes (com nomes de arquivo repetidos) dividem chamadas e
+    recebem de volta apenas as próprias imagens
+    """
+    print("🧪 Testando batching e demultiplexação...\n")
+
+    client = FakeBatchClient()
+    batcher = ExtractionBatcher(FeatureExtractor(client=client), max_images=6, max_wait_ms=50, workers=1)
+    jobs = _jobs(9)
+    results = _run_concurrently(batcher, jobs)
+
+    for index, (features, usage) in enumerate(results):
+        assert set(features) == {"1.jpg", "2.jpg"}, features
+        assert features["1.jpg"]["item_type"] == f"job{index}/1.jpg"
+        assert features["2.jpg"]["item_type"] == f"job{index}/2.jpg"
+        assert usage["prompt_tokens"] == 600 and usage["jobs_in_call"] >= 1
+    assert max(client.calls) <= 6 and len(client.calls) < 9, client.calls
+
+    stats = batcher.stats
+    assert stats["jobs"] == 9 and stats["images"] == 18 and stats["split_retries"] == 0
+    print(f"✅ 9 jobs em {len(client.calls)} chamadas: {client.calls}")
+
+
+def test_split_on_invalid_response():
+    """
+    Testa o fallback para batches menores quando a resposta agrupada é inválida
+    """
+    print("🧪 Testando fallback para batches menores...\n")
+
+    client = FakeBatchClient(max_ok_images=2)
+    batcher = ExtractionBatcher(FeatureExtractor(client=client), max_images=8, max_wait_ms=50, workers=1)
+    jobs = _jobs(6)
+    results = _run_concurrently(batcher, jobs)
+
+    for index, (features, _) in enumerate(results):
+        assert features["1.jpg"]["item_type"] == f"job{index}/1.jpg", features
+    assert batcher.stats["split_retries"] > 0
+    print(f"✅ Chamadas com fallback: {client.calls}")
+
+
+def test_unreadable_response_resolves_futures():
+    """
+    Testa se uma resposta cujo .text lança resolve os futures com a exceção (sem travar)
+    """
+    print("🧪 Testando resposta ilegível...\n")
+
+    batcher = ExtractionBatcher(FeatureExtractor(client=BlockedClient()), max_wait_ms=0, workers=1)
+    for job in _jobs(3):
+        try:
+            batcher.submit(job).result(timeout=3)
+            raise AssertionError("esperava ValueError")
+        except ValueError:
+            pass
+
+    # O slot da chamada foi liberado: o batcher continua atendendo
+    working = ExtractionBatcher(FeatureExtractor(client=FakeBatchClient()), max_wait_ms=0, workers=1)
+    assert working.extract(_jobs(1)[0], timeout=3)["1.jpg"]["item_type"] == "job0/1.jpg"
+    assert batcher.stats["errors"] == 3, batcher.stats
+    print("✅ Futures resolvidos com a exceção")
+
+
+def test_extract_timeout():
+    """
+    Testa se extract() desiste após o timeout quando a chamada não retorna
+    """
+    print("🧪 Testando timeout de extract()...\n")
+
+    release = threading.Event()
+    batcher = ExtractionBatcher(FeatureExtractor(client=BlockedClient(release)), max_wait_ms=0, workers=1, timeout=0.2)
+    try:
+        batcher.extract(_jobs(1)[0])
+        raise AssertionError("esperava TimeoutError")
+    except TimeoutError:
+        pass
+    finally:
+        release.set()
+    print("✅ extract() respeita o timeout")
+
+
+def test_cancelled_job_does_not_fail_batch():
+    """
+    Testa se um job cancelado na fila é descartado sem falhar os demais jobs do batch
+    """
+    print("🧪 Testando job cancelado...\n")
+
+    client = GatedClient()
+    batcher = ExtractionBatcher(FeatureExtractor(client=client), max_images=8, max_wait_ms=0, workers=1)
+    jobs = _jobs(4)
+    blocking = batcher.submit(jobs[0])
+    futures = [batcher.submit(job) for job in jobs[1:]]
+    assert futures[0].cancel()
+    client.release.set()
+
+    assert blocking.result(timeout=5)[0]["1.jpg"]["item_type"] == "job0/1.jpg"
+    for index, future in enumerate(futures[1:], start=2):
+        features, usage = future.result(timeout=5)
+        assert features["2.jpg"]["item_type"] == f"job{index}/2.jpg"
+    stats = batcher.stats
+    assert stats["cancelled"] == 1 and stats["errors"] == 0, stats
+    print(f"✅ Job cancelado descartado; chamadas: {client.calls}")
+
+
+def test_call_error_splits_batch():
+    """
+    Testa se um erro da chamada agrupada (não de cota) é isolado no job que o causa
+    """
+    print("🧪 Testando erro de chamada com fallback...\n")
+
+    client = GatedClient()
+    batcher = ExtractionBatcher(FeatureExtractor(client=client), max_images=8, max_wait_ms=0, workers=1)
+    jobs = _jobs(4)
+    jobs[2][0][1]["tag"] = "poison"
+    blocking = batcher.submit(jobs[0])
+    futures = [batcher.submit(job) for job in jobs[1:]]
+    client.release.set()
+
+    assert blocking.result(timeout=5)[0]["1.jpg"]["item_type"] == "job0/1.jpg"
+    for index, future in enumerate(futures, start=1):
+        if index == 2:
+            try:
+                future.result(timeout=5)
+                raise AssertionError("esperava ValueError")
+            except ValueError:
+                pass
+        else:
+            assert future.result(timeout=5)[0]["1.jpg"]["item_type"] == f"job{index}/1.jpg"
+    stats = batcher.stats
+    assert stats["split_retries"] > 0 and stats["errors"] == 1, stats
+    print(f"✅ Só o job com a imagem ilegível falhou; chamadas: {client.calls}")
+
+
+if __name__ == "__main__":
+    test_batching_and_demultiplexing()
+    test_split_on_invalid_response()
+    test_unreadable_response_resolves_futures()
+    test_extract_timeout()
+    test_cancelled_job_does_not_fail_batch()
+    test_call_error_splits_batch()
@@ -0,0 +1,162 @@
+"""
+Script de teste para validar a extração concorrente com o Gemini (extraction_runner.py)
+
+Sobe um servidor Gemini falso local (generateContent via HTTP) que responde
+429 na primeira chamada de cada pasta e usa o GeminiRestClient plugado no
+FeatureExtractor.
+
+Execute: python backend/modules/test_extraction_runner.py
+"""
+
+import base64
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.extraction_runner import ExtractionRunner, TokenBucket
+from modules.feature_extractor import FeatureExtractor
+from modules.gemini_client import GeminiRestClient
+
+
+class FakeGeminiState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.seen = set()
+
+
+def make_handler(state: FakeGeminiState):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            parts = body["contents"][0]["parts"]
+            filenames = [p["text"].split(": ")[1].split(" ")[0] for p in parts[1:] if "text" in p]
+            images = [p for p in parts if "inline_data" in p]
+            assert len(images) == len(filenames)
+            Image.open(io.BytesIO(base64.b64decode(images[0]["inline_data"]["data"])))
+
+            with state.lock:
+                state.calls += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                first_call = tuple(filenames) not in state.seen
+                state.seen.add(tuple(filenames))
+            try:
+                time.sleep(0.05)
+                if first_call and filenames[0].startswith("q"):
+                    payload, status = {"error": {"code": 429, "message": "Resource has been exhausted"}}, 429
+                else:
+                    answer = {name: {"category": "tops", "item_type": "tshirt"} for name in filenames}
+                    text = f"```json\n{json.dumps(answer, indent=2)}\n```"
+                    payload, status = {
+                        "candidates": [{"content": {"parts": [{"text": text}]}}],
+                        "usageMetadata": {"promptTokenCount": 300, "candidatesTokenCount": 50},
+                    }, 200
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return FakeGeminiHandler
+
+
+def test_token_bucket_rate():
+    """
+    Testa se o TokenBucket limita a taxa após esgotar a rajada
+    """
+    print("🧪 Testando TokenBucket...\n")
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10/s
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire(1)
+    elapsed = time.monotonic() - start
+    assert 0.45 <= elapsed < 1.0, elapsed
+    print(f"✅ 6 aquisições a 10/s em {elapsed:.2f}s")
+
+
+def test_concurrent_extraction_with_fake_server():
+    """
+    Testa concorrência limitada, retry em 429, manifesto e retomada
+    """
+    print("🧪 Testando extração concorrente contra servidor Gemini falso...\n")
+
+    state = FakeGeminiState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            images_dir, responses_dir = root / "images", root / "responses"
+            rng = np.random.default_rng(0)
+            for index in range(12):
+                folder = images_dir / f"{1000 + index}"
+                folder.mkdir(parents=True)
+                prefix = "q" if index % 3 == 0 else "p"
+                for piece in range(2):
+                    pixels = rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+                    Image.fromarray(pixels).save(folder / f"{prefix}{index}_{piece}.jpg")
+            (images_dir / "1999").mkdir()  # Pasta sem imagens
+
+            client = GeminiRestClient("fake-key", "gemini-fake", endpoint=f"http://127.0.0.1:{server.server_port}")
+            extractor = FeatureExtractor(client=client, responses_dir=responses_dir)
+            runner = ExtractionRunner(
+                extractor,
+                concurrency=3,
+                requests_per_minute=6000,
+                tokens_per_minute=0,
+                backoff_base=0.01,
+                manifest_path=root / "manifest.jsonl"
+            )
+            stats = runner.run(sorted(images_dir.iterdir()))
+
+            assert stats["ok"] == 12 and stats["empty"] == 1 and stats["retries"] == 4, stats
+            assert stats["prompt_tokens"] == 12 * 300 and stats["response_tokens"] == 12 * 50
+            assert state.calls == 16
+            assert 1 < state.max_in_flight <= 3, state.max_in_flight
+
+            response = json.loads((responses_dir / "1003.json").read_text())
+            assert response == {"q3_0.jpg": {"category": "tops", "item_type": "tshirt"},
+                                "q3_1.jpg": {"category": "tops", "item_type": "tshirt"}}
+
+            manifest = runner.load_manifest()
+            assert manifest["1000"]["status"] == "ok" and manifest["1000"]["attempts"] == 2
+            assert manifest["1999"]["status"] == "empty"
+
+            # Segunda execução: nada a refazer
+            stats = runner.run(sorted(images_dir.iterdir()))
+            assert stats["total"] == 0 and stats["skipped"] == 13, stats
+            assert state.calls == 16
+            client.close()
+    finally:
+        server.shutdown()
+
+    print("✅ Extração concorrente, retry em 429 e manifesto funcionando!")
+
+
+if __name__ == "__main__":
+    test_token_bucket_rate()
+    test_concurrent_extraction_with_fake_server()
@@ -0,0 +1,108 @@
+"""
+Script de teste para validar o pré-processamento das imagens enviadas ao Gemini (image_preprocess.py)
+
+Execute: python backend/modules/test_image_preprocess.py
+"""
+
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.extraction_runner import estimate_tokens
+from modules.feature_extractor import FeatureExtractor
+from modules.gemini_client import GeminiResponse, GeminiUsage
+from modules.image_preprocess import load_image_part, preprocess_image
+
+
+def _garment_photo(size=(3000, 4000)) -> Image.Image:
+    """Peça azul centralizada sobre fundo claro uniforme"""
+    image = Image.new("RGB", size, (235, 235, 235))
+    ImageDraw.Draw(image).rectangle((900, 1000, 2100, 3000), fill=(30, 60, 150))
+    return image
+
+
+def test_preprocess_resize_crop_and_passthrough():
+    """
+    Testa redução (draft mode), recorte do fundo e envio direto de JPEGs pequenos
+    """
+    print("🧪 Testando pré-processamento de imagens...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "1.jpg"
+        _garment_photo().save(path, quality=92)
+
+        part = load_image_part(path, max_side=768, quality=85)
+        resized = Image.open(io.BytesIO(part["data"]))
+        assert part["mime_type"] == "image/jpeg" and resized.size == (576, 768)
+        assert len(part["data"]) < path.stat().st_size
+        assert estimate_tokens([part]) < estimate_tokens([Image.open(path)])
+
+        # Recorte: sobra a peça + margem, proporção ~ 1200x2000
+        cropped = Image.open(io.BytesIO(load_image_part(path, max_side=768, crop=True)["data"]))
+        assert cropped.height == 768 and 0.6 < cropped.width / cropped.height < 0.7, cropped.size
+        assert cropped.getpixel((cropped.width // 2, cropped.height // 2))[2] > 100
+
+        # JPEG que já cabe em max_side: bytes originais, sem recomprimir
+        small = Path(tmp_dir) / "2.jpg"
+        Image.open(io.BytesIO(part["data"])).save(small, quality=70)
+        assert load_image_part(small, max_side=768)["data"] == small.read_bytes()
+
+        # PNG com transparência vira JPEG com fundo branco
+        rgba = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+        blob = preprocess_image(rgba, max_side=768)
+        assert Image.open(io.BytesIO(blob["data"])).getpixel((50, 50)) == (255, 255, 255)
+
+    print("✅ Redução, recorte e envio direto funcionando!")
+
+
+class _RecordingClient:
+    """Guarda as partes recebidas e responde uma peça por imagem"""
+
+    def __init__(self):
+        self.parts = []
+
+    def generate_content(self, parts):
+        self.parts.append(parts)
+        answer = {"image.jpg": {"category": "tops", "item_type": "t-shirt"}}
+        return GeminiResponse(f"```json\n{json.dumps(answer, indent=2)}\n```", GeminiUsage(300, 50))
+
+
+def test_extract_from_memory_without_disk():
+    """
+    Testa a extração a partir de bytes e de imagem PIL sem criar arquivos temporários
+    """
+    print("🧪 Testando extração em memória...\n")
+
+    buffer = io.BytesIO()
+    _garment_photo().save(buffer, format="JPEG", quality=92)
+    image_bytes = buffer.getvalue()
+
+    client = _RecordingClient()
+    extractor = FeatureExtractor(client=client, preprocess=True, max_side=768)
+    with mock.patch("tempfile.mkdtemp", side_effect=AssertionError("escrita em disco")):
+        from_bytes = extractor.extract_features_from_image(image_bytes)
+        from_image = extractor.extract_features_from_image(Image.open(io.BytesIO(image_bytes)))
+
+    assert from_bytes == from_image == {"image.jpg": {"category": "tops", "item_type": "t-shirt"}}
+    assert client.parts[0] == client.parts[1]
+    blob = client.parts[0][2]
+    assert blob["mime_type"] == "image/jpeg" and max(Image.open(io.BytesIO(blob["data"])).size) == 768
+
+    # Sem pré-processamento os bytes originais são enviados como estão
+    raw = FeatureExtractor(client=client, preprocess=False).prepare_part(image_bytes)
+    assert raw == {"mime_type": "image/jpeg", "data": image_bytes}
+    print("✅ Extração em memória sem arquivos temporários!")
+
+
+if __name__ == "__main__":
+    test_preprocess_resize_crop_and_passthrough()
+    test_extract_from_memory_without_disk()
@@ -0,0 +1,169 @@
+"""
+Script de teste para validar o micro-batching de inferência (inference_scheduler.py)
+
+Execute: python backend/modules/test_inference_scheduler.py
+"""
+
+import asyncio
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.inference_scheduler import InferenceScheduler
+from modules.pytorch_model import PREDICT_BATCH_SIZE
+from modules.test_pytorch_model import _random_predictor
+
+
+def test_scheduler_matches_direct_prediction():
+    """
+    Testa se jobs concorrentes agrupados recebem os mesmos scores da predição direta
+    """
+    print("🧪 Testando InferenceScheduler vs predict_arrays...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = _random_predictor(tmp_dir)
+        rng = np.random.default_rng(0)
+
+        ids = np.array([f"{i // 4}/{i % 4}.jpg" for i in range(40)])
+        predictor.build_projection_cache(ids, rng.standard_normal((40, 96)).astype(np.float32))
+
+        jobs = []
+        for i in range(24):
+            num_outfits = int(rng.integers(1, 12))
+            embeddings = rng.standard_normal((num_outfits, 5, 96)).astype(np.float32)
+            masks = np.arange(5)[None, :] < rng.integers(2, 6, size=(num_outfits, 1))
+            jobs.append((embeddings, masks, False))
+        # Jobs com features do cache de projeções entram em forwards próprios
+        for i in range(4):
+            outfit_piece_ids = {str(o): [f"{o}/{k}.jpg" for k in range(1 + o % 3)] for o in range(i, i + 5)}
+            features, masks, _ = predictor.build_projected_inputs(rng.standard_normal(96), outfit_piece_ids)
+            jobs.append((features, masks, True))
+
+        expected = [
+            predictor.predict_projected_arrays(inputs, masks) if projected else predictor.predict_arrays(inputs, masks)
+            for inputs, masks, projected in jobs
+        ]
+
+        scheduler = InferenceScheduler(predictor, max_batch_size=64, max_wait_ms=20)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda job: scheduler.submit(*job).result(timeout=10), jobs))
+        scheduler.close()
+
+        for scores, reference in zip(results, expected):
+            assert scores.shape == reference.shape
+            np.testing.assert_allclose(scores, reference, rtol=1e-5, atol=1e-6)
+
+        stats = scheduler.stats
+        print(f"   {stats['jobs']} jobs em {stats['batches']} forwards "
+              f"(média {stats['avg_outfits_per_batch']:.1f} outfits, fila máx {stats['max_queue_depth']})")
+        assert stats["jobs"] == len(jobs) and stats["errors"] == 0
+        assert stats["batches"] < len(jobs)
+        assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+    print("\n✅ Scores agrupados idênticos à predição direta!")
+
+
+def test_scheduler_respects_predictor_chunks():
+    """
+    Testa se o forward agrupado respeita o chunk do predictor (max_batch_size do ModelPredictor)
+    """
+    print("🧪 Testando chunks do predictor no forward agrupado...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = _random_predictor(tmp_dir)
+        predictor.max_batch_size = 8
+        forward_sizes = []
+        original_forward = predictor.model.forward
+
+        def recording_forward(embeddings, masks):
+            forward_sizes.append(embeddings.shape[0])
+            return original_forward(embeddings, masks)
+
+        predictor.model.forward = recording_forward
+        rng = np.random.default_rng(1)
+        jobs = [
+            (rng.standard_normal((10, 5, 96)).astype(np.float32), np.ones((10, 5), dtype=bool))
+            for _ in range(6)
+        ]
+
+        scheduler = InferenceScheduler(predictor, max_batch_size=256, max_wait_ms=50)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda job: scheduler.submit(*job).result(timeout=10), jobs))
+        scheduler.close()
+
+        assert all(scores.shape == (10,) for scores in results)
+        assert sum(forward_sizes) == 60, forward_sizes
+        assert max(forward_sizes) <= predictor.max_batch_size, forward_sizes
+        print(f"   Forwards: {forward_sizes}")
+
+        # Com o chunk default, o grupo inteiro roda em um único forward
+        predictor.max_batch_size = PREDICT_BATCH_SIZE
+        forward_sizes.clear()
+        inputs = rng.standard_normal((200, 5, 96)).astype(np.float32)
+        predictor.predict_arrays(inputs, np.ones((200, 5), dtype=bool))
+        assert forward_sizes == [200], forward_sizes
+
+    print("\n✅ Nenhum forward acima do chunk do predictor!")
+
+
+class BlockingPredictor:
+    """Predictor falso: o primeiro forward espera release (ocupa a thread de inferência)"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def predict_arrays(self, inputs, masks, max_batch_size=None):
+        self.started.set()
+        self.release.wait(5)
+        return np.full(inputs.shape[0], 0.5, dtype=np.float32)
+
+
+def test_cancelled_caller_does_not_stop_scheduler():
+    """
+    Testa que uma requisição cancelada na fila não derruba a thread de inferência
+    """
+    print("🧪 Testando requisição cancelada...\n")
+
+    predictor = BlockingPredictor()
+    scheduler = InferenceScheduler(predictor, max_batch_size=256, max_wait_ms=0)
+    inputs, masks = np.zeros((2, 5, 96), dtype=np.float32), np.ones((2, 5), dtype=bool)
+
+    async def scenario():
+        blocking = scheduler.submit(inputs, masks)
+        assert predictor.started.wait(5)
+        # Enquanto a thread está ocupada, a requisição seguinte é cancelada (cliente desconectou)
+        task = asyncio.ensure_future(scheduler.score(inputs, masks))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        predictor.release.set()
+        assert blocking.result(timeout=5).shape == (2,)
+        return await asyncio.wait_for(scheduler.score(inputs, masks), timeout=5)
+
+    scores = asyncio.run(scenario())
+    assert scores.shape == (2,)
+    assert scheduler._thread.is_alive()
+    stats = scheduler.stats
+    scheduler.close()
+    assert stats["cancelled"] == 1 and stats["errors"] == 0, stats
+    print(f"✅ Thread de inferência ativa após o cancelamento: {stats['cancelled']} job cancelado")
+
+
+if __name__ == "__main__":
+    test_scheduler_matches_direct_prediction()
+    print()
+    test_scheduler_respects_predictor_chunks()
+    print()
+    test_cancelled_caller_does_not_stop_scheduler()
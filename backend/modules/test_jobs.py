@@ -0,0 +1,141 @@
+"""
+Script de teste para validar a fila de jobs em background (src/core/jobs.py)
+
+Execute: python backend/modules/test_jobs.py
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from src.core.jobs import InProcessJobQueue, JobQueue, RedisJobQueue, create_job_queue
+
+
+class FakeRedis:
+    """Subconjunto de redis.Redis usado pela RedisJobQueue (SADD/SREM/LPUSH/BRPOP)"""
+
+    def __init__(self):
+        self.sets = {}
+        self.lists = {}
+        self.condition = threading.Condition()
+
+    def sadd(self, name, value):
+        with self.condition:
+            members = self.sets.setdefault(name, set())
+            if value in members:
+                return 0
+            members.add(value)
+            return 1
+
+    def srem(self, name, value):
+        with self.condition:
+            self.sets.get(name, set()).discard(value)
+
+    def lpush(self, name, value):
+        with self.condition:
+            self.lists.setdefault(name, []).insert(0, value)
+            self.condition.notify_all()
+
+    def brpop(self, name, timeout=0):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.lists.get(name), timeout=timeout):
+                return None
+            return name, self.lists[name].pop()
+
+
+def test_job_queue_is_abstract():
+    """
+    Testa que a interface não pode ser instanciada sem enqueue
+    """
+    print("🧪 Testando interface JobQueue...\n")
+
+    try:
+        JobQueue()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("JobQueue sem enqueue não deveria ser instanciável")
+    assert isinstance(create_job_queue("inprocess"), InProcessJobQueue)
+    print("✅ JobQueue é abstrata; create_job_queue devolve uma implementação")
+
+
+def test_inprocess_dedup_and_failures():
+    """
+    Testa deduplicação por chave, limite de pendentes e contagem de falhas
+    """
+    print("🧪 Testando InProcessJobQueue...\n")
+
+    release = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    def handler(payload):
+        started.set()
+        release.wait(5)
+        seen.append(payload["item_id"])
+
+    def failing(payload):
+        raise RuntimeError("falha")
+
+    queue = InProcessJobQueue(workers=1, max_pending=2)
+    queue.register("precompute", handler)
+    queue.register("fail", failing)
+
+    # O primeiro job ocupa o worker; os seguintes ficam pendentes
+    assert queue.enqueue("precompute", {"item_id": 1}, key="item:1")
+    assert started.wait(5)
+    assert queue.enqueue("precompute", {"item_id": 2}, key="item:2")
+    assert not queue.enqueue("precompute", {"item_id": 2}, key="item:2")  # deduplicado
+    assert queue.enqueue("fail", {"item_id": 3})
+    assert not queue.enqueue("precompute", {"item_id": 4}, key="item:4")  # fila cheia
+    release.set()
+    queue.shutdown(wait=True)
+
+    assert seen == [1, 2], seen
+    assert queue.stats == {"enqueued": 3, "deduplicated": 1, "completed": 2, "failed": 1}, queue.stats
+    print(f"✅ Stats: {queue.stats}")
+
+
+def test_redis_queue_roundtrip():
+    """
+    Testa produção e consumo pela RedisJobQueue com um cliente falso
+    """
+    print("🧪 Testando RedisJobQueue...\n")
+
+    done = threading.Event()
+    seen = []
+
+    def handler(payload):
+        seen.append(payload["item_id"])
+        if len(seen) == 2:
+            done.set()
+
+    client = FakeRedis()
+    queue = RedisJobQueue("redis://unused", client=client)
+    queue.register("precompute", handler)
+
+    # Sem consumidores: a segunda chave igual é deduplicada no conjunto de pendentes
+    assert queue.enqueue("precompute", {"item_id": 1}, key="item:1")
+    assert not queue.enqueue("precompute", {"item_id": 1}, key="item:1")
+    assert queue.enqueue("precompute", {"item_id": 2}, key="item:2")
+
+    queue.start()
+    assert done.wait(5)
+    queue.shutdown(wait=True)
+
+    assert sorted(seen) == [1, 2], seen
+    assert not client.sets[queue.pending_name]
+    assert queue.stats == {"enqueued": 2, "deduplicated": 1, "completed": 2, "failed": 0}, queue.stats
+    print(f"✅ Stats: {queue.stats}")
+
+
+if __name__ == "__main__":
+    test_job_queue_is_abstract()
+    print()
+    test_inprocess_dedup_and_failures()
+    print()
+    test_redis_queue_roundtrip()
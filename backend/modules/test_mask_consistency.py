@@ -90,6 +90,47 @@ def test_max_items_validation():
         print("✅ Validação de max_items funcionando!")
 
 
+def test_stacked_inputs_match_build_input():
+    """
+    Testa se build_stacked_inputs reproduz build_input outfit a outfit
+    """
+    print("\n🧪 Testando build_stacked_inputs vs build_input...\n")
+    
+    rng = np.random.default_rng(0)
+    new_piece_embedding = rng.standard_normal(96).astype(np.float32)
+    outfits_dict = {
+        f"outfit_{i}": [
+            {'embedding': rng.standard_normal(96).tolist()}
+            for _ in range(1 + i % 4)
+        ]
+        for i in range(7)
+    }
+    outfits_dict["empty"] = []
+    
+    builder = ModelInputBuilder(max_items=5, embedding_dim=96)
+    embeddings, masks, outfit_ids = builder.build_stacked_inputs(new_piece_embedding, outfits_dict)
+    
+    assert embeddings.shape == (7, 5, 96) and embeddings.dtype == np.float32
+    assert masks.shape == (7, 5) and masks.dtype == bool
+    assert outfit_ids == [f"outfit_{i}" for i in range(7)], "Outfits vazios são pulados, ordem preservada"
+    
+    for b, outfit_id in enumerate(outfit_ids):
+        expected_embeddings, expected_mask, _ = builder.build_input(new_piece_embedding, outfits_dict[outfit_id])
+        np.testing.assert_array_equal(embeddings[b], expected_embeddings)
+        np.testing.assert_array_equal(masks[b], expected_mask)
+    
+    outfits_dict["too_big"] = [{'embedding': new_piece_embedding} for _ in range(5)]
+    try:
+        builder.build_stacked_inputs(new_piece_embedding, outfits_dict)
+        print("❌ ERRO: Deveria ter lançado ValueError!")
+        sys.exit(1)
+    except ValueError as e:
+        assert "too_big" in str(e)
+    
+    print("✅ build_stacked_inputs consistente com build_input")
+
+
 if __name__ == "__main__":
     test_mask_consistency()
     test_max_items_validation()
+    test_stacked_inputs_match_build_input()
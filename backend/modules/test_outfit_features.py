@@ -0,0 +1,71 @@
+"""
+Script de teste para validar o índice de features dos outfits (outfit_features.py)
+
+Execute: python backend/modules/test_outfit_features.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.outfit_features import OutfitFeaturesIndex
+
+
+def _write_outfit(filtered_dir: Path, outfit_id: str, pieces: dict) -> None:
+    with open(filtered_dir / f"{outfit_id}.json", "w", encoding="utf-8") as f:
+        json.dump(pieces, f, ensure_ascii=False)
+
+
+def test_index_matches_filtered_json():
+    """
+    Testa se o índice SQLite devolve exatamente o conteúdo dos JSONs filtrados
+    """
+    print("🧪 Testando índice de features dos outfits...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filtered_dir = Path(tmp_dir) / "filtered"
+        filtered_dir.mkdir()
+        outfits = {
+            "100": {"3.jpg": {"category": "tops", "primary_color": "azul"}, "1.jpg": {"category": "shoes"}},
+            "200": {"2.jpg": {"category": "bottoms", "texture": "jeans", "usage": "casual"}},
+        }
+        for outfit_id, pieces in outfits.items():
+            _write_outfit(filtered_dir, outfit_id, pieces)
+
+        index_path = Path(tmp_dir) / "filtered_outfits.sqlite"
+        assert OutfitFeaturesIndex.build(filtered_dir=filtered_dir, path=index_path) == 2
+
+        # Remove os JSONs: lookups devem vir apenas do índice
+        for file_path in filtered_dir.glob("*.json"):
+            file_path.unlink()
+
+        index = OutfitFeaturesIndex(path=index_path, filtered_dir=filtered_dir)
+        assert len(index) == 2
+        for outfit_id, pieces in outfits.items():
+            outfit = index.get_outfit(outfit_id)
+            assert outfit == pieces
+            assert list(outfit) == list(pieces), "Ordem das peças deve ser preservada"
+
+        assert index.get_piece("200", "2.jpg") == outfits["200"]["2.jpg"]
+        assert index.get_piece("200", "9.jpg") is None
+        assert index.get_outfit("999") is None
+
+        # Lookups devolvem cópias
+        index.get_outfit("100")["3.jpg"]["category"] = "changed"
+        assert index.get_outfit("100") == outfits["100"]
+
+        # Outfit filtrado após o build: fallback para o JSON
+        _write_outfit(filtered_dir, "300", {"1.jpg": {"category": "tops"}})
+        assert index.get_outfit("300") == {"1.jpg": {"category": "tops"}}
+        assert "300" in index
+
+        print("✅ Índice de features consistente com os JSONs filtrados")
+
+
+if __name__ == "__main__":
+    test_index_matches_filtered_json()
@@ -6,13 +6,18 @@ Execute: python backend/modules/test_pytorch_model.py
 
 import numpy as np
 import sys
+import tempfile
 from pathlib import Path
 
+import torch
+import torch.nn.functional as F
+
 # Adiciona backend ao path
 backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
-from modules.pytorch_model import ModelPredictor, get_model_predictor
+from modules.pytorch_model import ModelPredictor, get_model_predictor, create_model
+from modules.model_input import ModelInputBuilder
 
 
 def test_model_loading():
@@ -144,6 +149,184 @@ def test_singleton_cache():
     print(f"  Mesma instância retornada em chamadas subsequentes")
 
 
+def _random_predictor(tmp_dir: str) -> ModelPredictor:
+    """Cria um ModelPredictor a partir de um checkpoint com pesos aleatórios"""
+    torch.manual_seed(0)
+    model = create_model({})
+    # Estatísticas de BatchNorm não triviais para exercitar o modo eval
+    model.train()
+    with torch.no_grad():
+        for _ in range(3):
+            model(torch.randn(64, 5, 96), torch.rand(64, 5) > 0.3)
+    checkpoint_path = Path(tmp_dir) / "random_model.pth"
+    torch.save({'model_state_dict': model.state_dict(), 'epoch': 0, 'best_val_auc': 0.5}, checkpoint_path)
+    return ModelPredictor(str(checkpoint_path), device='cpu')
+
+
+def test_batch_matches_single_prediction():
+    """
+    Testa se a predição em batch (um forward, com chunks) é idêntica à predição única
+    """
+    print("\n🧪 Testando predict_batch vs predict_single...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = _random_predictor(tmp_dir)
+
+        rng = np.random.default_rng(0)
+        batch_inputs = {}
+        for i in range(37):
+            num_items = int(rng.integers(2, 6))
+            mask = np.zeros(5, dtype=bool)
+            mask[:num_items] = True
+            embeddings = np.zeros((5, 96), dtype=np.float32)
+            embeddings[:num_items] = rng.standard_normal((num_items, 96))
+            batch_inputs[f"outfit_{i}"] = (embeddings, mask, num_items)
+
+        expected = {
+            outfit_id: predictor.predict_single(embeddings, mask)
+            for outfit_id, (embeddings, mask, _) in batch_inputs.items()
+        }
+
+        for max_batch_size in [None, 8, 1]:
+            scores = predictor.predict_batch(batch_inputs, max_batch_size=max_batch_size)
+            assert list(scores) == list(expected), "Ordem dos outfits deve ser preservada"
+            np.testing.assert_allclose(list(scores.values()), list(expected.values()), rtol=1e-5, atol=1e-6)
+
+        assert predictor.predict_batch({}) == {}
+
+        print("✅ predict_batch consistente com predict_single")
+
+
+def _loop_relations(model, features: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """Relações par a par com o loop for i / for j original (referência)"""
+    relations = []
+    mask_weights = F.relu(model.masks.weight)
+    pair_idx = 0
+    for i in range(model.max_items):
+        for j in range(i, model.max_items):
+            pair_valid = mask[:, i] & mask[:, j]
+            left = F.normalize(mask_weights[pair_idx] * features[:, i], dim=-1)
+            right = F.normalize(mask_weights[pair_idx] * features[:, j], dim=-1)
+            relations.append((left * right).sum(dim=-1) * pair_valid.float())
+            pair_idx += 1
+    return torch.stack(relations, dim=1)
+
+
+def test_vectorised_relations_match_loop():
+    """
+    Testa se o forward vetorizado reproduz o loop par a par original
+    """
+    print("\n🧪 Testando relações vetorizadas vs loop original...\n")
+
+    torch.manual_seed(0)
+    model = create_model({})
+    model.eval()
+
+    # Buffers de pares não entram no state_dict (checkpoints antigos continuam válidos)
+    assert not any(key.startswith('pair_') for key in model.state_dict())
+
+    embeddings = torch.randn(16, 5, 96)
+    mask = torch.arange(5).unsqueeze(0) < torch.randint(2, 6, (16, 1))
+
+    with torch.no_grad():
+        features = model.feature_proj(embeddings.reshape(-1, 96)).reshape(16, 5, -1)
+        expected = model.predictor(model.bn_relations(_loop_relations(model, features, mask))).squeeze(-1)
+        scores = model(embeddings, mask)
+
+    np.testing.assert_allclose(scores.numpy(), expected.numpy(), rtol=1e-5, atol=1e-6)
+
+    print("✅ Forward vetorizado equivalente ao loop original")
+
+
+def test_zero_row_gradients_finite():
+    """
+    Testa se uma peça com projeção toda zero não gera gradiente NaN (treino)
+    """
+    print("\n🧪 Testando gradientes com linha projetada zerada...\n")
+
+    from models.compat_model import create_model as create_training_model
+
+    for factory in (create_model, create_training_model):
+        torch.manual_seed(0)
+        model = factory({})
+        model.train()
+
+        # Zera a projeção da peça 1 do primeiro outfit (mesma injeção em ambas as cópias)
+        def zero_row(module, inputs, output):
+            keep = torch.ones_like(output)
+            keep[1] = 0.0
+            return output * keep
+
+        handle = model.feature_proj.register_forward_hook(zero_row)
+        embeddings = torch.randn(4, 5, 96)
+        mask = torch.ones(4, 5, dtype=torch.bool)
+        model(embeddings, mask).sum().backward()
+        handle.remove()
+
+        for name, param in model.named_parameters():
+            if param.grad is not None:
+                assert torch.isfinite(param.grad).all(), f"{factory.__module__}: gradiente não finito em {name}"
+
+    print("✅ Gradientes finitos nas duas cópias do modelo")
+
+
+def test_projection_cache_matches_full_forward():
+    """
+    Testa se a predição com projeções pré-computadas reproduz o forward completo
+    """
+    print("\n🧪 Testando cache de projeções vs forward completo...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictor = _random_predictor(tmp_dir)
+
+        rng = np.random.default_rng(1)
+        catalogue_ids = [f"{i // 4}/{i % 4}.jpg" for i in range(40)]
+        catalogue_embeddings = rng.standard_normal((40, 96)).astype(np.float32)
+        embedding_by_id = dict(zip(catalogue_ids, catalogue_embeddings))
+        new_piece = rng.standard_normal(96).astype(np.float32)
+
+        # Outfits de 1 a 4 peças do catálogo (+ nova peça) e um outfit vazio
+        outfit_piece_ids = {
+            str(i): catalogue_ids[i * 4:i * 4 + 1 + i % 4] for i in range(10)
+        }
+        outfit_piece_ids["empty"] = []
+        outfits_dict = {
+            outfit_id: [{'piece_id': pid, 'embedding': embedding_by_id[pid]} for pid in piece_ids]
+            for outfit_id, piece_ids in outfit_piece_ids.items()
+        }
+        expected = predictor.predict_batch(ModelInputBuilder().build_batch_inputs(new_piece, outfits_dict))
+
+        assert predictor.build_projection_cache(catalogue_ids, catalogue_embeddings) == 40
+        scores = predictor.predict_with_projection_cache(new_piece, outfit_piece_ids, max_batch_size=4)
+        assert list(scores) == list(expected), "Ordem dos outfits deve ser preservada"
+        np.testing.assert_allclose(list(scores.values()), list(expected.values()), rtol=1e-5, atol=1e-6)
+
+        # Cache persistido e recarregado (memory-mapped) por outra instância
+        cache_dir = Path(tmp_dir) / "projection_cache"
+        predictor.save_projection_cache(cache_dir, catalogue_fingerprint="v1")
+        reloaded = _random_predictor(tmp_dir)
+        assert not reloaded.load_projection_cache(cache_dir, expected_count=41), "Catálogo alterado invalida o cache"
+        assert not reloaded.load_projection_cache(cache_dir, expected_count=40, catalogue_fingerprint="v2"), \
+            "Escrita no catálogo com o mesmo número de peças invalida o cache"
+        assert reloaded.load_projection_cache(cache_dir, expected_count=40, catalogue_fingerprint="v1")
+        reloaded_scores = reloaded.predict_with_projection_cache(new_piece, outfit_piece_ids)
+        np.testing.assert_allclose(list(reloaded_scores.values()), list(expected.values()), rtol=1e-5, atol=1e-6)
+
+        try:
+            predictor.predict_with_projection_cache(new_piece, {"x": ["missing/1.jpg"]})
+            assert False, "Peça fora do cache deveria lançar KeyError"
+        except KeyError:
+            pass
+
+        # Catálogo alterado: cache em memória e arquivos descartados
+        reloaded.clear_projection_cache()
+        reloaded.delete_projection_cache(cache_dir)
+        assert not reloaded.has_projection_cache
+        assert not reloaded.load_projection_cache(cache_dir)
+
+        print("✅ Cache de projeções consistente com o forward completo")
+
+
 if __name__ == "__main__":
     print("="*60)
     print("TESTES DO MÓDULO PYTORCH_MODEL")
@@ -154,6 +337,10 @@ if __name__ == "__main__":
     test_batch_prediction(predictor)
     test_top_k_filtering(predictor)
     test_singleton_cache()
+    test_batch_matches_single_prediction()
+    test_vectorised_relations_match_loop()
+    test_zero_row_gradients_finite()
+    test_projection_cache_matches_full_forward()
     
     print("\n" + "="*60)
     print("✅ TODOS OS TESTES PASSARAM!")
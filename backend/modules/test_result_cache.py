@@ -0,0 +1,110 @@
+"""
+Script de teste para validar o cache de resultados (result_cache.py)
+
+Execute: python backend/modules/test_result_cache.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.result_cache import ResultCache
+
+
+def test_result_cache_lru_ttl_and_disk_tier():
+    """
+    Testa LRU em memória, TTL e promoção de hits do SQLite para a memória
+    """
+    print("🧪 Testando ResultCache...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sqlite_path = Path(tmp_dir) / "results.sqlite"
+        value = {"top": [["100", 0.99], ["200", 0.97]], "pieces": {"100": ["100/1.jpg"], "200": ["200/2.jpg"]}}
+
+        cache = ResultCache(max_items=2, sqlite_path=sqlite_path)
+        assert cache.get("a") is None
+        cache.set("a", value)
+        cache.set("b", 1)
+        assert cache.get("a") == value
+        cache.set("c", 2)  # Remove "b" (menos recente) da memória
+        assert len(cache) == 2
+
+        # "b" continua no disco e volta para a memória
+        assert cache.get("b") == 1
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["disk_hits"] == 1 and stats["misses"] == 1, stats
+        assert stats["evictions"] == 2
+
+        # Nova instância (outro processo/reinício) lê o segundo nível
+        reloaded = ResultCache(max_items=2, sqlite_path=sqlite_path)
+        assert reloaded.get("a") == value
+        reloaded.clear()
+        assert ResultCache(sqlite_path=sqlite_path).get("a") is None
+
+        # TTL
+        expiring = ResultCache(max_items=10, ttl_seconds=0.05)
+        expiring.set("x", 1)
+        assert expiring.get("x") == 1
+        time.sleep(0.1)
+        assert expiring.get("x") is None
+        assert expiring.get_stats()["expired"] == 1
+
+    print("✅ LRU, TTL e segundo nível em SQLite funcionando!")
+
+
+def test_suggestion_key_survives_restart_after_catalogue_write():
+    """
+    Testa que uma escrita no catálogo invalida as sugestões do tier SQLite após reiniciar
+    """
+    print("🧪 Testando chave do cache de sugestões entre reinícios...\n")
+
+    from modules.vector_db import VectorDB
+    from src.app_services.suggestion_app_service import SuggestionAppService
+
+    def make_service(chroma_dir: Path) -> SuggestionAppService:
+        """Service de um processo novo: VectorDB próprio sobre o mesmo diretório"""
+        vector_db = VectorDB(path=chroma_dir)
+        vector_db.get_or_create_collection("pieces")
+        return SuggestionAppService(
+            db=None, vector_db=vector_db, model_predictor=SimpleNamespace(checkpoint_hash="0" * 64),
+            model_input_builder=None, thumbnail_cache=None, outfit_features=None, executors=None,
+            catalogue_version="test"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chroma_dir = Path(tmp_dir) / "chroma"
+        sqlite_path = Path(tmp_dir) / "results.sqlite"
+        embedding = np.arange(96, dtype=np.float32)
+
+        service = make_service(chroma_dir)
+        key = service._result_cache_key(embedding, "tops")
+        ResultCache(sqlite_path=sqlite_path).set(key, {"top": [["100", 0.9]]})
+
+        # Reinício sem escrita: mesma chave, entrada servida pelo SQLite
+        restarted = make_service(chroma_dir)
+        assert restarted._result_cache_key(embedding, "tops") == key
+        assert ResultCache(sqlite_path=sqlite_path).get(key) is not None
+
+        # Reindexação e reinício: a revisão em processo volta a 0, a chave não
+        service.vector_db.add_item("pieces", embedding, "100/1.jpg")
+        restarted = make_service(chroma_dir)
+        assert restarted.vector_db.revision("pieces") == 0
+        new_key = restarted._result_cache_key(embedding, "tops")
+        assert new_key != key
+        assert ResultCache(sqlite_path=sqlite_path).get(new_key) is None
+
+    print("✅ Escrita no catálogo invalida o tier SQLite entre reinícios!")
+
+
+if __name__ == "__main__":
+    test_result_cache_lru_ttl_and_disk_tier()
+    print()
+    test_suggestion_key_survives_restart_after_catalogue_write()
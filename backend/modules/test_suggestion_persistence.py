@@ -0,0 +1,190 @@
+"""
+Script de teste para validar a persistência de sugestões (SuggestionRepository/SuggestionAppService)
+
+Usa um SQLite temporário próprio (não depende de DATABASE_URL).
+
+Execute: python backend/modules/test_suggestion_persistence.py
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from src.app_services.suggestion_app_service import SuggestionAppService
+from src.models import Base, Item, Suggestion, User
+from src.repositories.item_repository import ItemRepository
+from src.schemas.item import ItemUpdate
+from src.services.item_service import ItemService
+
+
+def _make_db(tmp_dir: str):
+    """Cria o schema em um SQLite temporário e devolve (sessionmaker, user_id, item_id)"""
+    engine = create_engine(f"sqlite:///{tmp_dir}/suggestions.db", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        user = User(email="persist@test.com", name="Persist", hashed_password="x", is_active=True)
+        db.add(user)
+        db.commit()
+        item = Item(
+            user_id=user.id, name="Camiseta", category="tops", item_type="t-shirt", primary_color="white",
+            usage="casual", texture="cotton", print_category="plain", image_url="http://localhost/item.jpg"
+        )
+        db.add(item)
+        db.commit()
+        return Session, user.id, item.id
+
+
+def _make_service(db) -> SuggestionAppService:
+    """Service só com o necessário para _persist_suggestion/_get_stored_suggestion"""
+    return SuggestionAppService(
+        db=db,
+        vector_db=None,
+        model_predictor=SimpleNamespace(checkpoint_hash="0" * 64),
+        model_input_builder=None,
+        thumbnail_cache=None,
+        outfit_features=None,
+        executors=None,
+        catalogue_version="test"
+    )
+
+
+def test_concurrent_persist_same_item():
+    """
+    Testa gravações concorrentes do mesmo usuário/item (sessões separadas, como requisições)
+    """
+    print("🧪 Testando persistência concorrente de sugestões...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Session, user_id, item_id = _make_db(tmp_dir)
+        errors = []
+        barrier = threading.Barrier(8)
+
+        def worker(index: int):
+            db = Session()
+            try:
+                service = _make_service(db)
+                barrier.wait()
+                for iteration in range(25):
+                    outfit_id = str(1000 + index * 100 + iteration)
+                    service._persist_suggestion(
+                        user_id, item_id, {outfit_id: 0.99},
+                        {outfit_id: [{"piece_id": f"{outfit_id}/1.jpg"}]}
+                    )
+            except Exception as e:
+                errors.append(repr(e))
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors[:3]
+        with Session() as db:
+            count = db.execute(
+                select(func.count()).select_from(Suggestion)
+                .where(Suggestion.user_id == user_id, Suggestion.item_id == item_id)
+            ).scalar_one()
+        assert count == 1, count
+        print(f"✅ 8 threads x 25 gravações: sem erros, {count} linha")
+
+
+def test_stored_suggestion_pairs_scores():
+    """
+    Testa a leitura da sugestão persistida com um outfit vazio no meio (score deve seguir o seu outfit)
+    """
+    print("🧪 Testando leitura da sugestão persistida...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Session, user_id, item_id = _make_db(tmp_dir)
+        with Session() as db:
+            service = _make_service(db)
+            service._persist_suggestion(
+                user_id, item_id, {"100": 0.9, "200": 0.8, "300": 0.7},
+                {"100": [{"piece_id": "100/1.jpg"}], "300": [{"piece_id": "300/2.jpg"}, {"piece_id": "300/3.jpg"}]}
+            )
+            target_item = db.get(Item, item_id)
+            top_outfits, outfits_dict = service._get_stored_suggestion(target_item)
+
+        assert top_outfits == {"100": 0.9, "300": 0.7}, top_outfits
+        assert outfits_dict["300"] == [{"piece_id": "300/2.jpg"}, {"piece_id": "300/3.jpg"}], outfits_dict
+        print(f"✅ Outfit sem peças descartado junto do seu score: {top_outfits}")
+
+
+class RecordingVectorDB:
+    """Registra os embeddings gravados por item"""
+
+    def __init__(self):
+        self.added = []
+
+    def get_or_create_collection(self, name):
+        return name
+
+    def add_item(self, collection_name, embedding, id, metadata=None):
+        self.added.append(id)
+
+
+def test_update_invalidates_on_embedding_fields():
+    """
+    Testa que editar qualquer atributo do embedding regenera o vetor e apaga a sugestão persistida
+    """
+    print("🧪 Testando invalidação na edição de itens...\n")
+
+    from modules.embeddings import EmbeddingGenerator
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Session, user_id, item_id = _make_db(tmp_dir)
+        with Session() as db:
+            vector_db = RecordingVectorDB()
+            item_service = ItemService(ItemRepository(db), vector_db, EmbeddingGenerator())
+            suggestion_service = _make_service(db)
+
+            def stored_count():
+                return db.execute(
+                    select(func.count()).select_from(Suggestion).where(Suggestion.item_id == item_id)
+                ).scalar_one()
+
+            def persist():
+                suggestion_service._persist_suggestion(
+                    user_id, item_id, {"100": 0.9}, {"100": [{"piece_id": "100/1.jpg"}]}
+                )
+
+            # Só o nome: embedding e sugestão mantidos
+            persist()
+            item_service.update_item(item_id, user_id, ItemUpdate(name="Camiseta branca"))
+            assert vector_db.added == [] and stored_count() == 1
+
+            # Mesmo valor: nada muda
+            item_service.update_item(item_id, user_id, ItemUpdate(primary_color="white"))
+            assert vector_db.added == [] and stored_count() == 1
+
+            for field, value in (
+                ("category", "bottoms"), ("item_type", "jeans"), ("primary_color", "blue"),
+                ("usage", "formal"), ("texture", "denim"), ("print_category", "striped")
+            ):
+                persist()
+                updated = item_service.update_item(item_id, user_id, ItemUpdate(**{field: value}))
+                assert getattr(updated, field) == value
+                assert stored_count() == 0, field
+            assert vector_db.added == [str(item_id)] * 6, vector_db.added
+        print("✅ Cada atributo do embedding regenera o vetor e invalida a sugestão")
+
+
+if __name__ == "__main__":
+    test_concurrent_persist_same_item()
+    print()
+    test_stored_suggestion_pairs_scores()
+    print()
+    test_update_invalidates_on_embedding_fields()
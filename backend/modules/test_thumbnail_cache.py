@@ -0,0 +1,74 @@
+"""
+Script de teste para validar o cache de thumbnails (thumbnail_cache.py)
+
+Execute: python backend/modules/test_thumbnail_cache.py
+"""
+
+import base64
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.thumbnail_cache import ThumbnailCache
+from src.utils.image_utils import compress_image_to_jpeg
+
+
+def _write_images(images_dir: Path) -> None:
+    """Cria 2 outfits com imagens RGB (JPEG) e RGBA (PNG)"""
+    rng = np.random.default_rng(0)
+    for outfit_id in ["100", "200"]:
+        (images_dir / outfit_id).mkdir(parents=True)
+        Image.fromarray(rng.integers(0, 255, (64, 48, 3), dtype=np.uint8)).save(images_dir / outfit_id / "1.jpg")
+        Image.fromarray(rng.integers(0, 255, (40, 80, 4), dtype=np.uint8)).save(images_dir / outfit_id / "2.png")
+
+
+def test_thumbnail_cache_matches_compression():
+    """
+    Testa se o cache devolve os mesmos bytes da compressão por requisição e evita recodificar
+    """
+    print("🧪 Testando cache de thumbnails...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        images_dir = Path(tmp_dir) / "images"
+        cache_dir = Path(tmp_dir) / "thumbnails"
+        _write_images(images_dir)
+
+        cache = ThumbnailCache(cache_dir=cache_dir, images_dir=images_dir, max_memory_items=2)
+        counts = cache.build(formats=["jpeg", "webp"], sizes=[None, 32])
+        assert counts == {"images": 4, "encoded": 16, "skipped": 0, "errors": 0}, counts
+
+        for outfit_id in ["100", "200"]:
+            for piece_name in ["1.jpg", "2.png"]:
+                expected = compress_image_to_jpeg((images_dir / outfit_id / piece_name).read_bytes(), quality=75)
+                assert cache.get_base64(outfit_id, piece_name) == expected
+
+        # Variante reduzida respeita o maior lado
+        small = Image.open(io.BytesIO(base64.b64decode(cache.get_base64("100", "2.png", fmt="webp", size=32))))
+        assert small.format == "WEBP" and max(small.size) == 32
+
+        # Nova instância: tudo servido do disco, sem codec
+        reloaded = ThumbnailCache(cache_dir=cache_dir, images_dir=images_dir, max_memory_items=2)
+        assert reloaded.build(formats=["jpeg", "webp"], sizes=[None, 32])["encoded"] == 0
+        reloaded.get_base64("100", "1.jpg")
+        reloaded.get_base64("100", "1.jpg")
+        assert reloaded.stats["encodes"] == 0 and reloaded.stats["memory_hits"] == 1
+
+        # LRU limitada e imagem ausente
+        reloaded.get_base64("100", "2.png")
+        reloaded.get_base64("200", "1.jpg")
+        assert len(reloaded._memory) == 2
+        assert reloaded.get_base64("999", "1.jpg") == ""
+
+        print("✅ Thumbnails em cache idênticos à compressão por requisição")
+
+
+if __name__ == "__main__":
+    test_thumbnail_cache_matches_compression()
@@ -0,0 +1,119 @@
+"""
+Script de teste para validar spans e histogramas por etapa (tracing.py)
+
+Execute: python backend/modules/test_tracing.py
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from modules.tracing import Tracer
+
+
+def test_spans_histograms_and_prometheus():
+    """
+    Testa aninhamento, histogramas, contagem de erros e o formato Prometheus
+    """
+    print("🧪 Testando spans e histogramas...\n")
+
+    tracer = Tracer(enabled=True, buckets=(0.01, 0.1))
+
+    @tracer.traced("pipeline.persist")
+    def persist():
+        time.sleep(0.02)
+
+    async def request():
+        with tracer.span("pipeline.total", item_id=1) as root:
+            with tracer.span("pipeline.search") as span:
+                span.set(results=10)
+            persist()
+            await asyncio.sleep(0)
+        return root
+
+    root = asyncio.run(request())
+    assert [child.name for child in root.children] == ["pipeline.search", "pipeline.persist"]
+    assert "pipeline.search" in root.summary() and "results=10" in root.summary()
+
+    try:
+        with tracer.span("pipeline.search"):
+            raise ValueError("falha")
+    except ValueError:
+        pass
+
+    snapshot = tracer.snapshot()
+    assert snapshot["pipeline.search"]["count"] == 2 and snapshot["pipeline.search"]["errors"] == 1
+    assert snapshot["pipeline.persist"]["buckets"] == {0.01: 0, 0.1: 1, float("inf"): 1}
+
+    tracer.register_gauges("cache", lambda: {"hits": 3, "hit_rate": 0.75, "enabled": True, "path": "x"})
+    text = tracer.render_prometheus()
+    assert '# TYPE blindstyle_span_duration_seconds histogram' in text
+    assert 'blindstyle_span_duration_seconds_bucket{span="pipeline.persist",le="0.1"} 1' in text
+    assert 'blindstyle_span_duration_seconds_bucket{span="pipeline.persist",le="+Inf"} 1' in text
+    assert 'blindstyle_span_duration_seconds_count{span="pipeline.search"} 2' in text
+    assert 'blindstyle_span_errors_total{span="pipeline.search"} 1' in text
+    assert "blindstyle_cache_hit_rate 0.75" in text and "blindstyle_cache_path" not in text
+    print("✅ Spans aninhados e métricas Prometheus funcionando!")
+
+
+def test_disabled_overhead():
+    """
+    Testa se a instrumentação desativada não registra nada e custa pouco por etapa
+    """
+    print("🧪 Testando instrumentação desativada...\n")
+
+    disabled, enabled = Tracer(enabled=False), Tracer(enabled=True)
+    iterations = 100000
+
+    def loop(tracer):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with tracer.span("stage") as span:
+                span.set(value=1)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    logging.getLogger("modules.tracing").setLevel(logging.INFO)
+    disabled_us, enabled_us = loop(disabled), loop(enabled)
+    assert disabled.snapshot() == {} and enabled.snapshot()["stage"]["count"] == iterations
+    assert disabled_us < enabled_us and disabled_us < 2.0, disabled_us
+    print(f"✅ Custo por span: {disabled_us:.2f}µs desativado, {enabled_us:.2f}µs ativo")
+
+
+def test_gauges_registered_only_when_component_exists():
+    """
+    Testa que o scrape de /metrics não instancia componentes do container
+    """
+    print("🧪 Testando gauges de componentes do container...\n")
+
+    from dependency_injector import providers
+    from modules.tracing import tracer
+    from src.core.di.container import _with_gauges
+
+    created = []
+
+    class Component:
+        def __init__(self):
+            created.append(self)
+            self.stats = {"jobs": 7}
+
+    provider = providers.Singleton(_with_gauges(Component, "test_component", lambda component: component.stats))
+    assert "blindstyle_test_component_jobs" not in tracer.render_prometheus()
+    assert created == []
+
+    assert provider() is provider()
+    assert "blindstyle_test_component_jobs 7" in tracer.render_prometheus()
+    assert len(created) == 1
+    tracer._gauges.pop("test_component")
+    print("✅ Gauges registrados só após a criação do singleton")
+
+
+if __name__ == "__main__":
+    test_spans_histograms_and_prometheus()
+    test_disabled_overhead()
+    test_gauges_registered_only_when_component_exists()
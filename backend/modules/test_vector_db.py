@@ -0,0 +1,227 @@
+"""
+Script de teste para validar o índice outfit_id -> piece_ids do vector_db.py
+
+Execute: python backend/modules/test_vector_db.py
+"""
+
+import numpy as np
+import sys
+import tempfile
+from pathlib import Path
+
+# Adiciona backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import modules.vector_db as vector_db_module
+from modules.vector_db import VectorDB
+
+
+def _populate(vector_db: VectorDB, collection_name: str = "pieces") -> None:
+    """Cria uma coleção com 3 outfits de 2-3 peças"""
+    vector_db.get_or_create_collection(collection_name)
+    rng = np.random.default_rng(0)
+    for outfit_id, num_pieces in [("100", 2), ("200", 3), ("300", 2)]:
+        ids = [f"{outfit_id}/{i}.jpg" for i in range(1, num_pieces + 1)]
+        embeddings = [rng.standard_normal(96).astype(np.float32) for _ in ids]
+        vector_db.add_items(collection_name, embeddings=embeddings, ids=ids)
+
+
+def test_outfit_index_batch_lookup():
+    """
+    Testa se get_pieces_by_outfits_batch usa o índice e mantém a ordem das peças
+    """
+    print("🧪 Testando lookup em batch pelo índice de outfits...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_db = VectorDB(path=tmp_dir)
+        _populate(vector_db)
+
+        outfits = vector_db.get_pieces_by_outfits_batch("pieces", ["200", "100", "999"])
+
+        assert [p['piece_id'] for p in outfits["200"]] == ["200/1.jpg", "200/2.jpg", "200/3.jpg"]
+        assert [p['piece_id'] for p in outfits["100"]] == ["100/1.jpg", "100/2.jpg"]
+        assert outfits["999"] == [], "Outfit inexistente deveria retornar lista vazia"
+        assert len(outfits["100"][0]['embedding']) == 96
+
+        print("✅ Lookup em batch retornou as peças corretas")
+
+
+def test_outfit_index_sync_and_reload():
+    """
+    Testa se o índice acompanha add/delete e é recarregado do disco
+    """
+    print("\n🧪 Testando sincronização e persistência do índice...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_db = VectorDB(path=tmp_dir)
+        _populate(vector_db)
+
+        vector_db.delete_items("pieces", ["200/2.jpg", "300/1.jpg", "300/2.jpg"])
+        vector_db.add_item("pieces", np.ones(96, dtype=np.float32), "400/1.jpg")
+
+        # Nova instância: índice carregado do log persistido
+        reloaded = VectorDB(path=tmp_dir)
+        index = reloaded.get_outfit_piece_ids("pieces", ["200", "300", "400"])
+
+        assert index == {
+            "200": ["200/1.jpg", "200/3.jpg"],
+            "300": [],
+            "400": ["400/1.jpg"],
+        }, f"Índice incorreto: {index}"
+
+        # Reconstrução a partir da coleção deve gerar o mesmo índice
+        assert reloaded.rebuild_outfit_index("pieces") == 3
+        assert reloaded.get_outfit_piece_ids("pieces", ["200", "300", "400"]) == index
+
+        print("✅ Índice sincronizado e recarregado corretamente")
+
+
+def test_outfit_index_log_compaction():
+    """
+    Testa a compactação do log do índice com re-upserts repetidos (na escrita e no carregamento)
+    """
+    print("\n🧪 Testando compactação do log do índice...\n")
+
+    min_lines = vector_db_module.OUTFIT_INDEX_COMPACT_MIN_LINES
+    vector_db_module.OUTFIT_INDEX_COMPACT_MIN_LINES = 20
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            vector_db = VectorDB(path=tmp_dir)
+            _populate(vector_db)
+            expected = vector_db.get_outfit_piece_ids("pieces", ["100", "200", "300"])
+            log_path = Path(tmp_dir) / vector_db_module.OUTFIT_INDEX_DIRNAME / "pieces.log"
+
+            # Re-indexação: cada upsert acrescentaria "+id" de novo
+            ids = [pid for pieces in expected.values() for pid in pieces]
+            embeddings = [np.ones(96, dtype=np.float32)] * len(ids)
+            for _ in range(20):
+                vector_db.add_items("pieces", embeddings=embeddings, ids=ids, upsert=True)
+            num_lines = len(log_path.read_text().splitlines())
+            assert num_lines <= 2 * vector_db_module.OUTFIT_INDEX_COMPACT_MIN_LINES + len(ids), num_lines
+            assert vector_db.get_outfit_piece_ids("pieces", ["100", "200", "300"]) == expected
+            assert VectorDB(path=tmp_dir).get_outfit_piece_ids("pieces", ["100", "200", "300"]) == expected
+
+            # Log inchado por versões antigas: compactado ao carregar
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"+{pid}\n" for pid in ids) * 10 + "-999/1.jpg\n")
+            reloaded = VectorDB(path=tmp_dir)
+            assert len(log_path.read_text().splitlines()) == len(ids)
+            assert reloaded.get_outfit_piece_ids("pieces", ["100", "200", "300"]) == expected
+    finally:
+        vector_db_module.OUTFIT_INDEX_COMPACT_MIN_LINES = min_lines
+
+    print(f"✅ Log compactado ({num_lines} linhas após 20 re-indexações de {len(ids)} peças)")
+
+
+def test_memory_mirror_matches_chromadb():
+    """
+    Testa se o espelho em memória reproduz a ordenação por cosseno do ChromaDB
+    """
+    print("\n🧪 Testando espelho em memória vs ChromaDB...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_db = VectorDB(path=tmp_dir)
+        vector_db.get_or_create_collection("pieces")
+
+        rng = np.random.default_rng(42)
+        num_pieces = 300
+        ids = [f"{i // 3}/{i % 3}.jpg" for i in range(num_pieces)]
+        embeddings = rng.standard_normal((num_pieces, 96)).astype(np.float32)
+        categories = ["tops", "bottoms", "shoes"]
+        metadatas = [{"category": categories[i % 3], "outfit_id": str(i // 3)} for i in range(num_pieces)]
+        # Chave ausente em parte das linhas: {"texture": ""} não casa com elas no ChromaDB
+        for i in range(0, num_pieces, 2):
+            metadatas[i]["texture"] = "lisa" if i % 4 == 0 else ""
+        vector_db.add_items("pieces", embeddings=list(embeddings), ids=ids, metadatas=metadatas)
+
+        queries = rng.standard_normal((5, 96)).astype(np.float32)
+        filters = [
+            None,
+            {"category": "tops"},
+            {"texture": ""},
+            {"texture": {"$in": ["", "lisa"]}},
+        ]
+        expected = {
+            (q, str(f)): vector_db.search_similar("pieces", queries[q], n_results=10, filter_dict=f)
+            for q in range(len(queries)) for f in filters
+        }
+        expected_outfits = vector_db.get_pieces_by_outfits_batch("pieces", ["0", "7"])
+
+        assert vector_db.enable_memory_mirror("pieces") == num_pieces
+
+        for q in range(len(queries)):
+            for f in filters:
+                result = vector_db.search_similar("pieces", queries[q], n_results=10, filter_dict=f)
+                assert result['ids'] == expected[(q, str(f))]['ids'], f"Ordenação divergente (query {q}, filtro {f})"
+                np.testing.assert_allclose(
+                    result['distances'][0], expected[(q, str(f))]['distances'][0], atol=1e-5
+                )
+                assert result['metadatas'] == expected[(q, str(f))]['metadatas'], f"Metadados divergentes (filtro {f})"
+
+        outfits = vector_db.get_pieces_by_outfits_batch("pieces", ["0", "7"])
+        for outfit_id in ["0", "7"]:
+            for piece, expected_piece in zip(outfits[outfit_id], expected_outfits[outfit_id]):
+                assert piece['piece_id'] == expected_piece['piece_id']
+                np.testing.assert_array_equal(
+                    np.asarray(piece['embedding'], dtype=np.float32),
+                    np.asarray(expected_piece['embedding'], dtype=np.float32)
+                )
+
+        # Snapshot memory-mapped recarregado por outra instância
+        reloaded = VectorDB(path=tmp_dir)
+        reloaded.enable_memory_mirror("pieces")
+        assert reloaded.search_similar("pieces", queries[0], n_results=10)['ids'] == expected[(0, "None")]['ids']
+        missing_filter = {"texture": ""}
+        assert (
+            reloaded.search_similar("pieces", queries[0], n_results=10, filter_dict=missing_filter)['ids']
+            == expected[(0, str(missing_filter))]['ids']
+        )
+
+        # Escrita na coleção desativa o espelho
+        vector_db.add_item("pieces", embeddings[0], "999/1.jpg")
+        result = vector_db.search_similar("pieces", embeddings[0], n_results=2)
+        assert "999/1.jpg" in result['ids'][0]
+
+        print("✅ Espelho em memória consistente com o ChromaDB")
+
+
+def test_fingerprint_and_write_listeners():
+    """
+    Testa o fingerprint persistente da coleção e a notificação de escritas
+    """
+    print("\n🧪 Testando fingerprint e listeners de escrita...\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_db = VectorDB(path=tmp_dir)
+        _populate(vector_db)
+        writes = []
+        vector_db.add_write_listener(writes.append)
+
+        # Estável entre leituras e entre instâncias (reinício do processo)
+        fingerprint = vector_db.fingerprint("pieces")
+        assert vector_db.fingerprint("pieces") == fingerprint
+        assert VectorDB(path=tmp_dir).fingerprint("pieces") == fingerprint
+        assert vector_db.fingerprint("other") != fingerprint
+
+        # Escrita renova o fingerprint, também para outras instâncias sobre o mesmo diretório
+        other = VectorDB(path=tmp_dir)
+        assert other.fingerprint("pieces") == fingerprint
+        vector_db.add_item("pieces", np.ones(96, dtype=np.float32), "400/1.jpg")
+        renewed = vector_db.fingerprint("pieces")
+        assert renewed != fingerprint
+        assert other.fingerprint("pieces") == renewed
+        assert VectorDB(path=tmp_dir).fingerprint("pieces") == renewed
+        vector_db.delete_items("pieces", ["400/1.jpg"])
+        assert vector_db.fingerprint("pieces") not in (fingerprint, renewed)
+        assert writes == ["pieces", "pieces"], writes
+
+        print("✅ Fingerprint persistente e renovado a cada escrita")
+
+
+if __name__ == "__main__":
+    test_outfit_index_batch_lookup()
+    test_outfit_index_sync_and_reload()
+    test_outfit_index_log_compaction()
+    test_memory_mirror_matches_chromadb()
+    test_fingerprint_and_write_listeners()
@@ -0,0 +1,302 @@
+"""
+Cache de thumbnails pré-comprimados das imagens do catálogo
+
+As imagens de archive/images nunca mudam, então a recompressão JPEG feita a
+cada sugestão pode ser feita uma única vez (build offline) e reaproveitada:
+
+1. Disco: bytes já comprimidos, endereçados pelo SHA-256 da imagem original
+   e pela variante (formato, tamanho, qualidade):
+   <cache_dir>/<sha[:2]>/<sha>_<variante>.<ext>
+2. Memória: LRU limitado das strings base64 prontas para a resposta da API
+
+Uma requisição com acerto na LRU não faz I/O nem trabalho de codec; com
+acerto no disco, apenas leitura de arquivo.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from .config import IMAGES_DIR, THUMBNAILS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Formatos suportados: nome -> (formato PIL, extensão)
+FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+}
+
+# Extensões de imagem consideradas no build offline
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def encode_thumbnail(
+    image_data: bytes,
+    fmt: str = "jpeg",
+    size: Optional[int] = None,
+    quality: int = 75
+) -> bytes:
+    """
+    Comprime uma imagem no formato/tamanho pedidos
+
+    Para fmt="jpeg" e size=None produz os mesmos bytes de
+    compress_image_to_jpeg(image_data, quality, return_base64=False).
+
+    Args:
+        image_data: Bytes da imagem original
+        fmt: "jpeg" ou "webp"
+        size: Maior lado em pixels (None mantém o tamanho original)
+        quality: Qualidade de compressão (1-100)
+
+    Returns:
+        Bytes da imagem comprimida
+    """
+    img = Image.open(io.BytesIO(image_data))
+
+    # Converter para RGB (fundo branco para imagens com transparência)
+    if img.mode in ('RGBA', 'P', 'LA'):
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        img = rgb_img
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    if size is not None and max(img.size) > size:
+        img.thumbnail((size, size), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if fmt == "jpeg":
+        img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    else:
+        img.save(buffer, format=FORMATS[fmt][0], quality=quality, method=4)
+    return buffer.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thumbnails endereçados por conteúdo em disco + LRU de base64 em memória
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        images_dir: Optional[Union[str, Path]] = None,
+        max_memory_items: int = 2000,
+        quality: int = 75,
+        size: Optional[int] = None
+    ):
+        """
+        Inicializa o cache
+
+        Args:
+            cache_dir: Diretório dos thumbnails (default: THUMBNAILS_DIR)
+            images_dir: Diretório das imagens originais (default: IMAGES_DIR)
+            max_memory_items: Máximo de strings base64 na LRU (0 desativa)
+            quality: Qualidade de compressão padrão
+            size: Maior lado padrão em pixels (None mantém o tamanho original)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else Path(THUMBNAILS_DIR)
+        self.images_dir = Path(images_dir) if images_dir is not None else Path(IMAGES_DIR)
+        self.max_memory_items = max_memory_items
+        self.quality = quality
+        self.size = size
+
+        self._memory: "OrderedDict[Tuple, str]" = OrderedDict()
+        # Digest da imagem original por (caminho, mtime, tamanho): evita reler/hashear o original
+        self._source_digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "encodes": 0, "missing": 0}
+
+    # ------------------------------------------------------------------
+    # Caminhos / endereçamento por conteúdo
+    # ------------------------------------------------------------------
+
+    def _variant(self, fmt: str, size: Optional[int], quality: Optional[int]) -> Tuple[str, Optional[int], int]:
+        """Normaliza a variante pedida usando os defaults do cache"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato não suportado: {fmt}. Use {', '.join(FORMATS)}")
+        return fmt, size if size is not None else self.size, quality if quality is not None else self.quality
+
+    def _source_digest(self, source_path: Path) -> Optional[str]:
+        """SHA-256 da imagem original (memoizado por mtime/tamanho)"""
+        try:
+            stat = source_path.stat()
+        except FileNotFoundError:
+            return None
+        stat_key = (str(source_path), stat.st_mtime_ns, stat.st_size)
+        digest = self._source_digests.get(stat_key)
+        if digest is None:
+            digest = hashlib.sha256(source_path.read_bytes()).hexdigest()
+            self._source_digests[stat_key] = digest
+        return digest
+
+    def _thumbnail_path(self, digest: str, fmt: str, size: Optional[int], quality: int) -> Path:
+        """Caminho do thumbnail endereçado pelo digest do original e pela variante"""
+        variant = f"{fmt}_{size or 'orig'}_q{quality}"
+        return self.cache_dir / digest[:2] / f"{digest}_{variant}.{FORMATS[fmt][1]}"
+
+    def get_path(
+        self,
+        outfit_id: str,
+        piece_name: str,
+        fmt: str = "jpeg",
+        size: Optional[int] = None,
+        quality: Optional[int] = None
+    ) -> Optional[Path]:
+        """
+        Retorna o caminho do thumbnail, gerando-o (uma única vez) se necessário
+
+        Args:
+            outfit_id: ID do outfit
+            piece_name: Nome do arquivo da peça (ex: "1.jpg")
+            fmt: "jpeg" ou "webp"
+            size: Maior lado em pixels (default: self.size)
+            quality: Qualidade de compressão (default: self.quality)
+
+        Returns:
+            Path do thumbnail ou None se a imagem original não existir
+        """
+        fmt, size, quality = self._variant(fmt, size, quality)
+        source_path = self.images_dir / outfit_id / piece_name
+        digest = self._source_digest(source_path)
+        if digest is None:
+            self.stats["missing"] += 1
+            return None
+
+        path = self._thumbnail_path(digest, fmt, size, quality)
+        if path.exists():
+            self.stats["disk_hits"] += 1
+            return path
+
+        data = encode_thumbnail(source_path.read_bytes(), fmt, size, quality)
+        self.stats["encodes"] += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escrita atômica: requisições concorrentes nunca leem arquivo parcial
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return path
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def get_bytes(
+        self,
+        outfit_id: str,
+        piece_name: str,
+        fmt: str = "jpeg",
+        size: Optional[int] = None,
+        quality: Optional[int] = None
+    ) -> Optional[bytes]:
+        """Bytes comprimidos do thumbnail (None se a imagem original não existir)"""
+        path = self.get_path(outfit_id, piece_name, fmt, size, quality)
+        return path.read_bytes() if path is not None else None
+
+    def get_base64(
+        self,
+        outfit_id: str,
+        piece_name: str,
+        fmt: str = "jpeg",
+        size: Optional[int] = None,
+        quality: Optional[int] = None
+    ) -> str:
+        """
+        String base64 do thumbnail, servida da LRU em memória quando possível
+
+        Returns:
+            String base64 ou "" se a imagem original não existir
+        """
+        key = (outfit_id, piece_name) + self._variant(fmt, size, quality)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return cached
+
+        data = self.get_bytes(outfit_id, piece_name, *key[2:])
+        if data is None:
+            return ""
+        encoded = base64.b64encode(data).decode('utf-8')
+
+        if self.max_memory_items > 0:
+            with self._lock:
+                self._memory[key] = encoded
+                self._memory.move_to_end(key)
+                while len(self._memory) > self.max_memory_items:
+                    self._memory.popitem(last=False)
+        return encoded
+
+    def clear_memory(self) -> None:
+        """Esvazia a LRU em memória (thumbnails em disco são mantidos)"""
+        with self._lock:
+            self._memory.clear()
+
+    # ------------------------------------------------------------------
+    # Build offline
+    # ------------------------------------------------------------------
+
+    def iter_catalogue_images(self, outfit_ids: Optional[Iterable[str]] = None) -> Iterable[Tuple[str, str]]:
+        """Itera (outfit_id, piece_name) das imagens do catálogo"""
+        if outfit_ids is None:
+            outfit_dirs = sorted(p for p in self.images_dir.iterdir() if p.is_dir())
+        else:
+            outfit_dirs = [self.images_dir / str(outfit_id) for outfit_id in outfit_ids]
+        for outfit_dir in outfit_dirs:
+            if not outfit_dir.is_dir():
+                continue
+            for image_path in sorted(outfit_dir.iterdir()):
+                if image_path.suffix.lower() in IMAGE_EXTENSIONS:
+                    yield outfit_dir.name, image_path.name
+
+    def build(
+        self,
+        outfit_ids: Optional[Iterable[str]] = None,
+        formats: List[str] = ("jpeg",),
+        sizes: List[Optional[int]] = (None,),
+        quality: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Gera offline os thumbnails de todas as imagens do catálogo
+
+        Variantes já existentes em disco são puladas, então o build pode ser
+        reexecutado de forma incremental.
+
+        Args:
+            outfit_ids: Outfits a processar (default: todos em images_dir)
+            formats: Formatos a gerar ("jpeg", "webp")
+            sizes: Maiores lados a gerar (None = tamanho padrão do cache)
+            quality: Qualidade de compressão (default: self.quality)
+
+        Returns:
+            Dict com contadores: images, encoded, skipped, errors
+        """
+        counts = {"images": 0, "encoded": 0, "skipped": 0, "errors": 0}
+        for outfit_id, piece_name in self.iter_catalogue_images(outfit_ids):
+            counts["images"] += 1
+            for fmt in formats:
+                for size in sizes:
+                    encodes_before = self.stats["encodes"]
+                    try:
+                        self.get_path(outfit_id, piece_name, fmt, size, quality)
+                    except Exception as e:
+                        counts["errors"] += 1
+                        logger.error(f"Erro ao gerar thumbnail {outfit_id}/{piece_name} ({fmt}, {size}): {e}")
+                        continue
+                    if self.stats["encodes"] > encodes_before:
+                        counts["encoded"] += 1
+                    else:
+                        counts["skipped"] += 1
+        return counts
@@ -0,0 +1,349 @@
+"""
+Instrumentação por spans e histogramas por etapa
+
+Substitui os pares time.time() + logger.info("[TIMER] ...") espalhados pelo
+pipeline: cada etapa vira um span (context manager ou decorator) com
+aninhamento, e a duração de cada span alimenta um histograma por nome de
+etapa, exposto no formato texto do Prometheus (GET /metrics).
+
+    from modules.tracing import tracer
+
+    with tracer.span("suggestion.search") as span:
+        results = search(...)
+        span.set(results=len(results))
+
+    @tracer.traced("suggestion.persist")
+    def persist(...): ...
+
+- Atributos (span.set) não viram labels do Prometheus (cardinalidade): vão
+  para o log de resumo e para o exporter OpenTelemetry
+- Ao terminar um span raiz, um resumo com a árvore de etapas é logado em
+  DEBUG (a formatação só acontece se o nível DEBUG estiver ativo)
+- Exporter OpenTelemetry (OTLP/gRPC) opcional: configure(otel_endpoint=...)
+- Desativado, span() devolve um span no-op compartilhado: uma checagem de
+  flag por etapa, sem relógio, lock ou alocação
+
+O contexto do span atual é um contextvar: spans abertos dentro de coroutines
+aninham normalmente; funções executadas em pools de threads
+(run_in_executor) não herdam o contexto e abrem spans raiz.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import TRACING_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (segundos) dos buckets dos histogramas
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("blindstyle_span", default=None)
+
+
+class _Histogram:
+    """Histograma de durações (contagens por bucket, soma e total)"""
+
+    __slots__ = ("counts", "sum", "count", "errors")
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # último bucket = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+
+class _NoopSpan:
+    """Span usado com a instrumentação desativada"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Etapa em andamento; registrada no histograma do nome ao sair do bloco"""
+
+    __slots__ = ("tracer", "name", "attributes", "start", "duration", "children", "_root", "_token", "_otel")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.duration = 0.0
+        self.children: List["Span"] = []
+        self._otel = None
+
+    def set(self, **attributes: Any) -> None:
+        """Adiciona atributos ao span (ex: número de resultados, hit de cache)"""
+        self.attributes.update(attributes)
+        if self._otel is not None:
+            for key, value in attributes.items():
+                self._otel[1].set_attribute(key, _otel_value(value))
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self._root = parent is None
+        if parent is not None:
+            parent.children.append(self)
+        self._token = _current_span.set(self)
+        otel_tracer = self.tracer._otel_tracer
+        if otel_tracer is not None:
+            manager = otel_tracer.start_as_current_span(
+                self.name, attributes={key: _otel_value(value) for key, value in self.attributes.items()}
+            )
+            self._otel = (manager, manager.__enter__())
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if self._otel is not None:
+            self._otel[0].__exit__(exc_type, exc, traceback)
+        self.tracer._record(self.name, self.duration, error=exc_type is not None)
+        if self._root and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[TRACE] {self.summary()}")
+        return False
+
+    def summary(self, indent: int = 0) -> str:
+        """Árvore do span e dos filhos com durações e atributos"""
+        attributes = "".join(f" {key}={value}" for key, value in self.attributes.items())
+        lines = [f"{'  ' * indent}{self.name}: {self.duration * 1000:.1f}ms{attributes}"]
+        lines.extend(child.summary(indent + 1) for child in self.children)
+        return "\n".join(lines)
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Tracer:
+    """
+    Fábrica de spans e registro dos histogramas por etapa
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        namespace: str = "blindstyle"
+    ):
+        """
+        Args:
+            enabled: Se False, span()/traced() não medem nada
+            buckets: Limites superiores dos buckets dos histogramas (segundos)
+            namespace: Prefixo das métricas Prometheus
+        """
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._histograms: Dict[str, _Histogram] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._otel_tracer = None
+
+    # ------------------------------------------------------------------
+    # Configuração
+    # ------------------------------------------------------------------
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        otel_endpoint: Optional[str] = None,
+        service_name: str = "blindstyle-api"
+    ) -> None:
+        """
+        Ativa/desativa a instrumentação e, opcionalmente, o exporter OpenTelemetry
+
+        Args:
+            enabled: Novo estado (None mantém o atual)
+            otel_endpoint: Endpoint OTLP/gRPC (ex: http://localhost:4317); None não exporta
+            service_name: service.name dos spans exportados
+        """
+        if enabled is not None:
+            self.enabled = enabled
+        if otel_endpoint and self.enabled:
+            self._otel_tracer = self._create_otel_tracer(otel_endpoint, service_name)
+
+    @staticmethod
+    def _create_otel_tracer(endpoint: str, service_name: str):
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            logger.warning(f"OpenTelemetry indisponível, spans não serão exportados: {e}")
+            return None
+
+        # Provider próprio (não o global): não interfere na telemetria de outras bibliotecas
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        logger.info(f"Exportando spans via OTLP para {endpoint}")
+        return provider.get_tracer("blindstyle")
+
+    # ------------------------------------------------------------------
+    # Spans
+    # ------------------------------------------------------------------
+
+    def span(self, name: str, **attributes: Any):
+        """
+        Context manager que mede uma etapa
+
+        Args:
+            name: Nome da etapa (vira o label span do histograma)
+            **attributes: Atributos do span (log de resumo e OpenTelemetry)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorator que executa a função (sync ou async) dentro de um span
+
+        Args:
+            name: Nome da etapa (default: módulo.função)
+        """
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with Span(self, span_name, {}):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        """Registra uma duração medida fora de um span (ex: tempo em fila)"""
+        if self.enabled:
+            self._record(name, seconds, error)
+
+    def _record(self, name: str, seconds: float, error: bool) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+            if error:
+                histogram.errors += 1
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def register_gauges(self, prefix: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Expõe os valores numéricos de um dict de estatísticas como gauges
+
+        Args:
+            prefix: Prefixo das métricas (ex: "feature_cache" -> blindstyle_feature_cache_hits)
+            collect: Função chamada a cada scrape (ex: ResultCache.get_stats)
+        """
+        self._gauges[prefix] = collect
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Estatísticas por etapa
+
+        Returns:
+            Dict nome -> {count, sum, errors, buckets {limite: contagem acumulada}}
+        """
+        with self._lock:
+            histograms = {
+                name: (list(h.counts), h.sum, h.count, h.errors) for name, h in self._histograms.items()
+            }
+        snapshot = {}
+        for name, (counts, total, count, errors) in histograms.items():
+            cumulative, buckets = 0, {}
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                buckets[bound] = cumulative
+            snapshot[name] = {"count": count, "sum": total, "errors": errors, "buckets": buckets}
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        """
+        Métricas no formato texto de exposição do Prometheus (version 0.0.4)
+        """
+        metric = f"{self.namespace}_span_duration_seconds"
+        errors_metric = f"{self.namespace}_span_errors_total"
+        snapshot = self.snapshot()
+
+        lines = [
+            f"# HELP {metric} Duração das etapas instrumentadas",
+            f"# TYPE {metric} histogram",
+        ]
+        for name, stats in sorted(snapshot.items()):
+            label = f'span="{_escape_label(name)}"'
+            for bound, count in stats["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{{label},le="{le}"}} {count}')
+            lines.append(f"{metric}_sum{{{label}}} {stats['sum']:.6f}")
+            lines.append(f"{metric}_count{{{label}}} {stats['count']}")
+
+        lines.append(f"# HELP {errors_metric} Etapas encerradas com exceção")
+        lines.append(f"# TYPE {errors_metric} counter")
+        for name, stats in sorted(snapshot.items()):
+            lines.append(f'{errors_metric}{{span="{_escape_label(name)}"}} {stats["errors"]}')
+
+        for prefix, collect in sorted(self._gauges.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning(f"Falha ao coletar métricas {prefix}: {e}")
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                gauge = f"{self.namespace}_{prefix}_{key}"
+                lines.append(f"# TYPE {gauge} gauge")
+                lines.append(f"{gauge} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Zera os histogramas (testes e benchmarks)"""
+        with self._lock:
+            self._histograms.clear()
+
+
+# Instância compartilhada pelo pipeline (configurada em src/main.py a partir das settings)
+tracer = Tracer(enabled=TRACING_ENABLED)
@@ -1,18 +1,387 @@
+import logging
+import os
+import threading
+import uuid
 import chromadb
 from chromadb.config import Settings
-from typing import Dict, List, Optional, Any, Union
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Union, Iterable, Tuple
 import numpy as np
 from .config import VECTOR_DB_DIR
+from .vector_mirror import EmbeddingMirror
+
+logger = logging.getLogger(__name__)
+
+# Nome do subdiretório (dentro do diretório do ChromaDB) com os índices outfit -> peças
+OUTFIT_INDEX_DIRNAME = "outfit_index"
+
+# Compactação do log do índice: quando mais que esta fração das linhas está morta
+# (re-upserts e remoções) e o log tem ao menos OUTFIT_INDEX_COMPACT_MIN_LINES linhas
+OUTFIT_INDEX_COMPACT_RATIO = 0.5
+OUTFIT_INDEX_COMPACT_MIN_LINES = 1000
+
+# Nome do subdiretório com snapshots .npy dos espelhos em memória
+MIRROR_DIRNAME = "mirror"
+
+# Nome do subdiretório com o fingerprint persistente de cada coleção
+FINGERPRINT_DIRNAME = "fingerprint"
+
 
 class VectorDB:
-    def __init__(self):
-        """Inicializa conexão com ChromaDB"""
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa conexão com ChromaDB
+        
+        Args:
+            path: Diretório do banco persistente (default: VECTOR_DB_DIR)
+        """
+        self.path = Path(path) if path is not None else Path(VECTOR_DB_DIR)
         self.client = chromadb.PersistentClient(
-            path=str(VECTOR_DB_DIR),
+            path=str(self.path),
             settings=Settings(
                 anonymized_telemetry=False
             )
         )
+        
+        # Índice persistente outfit_id -> [piece_ids] por coleção
+        # IDs de peças têm formato "outfit_id/piece_name"; IDs sem "/" são ignorados
+        self._outfit_index_dir = self.path / OUTFIT_INDEX_DIRNAME
+        self._outfit_index: Dict[str, Dict[str, List[str]]] = {}
+        # Linhas do log e linhas mortas por coleção (critério de compactação)
+        self._outfit_log_lines: Dict[str, int] = {}
+        self._outfit_log_dead: Dict[str, int] = {}
+        self._outfit_index_lock = threading.Lock()
+        self._load_outfit_indexes()
+        
+        # Espelhos NumPy de coleções somente leitura (ver enable_memory_mirror)
+        self._mirror_dir = self.path / MIRROR_DIRNAME
+        self._mirrors: Dict[str, EmbeddingMirror] = {}
+        
+        # Revisão por coleção, incrementada a cada escrita (invalida caches derivados)
+        self._revisions: Dict[str, int] = {}
+        
+        # Fingerprint persistente por coleção, renovado a cada escrita (ver fingerprint)
+        self._fingerprint_dir = self.path / FINGERPRINT_DIRNAME
+        self._fingerprints: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._write_listeners: List[Callable[[str], None]] = []
+    
+    # ------------------------------------------------------------------
+    # Espelho em memória (busca exata sem round trip ao ChromaDB)
+    # ------------------------------------------------------------------
+    
+    def enable_memory_mirror(
+        self,
+        collection_name: str,
+        use_snapshot: bool = True,
+        mmap: bool = True,
+        refresh: bool = False
+    ) -> int:
+        """
+        Carrega a coleção em memória para responder search_similar e
+        get_pieces_by_outfits_batch com busca exata em NumPy
+        
+        Indicado para coleções somente leitura (catálogo "pieces"). Qualquer
+        escrita na coleção desativa o espelho e remove o snapshot.
+        
+        Args:
+            collection_name: Nome da coleção
+            use_snapshot: Se True, lê/grava snapshot .npy em <chroma>/mirror
+            mmap: Se True, a matriz do snapshot é memory-mapped
+            refresh: Se True, ignora o snapshot existente e relê a coleção
+            
+        Returns:
+            Número de vetores carregados
+        """
+        mirror = None
+        if use_snapshot and not refresh:
+            mirror = EmbeddingMirror.load(self._mirror_dir, collection_name, mmap=mmap)
+        
+        if mirror is None:
+            mirror = EmbeddingMirror.from_collection(self.get_collection(collection_name))
+            if use_snapshot:
+                mirror.save(self._mirror_dir, collection_name)
+                if mmap:
+                    mirror = EmbeddingMirror.load(self._mirror_dir, collection_name, mmap=True)
+        
+        self._mirrors[collection_name] = mirror
+        logger.info(f"Espelho em memória da coleção {collection_name}: {len(mirror)} vetores")
+        return len(mirror)
+    
+    def disable_memory_mirror(self, collection_name: str) -> None:
+        """Desativa o espelho em memória de uma coleção (snapshot é mantido)"""
+        self._mirrors.pop(collection_name, None)
+    
+    def revision(self, collection_name: str) -> int:
+        """
+        Número de escritas na coleção feitas por esta instância
+        
+        Caches de resultados derivados da coleção (ex: sugestões) incluem a
+        revisão na chave e são invalidados por reindexações em processo.
+        """
+        return self._revisions.get(collection_name, 0)
+    
+    def fingerprint(self, collection_name: str) -> str:
+        """
+        Identificador persistente do conteúdo da coleção
+        
+        Renovado a cada escrita feita por qualquer instância sobre o mesmo
+        diretório e mantido entre reinícios (ao contrário de revision()).
+        Caches persistidos derivados da coleção (cache de projeções, tier
+        SQLite das sugestões) incluem o fingerprint na chave ou nos metadados.
+        
+        Args:
+            collection_name: Nome da coleção
+            
+        Returns:
+            Fingerprint (hex)
+        """
+        path = self._fingerprint_path(collection_name)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Coleção sem escritas registradas: cria o fingerprint (exclusivo entre processos)
+            self._write_fingerprint(path, exclusive=True)
+            stat = path.stat()
+        
+        # Relê o arquivo apenas quando outra escrita o substituiu
+        version = (stat.st_ino, stat.st_mtime_ns)
+        cached = self._fingerprints.get(collection_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = path.read_text().strip()
+        self._fingerprints[collection_name] = (version, value)
+        return value
+    
+    def _fingerprint_path(self, collection_name: str) -> Path:
+        return self._fingerprint_dir / collection_name
+    
+    @staticmethod
+    def _write_fingerprint(path: Path, exclusive: bool = False) -> None:
+        """Grava um fingerprint novo de forma atômica (exclusive: não sobrescreve um existente)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(uuid.uuid4().hex)
+        try:
+            if exclusive:
+                try:
+                    os.link(tmp_path, path)
+                except FileExistsError:
+                    pass
+            else:
+                os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
+    def add_write_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Registra uma função chamada após cada escrita em uma coleção
+        
+        Usada para descartar caches derivados mantidos fora do VectorDB
+        (ex: cache de projeções do ModelPredictor).
+        
+        Args:
+            listener: Função que recebe o nome da coleção alterada
+        """
+        self._write_listeners.append(listener)
+    
+    def _invalidate_derived_caches(self, collection_name: str) -> None:
+        """Descarta espelho, snapshot e caches derivados após escrita na coleção"""
+        self._revisions[collection_name] = self._revisions.get(collection_name, 0) + 1
+        self._write_fingerprint(self._fingerprint_path(collection_name))
+        if self._mirrors.pop(collection_name, None) is not None:
+            logger.warning(f"Coleção {collection_name} alterada: espelho em memória desativado")
+        EmbeddingMirror.delete_snapshot(self._mirror_dir, collection_name)
+        for listener in self._write_listeners:
+            try:
+                listener(collection_name)
+            except Exception as e:
+                logger.error(f"Erro invalidando cache derivado da coleção {collection_name}: {e}")
+    
+    def get_collection_matrix(self, collection_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lê a coleção inteira como matriz (usa o espelho em memória se ativo)
+        
+        Args:
+            collection_name: Nome da coleção
+        
+        Returns:
+            Tuple (ids (N,) array de str, embeddings (N, dim) float32)
+        """
+        mirror = self._mirrors.get(collection_name)
+        if mirror is None:
+            mirror = EmbeddingMirror.from_collection(self.get_collection(collection_name))
+        return mirror.ids, mirror.embeddings
+    
+    # ------------------------------------------------------------------
+    # Índice outfit_id -> piece_ids
+    # ------------------------------------------------------------------
+    
+    def _outfit_index_path(self, collection_name: str) -> Path:
+        """Caminho do log do índice de outfits de uma coleção"""
+        return self._outfit_index_dir / f"{collection_name}.log"
+    
+    @staticmethod
+    def _split_piece_id(piece_id: str) -> Optional[tuple]:
+        """Separa "outfit_id/piece_name" em (outfit_id, piece_name), ou None"""
+        parts = piece_id.split('/')
+        if len(parts) < 2:
+            return None
+        return parts[0], parts[1]
+    
+    def _apply_to_index(self, index: Dict[str, List[str]], op: str, piece_id: str) -> int:
+        """
+        Aplica uma operação ("+" adiciona, "-" remove) ao índice em memória
+        
+        Returns:
+            Linhas do log que a operação torna mortas: 0 para uma adição nova,
+            1 para um "+" repetido ou um "-" sem efeito, 2 para uma remoção
+            (o "-" e o "+" anterior)
+        """
+        split = self._split_piece_id(piece_id)
+        if split is None:
+            return 1
+        outfit_id = split[0]
+        if op == "+":
+            pieces = index.setdefault(outfit_id, [])
+            if piece_id in pieces:
+                return 1
+            pieces.append(piece_id)
+            return 0
+        pieces = index.get(outfit_id)
+        if pieces and piece_id in pieces:
+            pieces.remove(piece_id)
+            if not pieces:
+                del index[outfit_id]
+            return 2
+        return 1
+    
+    def _replay_outfit_index_log(self, log_path: Path) -> Tuple[Dict[str, List[str]], int, int]:
+        """
+        Reaplica o log persistido de um índice
+        
+        Returns:
+            Tuple (índice, linhas do log, linhas mortas)
+        """
+        index: Dict[str, List[str]] = {}
+        lines = dead = 0
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if len(line) > 1:
+                    dead += self._apply_to_index(index, line[0], line[1:])
+                    lines += 1
+        return index, lines, dead
+    
+    def _load_outfit_indexes(self) -> None:
+        """Carrega (na inicialização) todos os índices de outfits persistidos, compactando logs inchados"""
+        if not self._outfit_index_dir.exists():
+            return
+        for log_path in self._outfit_index_dir.glob("*.log"):
+            collection_name = log_path.stem
+            index, lines, dead = self._replay_outfit_index_log(log_path)
+            self._outfit_index[collection_name] = index
+            self._outfit_log_lines[collection_name] = lines
+            self._outfit_log_dead[collection_name] = dead
+            if self._outfit_log_needs_compaction(collection_name):
+                self._write_outfit_index_log_locked(collection_name, index)
+    
+    def _outfit_log_needs_compaction(self, collection_name: str) -> bool:
+        lines = self._outfit_log_lines.get(collection_name, 0)
+        dead = self._outfit_log_dead.get(collection_name, 0)
+        return lines >= OUTFIT_INDEX_COMPACT_MIN_LINES and dead > lines * OUTFIT_INDEX_COMPACT_RATIO
+    
+    def _write_outfit_index_log_locked(self, collection_name: str, index: Dict[str, List[str]]) -> None:
+        """Regrava o log com uma linha "+id" por peça do índice (troca atômica; requer lock)"""
+        self._outfit_index_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self._outfit_index_path(collection_name)
+        tmp_path = log_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for pieces in index.values():
+                f.write("".join(f"+{pid}\n" for pid in pieces))
+        tmp_path.replace(log_path)
+        self._outfit_log_lines[collection_name] = sum(len(pieces) for pieces in index.values())
+        self._outfit_log_dead[collection_name] = 0
+    
+    def _compact_outfit_index_locked(self, collection_name: str) -> None:
+        """
+        Compacta o log do índice (requer lock)
+        
+        Reaplica o log do disco, e não o índice em memória, para preservar
+        operações gravadas por outros processos sobre o mesmo diretório.
+        """
+        index, _, _ = self._replay_outfit_index_log(self._outfit_index_path(collection_name))
+        self._write_outfit_index_log_locked(collection_name, index)
+        self._outfit_index[collection_name] = index
+        logger.info(f"Log do índice de outfits de {collection_name} compactado: {self._outfit_log_lines[collection_name]} linhas")
+    
+    def _record_in_outfit_index(self, collection_name: str, op: str, ids: Iterable[str]) -> None:
+        """
+        Atualiza o índice em memória e acrescenta as operações ao log persistente
+        
+        O log é append-only (uma linha "+id" ou "-id" por operação), de modo que
+        cada escrita custa O(len(ids)) independente do tamanho do catálogo.
+        Re-upserts e remoções deixam linhas mortas; o log é compactado quando
+        elas passam de OUTFIT_INDEX_COMPACT_RATIO das linhas.
+        """
+        piece_ids = [pid for pid in ids if self._split_piece_id(pid) is not None]
+        if not piece_ids:
+            return
+        with self._outfit_index_lock:
+            index = self._get_outfit_index_locked(collection_name)
+            dead = 0
+            for piece_id in piece_ids:
+                dead += self._apply_to_index(index, op, piece_id)
+            self._outfit_index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._outfit_index_path(collection_name), "a", encoding="utf-8") as f:
+                f.write("".join(f"{op}{pid}\n" for pid in piece_ids))
+            self._outfit_log_lines[collection_name] = self._outfit_log_lines.get(collection_name, 0) + len(piece_ids)
+            self._outfit_log_dead[collection_name] = self._outfit_log_dead.get(collection_name, 0) + dead
+            if self._outfit_log_needs_compaction(collection_name):
+                self._compact_outfit_index_locked(collection_name)
+    
+    def _get_outfit_index_locked(self, collection_name: str) -> Dict[str, List[str]]:
+        """Retorna o índice da coleção, reconstruindo-o se ainda não existir (requer lock)"""
+        index = self._outfit_index.get(collection_name)
+        if index is None:
+            index = self._rebuild_outfit_index_locked(collection_name)
+        return index
+    
+    def _rebuild_outfit_index_locked(self, collection_name: str) -> Dict[str, List[str]]:
+        """Reconstrói o índice a partir dos IDs da coleção e regrava o log compactado"""
+        index: Dict[str, List[str]] = {}
+        try:
+            all_ids = self.get_collection(collection_name).get(include=[])['ids']
+        except Exception:
+            all_ids = []
+        for piece_id in all_ids:
+            self._apply_to_index(index, "+", piece_id)
+        
+        self._write_outfit_index_log_locked(collection_name, index)
+        self._outfit_index[collection_name] = index
+        return index
+    
+    def rebuild_outfit_index(self, collection_name: str) -> int:
+        """
+        Reconstrói o índice outfit_id -> piece_ids varrendo a coleção uma única vez
+        
+        Útil para coleções populadas antes da existência do índice.
+        
+        Returns:
+            Número de outfits indexados
+        """
+        with self._outfit_index_lock:
+            return len(self._rebuild_outfit_index_locked(collection_name))
+    
+    def get_outfit_piece_ids(self, collection_name: str, outfit_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Consulta o índice outfit_id -> piece_ids (sem acessar o ChromaDB)
+        
+        Returns:
+            Dicionário {outfit_id: [piece_ids]} (lista vazia se o outfit não existir)
+        """
+        with self._outfit_index_lock:
+            index = self._get_outfit_index_locked(collection_name)
+            return {outfit_id: list(index.get(outfit_id, [])) for outfit_id in outfit_ids}
     
     def _normalize_embedding_to_float32(self, embedding: Union[np.ndarray, List[float]]) -> List[float]:
         """
@@ -61,6 +430,10 @@ class VectorDB:
     def delete_collection(self, name: str) -> None:
         """Deleta uma coleção"""
         self.client.delete_collection(name)
+        with self._outfit_index_lock:
+            self._outfit_index.pop(name, None)
+            self._outfit_index_path(name).unlink(missing_ok=True)
+        self._invalidate_derived_caches(name)
     
     def list_collections(self) -> List[str]:
         """Lista todas as coleções existentes"""
@@ -71,8 +444,8 @@ class VectorDB:
         collection_name: str,
         embeddings: List[Union[List[float], np.ndarray]],
         ids: List[str],
-        metadatas: Optional[List[Dict]] = None
-
+        metadatas: Optional[List[Dict]] = None,
+        upsert: bool = False
     ) -> None:
         """
         Adiciona itens a uma coleção
@@ -82,6 +455,7 @@ class VectorDB:
             embeddings: Lista de embeddings (aceita np.ndarray ou list)
             ids: Lista de IDs únicos
             metadatas: Lista de metadados (opcional)
+            upsert: Se True, sobrescreve itens com IDs já existentes (re-indexação)
         """
         # Normaliza todos embeddings para float32
         normalized_embeddings = [
@@ -89,11 +463,14 @@ class VectorDB:
         ]
         
         collection = self.get_collection(collection_name)
-        collection.add(
+        write = collection.upsert if upsert else collection.add
+        write(
             embeddings=normalized_embeddings,
             metadatas=metadatas,
             ids=ids
         )
+        self._record_in_outfit_index(collection_name, "+", ids)
+        self._invalidate_derived_caches(collection_name)
         
     def add_item(
         self,
@@ -120,6 +497,8 @@ class VectorDB:
             metadatas=metadata,
             ids=id
         )
+        self._record_in_outfit_index(collection_name, "+", [id])
+        self._invalidate_derived_caches(collection_name)
     
     def search_similar(
         self,
@@ -137,6 +516,10 @@ class VectorDB:
             n_results: Número de resultados
             filter_dict: Filtros a aplicar
         """
+        mirror = self._mirrors.get(collection_name)
+        if mirror is not None and mirror.supports_filter(filter_dict):
+            return mirror.query(query_embedding, n_results=n_results, filter_dict=filter_dict)
+        
         # Normaliza query embedding para float32
         normalized_query = self._normalize_embedding_to_float32(query_embedding)
         
@@ -165,6 +548,8 @@ class VectorDB:
         """Deleta itens de uma coleção por IDs"""
         collection = self.get_collection(collection_name)
         collection.delete(ids=ids)
+        self._record_in_outfit_index(collection_name, "-", ids)
+        self._invalidate_derived_caches(collection_name)
 
     def get_pieces_by_outfit(self, collection_name: str, outfit_id: str) -> List[Dict]:
         """
@@ -177,23 +562,7 @@ class VectorDB:
         Returns:
             Lista de dicionários com informações das peças
         """
-        collection = self.get_collection(collection_name)
-        # Busca apenas IDs que começam com o outfit_id específico
-        # IDs têm formato: "outfit_id/piece_name.jpg"
-        results = collection.get(include=['embeddings'])
-        
-        pieces = []
-        for doc_id, embedding in zip(results['ids'], results['embeddings']):
-            if doc_id.startswith(f"{outfit_id}/"):
-                piece_name = doc_id.split('/')[1]
-                pieces.append({
-                    'piece_id': doc_id,
-                    'piece_name': piece_name,
-                    'embedding': embedding,
-                    'outfit_id': outfit_id
-                })
-        
-        return pieces
+        return self.get_pieces_by_outfits_batch(collection_name, [outfit_id])[outfit_id]
     
     def get_pieces_by_outfits_batch(self, collection_name: str, outfit_ids: List[str]) -> Dict[str, List[Dict]]:
         """
@@ -206,37 +575,28 @@ class VectorDB:
         Returns:
             Dicionário mapeando outfit_id -> lista de peças
         """
-        collection = self.get_collection(collection_name)
-        
-        # TODO: Filtros nativos ChromaDB quando metadata disponível
-        # Atualmente, a collection não possui metadata (apenas IDs no formato "outfit_id/piece_name")
-        # Para usar filtros nativos, seria necessário:
-        #   results = collection.get(where={"outfit_id": {"$in": outfit_ids}}, include=['embeddings'])
-        # Isso requer repopulação do ChromaDB com metadata estruturada.
-
-        # Primeiro, busca só os IDs (sem embeddings) para descobrir quais existem
-        all_ids = collection.get(limit=None)['ids']  # Get all IDs only (fast)
-        
-
-        outfit_ids_set = set(outfit_ids)
-        relevant_ids = []
-        
-        for doc_id in all_ids:
-            parts = doc_id.split('/')
-            if len(parts) >= 2 and parts[0] in outfit_ids_set:
-                relevant_ids.append(doc_id)
+        # Índice outfit_id -> piece_ids: lookup O(len(outfit_ids)), sem varrer a coleção
+        outfit_piece_ids = self.get_outfit_piece_ids(collection_name, outfit_ids)
+        relevant_ids = [pid for pieces in outfit_piece_ids.values() for pid in pieces]
         
+        outfits_dict = {outfit_id: [] for outfit_id in outfit_ids}
         if not relevant_ids:
-            return {outfit_id: [] for outfit_id in outfit_ids}
+            return outfits_dict
         
-        results = collection.get(ids=relevant_ids, include=['embeddings'])
-        
-        outfits_dict = {outfit_id: [] for outfit_id in outfit_ids}
+        mirror = self._mirrors.get(collection_name)
+        if mirror is not None:
+            embeddings_by_id = mirror.get_embeddings(relevant_ids)
+        else:
+            collection = self.get_collection(collection_name)
+            results = collection.get(ids=relevant_ids, include=['embeddings'])
+            embeddings_by_id = dict(zip(results['ids'], results['embeddings']))
         
-        for doc_id, embedding in zip(results['ids'], results['embeddings']):
-            parts = doc_id.split('/')
-            outfit_id = parts[0]
-            piece_name = parts[1]
+        # Mantém a ordem de inserção das peças (a ordem afeta o input do modelo)
+        for doc_id in relevant_ids:
+            if doc_id not in embeddings_by_id:
+                continue
+            embedding = embeddings_by_id[doc_id]
+            outfit_id, piece_name = self._split_piece_id(doc_id)
             outfits_dict[outfit_id].append({
                 'piece_id': doc_id,
                 'piece_name': piece_name,
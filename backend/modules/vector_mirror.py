@@ -0,0 +1,305 @@
+"""
+Espelho em memória (NumPy) de uma coleção do ChromaDB
+
+O catálogo "pieces" é somente leitura em produção e seus vetores são
+embeddings de hash (96-d float32), então a matriz inteira cabe em RAM.
+Este módulo carrega a coleção uma única vez em um np.ndarray contíguo e
+responde buscas por similaridade com busca exata (matmul + argpartition),
+sem round trip ao ChromaDB.
+
+Os vetores são mantidos na forma original (float32) junto com o inverso
+das normas L2: a busca usa os cossenos (M @ q) * inv_norms e a leitura de
+peças devolve exatamente os mesmos valores gravados no ChromaDB.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Tamanho da página usada para ler a coleção do ChromaDB
+LOAD_BATCH_SIZE = 10000
+
+
+class EmbeddingMirror:
+    """
+    Índice exato de similaridade por cosseno sobre uma matriz (N, dim) em memória
+    """
+
+    def __init__(
+        self,
+        ids: Union[List[str], np.ndarray],
+        embeddings: np.ndarray,
+        metadata_columns: Optional[Dict[str, np.ndarray]] = None,
+        metadata_present: Optional[Dict[str, np.ndarray]] = None
+    ):
+        """
+        Inicializa o espelho
+
+        Args:
+            ids: IDs das linhas (mesma ordem de embeddings)
+            embeddings: Matriz (N, dim) float32 (pode ser memory-mapped)
+            metadata_columns: Colunas de metadados {chave: array (N,) de str}
+            metadata_present: Máscaras {chave: array (N,) bool} das linhas que têm a
+                chave, só para chaves ausentes em alguma linha (default: presente em todas)
+        """
+        self.ids = np.asarray(ids, dtype=str)
+        if embeddings.dtype != np.float32 or not embeddings.flags['C_CONTIGUOUS']:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.embeddings = embeddings
+        self.metadata_columns = metadata_columns or {}
+        self.metadata_present = metadata_present or {}
+
+        if len(self.ids) != self.embeddings.shape[0]:
+            raise ValueError(
+                f"Número de IDs ({len(self.ids)}) difere do número de embeddings ({self.embeddings.shape[0]})"
+            )
+
+        norms = np.linalg.norm(self.embeddings, axis=1)
+        norms[norms == 0] = 1.0
+        self.inv_norms = (1.0 / norms).astype(np.float32)
+
+        self._row_by_id = {piece_id: row for row, piece_id in enumerate(self.ids.tolist())}
+        self._filter_rows: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------
+    # Construção / persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_collection(cls, collection: Any, batch_size: int = LOAD_BATCH_SIZE) -> "EmbeddingMirror":
+        """
+        Carrega uma coleção inteira do ChromaDB (paginada)
+
+        Args:
+            collection: Coleção do ChromaDB
+            batch_size: Número de itens por página
+        """
+        total = collection.count()
+        ids: List[str] = []
+        embeddings: Optional[np.ndarray] = None
+        metadatas: List[Dict] = []
+
+        for offset in range(0, total, batch_size):
+            page = collection.get(
+                include=['embeddings', 'metadatas'],
+                limit=batch_size,
+                offset=offset
+            )
+            page_embeddings = np.asarray(page['embeddings'], dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.empty((total, page_embeddings.shape[1]), dtype=np.float32)
+            embeddings[len(ids):len(ids) + len(page['ids'])] = page_embeddings
+            ids.extend(page['ids'])
+            metadatas.extend(page['metadatas'] or [None] * len(page['ids']))
+
+        if embeddings is None:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+
+        return cls(ids, embeddings[:len(ids)], *cls._metadata_to_columns(metadatas))
+
+    @staticmethod
+    def _metadata_to_columns(
+        metadatas: List[Optional[Dict]]
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Converte lista de metadados em colunas {chave: array de str}
+
+        Returns:
+            (colunas, máscaras de presença): a coluna guarda "" onde a chave falta, e a
+            máscara da chave exclui essas linhas dos filtros (no ChromaDB, {"key": ""}
+            não casa com linhas sem a chave)
+        """
+        metadatas = [metadata or {} for metadata in metadatas]
+        keys = sorted({key for metadata in metadatas for key in metadata})
+        columns, present = {}, {}
+        for key in keys:
+            columns[key] = np.asarray([str(metadata.get(key, "")) for metadata in metadatas], dtype=str)
+            mask = np.asarray([key in metadata for metadata in metadatas], dtype=bool)
+            if not mask.all():
+                present[key] = mask
+        return columns, present
+
+    @staticmethod
+    def _snapshot_paths(snapshot_dir: Path, name: str) -> Tuple[Path, Path]:
+        """Caminhos do snapshot: matriz .npy (memory-mappable) e ids/metadados .npz"""
+        return snapshot_dir / f"{name}.embeddings.npy", snapshot_dir / f"{name}.rows.npz"
+
+    def save(self, snapshot_dir: Union[str, Path], name: str) -> None:
+        """
+        Salva um snapshot do espelho em disco
+
+        Args:
+            snapshot_dir: Diretório do snapshot
+            name: Nome base dos arquivos (ex: nome da coleção)
+        """
+        snapshot_dir = Path(snapshot_dir)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        embeddings_path, rows_path = self._snapshot_paths(snapshot_dir, name)
+        np.save(embeddings_path, self.embeddings)
+        np.savez(
+            rows_path,
+            ids=self.ids,
+            metadata_keys=np.asarray(json.dumps(list(self.metadata_columns))),
+            **{f"meta_{i}": column for i, column in enumerate(self.metadata_columns.values())},
+            **{
+                f"present_{i}": self.metadata_present[key]
+                for i, key in enumerate(self.metadata_columns)
+                if key in self.metadata_present
+            }
+        )
+
+    @classmethod
+    def delete_snapshot(cls, snapshot_dir: Union[str, Path], name: str) -> None:
+        """Remove os arquivos de snapshot (ex: após alterações na coleção)"""
+        for path in cls._snapshot_paths(Path(snapshot_dir), name):
+            path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, snapshot_dir: Union[str, Path], name: str, mmap: bool = True) -> Optional["EmbeddingMirror"]:
+        """
+        Carrega um snapshot salvo por save()
+
+        Args:
+            snapshot_dir: Diretório do snapshot
+            name: Nome base dos arquivos
+            mmap: Se True, a matriz é memory-mapped (somente leitura)
+
+        Returns:
+            EmbeddingMirror ou None se o snapshot não existir
+        """
+        embeddings_path, rows_path = cls._snapshot_paths(Path(snapshot_dir), name)
+        if not embeddings_path.exists() or not rows_path.exists():
+            return None
+
+        embeddings = np.load(embeddings_path, mmap_mode='r' if mmap else None)
+        with np.load(rows_path) as rows:
+            keys = json.loads(str(rows['metadata_keys']))
+            columns = {key: rows[f"meta_{i}"] for i, key in enumerate(keys)}
+            present = {key: rows[f"present_{i}"] for i, key in enumerate(keys) if f"present_{i}" in rows.files}
+            ids = rows['ids']
+        return cls(ids, embeddings, columns, present)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def supports_filter(self, filter_dict: Optional[Dict]) -> bool:
+        """
+        Indica se o filtro pode ser resolvido no espelho
+
+        Suporta igualdade simples ({"category": "tops"}), $eq e $in em
+        chaves presentes nos metadados. Outros filtros devem usar o ChromaDB.
+        """
+        if not filter_dict:
+            return True
+        for key, condition in filter_dict.items():
+            if key not in self.metadata_columns:
+                return False
+            if isinstance(condition, dict):
+                if set(condition) - {"$eq", "$in"} or len(condition) != 1:
+                    return False
+        return True
+
+    def _rows_for_filter(self, filter_dict: Optional[Dict]) -> Optional[np.ndarray]:
+        """Índices das linhas que satisfazem o filtro (None = todas)"""
+        if not filter_dict:
+            return None
+
+        rows: Optional[np.ndarray] = None
+        for key, condition in filter_dict.items():
+            if isinstance(condition, dict) and "$in" in condition:
+                values = [str(v) for v in condition["$in"]]
+            else:
+                values = [str(condition["$eq"] if isinstance(condition, dict) else condition)]
+
+            if len(values) == 1:
+                key_rows = self._rows_for_value(key, values[0])
+            else:
+                key_rows = np.unique(np.concatenate([self._rows_for_value(key, value) for value in values]))
+            rows = key_rows if rows is None else np.intersect1d(rows, key_rows, assume_unique=True)
+        return rows
+
+    def _rows_for_value(self, key: str, value: str) -> np.ndarray:
+        """Linhas que têm a chave com metadata[key] == value (cacheado por par chave/valor)"""
+        cache_key = (key, value)
+        rows = self._filter_rows.get(cache_key)
+        if rows is None:
+            matches = self.metadata_columns[key] == value
+            if key in self.metadata_present:
+                matches &= self.metadata_present[key]
+            rows = np.flatnonzero(matches)
+            self._filter_rows[cache_key] = rows
+        return rows
+
+    def query(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        n_results: int = 5,
+        filter_dict: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Busca exata pelos vizinhos mais próximos em distância cosseno
+
+        Retorna no mesmo formato de collection.query do ChromaDB
+        (distância = 1 - cosseno, ordem crescente; empates pela ordem das linhas).
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+
+        rows = self._rows_for_filter(filter_dict)
+        if len(self) == 0:
+            similarities = np.empty(0, dtype=np.float32)
+        else:
+            similarities = (self.embeddings @ query) * self.inv_norms
+        if rows is not None:
+            similarities = similarities[rows]
+
+        k = min(n_results, similarities.shape[0])
+        if k == 0:
+            top = np.empty(0, dtype=np.int64)
+        else:
+            if k < similarities.shape[0]:
+                candidates = np.argpartition(-similarities, k - 1)[:k]
+            else:
+                candidates = np.arange(similarities.shape[0])
+            # lexsort: ordena por similaridade decrescente, desempate pela linha
+            top = candidates[np.lexsort((candidates, -similarities[candidates]))]
+
+        distances = (1.0 - similarities[top]).tolist()
+        result_rows = top if rows is None else rows[top]
+
+        return {
+            'ids': [self.ids[result_rows].tolist()],
+            'distances': [distances],
+            'metadatas': [[self._row_metadata(row) for row in result_rows.tolist()]],
+            'documents': None,
+            'embeddings': None
+        }
+
+    def _row_metadata(self, row: int) -> Dict[str, str]:
+        """Reconstrói o dicionário de metadados de uma linha (sem as chaves ausentes)"""
+        return {
+            key: column[row].item()
+            for key, column in self.metadata_columns.items()
+            if key not in self.metadata_present or self.metadata_present[key][row]
+        }
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Obtém embeddings por ID (IDs ausentes são ignorados)
+
+        Returns:
+            Dict {id: embedding (dim,) float32}
+        """
+        return {
+            piece_id: self.embeddings[self._row_by_id[piece_id]]
+            for piece_id in ids
+            if piece_id in self._row_by_id
+        }
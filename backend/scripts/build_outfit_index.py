@@ -0,0 +1,46 @@
+"""
+Build offline do índice de features dos outfits filtrados
+=========================================================
+
+Grava todos os JSONs de filtered_outfits em um único arquivo SQLite
+(outfit_id/piece_name -> features), carregado pela API na inicialização.
+Reexecute após filtrar novos outfits.
+
+Usage:
+    python scripts/build_outfit_index.py
+    python scripts/build_outfit_index.py --filtered-dir ../filtered_outfits --output filtered_outfits.sqlite
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+from modules.outfit_features import OutfitFeaturesIndex
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Build the filtered outfits features index')
+    parser.add_argument('--filtered-dir', type=str, default=None, help='Filtered outfits directory (default: FILTERED_DIR)')
+    parser.add_argument('--output', type=str, default=None, help='SQLite output path (default: OUTFIT_FEATURES_INDEX_PATH)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("🔄 Gerando índice de features dos outfits filtrados...")
+    start = time.time()
+    num_outfits = OutfitFeaturesIndex.build(filtered_dir=args.filtered_dir, path=args.output)
+    elapsed = time.time() - start
+
+    print(f"✅ {num_outfits} outfits indexados em {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Build offline dos thumbnails do catálogo
+========================================
+
+Gera os thumbnails pré-comprimados (JPEG e, opcionalmente, WebP) de todas as
+imagens de archive/images, usados pelas respostas de sugestão. Variantes já
+existentes são puladas, então o script pode ser reexecutado após adicionar
+novos outfits.
+
+Usage:
+    python scripts/build_thumbnails.py
+    python scripts/build_thumbnails.py --sizes 0 512 --webp
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+from modules.thumbnail_cache import ThumbnailCache
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Build pre-compressed catalogue thumbnails')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Thumbnail directory (default: THUMBNAILS_DIR)')
+    parser.add_argument('--images-dir', type=str, default=None, help='Source images directory (default: IMAGES_DIR)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0],
+                        help='Longest side in pixels, 0 keeps the original size (default: 0)')
+    parser.add_argument('--quality', type=int, default=75, help='Compression quality (default: 75)')
+    parser.add_argument('--webp', action='store_true', help='Also build WebP variants')
+    parser.add_argument('--outfits', type=str, nargs='+', default=None, help='Only these outfit IDs')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cache = ThumbnailCache(cache_dir=args.cache_dir, images_dir=args.images_dir, max_memory_items=0)
+
+    formats = ["jpeg", "webp"] if args.webp else ["jpeg"]
+    sizes = [size or None for size in args.sizes]
+
+    print(f"🔄 Gerando thumbnails em {cache.cache_dir} (formatos={formats}, tamanhos={args.sizes})...")
+    start = time.time()
+    counts = cache.build(outfit_ids=args.outfits, formats=formats, sizes=sizes, quality=args.quality)
+    elapsed = time.time() - start
+
+    print(
+        f"✅ {counts['images']} imagens | {counts['encoded']} geradas | "
+        f"{counts['skipped']} já existentes | {counts['errors']} erros | {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
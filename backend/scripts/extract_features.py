@@ -0,0 +1,76 @@
+"""
+Extração de features do dataset com o Gemini
+============================================
+
+Processa todas as pastas de IMAGES_DIR em paralelo (FeatureExtractor.process_all_folders),
+respeitando as cotas de requisições e tokens por minuto. O progresso fica no
+manifesto (EXTRACTION_MANIFEST_PATH); pastas já extraídas são puladas, então
+basta rodar de novo para retomar.
+
+Usage:
+    python scripts/extract_features.py
+    python scripts/extract_features.py --concurrency 16 --rpm 150 --tpm 2000000
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8080 python scripts/extract_features.py   # servidor falso
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+
+from modules.config import (
+    GEMINI_BATCH_IMAGES,
+    GEMINI_CONCURRENCY,
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE
+)
+from modules.feature_extractor import FeatureExtractor
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Concurrent Gemini feature extraction')
+    parser.add_argument('--images-dir', type=str, default=None, help='Outfit image folders (default: IMAGES_DIR)')
+    parser.add_argument('--responses-dir', type=str, default=None, help='Output JSONs (default: RESPONSES_DIR)')
+    parser.add_argument('--manifest', type=str, default=None, help='Progress manifest (default: EXTRACTION_MANIFEST_PATH)')
+    parser.add_argument('--concurrency', type=int, default=GEMINI_CONCURRENCY,
+                        help=f'Concurrent Gemini calls (default: {GEMINI_CONCURRENCY})')
+    parser.add_argument('--rpm', type=float, default=GEMINI_REQUESTS_PER_MINUTE,
+                        help=f'Requests per minute quota (default: {GEMINI_REQUESTS_PER_MINUTE:.0f})')
+    parser.add_argument('--tpm', type=float, default=GEMINI_TOKENS_PER_MINUTE,
+                        help=f'Tokens per minute quota (default: {GEMINI_TOKENS_PER_MINUTE:.0f})')
+    parser.add_argument('--batch-images', type=int, default=GEMINI_BATCH_IMAGES,
+                        help=f'Max images per call, packing several folders (default: {GEMINI_BATCH_IMAGES}; 1 disables)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    extractor = FeatureExtractor(responses_dir=args.responses_dir)
+
+    stats = extractor.process_all_folders(
+        images_dir=args.images_dir,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        manifest_path=args.manifest,
+        batch_images=args.batch_images
+    )
+
+    print(
+        f"\n✅ {stats['ok']} ok | {stats['error']} erros | {stats['invalid_json']} JSON inválido | "
+        f"{stats['quota_exhausted']} sem cota | {stats['empty']} vazias | {stats['skipped']} já processadas"
+    )
+    print(
+        f"   {stats['elapsed']:.1f}s = {stats['folders_per_minute']:.1f} pastas/min, {stats['retries']} retries, "
+        f"{stats['prompt_tokens']} + {stats['response_tokens']} tokens"
+    )
+    if "calls" in stats:
+        print(f"   {stats['calls']} chamadas agrupadas ({stats['split_retries']} refeitas em batches menores)")
+
+
+if __name__ == "__main__":
+    main()
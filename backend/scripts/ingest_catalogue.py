@@ -0,0 +1,64 @@
+"""
+Ingestão em massa do catálogo no ChromaDB
+=========================================
+
+Lê todos os JSONs de filtered_outfits com um pool de processos, gera os
+embeddings em batch e grava na coleção em chunks de milhares de vetores.
+O progresso é salvo após cada chunk: se a execução for interrompida, basta
+rodar o script de novo para continuar do ponto onde parou.
+
+Usage:
+    python scripts/ingest_catalogue.py
+    python scripts/ingest_catalogue.py --collection pieces --reindex --workers 8
+    python scripts/ingest_catalogue.py --restart   # ignora o progresso salvo
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+
+from modules.embeddings import EmbeddingGenerator, INGEST_CHUNK_SIZE
+from modules.vector_db import VectorDB
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Parallel, resumable bulk ingestion of filtered outfits')
+    parser.add_argument('--collection', type=str, default='pieces', help='Target collection (default: pieces)')
+    parser.add_argument('--filtered-dir', type=str, default=None, help='Outfit JSONs directory (default: FILTERED_DIR)')
+    parser.add_argument('--db-path', type=str, default=None, help='ChromaDB directory (default: VECTOR_DB_DIR)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=INGEST_CHUNK_SIZE,
+                        help=f'Vectors per ChromaDB write (default: {INGEST_CHUNK_SIZE})')
+    parser.add_argument('--limit', type=int, default=None, help='Max files in this run')
+    parser.add_argument('--reindex', action='store_true', help='Upsert pieces that already exist')
+    parser.add_argument('--restart', action='store_true', help='Discard saved progress and start over')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    generator = EmbeddingGenerator(vector_db=VectorDB(path=args.db_path))
+
+    stats = generator.bulk_ingest(
+        args.collection,
+        limit=args.limit,
+        reindex=args.reindex,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=not args.restart,
+        filtered_dir=args.filtered_dir
+    )
+
+    print(
+        f"\n✅ {stats['outfits']} outfits ({stats['pieces']} peças) em {stats['elapsed']:.1f}s "
+        f"= {stats['outfits_per_second']:.0f} outfits/s | {stats['skipped']} já ingeridos | {stats['errors']} erros"
+    )
+
+
+if __name__ == "__main__":
+    main()
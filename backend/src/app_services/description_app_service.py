@@ -1,14 +1,18 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
 from src.services.image_service import ImageService
 from src.services.ai_service import AIService
+from src.services.upload_service import UploadService
 from src.schemas.description import (
   FeatureExtractionRequest, 
   FeatureExtractionResponse
 )
 
 class DescriptionAppService:
-    def __init__(self, image_service: ImageService, ai_service: AIService):
+    def __init__(self, image_service: ImageService, ai_service: AIService, upload_service: UploadService):
         self.image_service = image_service
         self.ai_service = ai_service
+        self.upload_service = upload_service
 
     def extract_clothing_features(self, request: FeatureExtractionRequest) -> FeatureExtractionResponse:
         if not request.image_base64:
@@ -19,4 +23,18 @@ class DescriptionAppService:
 
         return self.ai_service.extract_features_from_base64(
             request.image_base64
-        )
\ No newline at end of file
+        )
+
+    async def read_upload(
+        self,
+        stream: AsyncIterator[bytes],
+        content_type: str,
+        content_length: Optional[int] = None
+    ) -> bytes:
+        return await self.upload_service.read_image(stream, content_type, content_length)
+
+    def extract_clothing_features_from_bytes(self, image_data: bytes) -> FeatureExtractionResponse:
+        return self.ai_service.extract_features_from_bytes(image_data)
+
+    def get_feature_cache_stats(self) -> Dict[str, Any]:
+        return self.ai_service.get_cache_stats()
@@ -1,5 +1,6 @@
 from typing import Optional, Dict
 from src.services.item_service import ItemService
+from src.core.jobs import JobQueue
 from src.schemas.item import (
     ItemCreate,
     ItemUpdate,
@@ -9,12 +10,26 @@ from src.schemas.item import (
     ItemStatusUpdate
 )
 
+# Job da fila que pré-computa a sugestão de um item (ver src/app_services/suggestion_jobs.py)
+PRECOMPUTE_SUGGESTION_JOB = "precompute_suggestion"
+
 class ItemAppService:
-    def __init__(self, item_service: ItemService):
+    def __init__(self, item_service: ItemService, job_queue: Optional[JobQueue] = None):
         self.item_service = item_service
+        self.job_queue = job_queue
+
+    def _enqueue_suggestion(self, item_id: int, user_id: int) -> None:
+        """Agenda o cálculo da sugestão do item em background (se a fila estiver habilitada)"""
+        if self.job_queue is not None:
+            self.job_queue.enqueue(
+                PRECOMPUTE_SUGGESTION_JOB,
+                {"item_id": item_id, "user_id": user_id},
+                key=f"{PRECOMPUTE_SUGGESTION_JOB}:{user_id}:{item_id}"
+            )
 
     def create_item(self, user_id: int, item_data: ItemCreate) -> ItemSchema:
         item = self.item_service.create_item(user_id, item_data)
+        self._enqueue_suggestion(item.id, user_id)
         return ItemSchema.model_validate(item)
 
     def get_item(self, item_id: int, user_id: int, allow_others: bool = False) -> ItemSchema:
@@ -27,6 +42,7 @@ class ItemAppService:
 
     def update_item(self, item_id: int, user_id: int, item_data: ItemUpdate) -> ItemSchema:
         item = self.item_service.update_item(item_id, user_id, item_data)
+        self._enqueue_suggestion(item.id, user_id)
         return ItemSchema.model_validate(item)
 
     def update_item_status(self, item_id: int, user_id: int, status_update: ItemStatusUpdate) -> ItemSchema:
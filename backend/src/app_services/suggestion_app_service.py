@@ -1,19 +1,25 @@
+import asyncio
 import base64
+import hashlib
 import json
-import time
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from functools import lru_cache
+import numpy as np
 from sqlalchemy.orm import Session
 
 from src.schemas.sugestion import SugestionResponse, OutfitDisplay, Pieces
 from src.repositories.suggestion_repository import SuggestionRepository
-from src.utils.image_utils import compress_image_to_jpeg
+from src.core.executors import StageExecutors
 from modules.vector_db import VectorDB
 from modules.model_input import ModelInputBuilder
 from modules.pytorch_model import ModelPredictor
-from modules.config import FILTERED_DIR, IMAGES_DIR
+from modules.thumbnail_cache import ThumbnailCache
+from modules.outfit_features import OutfitFeaturesIndex
+from modules.inference_scheduler import InferenceScheduler
+from modules.result_cache import ResultCache
+from modules.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -46,98 +52,178 @@ class SuggestionAppService:
         db: Session,
         vector_db: VectorDB,
         model_predictor: ModelPredictor,
-        model_input_builder: ModelInputBuilder
+        model_input_builder: ModelInputBuilder,
+        thumbnail_cache: ThumbnailCache,
+        outfit_features: OutfitFeaturesIndex,
+        executors: StageExecutors,
+        inference_scheduler: Optional[InferenceScheduler] = None,
+        catalogue_version: str = "",
+        result_cache: Optional[ResultCache] = None
     ):
         self.db = db
         self.vector_db = vector_db
         self.model_predictor = model_predictor
         self.model_input_builder = model_input_builder
+        self.thumbnail_cache = thumbnail_cache
+        self.outfit_features = outfit_features
+        self.executors = executors
+        self.inference_scheduler = inference_scheduler
         self.suggestion_repository = SuggestionRepository(db)
+        self.result_cache = result_cache
+        # Sugestões persistidas com outra versão de catálogo/checkpoint são recalculadas
+        self.catalogue_version = f"{catalogue_version}:{model_predictor.checkpoint_hash[:16]}"
 
-    async def generate_suggestion(self, item_id: int, user_id: int) -> SugestionResponse:
-        start_total = time.time()
-        logger.info(f"[TIMER] Starting generate_suggestion for item_id={item_id}, user_id={user_id}")
-        
-        collection_name = f"user_{str(user_id)}_pieces"
-        
-        # Get target item from database to get category
-        start_get_item = time.time()
-        from src.repositories.item_repository import ItemRepository
-        item_repo = ItemRepository(self.db)
-        target_item = item_repo.get_by_id(item_id, user_id)
-        if not target_item:
-            raise ValueError(f"Item {item_id} not found for user {user_id}")
-        target_category = target_item.category
-        elapsed_get_item = time.time() - start_get_item
-        logger.info(f"[TIMER] Get target item (category={target_category}): {elapsed_get_item:.3f}s")
+    async def generate_suggestion(
+        self,
+        item_id: int,
+        user_id: int,
+        image_base_url: Optional[str] = None,
+        use_stored: bool = True
+    ) -> SugestionResponse:
+        """
+        Gera as 3 melhores sugestões de outfit para um item do usuário
 
-        # Get target embedding
-        start_get_embedding = time.time()
-        embedding_data = self.vector_db.get_by_id(collection_name, str(item_id))
-        if embedding_data is None:
-            raise ValueError(f"Embedding not found for item_id {item_id} in user's collection {collection_name}")
-        embedding = embedding_data["embedding"]
-        elapsed_get_embedding = time.time() - start_get_embedding
-        logger.info(f"[TIMER] Get target embedding: {elapsed_get_embedding:.3f}s")
+        Cada etapa bloqueante (banco, ChromaDB, modelo, imagens) roda nos
+        executores dedicados (StageExecutors), mantendo o event loop livre
+        para as demais requisições.
 
-        # Search similar items
-        start_search = time.time()
-        # TODO: REFATORAR QUANDO CHROMADB FOR REPOPULADO COM METADATA DE CATEGORIA
-        # Atualmente fazemos filtragem em Python lendo JSONs (overhead ~26ms)
-        # Implementação ideal quando metadata existir:
-        # similar_results = self.vector_db.search_similar(
-        #     "pieces", 
-        #     embedding, 
-        #     n_results=10,
-        #     filter_dict={"category": target_category}
-        # )
-        similar_results = self.vector_db.search_similar("pieces", embedding, n_results=10)
-        similar_ids = similar_results['ids'][0]
-        elapsed_search = time.time() - start_search
-        logger.info(f"[TIMER] Search similar items: {elapsed_search:.3f}s")
-        
-        # WORKAROUND: Filter similar items by category using filtered_outfits JSONs
-        # TODO: REMOVER quando ChromaDB tiver metadata de categoria
-        start_filter_category = time.time()
-        filtered_similar_ids = []
-        for sid in similar_ids:
-            outfit_id, piece_filename = sid.split('/')
-            outfit_json_path = FILTERED_DIR / f"{outfit_id}.json"
+        Se já existe uma sugestão persistida ainda válida (pré-computada em
+        background ou gerada antes), ela é servida sem rodar o pipeline.
+
+        Args:
+            item_id: ID do item do usuário
+            user_id: ID do usuário
+            image_base_url: Se informado, as peças trazem image_url
+                ("<image_base_url>/<outfit_id>/<piece>") em vez de image_base64
+            use_stored: Se False, sempre recalcula a sugestão (ignora a sugestão
+                persistida e o cache de resultados)
+        """
+        with tracer.span("suggestion.generate", item_id=item_id, user_id=user_id):
+            # Get target item from database to get category
+            with tracer.span("suggestion.get_item") as span:
+                target_item = await self.executors.run("db", self._get_target_item, item_id, user_id)
+                span.set(category=target_item.category)
+
+            stored = None
+            if use_stored:
+                with tracer.span("suggestion.stored_lookup") as span:
+                    stored = await self.executors.run("db", self._get_stored_suggestion, target_item)
+                    span.set(hit=stored is not None)
+
+            if stored is not None:
+                top_3_outfits, outfits_dict = stored
+            else:
+                top_3_outfits, outfits_dict = await self._compute_suggestion(
+                    target_item, item_id, user_id, use_cache=use_stored
+                )
+
+            # Montar SuggestionResponse com base64 (ou URLs) e descrições, outfits em paralelo
+            with tracer.span("suggestion.build_response"):
+                image_stage = "image" if image_base_url is None else "io"
+                displays = await asyncio.gather(*[
+                    self.executors.run(
+                        image_stage, self._build_outfit_display, outfit_id, score, outfits_dict, image_base_url
+                    )
+                    for outfit_id, score in top_3_outfits.items()
+                ])
+                outfits_display = [display for display in displays if display is not None]
             
-            try:
-                with open(outfit_json_path, "r") as f:
-                    outfit_data = json.load(f)
-                    piece_data = outfit_data.get(piece_filename, {})
-                    piece_category = piece_data.get("category", "")
-                    
-                    # Only include if same category as target
-                    if piece_category == target_category:
-                        filtered_similar_ids.append(sid)
-            except Exception as e:
-                logger.warning(f"Could not check category for {sid}: {e}")
-                continue
+            # Preenche com None se não houver 3 sugestões
+            while len(outfits_display) < 3:
+                outfits_display.append(None)
         
-        elapsed_filter_category = time.time() - start_filter_category
-        logger.info(f"[TIMER] Filter by category ({len(similar_ids)} -> {len(filtered_similar_ids)}): {elapsed_filter_category:.3f}s")
+        return SugestionResponse(
+            Outfit1=outfits_display[0],
+            Outfit2=outfits_display[1],
+            Outfit3=outfits_display[2]
+        )
+    
+    async def precompute_suggestion(self, item_id: int, user_id: int) -> Dict[str, float]:
+        """
+        Calcula e persiste a sugestão de um item, sem montar a resposta
         
-        # Use filtered IDs for rest of processing
-        similar_ids = filtered_similar_ids
+        Chamado pela fila de jobs quando o item é criado ou atualizado.
         
-        # Get unique outfits
-        start_get_outfits = time.time()
-        unique_outfits = set()
-        for sid in similar_ids:
-            outfit_id = sid.split('/')[0]
-            unique_outfits.add(outfit_id)
+        Returns:
+            Dict {outfit_id: score} persistido
+        """
+        target_item = await self.executors.run("db", self._get_target_item, item_id, user_id)
+        top_3_outfits, _ = await self._compute_suggestion(target_item, item_id, user_id)
+        return top_3_outfits
+    
+    async def _compute_suggestion(
+        self,
+        target_item,
+        item_id: int,
+        user_id: int,
+        use_cache: bool = True
+    ) -> Tuple[Dict[str, float], Dict[str, List[Dict]]]:
+        """
+        Pipeline completo: busca, modelo, top 3 e persistência
         
-        outfit_ids_list = list(unique_outfits)
-        outfits_dict = self.vector_db.get_pieces_by_outfits_batch("pieces", outfit_ids_list)
+        Args:
+            use_cache: Se False, não consulta o cache de resultados (o resultado
+                recalculado ainda é gravado nele)
+        
+        Returns:
+            Tuple (top outfits {outfit_id: score}, outfits_dict {outfit_id: [peças]})
+        """
+        collection_name = f"user_{str(user_id)}_pieces"
+        target_category = target_item.category
         
-        elapsed_get_outfits = time.time() - start_get_outfits
-        logger.info(f"[TIMER] Get {len(unique_outfits)} unique outfits (BATCH): {elapsed_get_outfits:.3f}s")
+        # Get target embedding
+        with tracer.span("suggestion.embedding"):
+            embedding_data = await self.executors.run("vector", self.vector_db.get_by_id, collection_name, str(item_id))
+            if embedding_data is None:
+                raise ValueError(f"Embedding not found for item_id {item_id} in user's collection {collection_name}")
+            embedding = embedding_data["embedding"]
+
+        # Peças com os mesmos atributos têm o mesmo embedding: o resultado pode vir do cache
+        cache_key = None
+        if self.result_cache is not None:
+            with tracer.span("suggestion.cache_lookup") as span:
+                # O fingerprint lê o arquivo da coleção: fora do event loop, como as demais leituras do vector DB
+                cache_key = await self.executors.run("vector", self._result_cache_key, embedding, target_category)
+                cached = await self.executors.run("io", self.result_cache.get, cache_key) if use_cache else None
+                span.set(hit=cached is not None)
+            if cached is not None:
+                top_3_outfits = {outfit_id: score for outfit_id, score in cached["top"]}
+                outfits_dict = {
+                    outfit_id: [{"piece_id": piece_id} for piece_id in piece_ids]
+                    for outfit_id, piece_ids in cached["pieces"].items()
+                }
+                await self.executors.run("db", self._persist_suggestion, user_id, item_id, top_3_outfits, outfits_dict)
+                return top_3_outfits, outfits_dict
+
+        # Search similar items (same category only, filtered natively by ChromaDB metadata)
+        # Requer coleção "pieces" indexada com metadata:
+        # EmbeddingGenerator.process_and_store("pieces", reindex=True)
+        with tracer.span("suggestion.search", category=target_category) as span:
+            similar_results = await self.executors.run(
+                "vector",
+                self.vector_db.search_similar,
+                "pieces",
+                embedding,
+                n_results=10,
+                filter_dict={"category": target_category}
+            )
+            similar_ids = similar_results['ids'][0]
+            span.set(results=len(similar_ids))
+        
+        # Get unique outfits
+        with tracer.span("suggestion.outfit_fetch") as span:
+            unique_outfits = set()
+            for sid in similar_ids:
+                outfit_id = sid.split('/')[0]
+                unique_outfits.add(outfit_id)
+            
+            outfit_ids_list = list(unique_outfits)
+            outfits_dict = await self.executors.run(
+                "vector", self.vector_db.get_pieces_by_outfits_batch, "pieces", outfit_ids_list
+            )
+            span.set(outfits=len(unique_outfits))
         
         # Remover do dicionário de outfits as peças similares que vieram da busca
-        start_filter = time.time()
         similar_piece_ids = set(similar_ids)
         
         for outfit_id in outfits_dict.keys():
@@ -148,41 +234,163 @@ class SuggestionAppService:
                 if piece['piece_id'] not in similar_piece_ids
             ]
             outfits_dict[outfit_id] = filtered_pieces
-        elapsed_filter = time.time() - start_filter
-        logger.info(f"[TIMER] Filter similar pieces: {elapsed_filter:.3f}s")
         
-        # Gera inputs em batch para todos os outfits
-        start_build_inputs = time.time()
-        batch_inputs = self.model_input_builder.build_batch_inputs(
-            new_piece_embedding=embedding,
-            outfits_dict=outfits_dict
-        )
-        elapsed_build_inputs = time.time() - start_build_inputs
-        logger.info(f"[TIMER] Build model inputs: {elapsed_build_inputs:.3f}s")
-
-        # Usar modelo injetado (já carregado)
-        # Avaliar cada outfit com o modelo e filtrar top 3
-        # Predição em batch para todos os outfits
-        start_predict = time.time()
-        all_scores = self.model_predictor.predict_batch(batch_inputs)
-        elapsed_predict = time.time() - start_predict
-        logger.info(f"[TIMER] Model prediction: {elapsed_predict:.3f}s for {len(batch_inputs)} outfits")
+        # Avaliar cada outfit com o modelo (predição em batch)
+        all_scores = await self._score_outfits(embedding, outfits_dict)
         
         # Filtra top 3 outfits com score >= 0.96 (threshold ótimo da ROC curve)
-        start_top3 = time.time()
         top_3_outfits = self.model_predictor.get_top_k_outfits(
             scores=all_scores,
             k=3,
             min_threshold=0.96
         )
-        elapsed_top3 = time.time() - start_top3
-        logger.info(f"[TIMER] Get top 3 outfits: {elapsed_top3:.3f}s")
+
+        if cache_key is not None:
+            await self.executors.run("io", self.result_cache.set, cache_key, {
+                "top": list(top_3_outfits.items()),
+                "pieces": {
+                    outfit_id: [piece['piece_id'] for piece in outfits_dict.get(outfit_id, [])]
+                    for outfit_id in top_3_outfits
+                }
+            })
 
         # Persistir sugestão no banco de dados
+        with tracer.span("suggestion.persist"):
+            await self.executors.run("db", self._persist_suggestion, user_id, item_id, top_3_outfits, outfits_dict)
+        
+        return top_3_outfits, outfits_dict
+    
+    def _result_cache_key(self, embedding, category: str) -> str:
+        """
+        Chave do cache de resultados: hash do embedding, categoria, versão do
+        catálogo/checkpoint e fingerprint da coleção "pieces"
+        
+        O fingerprint é persistente (ao contrário de vector_db.revision, que
+        volta a 0 no reinício), então entradas do tier SQLite gravadas antes
+        de uma escrita no catálogo não são servidas após reiniciar. Faz stat
+        (e às vezes leitura) do arquivo do fingerprint: executar na etapa "vector".
+        """
+        embedding_hash = hashlib.sha256(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()[:32]
+        return f"{embedding_hash}:{category}:{self.catalogue_version}:{self.vector_db.fingerprint('pieces')}"
+    
+    def _get_target_item(self, item_id: int, user_id: int):
+        """Busca o item do usuário no banco (etapa "db")"""
+        from src.repositories.item_repository import ItemRepository
+        item_repo = ItemRepository(self.db)
+        target_item = item_repo.get_by_id(item_id, user_id)
+        if not target_item:
+            raise ValueError(f"Item {item_id} not found for user {user_id}")
+        return target_item
+    
+    def _get_stored_suggestion(self, target_item) -> Optional[Tuple[Dict[str, float], Dict[str, List[Dict]]]]:
+        """
+        Sugestão persistida do item, se ainda válida (etapa "db")
+        
+        Válida se calculada com a versão atual do catálogo/modelo e depois da
+        última edição do item.
+        
+        Returns:
+            Tuple (top outfits {outfit_id: score}, outfits_dict) ou None
+        """
+        suggestion = self.suggestion_repository.get_by_user_and_item(target_item.user_id, target_item.id)
+        if suggestion is None or suggestion.scores is None:
+            return None
+        if suggestion.catalogue_version != self.catalogue_version:
+            return None
+        # SQLite descarta o timezone; ambos os campos são gravados em UTC
+        if suggestion.created_at.replace(tzinfo=None) < target_item.updated_at.replace(tzinfo=None):
+            return None
+        
+        # Outfit e score são posicionais: filtra os pares, não cada lista isoladamente
+        outfit_csvs = (suggestion.outfit1, suggestion.outfit2, suggestion.outfit3)
+        scores = suggestion.scores.split(",")
+        top_outfits: Dict[str, float] = {}
+        outfits_dict: Dict[str, List[Dict]] = {}
+        for outfit_csv, score in zip(outfit_csvs, scores):
+            if not outfit_csv or not score:
+                continue
+            score = float(score)
+            # Paths no formato archive\images\outfit_id\piece_name
+            piece_ids = ["/".join(path.split("\\")[-2:]) for path in outfit_csv.split(",")]
+            outfit_id = piece_ids[0].split("/")[0]
+            top_outfits[outfit_id] = score
+            outfits_dict[outfit_id] = [{"piece_id": piece_id} for piece_id in piece_ids]
+        return top_outfits, outfits_dict
+    
+    def _build_scoring_inputs(
+        self,
+        embedding,
+        outfits_dict: Dict[str, List[Dict]]
+    ) -> Tuple[np.ndarray, np.ndarray, List[str], bool]:
+        """
+        Monta os inputs empilhados do modelo para todos os outfits (etapa "model")
+        
+        Returns:
+            Tuple (inputs, masks, outfit_ids, projected). Com o cache de projeções,
+            inputs já são as features 1000-d (projected=True) e apenas a nova
+            peça passa por feature_proj
+        """
+        if self.model_predictor.has_projection_cache:
+            try:
+                features, masks, outfit_ids = self.model_predictor.build_projected_inputs(
+                    new_piece_embedding=embedding,
+                    outfit_piece_ids={
+                        outfit_id: [piece['piece_id'] for piece in pieces]
+                        for outfit_id, pieces in outfits_dict.items()
+                    }
+                )
+                return features, masks, outfit_ids, True
+            except (KeyError, RuntimeError) as e:
+                # KeyError: peça fora do cache; RuntimeError: cache descartado por escrita no catálogo
+                logger.warning(f"Projection cache miss, using full forward: {e}")
+
+        batch_embeddings, batch_masks, batch_outfit_ids = self.model_input_builder.build_stacked_inputs(
+            new_piece_embedding=embedding,
+            outfits_dict=outfits_dict
+        )
+        return batch_embeddings, batch_masks, batch_outfit_ids, False
+    
+    def _predict_scoring_inputs(self, inputs: np.ndarray, masks: np.ndarray, projected: bool) -> np.ndarray:
+        """Forward direto no ModelPredictor (sem scheduler)"""
+        if projected:
+            return self.model_predictor.predict_projected_arrays(inputs, masks)
+        return self.model_predictor.predict_arrays(inputs, masks)
+    
+    async def _score_outfits(self, embedding, outfits_dict: Dict[str, List[Dict]]) -> Dict[str, float]:
+        """
+        Calcula o score de compatibilidade de cada outfit com a nova peça
+        
+        Com o InferenceScheduler, o forward é agrupado com os de outras
+        requisições concorrentes.
+        
+        Returns:
+            Dict {outfit_id: score}
+        """
+        with tracer.span("suggestion.build_inputs") as span:
+            inputs, masks, outfit_ids, projected = await self.executors.run(
+                "model", self._build_scoring_inputs, embedding, outfits_dict
+            )
+            span.set(projected=projected)
+
+        with tracer.span("suggestion.predict", outfits=len(outfit_ids)):
+            if self.inference_scheduler is not None:
+                scores = await self.inference_scheduler.score(inputs, masks, projected=projected)
+            else:
+                scores = await self.executors.run("model", self._predict_scoring_inputs, inputs, masks, projected)
+        return dict(zip(outfit_ids, scores.tolist()))
+    
+    def _persist_suggestion(
+        self,
+        user_id: int,
+        item_id: int,
+        top_3_outfits: Dict[str, float],
+        outfits_dict: Dict[str, List[Dict]]
+    ) -> None:
+        """Substitui a sugestão persistida do usuário/item pelo novo top 3 (etapa "db")"""
         # Converte top 3 outfits para formato CSV com paths das imagens
-        start_persist = time.time()
         outfit_csvs = []
-        for outfit_id, score in top_3_outfits.items():
+        scores = []
+        for outfit_id, score in list(top_3_outfits.items())[:3]:
             # Busca as peças do outfit (sem a nova peça adicionada)
             outfit_pieces = outfits_dict.get(outfit_id, [])
             
@@ -192,110 +400,74 @@ class SuggestionAppService:
                 for piece in outfit_pieces
             ]
             outfit_csvs.append(",".join(piece_paths))
+            scores.append(f"{score:.6f}")
         
         # Preenche com None se não houver 3 sugestões
         while len(outfit_csvs) < 3:
             outfit_csvs.append(None)
         
-        # Verifica se já existe uma sugestão para este usuário e item, e deleta se existir
-        existing_suggestion = self.suggestion_repository.get_by_user_and_item(user_id, item_id)
-        if existing_suggestion:
-            self.suggestion_repository.delete(existing_suggestion.id)
-        
-        # Salva no banco
-        suggestion_record = self.suggestion_repository.create(
+        # Upsert atômico: requisições concorrentes para o mesmo item não se intercalam
+        self.suggestion_repository.upsert(
             user_id=user_id,
             item_id=item_id,
             outfit1=outfit_csvs[0],
             outfit2=outfit_csvs[1],
-            outfit3=outfit_csvs[2]
+            outfit3=outfit_csvs[2],
+            scores=",".join(scores),
+            catalogue_version=self.catalogue_version
         )
-        elapsed_persist = time.time() - start_persist
-        logger.info(f"[TIMER] Persist to database: {elapsed_persist:.3f}s")
-
-        # Montar SuggestionResponse com base64 e descrições
-        start_build_response = time.time()
-        outfits_display = []
+    
+    def _build_outfit_display(
+        self,
+        outfit_id: str,
+        score: float,
+        outfits_dict: Dict[str, List[Dict]],
+        image_base_url: Optional[str]
+    ) -> Optional[OutfitDisplay]:
+        """Monta um outfit da resposta: imagens (ou URLs) e descrições (etapa "image")"""
+        # Carrega features do outfit do índice em memória (filtered_outfits)
+        outfit_features = self.outfit_features.get_outfit(outfit_id)
         
-        for outfit_id, score in top_3_outfits.items():
-            start_outfit = time.time()
-            
-            # Carrega features do outfit do arquivo filtered_outfits (SEM CACHE)
-            start_load_json = time.time()
-            outfit_features_path = FILTERED_DIR / f"{outfit_id}.json"
-            
-            if not outfit_features_path.exists():
-                logger.warning(f"[TIMER]   Outfit JSON {outfit_id} not found, skipping")
-                continue
-            
-            with open(outfit_features_path, "r") as f:
-                outfit_features = json.load(f)
-            elapsed_load_json = time.time() - start_load_json
-            
-            logger.info(f"[TIMER]   Load outfit JSON {outfit_id}: {elapsed_load_json:.3f}s")
-            
-            # Busca peças do outfit
-            outfit_pieces = outfits_dict.get(outfit_id, [])
-            pieces_list: List[Pieces] = []
+        if outfit_features is None:
+            logger.warning(f"Outfit features {outfit_id} not found, skipping")
+            return None
+        
+        # Busca peças do outfit
+        outfit_pieces = outfits_dict.get(outfit_id, [])
+        pieces_list: List[Pieces] = []
+        
+        for piece in outfit_pieces:
+            piece_name = piece['piece_id'].split('/')[-1]
             
-            start_pieces = time.time()
-            for piece in outfit_pieces:
-                piece_name = piece['piece_id'].split('/')[-1]
-                image_path = IMAGES_DIR / outfit_id / piece_name
-                
-                # Converte e COMPRIME imagem para base64
-                start_base64 = time.time()
-                image_base64 = ""
-                if image_path.exists():
+            # Thumbnail pré-comprimado (LRU em memória -> cache em disco -> codifica uma vez)
+            # ou apenas a URL, para o cliente buscar/cachear as imagens em paralelo
+            image_base64 = ""
+            image_url = None
+            if image_base_url is not None:
+                image_url = f"{image_base_url}/{outfit_id}/{piece_name}"
+            else:
+                with tracer.span("suggestion.image_encode"):
                     try:
-                        with open(image_path, "rb") as img_file:
-                            image_data = img_file.read()
-                            # Comprimir para JPEG quality=75 (redução ~50-60%)
-                            image_base64 = compress_image_to_jpeg(image_data, quality=75, return_base64=True)
-                            logger.debug(f"Compressed image {piece_name}: {len(image_base64)} chars")
+                        image_base64 = self.thumbnail_cache.get_base64(outfit_id, piece_name)
+                        if not image_base64:
+                            logger.warning(f"Image not found: {outfit_id}/{piece_name}")
                     except Exception as e:
-                        logger.error(f"Error compressing image {piece_name}: {e}")
+                        logger.error(f"Error loading thumbnail {piece_name}: {e}")
                         # Fallback: retorna vazio mas não quebra o fluxo
                         image_base64 = ""
-                else:
-                    logger.warning(f"Image not found: {image_path}")
-                elapsed_base64 = time.time() - start_base64
-                
-                # Gera descrição a partir das features
-                start_description = time.time()
-                piece_features = outfit_features.get(f"{piece_name}", {})
-                description = self._generate_description_from_features(piece_features)
-                elapsed_description = time.time() - start_description
-                
-                logger.info(f"[TIMER]     Piece {piece_name}: base64={elapsed_base64:.3f}s, description={elapsed_description:.3f}s")
-                
-                pieces_list.append(Pieces(
-                    piece_id=piece['piece_id'],
-                    image_base64=image_base64,
-                    description=description
-                ))
-            elapsed_pieces = time.time() - start_pieces
             
-            outfits_display.append(OutfitDisplay(outfit_id=outfit_id, pieces=pieces_list, probability=score))
-            elapsed_outfit = time.time() - start_outfit
-            logger.info(f"[TIMER]   Total outfit {outfit_id}: {elapsed_outfit:.3f}s ({len(pieces_list)} pieces)")
-        
-        # Preenche com None se não houver 3 sugestões
-        while len(outfits_display) < 3:
-            outfits_display.append(None)
-        
-        elapsed_build_response = time.time() - start_build_response
-        logger.info(f"[TIMER] Build response with images: {elapsed_build_response:.3f}s")
-        
-        elapsed_total = time.time() - start_total
-        logger.info(f"[TIMER] TOTAL generate_suggestion: {elapsed_total:.3f}s")
-        logger.info(f"[TIMER] Breakdown - Embedding: {elapsed_get_embedding:.3f}s | Search: {elapsed_search:.3f}s | Get outfits: {elapsed_get_outfits:.3f}s | Filter: {elapsed_filter:.3f}s | Build inputs: {elapsed_build_inputs:.3f}s | Predict: {elapsed_predict:.3f}s | Top3: {elapsed_top3:.3f}s | Persist: {elapsed_persist:.3f}s | Response: {elapsed_build_response:.3f}s")
+            # Gera descrição a partir das features
+            piece_features = outfit_features.get(f"{piece_name}", {})
+            description = self._generate_description_from_features(piece_features)
+            
+            pieces_list.append(Pieces(
+                piece_id=piece['piece_id'],
+                image_base64=image_base64,
+                image_url=image_url,
+                description=description
+            ))
         
-        return SugestionResponse(
-            Outfit1=outfits_display[0],
-            Outfit2=outfits_display[1],
-            Outfit3=outfits_display[2]
-        )
+        return OutfitDisplay(outfit_id=outfit_id, pieces=pieces_list, probability=score)
     
     def _generate_description_from_features(self, features: dict) -> str:
         """
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+from typing import Any, Dict
+
+from src.core.db import get_db_context
+
+logger = logging.getLogger(__name__)
+
+
+def run_precompute_suggestion(container, payload: Dict[str, Any]) -> None:
+    """
+    Handler do job "precompute_suggestion" da fila de jobs
+
+    Roda na thread do worker: abre uma sessão própria do banco e executa o
+    pipeline de sugestão em um event loop próprio, persistindo o top 3.
+
+    Args:
+        container: Container de DI da aplicação
+        payload: {"item_id": int, "user_id": int}
+    """
+    with get_db_context() as db:
+        app_service = container.suggestion_app_service(db=db)
+        top_outfits = asyncio.run(
+            app_service.precompute_suggestion(payload["item_id"], payload["user_id"])
+        )
+    logger.info(f"Sugestão pré-computada para item {payload['item_id']}: {len(top_outfits)} outfits")
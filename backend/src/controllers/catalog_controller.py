@@ -0,0 +1,60 @@
+import re
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import FileResponse
+
+from modules.thumbnail_cache import ThumbnailCache
+from src.core.config.settings import settings
+from src.core.dependencies import get_thumbnail_cache
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+# IDs de outfit e nomes de peça do catálogo (impede path traversal)
+_OUTFIT_ID_PATTERN = re.compile(r"^[\w\-]+$")
+_PIECE_PATTERN = re.compile(r"^[\w\-]+\.(jpg|jpeg|png|webp)$", re.IGNORECASE)
+
+_MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara If-None-Match (lista ou "*") com a ETag do recurso"""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@router.get("/images/{outfit_id}/{piece}", name="get_catalog_image")
+def get_catalog_image(
+    request: Request,
+    outfit_id: str = Path(..., description="ID do outfit do catálogo"),
+    piece: str = Path(..., description="Nome do arquivo da peça (ex: 1.jpg)"),
+    fmt: Literal["jpeg", "webp"] = Query("jpeg", description="Formato do thumbnail"),
+    thumbnail_cache: ThumbnailCache = Depends(get_thumbnail_cache)
+):
+    """
+    Retorna o thumbnail pré-comprimado de uma peça do catálogo.
+
+    A ETag é forte: o thumbnail é endereçado pelo SHA-256 da imagem original
+    e pela variante, então bytes diferentes sempre têm ETags diferentes.
+    Requisições com If-None-Match correspondente recebem 304 sem corpo.
+    """
+    if not _OUTFIT_ID_PATTERN.match(outfit_id) or not _PIECE_PATTERN.match(piece):
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+
+    try:
+        path = thumbnail_cache.get_path(outfit_id, piece, fmt=fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar thumbnail: {str(e)}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+
+    headers = {
+        "ETag": f'"{path.stem}"',
+        "Cache-Control": f"public, max-age={settings.CATALOG_IMAGE_MAX_AGE}",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type=_MEDIA_TYPES[fmt], headers=headers)
@@ -1,7 +1,6 @@
-import base64
-import time
 import logging
-from fastapi import APIRouter, HTTPException, Depends,status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
 
 from src.core.dependencies import get_current_user
 from src.app_services.description_app_service import DescriptionAppService
@@ -14,6 +13,8 @@ from src.schemas.description import (
   FeatureExtractionResponse
 )
 from src.core.dependencies import get_current_user, get_description_app_service
+from src.core.exceptions import UploadError
+from modules.tracing import tracer
 from src.models.user import User
 
 router = APIRouter(
@@ -27,24 +28,15 @@ router = APIRouter(
     summary="Extrai features via upload de arquivo",
     description="Recebe base64 da imagem para extração de features"
 )
-async def extract_features_from_base64(
+def extract_features_from_base64(
     request: FeatureExtractionRequest,
     current_user: User = Depends(get_current_user),
     app_service: DescriptionAppService = Depends(get_description_app_service)
 ):
-    start_total = time.time()
-    logger.info(f"[TIMER] Starting extract_features for user={current_user.id}")
-    
+    # Handler síncrono: a chamada ao Gemini (segundos) roda no threadpool, sem bloquear o event loop
     try:
-        start_decode = time.time()
-        _ = base64.b64decode(request.image_base64)
-        elapsed_decode = time.time() - start_decode
-        logger.info(f"[TIMER] Base64 decode: {elapsed_decode:.3f}s")
-        
-        start_extract = time.time()
+        # A decodificação do base64 acontece uma única vez, no AIService
         result = app_service.extract_clothing_features(request)
-        elapsed_extract = time.time() - start_extract
-        logger.info(f"[TIMER] App service extraction: {elapsed_extract:.3f}s")
 
         if not result.success:
             raise HTTPException(
@@ -52,12 +44,78 @@ async def extract_features_from_base64(
                 detail=result.description
             )
         
-        elapsed_total = time.time() - start_total
-        logger.info(f"[TIMER] TOTAL extract_features: {elapsed_total:.3f}s")
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao processar arquivo: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post(
+    "/extract-features/stream",
+    response_model=FeatureExtractionResponse,
+    summary="Extrai features via upload em streaming",
+    description=(
+        "Recebe a imagem como multipart/form-data (campo de arquivo) ou bytes crus "
+        "(image/jpeg, image/png, image/webp, application/octet-stream), lida em chunks "
+        "até MAX_UPLOAD_SIZE; arquivos inválidos são recusados assim que o cabeçalho chega"
+    ),
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}
+                },
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            },
+            "required": True,
+        }
+    }
+)
+async def extract_features_from_stream(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    app_service: DescriptionAppService = Depends(get_description_app_service)
+):
+    content_length = request.headers.get("content-length")
+    try:
+        with tracer.span("upload.read") as span:
+            image_data = await app_service.read_upload(
+                request.stream(),
+                request.headers.get("content-type", ""),
+                int(content_length) if content_length and content_length.isdigit() else None
+            )
+            span.set(upload_kb=len(image_data) // 1024)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    try:
+        # A chamada ao Gemini é bloqueante: roda no threadpool, como no endpoint base64
+        result = await run_in_threadpool(app_service.extract_clothing_features_from_bytes, image_data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar arquivo: {str(e)}"
+        )
+    
+    if not result.success:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=result.description
+        )
+    
+    return result
+
+@router.get(
+    "/cache-stats",
+    summary="Métricas do cache de features",
+    description="Hits, misses e hit rate do cache de features extraídas (por hash da imagem)"
+)
+async def get_feature_cache_stats(
+    current_user: User = Depends(get_current_user),
+    app_service: DescriptionAppService = Depends(get_description_app_service)
+):
+    return app_service.get_feature_cache_stats()
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from modules.tracing import tracer
+
+router = APIRouter(tags=["metrics"])
+
+# Content-Type do formato texto de exposição do Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Métricas no formato Prometheus",
+    description="Histogramas de duração por etapa (spans), erros por etapa e gauges de caches/filas"
+)
+def get_metrics():
+    return PlainTextResponse(tracer.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from src.schemas.sugestion import SugestionResponse
+from src.core.config.settings import settings
 from src.app_services.suggestion_app_service import SuggestionAppService
 from src.core.dependencies import get_suggestion_app_service, get_current_user, get_db
 from src.schemas.user import User
@@ -9,14 +11,29 @@ router = APIRouter(prefix="/suggestions", tags=["suggestions"])
 @router.post("/generate", response_model=SugestionResponse)
 async def generate_suggestion(
     item_id: int,
+    request: Request,
+    image_mode: Literal["base64", "url"] = Query("base64", description="base64 inline ou URL de /catalog/images"),
+    refresh: bool = Query(False, description="Recalcula mesmo se houver sugestão salva/em cache"),
     current_user: User = Depends(get_current_user),
     app_service: SuggestionAppService = Depends(get_suggestion_app_service)
 ):
     """
     Gera uma sugestão com base em um item fornecido.
+
+    Com image_mode=url, cada peça traz image_url (thumbnail com ETag/Cache-Control)
+    em vez da imagem em base64. Sugestões já calculadas (pré-computadas ou em
+    cache) são servidas diretamente, a menos que refresh=true.
     """
     try:
-        suggestion = await app_service.generate_suggestion(item_id, user_id=current_user.id)
+        image_base_url = None
+        if image_mode == "url":
+            image_base_url = f"{str(request.base_url).rstrip('/')}{settings.API_V1_PREFIX}/catalog/images"
+        suggestion = await app_service.generate_suggestion(
+            item_id,
+            user_id=current_user.id,
+            image_base_url=image_base_url,
+            use_stored=not refresh
+        )
         return suggestion
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -149,6 +149,23 @@ class Settings(BaseSettings):
     AI_TEMPERATURE: float = Field(default=0.7)
     AI_TIMEOUT: int = Field(default=30)
 
+    # Cache de features extraídas por hash da imagem (+ modelo e versão do prompt)
+    FEATURE_CACHE_ENABLED: bool = Field(default=True)
+    FEATURE_CACHE_HASH: Literal["content", "perceptual"] = Field(
+        default="content",
+        description="content: pixels idênticos; perceptual: tolera recompressão/redimensionamento"
+    )
+    FEATURE_CACHE_ITEMS: int = Field(default=5000, ge=0, description="Máximo de entradas na LRU em memória")
+    FEATURE_CACHE_TTL: int = Field(default=30 * 86400, ge=0, description="Validade em segundos (0 = sem expiração)")
+    FEATURE_CACHE_PATH: Optional[str] = Field(default=None, description="SQLite do segundo nível (None = apenas memória)")
+
+    # Junta imagens de uploads concorrentes na mesma chamada ao Gemini (modules/extraction_batcher.py)
+    FEATURE_BATCH_ENABLED: bool = Field(default=False)
+    FEATURE_BATCH_MAX_IMAGES: int = Field(default=8, ge=1, description="Máximo de imagens por chamada")
+    FEATURE_BATCH_MAX_WAIT_MS: float = Field(default=200.0, ge=0, description="Espera máxima (ms) para agrupar uploads")
+    FEATURE_BATCH_WORKERS: int = Field(default=8, ge=1, description="Chamadas simultâneas ao Gemini")
+    FEATURE_BATCH_TIMEOUT: float = Field(default=600.0, gt=0, description="Espera máxima (s) de um upload no batcher")
+
     # ========================================================================
     # 📁 Armazenamento de Arquivos
     # ========================================================================
@@ -168,6 +185,80 @@ class Settings(BaseSettings):
         return [ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(",") if ext.strip()]
 
 
+    # ========================================================================
+    # 🧭 Busca Vetorial
+    # ========================================================================
+
+    # Espelho NumPy em memória do catálogo "pieces" (busca exata, sem round trip ao ChromaDB)
+    VECTOR_DB_MEMORY_MIRROR: bool = Field(default=False)
+    VECTOR_DB_MIRROR_MMAP: bool = Field(default=True, description="Memory-map do snapshot .npy do espelho")
+
+    # Cache das projeções feature_proj (1000-d) das peças do catálogo para o modelo MCN
+    MODEL_PROJECTION_CACHE: bool = Field(default=False)
+    MODEL_PROJECTION_CACHE_DIR: Optional[str] = Field(
+        default=None,
+        description="Diretório do cache (default: <chroma>/projection_cache)"
+    )
+    MODEL_PROJECTION_CACHE_MMAP: bool = Field(default=True, description="Memory-map da matriz de projeções")
+
+    # ========================================================================
+    # 👗 Features dos Outfits
+    # ========================================================================
+
+    # Índice SQLite dos filtered_outfits (scripts/build_outfit_index.py), carregado na inicialização
+    OUTFIT_FEATURES_INDEX_PATH: Optional[str] = Field(
+        default=None,
+        description="Arquivo do índice (default: backend/filtered_outfits.sqlite)"
+    )
+
+    # ========================================================================
+    # 🖼️ Thumbnails do Catálogo
+    # ========================================================================
+
+    # Thumbnails pré-comprimados (scripts/build_thumbnails.py) + LRU de base64 em memória
+    THUMBNAIL_CACHE_DIR: Optional[str] = Field(default=None, description="Diretório dos thumbnails (default: backend/thumbnails)")
+    THUMBNAIL_MEMORY_ITEMS: int = Field(default=2000, ge=0, description="Máximo de imagens base64 na LRU em memória")
+    THUMBNAIL_QUALITY: int = Field(default=75, ge=1, le=100)
+    THUMBNAIL_MAX_SIZE: Optional[int] = Field(default=None, ge=1, description="Maior lado em pixels (None mantém o original)")
+    CATALOG_IMAGE_MAX_AGE: int = Field(default=86400, ge=0, description="Cache-Control max-age (s) de /catalog/images")
+
+    # ========================================================================
+    # 🧵 Executores (etapas bloqueantes dos handlers async)
+    # ========================================================================
+
+    # Banco, ChromaDB, modelo e imagens rodam em pools de threads, fora do event loop
+    SUGGESTION_EXECUTORS_ENABLED: bool = Field(default=True)
+    EXECUTOR_IO_WORKERS: int = Field(default=8, ge=1, description="Threads para banco/ChromaDB/arquivos")
+    EXECUTOR_COMPUTE_WORKERS: int = Field(default=2, ge=1, description="Threads para modelo e codecs de imagem")
+    # Execuções simultâneas por etapa (0 = limitado apenas pelo pool)
+    STAGE_LIMIT_DB: int = Field(default=8, ge=0)
+    STAGE_LIMIT_VECTOR: int = Field(default=4, ge=0)
+    STAGE_LIMIT_MODEL: int = Field(default=2, ge=0)
+    STAGE_LIMIT_IMAGE: int = Field(default=2, ge=0)
+
+    # Micro-batching do modelo entre requisições concorrentes (modules/inference_scheduler.py)
+    INFERENCE_SCHEDULER_ENABLED: bool = Field(default=True)
+    INFERENCE_MAX_BATCH_SIZE: int = Field(default=256, ge=1, description="Máximo de outfits por forward (batch agrupado e chunks do ModelPredictor)")
+    INFERENCE_MAX_WAIT_MS: float = Field(default=3.0, ge=0, description="Espera máxima (ms) para agrupar jobs")
+
+    # ========================================================================
+    # 📬 Pré-cálculo de Sugestões
+    # ========================================================================
+
+    # Calcula e persiste a sugestão em background quando um item é criado/editado
+    SUGGESTION_PRECOMPUTE_ENABLED: bool = Field(default=False)
+    SUGGESTION_JOBS_BACKEND: Literal["inprocess", "redis"] = Field(default="inprocess")
+    SUGGESTION_JOBS_WORKERS: int = Field(default=1, ge=0, description="Threads executando jobs (0 = apenas produz, redis)")
+    REDIS_URL: Optional[str] = Field(default=None, description="URL do Redis para a fila de jobs")
+    # Alterar após reindexar o catálogo invalida as sugestões persistidas e o cache de resultados
+    CATALOGUE_VERSION: str = Field(default="1")
+
+    # Cache de resultados por (embedding, categoria, catálogo, checkpoint)
+    SUGGESTION_RESULT_CACHE: bool = Field(default=True)
+    SUGGESTION_RESULT_CACHE_ITEMS: int = Field(default=10000, ge=0, description="Máximo de entradas na LRU em memória")
+    SUGGESTION_RESULT_CACHE_TTL: int = Field(default=86400, ge=0, description="Validade em segundos (0 = sem expiração)")
+    SUGGESTION_RESULT_CACHE_PATH: Optional[str] = Field(default=None, description="SQLite do segundo nível (None = apenas memória)")
+
     # ========================================================================
     # 📊 Logging
     # ========================================================================
@@ -176,6 +267,12 @@ class Settings(BaseSettings):
     LOG_FORMAT: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     LOG_FILE: Optional[str] = Field(default=None)
 
+    # Spans e histogramas por etapa (modules/tracing.py); resumo por requisição em LOG_LEVEL=DEBUG
+    TRACING_ENABLED: bool = Field(default=True)
+    METRICS_ENDPOINT_ENABLED: bool = Field(default=True, description="Expõe GET /metrics (formato Prometheus)")
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = Field(default=None, description="Exporta os spans via OTLP/gRPC (None = desativado)")
+    OTEL_SERVICE_NAME: str = Field(default="blindstyle-api")
+
     # ========================================================================
     # ⚡ Rate Limiting
     # ========================================================================
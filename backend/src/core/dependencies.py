@@ -16,6 +16,7 @@ from src.services.auth_service import AuthService
 from src.app_services.item_app_service import ItemAppService
 from src.app_services.user_app_service import UserAppService
 from src.app_services.suggestion_app_service import SuggestionAppService
+from modules.thumbnail_cache import ThumbnailCache
 
 security = HTTPBearer(scheme_name="bearerAuth", description="Insira o token JWT obtido no endpoint de login", auto_error=True)
 
@@ -33,6 +34,9 @@ def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
     user_repo = container.user_repository(db=db)
     return container.auth_service(user_repository=user_repo)
 
+def get_thumbnail_cache() -> ThumbnailCache:
+    return container.thumbnail_cache()
+
 # ============ App Services ============
 def get_user_app_service(db: Session = Depends(get_db)) -> UserAppService:
     user_repo = container.user_repository(db=db)
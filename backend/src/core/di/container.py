@@ -9,7 +9,7 @@ from src.services.item_service import ItemService
 from src.services.user_service import UserService
 from src.services.auth_service import AuthService
 from src.services.image_service import ImageService
-from src.services.file_service import FileService
+from src.services.upload_service import UploadService
 
 from src.app_services.description_app_service import DescriptionAppService
 from src.app_services.user_app_service import UserAppService
@@ -20,8 +20,38 @@ from src.app_services.suggestion_app_service import SuggestionAppService
 from modules.vector_db import VectorDB
 from modules.embeddings import EmbeddingGenerator
 from modules.feature_extractor import FeatureExtractor
+from modules.extraction_batcher import ExtractionBatcher
 from modules.pytorch_model import ModelPredictor
 from modules.model_input import ModelInputBuilder
+from modules.thumbnail_cache import ThumbnailCache
+from modules.outfit_features import OutfitFeaturesIndex
+from modules.inference_scheduler import InferenceScheduler
+from modules.result_cache import ResultCache
+
+from src.core.config.settings import settings
+from src.core.executors import StageExecutors
+from src.core.jobs import create_job_queue
+from modules.tracing import tracer
+
+
+def _with_gauges(factory, prefix, read):
+    """
+    Envolve a criação de um componente para expor suas estatísticas em /metrics
+
+    O registro acontece só quando o singleton é criado: o scrape lê componentes
+    já existentes e nunca os instancia (o scheduler, por exemplo, carrega o modelo).
+
+    Args:
+        factory: Classe ou função que cria o componente
+        prefix: Prefixo das métricas (ex: "feature_cache")
+        read: Função componente -> dict de estatísticas
+    """
+    def create(*args, **kwargs):
+        component = factory(*args, **kwargs)
+        tracer.register_gauges(prefix, lambda: read(component))
+        return component
+    return create
+
 
 class Container(containers.DeclarativeContainer):
 
@@ -37,6 +67,15 @@ class Container(containers.DeclarativeContainer):
     
     feature_extractor = providers.Singleton(FeatureExtractor)
     
+    feature_batcher = providers.Singleton(
+        _with_gauges(ExtractionBatcher, "feature_batcher", lambda component: component.stats),
+        extractor=feature_extractor,
+        max_images=settings.FEATURE_BATCH_MAX_IMAGES,
+        max_wait_ms=settings.FEATURE_BATCH_MAX_WAIT_MS,
+        workers=settings.FEATURE_BATCH_WORKERS,
+        timeout=settings.FEATURE_BATCH_TIMEOUT
+    ) if settings.FEATURE_BATCH_ENABLED else providers.Object(None)
+    
     embedding_generator = providers.Singleton(
         EmbeddingGenerator,
         vector_db=vector_db
@@ -46,7 +85,9 @@ class Container(containers.DeclarativeContainer):
         ModelPredictor,
         checkpoint_path="../checkpoints/best_model.pth",
         device=None,  # Auto-detect (CPU or CUDA)
-        config=None   # Use defaults
+        config=None,  # Use defaults
+        # Mesmo limite do batch agrupado: um forward por grupo do InferenceScheduler
+        max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE
     )
     
     model_input_builder = providers.Singleton(
@@ -54,6 +95,60 @@ class Container(containers.DeclarativeContainer):
         max_items=5,
         embedding_dim=96
     )
+    
+    thumbnail_cache = providers.Singleton(
+        ThumbnailCache,
+        cache_dir=settings.THUMBNAIL_CACHE_DIR,
+        max_memory_items=settings.THUMBNAIL_MEMORY_ITEMS,
+        quality=settings.THUMBNAIL_QUALITY,
+        size=settings.THUMBNAIL_MAX_SIZE
+    )
+    
+    inference_scheduler = providers.Singleton(
+        _with_gauges(InferenceScheduler, "inference_scheduler", lambda component: component.stats),
+        predictor=model_predictor,
+        max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=settings.INFERENCE_MAX_WAIT_MS
+    ) if settings.INFERENCE_SCHEDULER_ENABLED else providers.Object(None)
+    
+    suggestion_result_cache = providers.Singleton(
+        _with_gauges(ResultCache, "suggestion_result_cache", lambda cache: cache.get_stats()),
+        max_items=settings.SUGGESTION_RESULT_CACHE_ITEMS,
+        ttl_seconds=settings.SUGGESTION_RESULT_CACHE_TTL,
+        sqlite_path=settings.SUGGESTION_RESULT_CACHE_PATH
+    ) if settings.SUGGESTION_RESULT_CACHE else providers.Object(None)
+    
+    feature_cache = providers.Singleton(
+        _with_gauges(ResultCache, "feature_cache", lambda cache: cache.get_stats()),
+        max_items=settings.FEATURE_CACHE_ITEMS,
+        ttl_seconds=settings.FEATURE_CACHE_TTL,
+        sqlite_path=settings.FEATURE_CACHE_PATH
+    ) if settings.FEATURE_CACHE_ENABLED else providers.Object(None)
+    
+    outfit_features = providers.Singleton(
+        OutfitFeaturesIndex,
+        path=settings.OUTFIT_FEATURES_INDEX_PATH
+    )
+    
+    executors = providers.Singleton(
+        StageExecutors,
+        io_workers=settings.EXECUTOR_IO_WORKERS,
+        compute_workers=settings.EXECUTOR_COMPUTE_WORKERS,
+        stage_limits={
+            "db": settings.STAGE_LIMIT_DB,
+            "vector": settings.STAGE_LIMIT_VECTOR,
+            "model": settings.STAGE_LIMIT_MODEL,
+            "image": settings.STAGE_LIMIT_IMAGE,
+        },
+        enabled=settings.SUGGESTION_EXECUTORS_ENABLED
+    )
+
+    job_queue = providers.Singleton(
+        _with_gauges(create_job_queue, "job_queue", lambda component: component.stats),
+        backend=settings.SUGGESTION_JOBS_BACKEND,
+        workers=settings.SUGGESTION_JOBS_WORKERS,
+        redis_url=settings.REDIS_URL
+    ) if settings.SUGGESTION_PRECOMPUTE_ENABLED else providers.Object(None)
 
     # ---------------- Services ----------------
     user_service = providers.Factory(UserService, user_repository=user_repository)
@@ -69,13 +164,19 @@ class Container(containers.DeclarativeContainer):
     
     image_service = providers.Factory(ImageService)
     
-    file_service = providers.Factory(FileService)
+    upload_service = providers.Factory(
+        UploadService,
+        image_service=image_service,
+        max_size=settings.MAX_UPLOAD_SIZE
+    )
     
     ai_service = providers.Singleton(
         AIService,
         feature_extractor=feature_extractor,
-        file_service=file_service,
-        image_service=image_service
+        image_service=image_service,
+        feature_cache=feature_cache,
+        cache_hash_mode=settings.FEATURE_CACHE_HASH,
+        feature_batcher=feature_batcher
     )
 
     # ---------------- App Services ----------------
@@ -87,13 +188,15 @@ class Container(containers.DeclarativeContainer):
     
     item_app_service = providers.Factory(
         ItemAppService, 
-        item_service=item_service
+        item_service=item_service,
+        job_queue=job_queue
     )
     
     description_app_service = providers.Factory(
         DescriptionAppService, 
         image_service=image_service, 
-        ai_service=ai_service
+        ai_service=ai_service,
+        upload_service=upload_service
     )
     
     suggestion_app_service = providers.Factory(
@@ -101,5 +204,11 @@ class Container(containers.DeclarativeContainer):
         db=providers.Dependency(),
         vector_db=vector_db,
         model_predictor=model_predictor,
-        model_input_builder=model_input_builder
+        model_input_builder=model_input_builder,
+        thumbnail_cache=thumbnail_cache,
+        outfit_features=outfit_features,
+        executors=executors,
+        inference_scheduler=inference_scheduler,
+        catalogue_version=settings.CATALOGUE_VERSION,
+        result_cache=suggestion_result_cache
     )
\ No newline at end of file
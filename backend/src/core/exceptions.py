@@ -10,6 +10,11 @@ class UnauthorizedError(ServiceError):
 class ValidationError(ServiceError):
     pass
 
+class UploadError(ValidationError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
 class BusinessError(ServiceError):
     pass
 
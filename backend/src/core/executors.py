@@ -0,0 +1,102 @@
+"""
+Executores dedicados para etapas bloqueantes dos handlers async
+
+Handlers async não podem chamar ChromaDB, SQLAlchemy síncrono, PyTorch ou
+PIL diretamente: o event loop do worker uvicorn ficaria parado durante a
+chamada e todas as outras requisições esperariam.
+
+StageExecutors mantém dois pools limitados de threads:
+- io: banco de dados, ChromaDB e leitura de arquivos
+- compute: inferência do modelo e codecs de imagem
+
+Além do tamanho dos pools, cada etapa (stage) tem um limite próprio de
+execuções simultâneas, de modo que uma etapa lenta não ocupa todos os
+workers do pool.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Etapas executadas no pool de computação; as demais usam o pool de I/O
+COMPUTE_STAGES = {"model", "image"}
+
+
+class StageExecutors:
+    """
+    Pools de threads de I/O e computação com limites de concorrência por etapa
+    """
+
+    def __init__(
+        self,
+        io_workers: int = 8,
+        compute_workers: int = 2,
+        stage_limits: Optional[Dict[str, int]] = None,
+        enabled: bool = True
+    ):
+        """
+        Inicializa os executores
+
+        Args:
+            io_workers: Threads do pool de I/O
+            compute_workers: Threads do pool de computação
+            stage_limits: Máximo de execuções simultâneas por etapa
+                (ex: {"db": 8, "vector": 4, "model": 2, "image": 2})
+            enabled: Se False, executa as etapas inline no event loop (comportamento antigo)
+        """
+        self.enabled = enabled
+        self.stage_limits = stage_limits or {}
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="blindstyle-io")
+        self._compute = ThreadPoolExecutor(max_workers=compute_workers, thread_name_prefix="blindstyle-compute")
+        # Semáforos por (event loop, etapa): asyncio.Semaphore pertence a um único loop
+        self._semaphores: Dict[tuple, asyncio.Semaphore] = {}
+        self._semaphores_lock = threading.Lock()
+
+    def _semaphore(self, stage: str) -> Optional[asyncio.Semaphore]:
+        """Semáforo da etapa no event loop atual (None se a etapa não tem limite)"""
+        limit = self.stage_limits.get(stage)
+        if not limit:
+            return None
+        key = (id(asyncio.get_running_loop()), stage)
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(limit)
+                self._semaphores[key] = semaphore
+        return semaphore
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Executa fn(*args, **kwargs) no pool da etapa, respeitando o limite da etapa
+
+        Args:
+            stage: Nome da etapa ("db", "vector", "model", "image", ...)
+            fn: Função bloqueante
+
+        Returns:
+            Resultado de fn
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        pool = self._compute if stage in COMPUTE_STAGES else self._io
+        call = functools.partial(fn, *args, **kwargs)
+        semaphore = self._semaphore(stage)
+        loop = asyncio.get_running_loop()
+
+        if semaphore is None:
+            return await loop.run_in_executor(pool, call)
+        async with semaphore:
+            return await loop.run_in_executor(pool, call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra os pools (chamado no shutdown da aplicação)"""
+        self._io.shutdown(wait=wait)
+        self._compute.shutdown(wait=wait)
@@ -0,0 +1,221 @@
+"""
+Fila de jobs em background
+
+Usada para pré-computar sugestões quando itens são criados ou atualizados,
+fora do ciclo da requisição.
+
+Dois backends com a mesma interface (JobQueue):
+- InProcessJobQueue: pool de threads no próprio processo (padrão)
+- RedisJobQueue: lista no Redis consumida por threads (LPUSH/BRPOP), para
+  compartilhar a fila entre workers uvicorn; requer o pacote redis
+
+Jobs pendentes com a mesma chave são deduplicados: editar um item várias
+vezes seguidas gera um único recálculo.
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], None]
+
+
+class JobQueue(ABC):
+    """Interface comum das filas de jobs"""
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "deduplicated": 0, "completed": 0, "failed": 0}
+
+    def register(self, name: str, handler: JobHandler) -> None:
+        """
+        Registra o handler de um tipo de job
+
+        Args:
+            name: Nome do job (ex: "precompute_suggestion")
+            handler: Função que recebe o payload do job
+        """
+        self._handlers[name] = handler
+
+    @abstractmethod
+    def enqueue(self, name: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
+        """
+        Enfileira um job
+
+        Args:
+            name: Nome do job registrado
+            payload: Dados do job (serializáveis em JSON)
+            key: Chave de deduplicação (default: nome + payload)
+
+        Returns:
+            True se enfileirado, False se já havia um job pendente com a mesma chave
+        """
+
+    def start(self) -> None:
+        """Inicia os consumidores (chamado no startup da aplicação)"""
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Encerra os consumidores"""
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _job_key(name: str, payload: Dict[str, Any], key: Optional[str]) -> str:
+        return key if key is not None else f"{name}:{json.dumps(payload, sort_keys=True)}"
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _execute(self, name: str, payload: Dict[str, Any]) -> None:
+        """Executa o handler do job, registrando falhas sem propagar"""
+        handler = self._handlers.get(name)
+        if handler is None:
+            logger.error(f"Job '{name}' sem handler registrado: descartado")
+            self._count("failed")
+            return
+        try:
+            handler(payload)
+            self._count("completed")
+        except Exception as e:
+            logger.error(f"Erro no job '{name}' ({payload}): {e}")
+            self._count("failed")
+
+
+class InProcessJobQueue(JobQueue):
+    """Fila em memória executada por um pool de threads do próprio processo"""
+
+    def __init__(self, workers: int = 1, max_pending: int = 1000):
+        """
+        Args:
+            workers: Threads executando jobs
+            max_pending: Máximo de jobs pendentes (excedentes são descartados com warning)
+        """
+        super().__init__()
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blindstyle-jobs")
+        self._pending: set = set()
+        self._pending_lock = threading.Lock()
+
+    def enqueue(self, name: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
+        job_key = self._job_key(name, payload, key)
+        with self._pending_lock:
+            if job_key in self._pending:
+                self._count("deduplicated")
+                return False
+            if len(self._pending) >= self.max_pending:
+                logger.warning(f"Fila de jobs cheia ({self.max_pending}): job '{job_key}' descartado")
+                return False
+            self._pending.add(job_key)
+
+        self._count("enqueued")
+        self._pool.submit(self._run, job_key, name, payload)
+        return True
+
+    def _run(self, job_key: str, name: str, payload: Dict[str, Any]) -> None:
+        # Libera a chave antes de executar: edições durante o job geram um novo recálculo
+        with self._pending_lock:
+            self._pending.discard(job_key)
+        self._execute(name, payload)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class RedisJobQueue(JobQueue):
+    """Fila em uma lista do Redis, consumida por threads (LPUSH/BRPOP)"""
+
+    def __init__(
+        self,
+        url: str,
+        queue_name: str = "blindstyle:jobs",
+        workers: int = 1,
+        client: Any = None
+    ):
+        """
+        Args:
+            url: URL do Redis (ex: redis://localhost:6379/0)
+            queue_name: Nome da lista; as chaves pendentes ficam em "<queue_name>:pending"
+            workers: Threads consumidoras neste processo (0 = apenas produz)
+            client: Cliente compatível com redis.Redis (opcional, para testes)
+        """
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("RedisJobQueue requer o pacote redis (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.queue_name = queue_name
+        self.pending_name = f"{queue_name}:pending"
+        self.workers = workers
+        self._stop = threading.Event()
+        self._threads = []
+
+    def enqueue(self, name: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
+        job_key = self._job_key(name, payload, key)
+        if not self.client.sadd(self.pending_name, job_key):
+            self._count("deduplicated")
+            return False
+        self.client.lpush(self.queue_name, json.dumps({"key": job_key, "name": name, "payload": payload}))
+        self._count("enqueued")
+        return True
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._consume, name=f"blindstyle-jobs-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _consume(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self.client.brpop(self.queue_name, timeout=1)
+            except Exception as e:
+                logger.error(f"Erro lendo fila de jobs do Redis: {e}")
+                self._stop.wait(1)
+                continue
+            if item is None:
+                continue
+            job = json.loads(item[1])
+            self.client.srem(self.pending_name, job["key"])
+            self._execute(job["name"], job["payload"])
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+
+def create_job_queue(
+    backend: str = "inprocess",
+    workers: int = 1,
+    redis_url: Optional[str] = None,
+    max_pending: int = 1000
+) -> JobQueue:
+    """
+    Cria a fila de jobs do backend configurado
+
+    Args:
+        backend: "inprocess" ou "redis"
+        workers: Threads executando jobs
+        redis_url: URL do Redis (obrigatória para backend "redis")
+        max_pending: Máximo de jobs pendentes (apenas "inprocess")
+    """
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL é obrigatória para a fila de jobs no Redis")
+        return RedisJobQueue(redis_url, workers=workers)
+    return InProcessJobQueue(workers=workers, max_pending=max_pending)
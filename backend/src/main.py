@@ -1,5 +1,7 @@
 import logging
+import time
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,12 +11,17 @@ from fastapi.exceptions import RequestValidationError
 from src.core.config.settings import settings
 from src.core.db import init_db, close_db
 from src.core.di.container import Container
+from src.app_services.item_app_service import PRECOMPUTE_SUGGESTION_JOB
+from src.app_services.suggestion_jobs import run_precompute_suggestion
 from src.controllers import (
+    catalog_controller,
     description_controller,
     item_controller,
+    metrics_controller,
     suggestion_controller,
     user_controller,
 )
+from modules.tracing import tracer
 
 logging.basicConfig(
     level=logging.INFO if not settings.DEBUG else logging.DEBUG,
@@ -26,10 +33,45 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Iniciando BlindStyle API...")
     init_db()
+    from src.core.dependencies import container
+    # Carrega o índice de features dos outfits uma única vez
+    container.outfit_features()
+    if settings.VECTOR_DB_MEMORY_MIRROR:
+        container.vector_db().enable_memory_mirror("pieces", mmap=settings.VECTOR_DB_MIRROR_MMAP)
+    if settings.MODEL_PROJECTION_CACHE:
+        _enable_projection_cache(container)
+    job_queue = container.job_queue()
+    if job_queue is not None:
+        job_queue.register(PRECOMPUTE_SUGGESTION_JOB, partial(run_precompute_suggestion, container))
+        job_queue.start()
     yield
     logger.info("Encerrando BlindStyle API...")
+    if job_queue is not None:
+        job_queue.shutdown(wait=False)
+    container.executors().shutdown(wait=False)
     close_db()
 
+def _enable_projection_cache(container) -> None:
+    """Carrega o cache de projeções e o descarta a cada escrita na coleção pieces"""
+    vector_db = container.vector_db()
+    predictor = container.model_predictor()
+    cache_dir = settings.MODEL_PROJECTION_CACHE_DIR or vector_db.path / "projection_cache"
+
+    def invalidate(collection_name: str) -> None:
+        if collection_name == "pieces":
+            predictor.clear_projection_cache()
+            predictor.delete_projection_cache(cache_dir)
+            logger.warning("Catálogo alterado: cache de projeções descartado")
+
+    vector_db.add_write_listener(invalidate)
+    predictor.enable_projection_cache(
+        cache_dir,
+        load_catalogue=lambda: vector_db.get_collection_matrix("pieces"),
+        expected_count=vector_db.get_collection("pieces").count(),
+        mmap=settings.MODEL_PROJECTION_CACHE_MMAP,
+        catalogue_fingerprint=vector_db.fingerprint("pieces")
+    )
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -38,6 +80,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 # ====================================Application Factory====================================
 def create_app() -> FastAPI:
+    tracer.configure(
+        enabled=settings.TRACING_ENABLED,
+        otel_endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT,
+        service_name=settings.OTEL_SERVICE_NAME
+    )
+
     _app = FastAPI(
         title="BlindStyle API",
         description="Backend API para o projeto BlindStyle",
@@ -58,6 +106,27 @@ def create_app() -> FastAPI:
         expose_headers=["X-Process-Time"]
     )
 
+    # Template completo (prefixo + rota) de cada rota dos routers incluídos, por id da rota.
+    # Dependendo da versão do FastAPI, scope["route"] pode ser a rota original do router,
+    # cujo path não tem o prefixo do include_router; quando a rota já é a cópia registrada
+    # no app, o fallback route.path já vem completo
+    route_templates = {}
+
+    @_app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        # Span por rota (template, não o path concreto: cardinalidade limitada)
+        start = time.perf_counter()
+        with tracer.span("http.request", method=request.method) as span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            template = route_templates.get(id(route), getattr(route, "path", "unmatched"))
+            span.set(route=template, status=response.status_code)
+        elapsed = time.perf_counter() - start
+        if route is not None:
+            tracer.observe(f"http {request.method} {template}", elapsed, error=response.status_code >= 500)
+        response.headers["X-Process-Time"] = f"{elapsed:.4f}"
+        return response
+
 # ====================================Exception Handlers====================================
     _app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
@@ -66,14 +135,22 @@ def create_app() -> FastAPI:
 
     API_V1_PREFIX = "/api/v1"
 
-    _app.include_router(user_controller.router, prefix=API_V1_PREFIX)
-    _app.include_router(item_controller.router, prefix=API_V1_PREFIX)
-    _app.include_router(description_controller.router, prefix=API_V1_PREFIX)
-    _app.include_router(suggestion_controller.router, prefix=API_V1_PREFIX)
+    for controller in (
+        user_controller,
+        item_controller,
+        description_controller,
+        suggestion_controller,
+        catalog_controller,
+    ):
+        _app.include_router(controller.router, prefix=API_V1_PREFIX)
+        route_templates.update({id(route): API_V1_PREFIX + route.path for route in controller.router.routes})
+    if settings.METRICS_ENDPOINT_ENABLED:
+        _app.include_router(metrics_controller.router)
 
 # ====================================Dependency Injection====================================
     Container().wire(
         modules=[
+            "src.controllers.catalog_controller",
             "src.controllers.description_controller",
             "src.controllers.item_controller",
             "src.controllers.suggestion_controller",
@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from src.models.base import Base, utc_now
 
 class Suggestion(Base):
     """Modelo de Sugestão para armazenamento no banco de dados"""
     __tablename__ = "suggestions"
+    # Uma sugestão por usuário/item: a gravação é um upsert (SuggestionRepository.upsert)
+    __table_args__ = (UniqueConstraint("user_id", "item_id", name="uq_suggestions_user_item"),)
 
     id = Column(Integer, primary_key=True, index=True)
     outfit1 = Column(String(1000), nullable=True)
     outfit2 = Column(String(1000), nullable=True)
     outfit3 = Column(String(1000), nullable=True)
+    scores = Column(String(100), nullable=True)  # CSV com o score de cada outfit
+    catalogue_version = Column(String(100), nullable=True)  # Catálogo/modelo usados no cálculo
 
     # Relacionamentos
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -1,6 +1,8 @@
 from typing import List, Optional
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from src.models.base import utc_now
 from src.models.suggestion import Suggestion
 
 
@@ -16,7 +18,9 @@ class SuggestionRepository:
         item_id: int,
         outfit1: Optional[str] = None,
         outfit2: Optional[str] = None,
-        outfit3: Optional[str] = None
+        outfit3: Optional[str] = None,
+        scores: Optional[str] = None,
+        catalogue_version: Optional[str] = None
     ) -> Suggestion:
         """
         Cria uma nova sugestão no banco de dados
@@ -27,6 +31,8 @@ class SuggestionRepository:
             outfit1: CSV com paths das imagens do outfit 1
             outfit2: CSV com paths das imagens do outfit 2
             outfit3: CSV com paths das imagens do outfit 3
+            scores: CSV com os scores dos outfits
+            catalogue_version: Versão do catálogo/modelo usada no cálculo
             
         Returns:
             Suggestion: Objeto Suggestion criado
@@ -36,13 +42,73 @@ class SuggestionRepository:
             item_id=item_id,
             outfit1=outfit1,
             outfit2=outfit2,
-            outfit3=outfit3
+            outfit3=outfit3,
+            scores=scores,
+            catalogue_version=catalogue_version
         )
         self.db.add(db_suggestion)
         self.db.commit()
         self.db.refresh(db_suggestion)
         return db_suggestion
 
+    def upsert(
+        self,
+        user_id: int,
+        item_id: int,
+        outfit1: Optional[str] = None,
+        outfit2: Optional[str] = None,
+        outfit3: Optional[str] = None,
+        scores: Optional[str] = None,
+        catalogue_version: Optional[str] = None,
+        max_attempts: int = 3
+    ) -> None:
+        """
+        Grava a sugestão do usuário/item, substituindo a existente
+        
+        Seguro entre requisições concorrentes para o mesmo par: UPDATE da linha
+        existente; sem linha, INSERT; se outra requisição inseriu no meio tempo
+        (IntegrityError na restrição única), refaz o UPDATE.
+        
+        Args:
+            user_id: ID do usuário
+            item_id: ID do item
+            outfit1: CSV com paths das imagens do outfit 1
+            outfit2: CSV com paths das imagens do outfit 2
+            outfit3: CSV com paths das imagens do outfit 3
+            scores: CSV com os scores dos outfits
+            catalogue_version: Versão do catálogo/modelo usada no cálculo
+            max_attempts: Tentativas UPDATE/INSERT antes de desistir
+            
+        Raises:
+            IntegrityError: Conflito persistente (ex: item removido durante a gravação)
+        """
+        values = dict(
+            outfit1=outfit1,
+            outfit2=outfit2,
+            outfit3=outfit3,
+            scores=scores,
+            catalogue_version=catalogue_version,
+            created_at=utc_now()
+        )
+        for attempt in range(max_attempts):
+            result = self.db.execute(
+                update(Suggestion)
+                .where(Suggestion.user_id == user_id)
+                .where(Suggestion.item_id == item_id)
+                .values(**values)
+            )
+            if result.rowcount:
+                self.db.commit()
+                return
+            try:
+                self.db.add(Suggestion(user_id=user_id, item_id=item_id, **values))
+                self.db.commit()
+                return
+            except IntegrityError:
+                self.db.rollback()
+                if attempt == max_attempts - 1:
+                    raise
+
     def get_by_id(self, suggestion_id: int) -> Optional[Suggestion]:
         """Busca uma sugestão pelo ID"""
         query = select(Suggestion).where(Suggestion.id == suggestion_id)
@@ -113,3 +179,17 @@ class SuggestionRepository:
             self.db.commit()
             return True
         return False
+
+    def delete_by_item(self, item_id: int) -> int:
+        """
+        Remove todas as sugestões de um item (ex: item editado ou deletado)
+        
+        Args:
+            item_id: ID do item
+            
+        Returns:
+            int: Número de sugestões removidas
+        """
+        result = self.db.execute(delete(Suggestion).where(Suggestion.item_id == item_id))
+        self.db.commit()
+        return result.rowcount
@@ -30,6 +30,11 @@ class ItemUpdate(BaseModel):
     name: Optional[str] = Field(None, description="Novo nome do item")
     description: Optional[str] = Field(None, description="Nova descrição do item")
     category: Optional[str] = Field(None, description="Nova categoria do item")
+    item_type: Optional[str] = Field(None, description="Novo tipo específico do item")
+    primary_color: Optional[str] = Field(None, description="Nova cor primária do item")
+    usage: Optional[str] = Field(None, description="Novo uso pretendido do item")
+    texture: Optional[str] = Field(None, description="Nova textura do item")
+    print_category: Optional[str] = Field(None, description="Nova categoria de estampa do item")
     color: Optional[str] = Field(None, description="Nova cor do item")
     image_url: Optional[str] = Field(None, description="Nova URL da imagem")
     ownership: Optional[bool] = Field(None, description="Nova indicação de propriedade do item")
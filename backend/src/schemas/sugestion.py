@@ -4,7 +4,8 @@ from typing import Optional, List
 
 class Pieces(BaseModel):
     piece_id: str
-    image_base64: str
+    image_base64: str = Field("", description="Imagem em base64 (vazio quando image_mode=url)")
+    image_url: Optional[str] = Field(None, description="URL do thumbnail (preenchido quando image_mode=url)")
     description: str
     
 class OutfitDisplay(BaseModel):
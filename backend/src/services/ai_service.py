@@ -1,6 +1,7 @@
 import base64
-import time
+import hashlib
 import logging
+from typing import Any, Dict, Optional
 
 # OTIMIZAÇÃO: Importar apenas plugins PIL necessários para evitar overhead
 import PIL.Image
@@ -12,88 +13,146 @@ logger = logging.getLogger(__name__)
 
 from src.schemas.description import ClothingFeatures, FeatureExtractionResponse
 from src.utils.description_formatter import generate_description_from_features
-from src.services.file_service import FileService
 from src.services.image_service import ImageService
 
 from modules import FeatureExtractor
+from modules.extraction_batcher import ExtractionBatcher
+from modules.image_preprocess import prepare_image
+from modules.result_cache import ResultCache
+from modules.tracing import tracer
 
 class AIService:
-    def __init__(self, feature_extractor: FeatureExtractor, file_service: FileService, image_service: ImageService):
+    def __init__(
+        self,
+        feature_extractor: FeatureExtractor,
+        image_service: ImageService,
+        feature_cache: Optional[ResultCache] = None,
+        cache_hash_mode: str = "content",
+        feature_batcher: Optional[ExtractionBatcher] = None
+    ):
+        """
+        Args:
+            feature_extractor: Extrator de features (Gemini)
+            image_service: Validação e hash de imagens
+            feature_cache: Cache de features por hash da imagem (None desativa)
+            cache_hash_mode: "content" ou "perceptual" (ver ImageService.content_hash)
+            feature_batcher: Junta uploads concorrentes na mesma chamada ao Gemini (None desativa)
+        """
         self.extractor = feature_extractor
-        self.file_service = file_service
         self.image_service = image_service
+        self.feature_cache = feature_cache
+        self.cache_hash_mode = cache_hash_mode
+        self.feature_batcher = feature_batcher
         
+        # Trocar de modelo ou editar o prompt invalida as entradas antigas do cache
+        prompt_version = hashlib.sha256(self.extractor.prompt.encode("utf-8")).hexdigest()[:12]
+        self._cache_namespace = f"features:{self.extractor.model_name}:{prompt_version}"
+    
+    def _build_response(self, features_data: Dict) -> FeatureExtractionResponse:
+        """Valida as features e gera a descrição"""
+        with tracer.span("features.build_response"):
+            features = ClothingFeatures(**features_data)
+            description = generate_description_from_features(features.model_dump())
         
+        return FeatureExtractionResponse(
+            success=True,
+            features = features,
+            description = description
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Métricas do cache de features (hits, misses, hit_rate, ...)
+        """
+        if self.feature_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, "hash_mode": self.cache_hash_mode, **self.feature_cache.get_stats()}
     
     def extract_features_from_base64(self, image_base64: str) -> FeatureExtractionResponse:
-        start_total = time.time()
-        logger.info("[TIMER] Starting AI service feature extraction")
-        
         try:
-            start_decode = time.time()
-            image_data = base64.b64decode(image_base64)
-            elapsed_decode = time.time() - start_decode
-            logger.info(f"[TIMER]   Base64 decode: {elapsed_decode:.3f}s")
+            with tracer.span("features.base64_decode"):
+                image_data = base64.b64decode(image_base64)
+        except Exception as e:
+            return FeatureExtractionResponse(
+                success=False,
+                description=f"Erro ao processar imagem: {str(e)}"
+            )
+        
+        return self.extract_features_from_bytes(image_data)
+    
+    def extract_features_from_bytes(self, image_data: bytes) -> FeatureExtractionResponse:
+        """
+        Extrai features de uma imagem já recebida em bytes (upload em streaming ou base64 decodificado)
+        
+        Args:
+            image_data: Bytes da imagem (JPEG/PNG/WEBP)
             
-            # Validar imagem antes de processar
-            start_validate = time.time()
-            is_valid, error_msg = self.image_service.validate_image(image_data)
-            if not is_valid:
+        Returns:
+            FeatureExtractionResponse
+        """
+        with tracer.span("features.extract", upload_kb=len(image_data) // 1024) as root:
+            try:
+                return self._extract_features(image_data, root)
+            except Exception as e:
                 return FeatureExtractionResponse(
                     success=False,
-                    description=f"Imagem inválida: {error_msg}"
-                )
-            elapsed_validate = time.time() - start_validate
-            logger.info(f"[TIMER]   Image validation: {elapsed_validate:.3f}s")
-            
-            # Use FileService context manager for automatic cleanup
-            with self.file_service.create_temp_image_file(image_data) as image_path:
-                start_file_ops = time.time()
-                elapsed_file_ops = time.time() - start_file_ops
-                logger.info(f"[TIMER]   File operations (managed): {elapsed_file_ops:.3f}s")
-                
-                #TODO USE img preprocess
-                start_gemini = time.time()
-                result = self.extractor.extract_features_in_memory(image_path.parent)
-                elapsed_gemini = time.time() - start_gemini
-                logger.info(f"[TIMER]   Gemini API call: {elapsed_gemini:.3f}s")
-                
-                if not result:
-                    return FeatureExtractionResponse(
-                        success=False,
-                        description="Falha ao extrair features da imagem"
-                    )
-                
-                first_key = list(result.keys())[0]
-                features_data = result[first_key]
-                
-                if "error" in features_data:
-                    return FeatureExtractionResponse(
-                        success=False,
-                        description=features_data.get("error"),
-                    )
-                
-                start_parse = time.time()
-                features = ClothingFeatures(**features_data)
-                elapsed_parse = time.time() - start_parse
-                logger.info(f"[TIMER]   Parse features: {elapsed_parse:.3f}s")
-                
-                start_description = time.time()
-                description = generate_description_from_features(features.model_dump())
-                elapsed_description = time.time() - start_description
-                logger.info(f"[TIMER]   Generate description: {elapsed_description:.3f}s")
-                
-                elapsed_total = time.time() - start_total
-                logger.info(f"[TIMER] TOTAL AI service: {elapsed_total:.3f}s")
-                
-                return FeatureExtractionResponse(
-                    success=True,
-                    features = features,
-                    description = description
+                    description=f"Erro ao processar imagem: {str(e)}"
                 )
-                
-        except Exception as e:
+    
+    def _extract_features(self, image_data: bytes, root) -> FeatureExtractionResponse:
+        # Validar imagem antes de processar
+        with tracer.span("features.validate"):
+            image, error_msg = self.image_service.open_image(image_data)
+        if image is None:
             return FeatureExtractionResponse(
                 success=False,
-                description=f"Erro ao processar imagem: {str(e)}"
+                description=f"Imagem inválida: {error_msg}"
+            )
+        
+        # Pré-processamento: a imagem aberta na validação é decodificada uma única vez
+        # (draft mode) e reduzida; hash e envio usam o mesmo resultado, sem passar pelo disco
+        image_source = image_data
+        if self.extractor.preprocess:
+            with tracer.span("features.preprocess") as span:
+                original_size = image.size
+                image_source = prepare_image(image, max_side=self.extractor.max_side, crop=self.extractor.crop_background)
+                span.set(original=f"{original_size[0]}x{original_size[1]}", prepared=f"{image_source.width}x{image_source.height}")
+        
+        cache_key = None
+        if self.feature_cache is not None:
+            with tracer.span("features.cache_lookup") as span:
+                image_hash = self.image_service.content_hash(image_source, mode=self.cache_hash_mode)
+                cache_key = f"{self._cache_namespace}:{image_hash}"
+                cached = self.feature_cache.get(cache_key)
+                span.set(hit=cached is not None)
+            if cached is not None:
+                root.set(cache="hit")
+                return self._build_response(cached)
+        
+        with tracer.span("features.gemini", batched=self.feature_batcher is not None):
+            if self.feature_batcher is not None:
+                # A imagem entra no próximo batch de uploads concorrentes
+                result = self.feature_batcher.extract([("image.jpg", self.extractor.prepare_part(image_source))])
+            else:
+                result = self.extractor.extract_features_from_image(image_source)
+        
+        if not result:
+            return FeatureExtractionResponse(
+                success=False,
+                description="Falha ao extrair features da imagem"
             )
+        
+        first_key = list(result.keys())[0]
+        features_data = result[first_key]
+        
+        if "error" in features_data:
+            return FeatureExtractionResponse(
+                success=False,
+                description=features_data.get("error"),
+            )
+        
+        response = self._build_response(features_data)
+        if cache_key is not None:
+            self.feature_cache.set(cache_key, response.features.model_dump())
+        
+        return response
@@ -1,9 +1,10 @@
 import io
 import base64
+import hashlib
 import cv2
 import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,26 +27,86 @@ class ImageService:
         Returns:
             Tuple[bool, Optional[str]]: (is_valid, error_message)
         """
+        image, error_msg = self.open_image(image_data)
+        return image is not None, error_msg
+    
+    def open_image(self, image_data: bytes) -> Tuple[Optional[Image.Image], Optional[str]]:
+        """
+        Abre e valida a imagem (formato e dimensões), lendo apenas o cabeçalho.
+        
+        A imagem devolvida ainda não foi decodificada: quem a usa pode decodificá-la
+        uma única vez (ex: em draft mode, já reduzida).
+        
+        Args:
+            image_data: Binary image data
+            
+        Returns:
+            Tuple[Optional[Image.Image], Optional[str]]: (image, None) se válida, (None, error_message) se não
+        """
         try:
             image = Image.open(io.BytesIO(image_data))
             
-            # Validar formato
-            if image.format not in self.SUPPORTED_FORMATS:
-                return False, f"Formato não suportado: {image.format}. Use {', '.join(self.SUPPORTED_FORMATS)}"
+            error_msg = self.check_image(image)
+            if error_msg:
+                return None, error_msg
             
-            # Validar dimensões
-            width, height = image.size
-            if width > self.MAX_DIMENSION or height > self.MAX_DIMENSION:
-                return False, f"Imagem muito grande: {width}x{height}. Máximo: {self.MAX_DIMENSION}px"
+            logger.debug(f"Image validated: {image.format}, {image.width}x{image.height}, mode={image.mode}")
+            return image, None
             
-            if width < self.MIN_DIMENSION or height < self.MIN_DIMENSION:
-                return False, f"Imagem muito pequena: {width}x{height}. Mínimo: {self.MIN_DIMENSION}px"
+        except Exception as e:
+            return None, f"Erro ao validar imagem: {str(e)}"
+    
+    def check_image(self, image: Image.Image) -> Optional[str]:
+        """
+        Valida formato e dimensões de uma imagem já aberta (apenas cabeçalho).
+        
+        Args:
+            image: Imagem PIL aberta
             
-            logger.debug(f"Image validated: {image.format}, {width}x{height}, mode={image.mode}")
-            return True, None
+        Returns:
+            Optional[str]: Mensagem de erro, ou None se a imagem é válida
+        """
+        # Validar formato
+        if image.format not in self.SUPPORTED_FORMATS:
+            return f"Formato não suportado: {image.format}. Use {', '.join(self.SUPPORTED_FORMATS)}"
+        
+        # Validar dimensões
+        width, height = image.size
+        if width > self.MAX_DIMENSION or height > self.MAX_DIMENSION:
+            return f"Imagem muito grande: {width}x{height}. Máximo: {self.MAX_DIMENSION}px"
+        
+        if width < self.MIN_DIMENSION or height < self.MIN_DIMENSION:
+            return f"Imagem muito pequena: {width}x{height}. Mínimo: {self.MIN_DIMENSION}px"
+        
+        return None
+    
+    def content_hash(self, image_data: Union[bytes, Image.Image], mode: str = "content") -> str:
+        """
+        Calcula o hash do conteúdo decodificado da imagem (independe de metadados/EXIF).
+        
+        Args:
+            image_data: Binary image data ou imagem PIL (reaproveita a decodificação)
+            mode: "content" (SHA-256 dos pixels RGB: mesma foto reenviada) ou
+                "perceptual" (hash médio 8x8 por canal + cor média quantizada:
+                tolera recompressão e redimensionamento)
             
-        except Exception as e:
-            return False, f"Erro ao validar imagem: {str(e)}"
+        Returns:
+            str: Hash hexadecimal prefixado pelo modo
+        """
+        image = image_data if isinstance(image_data, Image.Image) else Image.open(io.BytesIO(image_data))
+        
+        if mode == "perceptual":
+            image.draft('RGB', (64, 64))  # JPEG ainda não decodificado: decodifica já reduzido
+            pixels = np.asarray(image.convert('RGB').resize((8, 8), Image.BILINEAR), dtype=np.float32)
+            means = pixels.mean(axis=(0, 1))
+            bits = np.packbits((pixels > means).transpose(2, 0, 1).ravel())
+            color = (means.astype(np.uint8) >> 4).tobytes()
+            return f"p:{bits.tobytes().hex()}{color.hex()}"
+        
+        rgb = image.convert('RGB')
+        digest = hashlib.sha256(f"{rgb.width}x{rgb.height}".encode())
+        digest.update(rgb.tobytes())
+        return f"c:{digest.hexdigest()}"
     
     def preprocess_image(self, image_data: bytes) -> np.ndarray:
         """
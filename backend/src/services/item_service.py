@@ -1,6 +1,7 @@
 import base64
 from typing import List, Optional, Tuple, Dict
 from src.repositories.item_repository import ItemRepository
+from src.repositories.suggestion_repository import SuggestionRepository
 from src.schemas.item import (
     ItemCreate, ItemUpdate, ItemStatus
 )
@@ -9,6 +10,9 @@ from src.core.exceptions import ServiceError
 from modules.embeddings import EmbeddingGenerator
 from modules.vector_db import VectorDB
 
+# Atributos que compõem o embedding do item (e o filtro de categoria das sugestões)
+EMBEDDING_FIELDS = ("category", "item_type", "primary_color", "usage", "texture", "print_category")
+
 
 class ItemService:
     def __init__(
@@ -20,6 +24,7 @@ class ItemService:
         self.repository = repository
         self.vector_db = vector_db
         self.embedding_gen = embedding_generator
+        self.suggestion_repository = SuggestionRepository(repository.db)
 
     def _encode_image_url(self, image_url: str) -> str:
         try:
@@ -39,29 +44,26 @@ class ItemService:
         item_dict['image_url'] = self._decode_image_base64(item_dict['image_url'])
 
         item = self.repository.create(user_id, ItemCreate(**item_dict))
+        self._store_embedding(user_id, item)
+        
+        return item
+
+    def _store_embedding(self, user_id: int, item: Item) -> None:
+        """Gera (ou regenera) o embedding do item na coleção do usuário"""
         collection_name = f"user_{user_id}_pieces"
         self.vector_db.get_or_create_collection(collection_name)
 
-        piece_data = {
-            "category": item_data.category,
-            "item_type": item_data.item_type,  # Assuming item_type is in item
-            "primary_color": item_data.primary_color,
-            "usage": item_data.usage,  # Assuming usage is in item_data or default
-            "texture": item_data.texture,  # Assuming texture is in item_data or default
-            "print_category": item_data.print_category  # Assuming print_category is in item_data or default
-        }
+        piece_data = {field: getattr(item, field) for field in EMBEDDING_FIELDS}
         
         # Generate embedding
         embedding = self.embedding_gen._generate_piece_embedding(piece_data)
         
-        # Add to collection
+        # Add to collection (upsert: sobrescreve o embedding de um item editado)
         self.vector_db.add_item(
             collection_name=collection_name,
             embedding=embedding.tolist(),
             id=str(item.id),  # Use item ID as the unique key
         )
-        
-        return item
 
     def get_item(self, item_id: int, user_id: int, allow_others: bool = False) -> Item:
         item = self.repository.get_by_id(item_id, None if allow_others else user_id)
@@ -83,11 +85,16 @@ class ItemService:
         if item_data.image_url:
             item_data.image_url = self._decode_image_base64(item_data.image_url)
 
-        #TODO UPDATE vector db with new embdedding
-            
+        # O repositório altera a mesma instância: guarda os atributos antes do update
+        previous = {field: getattr(item, field) for field in EMBEDDING_FIELDS}
         updated_item = self.repository.update(item_id, user_id, item_data)
         if not updated_item:
             raise ServiceError("Falha ao atualizar o item")
+
+        # Qualquer atributo do embedding alterado invalida o vetor e a sugestão persistida
+        if any(getattr(updated_item, field) != previous[field] for field in EMBEDDING_FIELDS):
+            self._store_embedding(user_id, updated_item)
+            self.suggestion_repository.delete_by_item(item_id)
         return updated_item
 
     def delete_item(self, item_id: int, user_id: int, permanent: bool = False) -> Dict[str, str]:
@@ -96,6 +103,7 @@ class ItemService:
             raise ServiceError("Item não encontrado")
         
         #TODO DELETE in vector db
+        self.suggestion_repository.delete_by_item(item_id)
               
         if permanent:
             success = self.repository.hard_delete(item_id, user_id)
@@ -0,0 +1,236 @@
+"""
+Leitura em streaming de uploads de imagem (multipart/form-data ou bytes crus)
+
+O endpoint base64 recebe um JSON ~33% maior que a imagem e só descobre que o
+arquivo é inválido depois de receber e decodificar o corpo inteiro. Aqui o
+corpo é consumido em chunks à medida que chega:
+- Content-Length acima de MAX_UPLOAD_SIZE é recusado antes de ler o corpo
+- a assinatura (JPEG/PNG/WEBP) é verificada nos primeiros bytes
+- formato e dimensões são validados assim que o cabeçalho da imagem chega
+- a leitura é interrompida assim que o total passa de MAX_UPLOAD_SIZE
+"""
+
+import io
+import logging
+from typing import AsyncIterator, Optional
+
+from PIL import Image
+
+from src.core.exceptions import UploadError
+from src.services.image_service import ImageService
+
+logger = logging.getLogger(__name__)
+
+# Assinaturas (magic bytes) dos formatos aceitos
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+# Bytes necessários para identificar o formato pela assinatura
+SIGNATURE_SIZE = 12
+# Overhead aceito no Content-Length de um multipart (boundaries e cabeçalhos das partes)
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def detect_format(header: bytes) -> Optional[str]:
+    """
+    Identifica o formato da imagem pelos primeiros bytes
+
+    Returns:
+        "JPEG", "PNG", "WEBP" ou None
+    """
+    for signature, image_format in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+class _MultipartImageReader:
+    """
+    Parser incremental de multipart/form-data que extrai a primeira parte com arquivo
+
+    Campos sem filename são ignorados; o restante do corpo após o arquivo não é lido.
+    """
+
+    MAX_HEADERS_SIZE = 16 * 1024
+
+    def __init__(self, boundary: bytes):
+        self._delimiter = b"\r\n--" + boundary
+        # O primeiro delimitador não é precedido de CRLF
+        self._buffer = b"\r\n"
+        self._state = "preamble"
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """
+        Processa um chunk do corpo
+
+        Returns:
+            Bytes do arquivo contidos no chunk (pode ser vazio)
+        """
+        self._buffer += chunk
+        output = []
+        while not self.done:
+            if self._state in ("preamble", "skip"):
+                index = self._buffer.find(self._delimiter)
+                if index < 0:
+                    self._buffer = self._buffer[-(len(self._delimiter) - 1):]
+                    break
+                self._buffer = self._buffer[index + len(self._delimiter):]
+                self._state = "headers"
+
+            elif self._state == "headers":
+                if self._buffer.startswith(b"--"):
+                    # Delimitador final: corpo sem arquivo
+                    self.done = True
+                    break
+                index = self._buffer.find(b"\r\n\r\n")
+                if index < 0:
+                    if len(self._buffer) > self.MAX_HEADERS_SIZE:
+                        raise UploadError("Cabeçalhos multipart inválidos")
+                    break
+                headers = self._buffer[:index].lower()
+                self._buffer = self._buffer[index + 4:]
+                self._state = "body" if b"filename=" in headers else "skip"
+
+            else:  # body
+                index = self._buffer.find(self._delimiter)
+                if index >= 0:
+                    output.append(self._buffer[:index])
+                    self._buffer = b""
+                    self.done = True
+                    break
+                # Mantém o final do buffer: pode ser o início do delimitador
+                keep = len(self._delimiter) - 1
+                if len(self._buffer) > keep:
+                    output.append(self._buffer[:-keep])
+                    self._buffer = self._buffer[-keep:]
+                break
+        return b"".join(output)
+
+
+class _RawImageReader:
+    """Corpo inteiro é a imagem (image/* ou application/octet-stream)"""
+
+    done = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        return chunk
+
+
+class UploadService:
+    """Service for streaming image uploads with early validation."""
+
+    # Bytes recebidos sem conseguir ler o cabeçalho da imagem antes de recusar o arquivo
+    # (JPEGs com EXIF/ICC grandes têm o SOF depois de dezenas de KB)
+    HEADER_PROBE_LIMIT = 256 * 1024
+
+    def __init__(self, image_service: ImageService, max_size: int):
+        """
+        Args:
+            image_service: Validação de formato e dimensões
+            max_size: Tamanho máximo da imagem em bytes (MAX_UPLOAD_SIZE)
+        """
+        self.image_service = image_service
+        self.max_size = max_size
+
+    def _reader_for(self, content_type: str):
+        media_type, _, params = content_type.partition(";")
+        media_type = media_type.strip().lower()
+
+        if media_type == "multipart/form-data":
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key.lower() == "boundary" and value:
+                    return _MultipartImageReader(value.strip('"').encode("latin-1"))
+            raise UploadError("multipart/form-data sem boundary")
+
+        if media_type.startswith("image/") or media_type == "application/octet-stream":
+            return _RawImageReader()
+
+        raise UploadError(
+            f"Content-Type não suportado: {media_type or 'ausente'}. "
+            "Use multipart/form-data, image/* ou application/octet-stream",
+            status_code=415
+        )
+
+    def _probe_header(self, data: bytearray) -> bool:
+        """
+        Valida assinatura, formato e dimensões com os bytes recebidos até agora
+
+        Returns:
+            True quando o cabeçalho já foi validado, False se ainda faltam bytes
+
+        Raises:
+            UploadError: Arquivo não é uma imagem suportada ou tem dimensões inválidas
+        """
+        if len(data) < SIGNATURE_SIZE:
+            return False
+        if detect_format(bytes(data[:SIGNATURE_SIZE])) is None:
+            raise UploadError(
+                f"Arquivo não é uma imagem suportada. Use {', '.join(sorted(self.image_service.SUPPORTED_FORMATS))}",
+                status_code=415
+            )
+
+        try:
+            image = Image.open(io.BytesIO(bytes(data)))
+        except Exception:
+            if len(data) >= self.HEADER_PROBE_LIMIT:
+                raise UploadError("Cabeçalho da imagem inválido")
+            return False
+
+        error_msg = self.image_service.check_image(image)
+        if error_msg:
+            raise UploadError(error_msg)
+        return True
+
+    async def read_image(
+        self,
+        stream: AsyncIterator[bytes],
+        content_type: str,
+        content_length: Optional[int] = None
+    ) -> bytes:
+        """
+        Consome o corpo da requisição em chunks e devolve os bytes da imagem
+
+        Args:
+            stream: Iterador assíncrono do corpo (Request.stream())
+            content_type: Header Content-Type
+            content_length: Header Content-Length, se enviado
+
+        Returns:
+            bytes: Imagem completa, com cabeçalho já validado
+
+        Raises:
+            UploadError: Corpo grande demais (413), tipo não suportado (415) ou imagem inválida (400)
+        """
+        reader = self._reader_for(content_type)
+        limit = self.max_size + (MULTIPART_OVERHEAD if isinstance(reader, _MultipartImageReader) else 0)
+        if content_length is not None and content_length > limit:
+            raise UploadError(f"Arquivo muito grande. Máximo: {self.max_size // (1024 * 1024)}MB", status_code=413)
+
+        data = bytearray()
+        header_checked = False
+        async for chunk in stream:
+            data += reader.feed(chunk)
+            if len(data) > self.max_size:
+                raise UploadError(f"Arquivo muito grande. Máximo: {self.max_size // (1024 * 1024)}MB", status_code=413)
+            if not header_checked:
+                header_checked = self._probe_header(data)
+            if reader.done:
+                break
+
+        if not data:
+            raise UploadError("Nenhuma imagem enviada")
+        if not header_checked:
+            # Corpo menor que o necessário para o cabeçalho: validação completa
+            if len(data) < SIGNATURE_SIZE or detect_format(bytes(data[:SIGNATURE_SIZE])) is None:
+                raise UploadError("Arquivo não é uma imagem suportada", status_code=415)
+            valid, error_msg = self.image_service.validate_image(bytes(data))
+            if not valid:
+                raise UploadError(error_msg)
+
+        logger.debug(f"Upload received: {len(data) / 1024:.1f} KB")
+        return bytes(data)